@@ -263,25 +263,17 @@ async def memo_generate_stream(company: str, product: str, body: MemoGenerateReq
     """
     _check_rate_limits(request)
 
-    # Run the generator in a thread and bridge its progress_cb to an asyncio queue.
-    # This keeps the pipeline synchronous (already thread-parallel internally)
-    # while letting us yield SSE events as stages complete.
+    # Run the generator as a single-flight AI job and stream its progress_cb
+    # events. The pipeline stays synchronous (already thread-parallel
+    # internally); a second request for the same memo scope while one is in
+    # flight subscribes to that run instead of paying for another.
     async def event_stream():
-        import concurrent.futures
+        from core.ai_jobs import ai_jobs, make_job_key
         from core.memo.generator import MemoGenerator
         from core.memo.storage import MemoStorage
 
-        queue: asyncio.Queue = asyncio.Queue()
-        loop = asyncio.get_event_loop()
-
-        def progress_cb(event_type: str, payload: dict):
-            # Called from worker thread — thread-safe put via loop
-            try:
-                loop.call_soon_threadsafe(queue.put_nowait, (event_type, payload))
-            except RuntimeError:
-                pass  # Loop closed — stream ending
-
-        def _run_pipeline():
+        def _run_pipeline(job):
+            progress_cb = job.publish  # thread-safe fan-out to every subscriber
             generator = MemoGenerator()
             memo = generator.generate_full_memo(
                 company=company,
@@ -302,8 +294,7 @@ async def memo_generate_stream(company: str, product: str, body: MemoGenerateReq
                 storage.save(memo)
             except Exception as e:
                 logger.error("Memo save failed in agent pipeline: %s", e)
-                progress_cb("error", {"message": f"save_failed: {e}"})
-                return memo
+                raise RuntimeError(f"save_failed: {e}") from e
 
             # Best-effort: record the memo's thesis signal into Company Mind
             # so future memos see prior recommendations and can flag drift.
@@ -323,8 +314,13 @@ async def memo_generate_stream(company: str, product: str, body: MemoGenerateReq
             })
             return memo
 
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        future = executor.submit(_run_pipeline)
+        job_key = make_job_key("memo_stream", company, product, body.template_key,
+                               sorted(body.sections or []), body.snapshot, body.currency)
+        job, created = ai_jobs.submit(job_key, _run_pipeline, tier="memo",
+                                      label=f"memo {company}/{product} {body.template_key}")
+        if not created:
+            logger.info("Memo stream for %s/%s joined in-flight job %s", company, product, job.id)
+        queue = job.subscribe()
 
         # Heartbeat cadence: CF Free idle-proxy cap is ~100s. Individual pipeline
         # stages (research, polish) can run 60-90s without emitting progress,
@@ -334,43 +330,38 @@ async def memo_generate_stream(company: str, product: str, body: MemoGenerateReq
         # See tasks/lessons.md 2026-04-19 entry on CF HTTP/2 + SSE.
         HEARTBEAT_INTERVAL_S = 20
 
-        # Stream events until the future resolves
+        # Stream events until the job resolves. The job's own terminal
+        # events are `done` (payload carries the memo) and `error`.
         last_yield = time.monotonic()
-        done = False
-        while not done:
-            try:
-                event_type, payload = await asyncio.wait_for(queue.get(), timeout=0.5)
-                data = json.dumps(payload)
-                yield f"event: {event_type}\ndata: {data}\n\n"
-                last_yield = time.monotonic()
-                if event_type in ("saved", "error"):
-                    done = True
-            except asyncio.TimeoutError:
-                if future.done():
-                    # Drain any pending events then exit
-                    while not queue.empty():
-                        event_type, payload = queue.get_nowait()
-                        yield f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
-                        last_yield = time.monotonic()
-                    done = True
-                elif time.monotonic() - last_yield >= HEARTBEAT_INTERVAL_S:
-                    # SSE comment line — ignored by clients, keeps CF edge alive
-                    yield ": keepalive\n\n"
-                    last_yield = time.monotonic()
-                continue
-            if await request.is_disconnected():
-                logger.info("Client disconnected from memo stream")
-                done = True
-
-        # Final done event so the frontend stops listening
         try:
-            memo = future.result(timeout=5)
-            yield f"event: done\ndata: {json.dumps({'memo_id': memo.get('id'), 'ok': True})}\n\n"
-        except Exception as e:
-            logger.error("Memo pipeline failed: %s", e)
-            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+            while True:
+                try:
+                    event_type, payload = await asyncio.wait_for(queue.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_yield >= HEARTBEAT_INTERVAL_S:
+                        # SSE comment line — ignored by clients, keeps CF edge alive
+                        yield ": keepalive\n\n"
+                        last_yield = time.monotonic()
+                    continue
+
+                if event_type == "done":
+                    # Final done event so the frontend stops listening
+                    memo = payload.get("result") or {}
+                    yield f"event: done\ndata: {json.dumps({'memo_id': memo.get('id'), 'ok': True})}\n\n"
+                    break
+                if event_type == "error":
+                    logger.error("Memo pipeline failed: %s", job.exception)
+                    yield f"event: error\ndata: {json.dumps({'message': str(job.exception or payload.get('message'))})}\n\n"
+                    break
+
+                yield f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+                last_yield = time.monotonic()
+                if await request.is_disconnected():
+                    # The job keeps running so the memo is still saved.
+                    logger.info("Client disconnected from memo stream")
+                    break
         finally:
-            executor.shutdown(wait=False)
+            job.unsubscribe(queue)
 
     return StreamingResponse(
         event_stream(),
@@ -551,4 +542,12 @@ async def list_sessions(limit: int = 20):
 async def get_rate_limits(request: Request):
     """Get current rate limit stats for the authenticated user."""
     from core.agents.rate_limit import rate_limiter
-    return rate_limiter.get_user_stats(request)
+    from core.agents.tool_cache import tool_cache
+    return {**rate_limiter.get_user_stats(request), "tool_cache": tool_cache.stats()}
+
+
+@router.get("/tool-cache")
+async def get_tool_cache_stats():
+    """Shared tool-result cache stats: size, hit ratio, per-tool hits/misses."""
+    from core.agents.tool_cache import tool_cache
+    return tool_cache.stats()
@@ -185,6 +185,7 @@ _SKIP_PREFIXES = (
     "/auth/",
     "/api/integration/",
     "/health",
+    "/metrics",       # own bearer token (LAITH_METRICS_TOKEN)
     "/docs",
     "/openapi.json",
     "/redoc",
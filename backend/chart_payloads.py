@@ -0,0 +1,280 @@
+"""Compact chart payloads — opt-in columnar JSON, orjson serialisation, compression.
+
+Chart endpoints return lists of per-row dicts (cohorts, loss triangles,
+collection curves, ...). Every row repeats every key, and FastAPI runs the
+whole payload through jsonable_encoder before json.dumps — both show up on
+the larger tapes as hundreds of KB and tens of ms per chart.
+
+ChartRoute is the route class for the main app: GET routes under
+`/charts/` have their return value serialised directly with orjson
+(NumPy scalars / arrays, dates and NaN → null handled natively), skipping
+jsonable_encoder. With `?format=columnar` every list of same-keyed dicts
+is additionally rewritten as
+
+    {"$columns": {"month": [...], "collected": [...], ...}}
+
+(row order and key order preserved) — the frontend expands it back to rows
+in services/api.js, so chart components never see the columnar form.
+Without the flag the response body is the same JSON as before.
+
+install_compression() adds response compression for every route: brotli
+for clients that accept `br` when the optional `brotli` package is
+installed, gzip otherwise. Server-sent event streams are never compressed.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import os
+import zlib
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+
+from backend.profiling import ProfiledRoute
+
+try:
+    import brotli
+except ImportError:  # optional — gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR = "columnar"
+COLUMNS_KEY = "$columns"
+CHART_PATH_MARKER = "/charts/"
+# Below this size compression costs more than it saves
+COMPRESS_MIN_BYTES = int(os.getenv("LAITH_COMPRESS_MIN_BYTES", "1024"))
+# Dynamic responses: mid-range levels give most of the ratio at a fraction of the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def to_columnar(obj: Any) -> Any:
+    """Rewrite every list of same-keyed dicts in obj as {"$columns": {key: [values]}}.
+
+    Lists whose rows differ in keys (or aren't all dicts) are left as rows,
+    so expanding the result always reproduces the original payload.
+    """
+    if isinstance(obj, dict):
+        return {k: to_columnar(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        if obj and all(isinstance(row, dict) for row in obj):
+            keys = tuple(obj[0])
+            if keys and all(tuple(row) == keys for row in obj):
+                return {COLUMNS_KEY: {k: [to_columnar(row[k]) for row in obj] for k in keys}}
+        return [to_columnar(v) for v in obj]
+    return obj
+
+
+def from_columnar(obj: Any) -> Any:
+    """Inverse of to_columnar (the Python twin of the frontend adapter)."""
+    if isinstance(obj, dict):
+        cols = obj.get(COLUMNS_KEY) if len(obj) == 1 else None
+        if isinstance(cols, dict):
+            keys = list(cols)
+            n = len(cols[keys[0]]) if keys else 0
+            return [{k: from_columnar(cols[k][i]) for k in keys} for i in range(n)]
+        return {k: from_columnar(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [from_columnar(v) for v in obj]
+    return obj
+
+
+def _default(value: Any) -> Any:
+    """Anything orjson can't serialise natively goes through FastAPI's encoder."""
+    if isinstance(value, float):           # float subclasses, e.g. numpy.float64 on older orjson
+        return float(value)
+    encoded = jsonable_encoder(value)
+    if encoded is value:
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+    return encoded
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTS)
+
+
+class ChartJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def chart_response(content: Any, fmt: str | None = None) -> ChartJSONResponse:
+    if fmt == COLUMNAR:
+        content = to_columnar(content)
+    return ChartJSONResponse(content)
+
+
+def _with_format(endpoint):
+    """Wrap a chart endpoint so its result is returned as a ChartJSONResponse.
+
+    The wrapper takes one extra Request parameter (to read ?format=) and
+    otherwise keeps the endpoint's signature, so FastAPI's parameter
+    parsing, validation and OpenAPI output are unchanged.
+    """
+    sig = inspect.signature(endpoint)
+    req_param = "_chart_request"
+    params = list(sig.parameters.values())
+    params.append(inspect.Parameter(req_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+    def _respond(result, request):
+        if isinstance(result, JSONResponse) or not isinstance(result, (dict, list)):
+            return result
+        return chart_response(result, request.query_params.get("format"))
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(req_param)
+            return _respond(await endpoint(*args, **kwargs), request)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            request = kwargs.pop(req_param)
+            return _respond(endpoint(*args, **kwargs), request)
+
+    wrapper.__signature__ = sig.replace(parameters=params)
+    return wrapper
+
+
+class ChartRoute(ProfiledRoute):
+    """APIRoute that serialises GET /charts/ responses with orjson (+ optional columnar form).
+
+    Extends ProfiledRoute so every app-level route can be profiled per request.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        methods = {m.upper() for m in (kwargs.get("methods") or ())}
+        if CHART_PATH_MARKER in path and methods <= {"GET", "HEAD"} and not kwargs.get("response_model"):
+            endpoint = _with_format(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class _GzipCodec:
+    encoding = "gzip"
+
+    def __init__(self):
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 → gzip container
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self._z.compress(body)
+        return out + (self._z.flush(zlib.Z_SYNC_FLUSH) if more_body else self._z.flush())
+
+
+class _BrotliCodec:
+    encoding = "br"
+
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self._c.process(body)
+        return out + (self._c.flush() if more_body else self._c.finish())
+
+
+class CompressionMiddleware:
+    """ASGI middleware: brotli when the client accepts `br` and `brotli` is installed, else gzip.
+
+    Standalone rather than a GZipMiddleware subclass — Starlette's responder
+    internals change between releases. Responses pass through untouched when
+    they are event streams, already encoded, or smaller than minimum_size by
+    Content-Length or as a single body chunk. The Content-Length check
+    matters because the BaseHTTPMiddleware layers inside (auth, ETag)
+    re-stream every response, so a small body can arrive in several chunks.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES,
+                 exclude_content_types: tuple = ("text/event-stream",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_content_types = exclude_content_types
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = _accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+        if brotli is not None and "br" in accepted:
+            codec_cls = _BrotliCodec
+        elif "gzip" in accepted:
+            codec_cls = _GzipCodec
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        codec = None
+        passthrough = False
+
+        async def send_compressed(message) -> None:
+            nonlocal start_message, codec, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                length = headers.get("content-length", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith(self.exclude_content_types)
+                    or (length.isdigit() and int(length) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message  # held until the first body chunk decides
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if codec is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                codec = codec_cls()
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = codec.encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    body = codec.compress(body, more_body=True)
+                else:
+                    body = codec.compress(body, more_body=False)
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+            await send({"type": "http.response.body",
+                        "body": codec.compress(body, more_body=more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _accepted_encodings(header: str) -> set:
+    out = set()
+    for part in header.split(","):
+        coding, _, q = part.strip().partition(";")
+        if coding and q.strip().replace(" ", "") not in ("q=0", "q=0.0"):
+            out.add(coding.strip().lower())
+    return out
+
+
+def install_compression(app) -> str:
+    """Add response compression to app; returns the preferred encoding."""
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+    return "br" if brotli is not None else "gzip"
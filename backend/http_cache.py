@@ -0,0 +1,234 @@
+"""ETag / 304 caching for tape-backed chart and summary GETs.
+
+Chart endpoints recompute and re-serialise on every fetch, even when the
+tape, as_of_date and currency are exactly what the browser asked for last
+time. This middleware derives a strong ETag *before* the handler runs from
+
+    (tape content hash, product sidecars, FX rates, method + path,
+     sorted query params, effective as-of date, code version)
+
+and answers a matching If-None-Match with 304 without loading the tape.
+The tape hash is a sha256 of the file bytes, memoised per (size, mtime),
+so an unchanged tape is hashed once per process. The effective as-of date
+is the as_of_date param, else today — chart functions measure ageing and
+DPD against the wall clock when none is sent, so the ETag rolls daily.
+
+Only opted-in routes participate (TapeETagMiddleware(routes=...)). Routes
+that read a single resolved snapshot key on that tape; routes that read
+every tape of the product (risk migration, HHI time series) key on all of
+them.
+
+Cache-Control: responses for the latest tape are `private, no-cache` —
+the browser revalidates every time and gets a cheap 304. When
+LAITH_HTTP_CACHE_PUBLIC is set, responses for an explicitly pinned
+snapshot become `public, max-age=0, s-maxage=LAITH_HTTP_CACHE_MAX_AGE,
+must-revalidate` so a reverse proxy in front of the API can share them.
+Only enable that when the proxy sits behind the same access policy.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import compile_path
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PUBLIC = os.getenv("LAITH_HTTP_CACHE_PUBLIC", "").lower() in ("1", "true", "yes")
+_SHARED_MAX_AGE = int(os.getenv("LAITH_HTTP_CACHE_MAX_AGE", "3600"))
+# Product-level files that change chart output without changing the tape
+SIDECAR_FILES = ("config.json", "facility_params.json", "methodology.json")
+
+_hash_lock = threading.Lock()
+_stats = {"not_modified": 0, "full": 0}
+_hash_memo: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_code_version: Optional[str] = None
+
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def tape_content_hash(path: str) -> str:
+    """sha256 of the tape bytes, recomputed only when size or mtime move."""
+    fp = file_fingerprint(path)
+    with _hash_lock:
+        hit = _hash_memo.get(path)
+        if hit and hit[0] == fp:
+            return hit[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_memo[path] = (fp, digest)
+    return digest
+
+
+def code_version() -> str:
+    """LAITH_CODE_VERSION, else a digest of the core/ and backend/ sources on disk."""
+    global _code_version
+    if _code_version is None:
+        env = os.getenv("LAITH_CODE_VERSION")
+        if env:
+            _code_version = env
+        else:
+            h = hashlib.sha256()
+            for sub in ("core", "backend"):
+                for dirpath, dirnames, filenames in os.walk(os.path.join(_ROOT, sub)):
+                    dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+                    for name in sorted(filenames):
+                        if name.endswith(".py"):
+                            path = os.path.join(dirpath, name)
+                            h.update(f"{os.path.relpath(path, _ROOT)}:{file_fingerprint(path)}".encode())
+            _code_version = h.hexdigest()[:16]
+    return _code_version
+
+
+def _count(key: str) -> None:
+    with _hash_lock:
+        _stats[key] += 1
+
+
+def cache_stats() -> Dict[str, object]:
+    """Process-wide 304 vs full-response counts for ETag-enabled routes."""
+    with _hash_lock:
+        total = _stats["not_modified"] + _stats["full"]
+        return {**_stats, "hit_rate": round(_stats["not_modified"] / total, 4) if total else 0.0}
+
+
+def _if_none_match(header: str) -> List[str]:
+    """Entity tags from an If-None-Match header (weak prefix stripped — 304s use weak comparison)."""
+    tags = []
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        if part:
+            tags.append(part)
+    return tags
+
+
+def if_none_match_matches(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header value matches etag (or is `*`)."""
+    if not header:
+        return False
+    return header.strip() == "*" or etag in _if_none_match(header)
+
+
+def effective_as_of(request: Request) -> str:
+    """The as-of date a response is computed at. Chart functions default to
+    today when as_of_date is absent, so an unchanged tape still changes daily."""
+    return request.query_params.get("as_of_date") or date.today().isoformat()
+
+
+def _seconds_to_midnight() -> int:
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+class TapeETagMiddleware(BaseHTTPMiddleware):
+    """Strong ETags + If-None-Match → 304 for tape-backed GET routes.
+
+    routes:       path templates keyed on the resolved snapshot's tape
+    multi_routes: path templates keyed on every tape of the product
+    resolve:      (company, product, snapshot) → tape filepath (raises if unknown)
+    list_tapes:   (company, product) → filepaths of every tape
+    product_dir:  (company, product) → directory holding the product sidecars
+    fx_state:     (company, product, currency) → anything JSON-serialisable identifying
+                  the FX rate the response is converted at (None when unconverted)
+    """
+
+    def __init__(self, app, *, routes: Sequence[str] = (), multi_routes: Sequence[str] = (),
+                 resolve: Callable[[str, str, Optional[str]], str],
+                 list_tapes: Callable[[str, str], Iterable[str]],
+                 product_dir: Callable[[str, str], str],
+                 fx_state: Callable[[str, str, Optional[str]], object] = lambda co, prod, cur: None):
+        super().__init__(app)
+        # Multi-tape templates first so they win over a broader single-tape pattern
+        self._routes = [(compile_path(p)[0], True) for p in multi_routes] + \
+                       [(compile_path(p)[0], False) for p in routes]
+        self._resolve = resolve
+        self._list_tapes = list_tapes
+        self._product_dir = product_dir
+        self._fx_state = fx_state
+
+    def _match(self, path: str):
+        for regex, multi in self._routes:
+            m = regex.match(path)
+            if m:
+                return m.groupdict(), multi
+        return None
+
+    def etag_for(self, request: Request) -> Optional[str]:
+        """ETag for a request, or None when the route is not cacheable or the tape can't be resolved."""
+        match = self._match(request.url.path)
+        if match is None:
+            return None
+        params, multi = match
+        company, product = params.get("company"), params.get("product")
+        snapshot = request.query_params.get("snapshot")
+        try:
+            if multi:
+                tapes = sorted(self._list_tapes(company, product))
+            else:
+                tapes = [self._resolve(company, product, snapshot)]
+            tape_ids = [tape_content_hash(t) for t in tapes]
+            base = self._product_dir(company, product)
+            sidecars = [list(file_fingerprint(os.path.join(base, f)))
+                        for f in SIDECAR_FILES if os.path.exists(os.path.join(base, f))]
+            fx = self._fx_state(company, product, request.query_params.get("currency"))
+        except Exception:
+            return None
+        material = json.dumps({
+            "tapes": tape_ids,
+            "sidecars": sidecars,
+            "fx": fx,
+            "path": request.url.path,
+            "query": sorted(request.query_params.multi_items()),
+            "as_of": effective_as_of(request),
+            "code": code_version(),
+        }, sort_keys=True, default=str)
+        return '"' + hashlib.sha256(material.encode()).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def cache_control(request: Request) -> str:
+        if _PUBLIC and request.query_params.get("snapshot"):
+            max_age = _SHARED_MAX_AGE
+            if not request.query_params.get("as_of_date"):
+                # Computed as of today — a shared copy must not outlive the day
+                max_age = min(max_age, _seconds_to_midnight())
+            return f"public, max-age=0, s-maxage={max_age}, must-revalidate"
+        return "private, no-cache"
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD"):
+            return await call_next(request)
+        # The first request after a new tape hashes the whole file — off the event loop
+        etag = await run_in_threadpool(self.etag_for, request)
+        if etag is None:
+            return await call_next(request)
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control(request)}
+        if if_none_match_matches(request.headers.get("if-none-match"), etag):
+            _count("not_modified")
+            return Response(status_code=304, headers=headers)
+
+        _count("full")
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
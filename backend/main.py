@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 import sys, os, json, re, subprocess, tempfile, pandas as pd
@@ -7,9 +7,9 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.loader import get_companies, get_products, get_snapshots, load_snapshot, load_silq_snapshot
-from core.config import load_config, SUPPORTED_CURRENCIES
-from core.activity_log import log_activity, AI_COMMENTARY, AI_EXECUTIVE_SUMMARY, AI_TAB_INSIGHT, AI_CHAT, REPORT_GENERATED, COMPLIANCE_CERT, BREACH_NOTIFICATION, FACILITY_PARAMS_SAVED, DATAROOM_INGEST, MEMO_GENERATED, MEMO_EXPORTED, MIND_ENTRY_RECORDED, RESEARCH_QUERY, LEGAL_UPLOAD
+from core.loader import DATA_DIR, get_companies, get_products, get_snapshots, load_snapshot, load_silq_snapshot
+from core.config import load_config, get_fx_rates, SUPPORTED_CURRENCIES
+from core.activity_log import log_activity, AI_COMMENTARY, AI_EXECUTIVE_SUMMARY, AI_TAB_INSIGHT, AI_CHAT, REPORT_GENERATED, COMPLIANCE_CERT, BREACH_NOTIFICATION, FACILITY_PARAMS_SAVED, LEGAL_UPLOAD
 from core.analysis import (
     compute_summary, compute_deployment, compute_deployment_by_product,
     compute_collection_velocity,
@@ -32,7 +32,6 @@ from core.analysis import (
 from core.migration import compute_roll_rates
 from core.validation import validate_tape
 from core.consistency import run_consistency_check
-from core.reporter import generate_ai_analysis, save_pdf_report
 from core.analysis_ejari import parse_ejari_workbook
 from core.analysis_tamara import parse_tamara_data, get_tamara_summary_kpis
 from core.analysis_aajil import (
@@ -54,6 +53,10 @@ from core.analysis_silq import (
     filter_silq_by_date,
 )
 from core.validation_silq import validate_silq_tape
+from core.time_index import (
+    AAJIL_DATE_COL, KLAIM_DATE_COL, MAX_SWEEP_POINTS, SILQ_DATE_COL, SWEEP_METRICS,
+    as_of_sweep, sort_by_date, sweep_by_slices, sweep_cutoffs,
+)
 from core.metric_registry import get_methodology, get_registry
 from core.methodology_klaim import register_klaim_methodology
 from core.methodology_silq import register_silq_methodology
@@ -73,20 +76,17 @@ from core.portfolio import (
     compute_klaim_covenants,
     annotate_covenant_eod,
 )
+from core.covenant_ledger import (
+    covenant_series, ledger_entry, ledger_history, load_ledger, params_fingerprint, update_ledger,
+)
+from core.facility_whatif import build_facility_state, evaluate as evaluate_whatif, expand_grid, get_state_cache
 from core.database import engine, get_db
 from core.db_loader import (
     load_from_db, resolve_snapshot, list_snapshots,
     get_facility_config as db_facility_config,
 )
 from backend.integration import router as integration_router
-from core.dataroom.engine import DataRoomEngine
-from core.dataroom.analytics_snapshot import AnalyticsSnapshotEngine
-from core.mind import MasterMind, CompanyMind, build_mind_context
-from core.research.dual_engine import DualResearchEngine
-from core.memo.templates import MEMO_TEMPLATES, get_template, list_templates
-from core.memo.generator import MemoGenerator
-from core.memo.storage import MemoStorage
-from core.memo.pdf_export import export_memo_pdf
+from core.mind import build_mind_context
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
@@ -105,32 +105,38 @@ logger = logging.getLogger("laith")
 _OPTIONAL_DEPS = [
     ("pdfplumber", "Data room PDF text + table extraction"),
     ("docx", "Data room DOCX parsing (python-docx)"),
-    ("sklearn.feature_extraction.text", "TF-IDF search index (scikit-learn)"),
+    ("sklearn", "TF-IDF search index (scikit-learn)"),
     ("pymupdf4llm", "Legal PDF → markdown conversion"),
     ("fitz", "Legal PDF page extraction (pymupdf)"),
 ]
 
 
 def _probe_optional_deps() -> dict:
-    """Import-check every optional runtime dependency, log + persist result.
+    """Presence-check every optional runtime dependency, log + persist result.
 
+    Uses importlib.util.find_spec, so nothing is imported — pdfplumber,
+    sklearn and fitz only load when a feature first needs them.
     Returns the health dict (also written to data/_platform_health.json).
     """
-    import importlib
+    import importlib.util
     from pathlib import Path as _Path
 
     present: list[dict] = []
     missing: list[dict] = []
     for mod_name, purpose in _OPTIONAL_DEPS:
         try:
-            importlib.import_module(mod_name)
+            found = importlib.util.find_spec(mod_name) is not None
+            error = None if found else f"No module named '{mod_name}'"
+        except (ImportError, ValueError) as e:
+            found, error = False, str(e)
+        if found:
             present.append({"module": mod_name, "purpose": purpose})
-        except ImportError as e:
+        else:
             logger.error(
                 "[startup] MISSING OPTIONAL DEPENDENCY: %s — %s (feature will silently degrade). ImportError: %s",
-                mod_name, purpose, e,
+                mod_name, purpose, error,
             )
-            missing.append({"module": mod_name, "purpose": purpose, "error": str(e)})
+            missing.append({"module": mod_name, "purpose": purpose, "error": error})
 
     health = {
         "checked_at": datetime.now().isoformat()[:19],
@@ -183,6 +189,17 @@ async def lifespan(app: FastAPI):
     from core.mind.listeners import register_all_listeners
     register_all_listeners()
 
+    # Operator health cache — invalidated by the same events, warmed in the
+    # background so /api/operator/status never computes on a cold cache
+    from backend.operator import register_operator_listeners
+    register_operator_listeners()
+
+    # Optional: pregenerate every AI panel the first time a tape is loaded
+    if os.getenv('LAITH_AI_PREGENERATE_ON_INGEST', '').lower() in ('1', 'true', 'yes'):
+        from core.mind.event_bus import event_bus, Events
+        event_bus.subscribe(Events.TAPE_INGESTED, _pregenerate_on_ingest)
+        logger.info("AI pregeneration on tape ingest enabled.")
+
     # Register agent tools
     try:
         from core.agents.tools import register_all_tools
@@ -195,6 +212,10 @@ async def lifespan(app: FastAPI):
 
 
 app = FastAPI(title="ACP Private Credit API", lifespan=lifespan)
+# GET /charts/ routes declared on the app serialise with orjson and accept ?format=columnar
+from backend.chart_payloads import ChartRoute, install_compression
+from core.telemetry import RequestTimingMiddleware, get_telemetry, record_cache
+app.router.route_class = ChartRoute
 app.include_router(integration_router)
 
 from backend.legal import router as legal_router
@@ -221,9 +242,81 @@ async def health_check():
     """Unauthenticated health check for deploy scripts and monitoring."""
     return {"status": "ok"}
 
+
+# ── Telemetry ────────────────────────────────────────────────────────────────
+
+def _collect_cache_stats():
+    """Hit ratio / entries of caches that keep their own counts (polled per scrape).
+
+    Subsystems that load lazily (agent tools, memo bridge) are only reported
+    once something has imported them — a scrape never pulls them in.
+    """
+    from backend.http_cache import cache_stats
+    yield "laith_cache_hit_ratio", {"cache": "http_etag"}, cache_stats()["hit_rate"]
+    stats = get_state_cache().stats()
+    yield "laith_cache_hit_ratio", {"cache": "whatif_state"}, stats["hit_rate"]
+    yield "laith_cache_entries", {"cache": "whatif_state"}, stats["entries"]
+    tools = sys.modules.get("core.agents.tool_cache")
+    if tools is not None:
+        stats = tools.tool_cache.stats()
+        yield "laith_cache_hit_ratio", {"cache": "agent_tools"}, stats["hit_ratio"]
+        yield "laith_cache_entries", {"cache": "agent_tools"}, stats["entries"]
+    bridge = sys.modules.get("core.memo.analytics_bridge")
+    if bridge is not None:
+        stats = bridge.get_context_cache().stats()
+        yield "laith_cache_hit_ratio", {"cache": "memo_context"}, stats["hit_rate"]
+        yield "laith_cache_entries", {"cache": "memo_context"}, stats["entries"]
+    for name, cache in (("tape_klaim", _tape_cache), ("tape_silq", _silq_tape_cache),
+                        ("tape_aajil", _aajil_tape_cache)):
+        yield "laith_cache_entries", {"cache": name}, len(cache)
+
+
+get_telemetry().register_collector("caches", _collect_cache_stats)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    """Prometheus scrape endpoint (text exposition format).
+
+    Skipped by Cloudflare Access auth so a scraper can reach it. When
+    LAITH_METRICS_TOKEN is set the scraper must send it as a bearer token;
+    in production (CF_TEAM set) the endpoint stays closed until one is.
+    """
+    import hmac
+    from backend import cf_auth
+    token = os.getenv("LAITH_METRICS_TOKEN", "").strip()
+    if token:
+        sent = request.headers.get("authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    elif cf_auth.CF_TEAM:
+        raise HTTPException(status_code=403, detail="Set LAITH_METRICS_TOKEN to enable /metrics")
+    return PlainTextResponse(get_telemetry().render_prometheus(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
 from backend.onboarding import router as onboarding_router
 app.include_router(onboarding_router)
 
+# ETag/304 for tape-backed GETs — added before auth so it runs *inside* it:
+# a 304 is only ever answered to an authenticated request.
+from backend.http_cache import TapeETagMiddleware
+_PRODUCT_ROUTE = "/companies/{company}/products/{product}"
+app.add_middleware(
+    TapeETagMiddleware,
+    routes=[f"{_PRODUCT_ROUTE}/summary", f"{_PRODUCT_ROUTE}/date-range",
+            f"{_PRODUCT_ROUTE}/aajil-summary", f"{_PRODUCT_ROUTE}/charts/{{chart:path}}"],
+    multi_routes=[f"{_PRODUCT_ROUTE}/charts/risk-migration", f"{_PRODUCT_ROUTE}/charts/hhi-timeseries"],
+    resolve=lambda co, prod, snap: _resolve_snapshot(co, prod, snap)['filepath'],
+    list_tapes=lambda co, prod: [s['filepath'] for s in get_snapshots(co, prod)],
+    product_dir=lambda co, prod: os.path.join(DATA_DIR, co, prod),
+    fx_state=lambda co, prod, cur: _etag_fx_state(co, prod, cur),
+)
+
+# Admin-only ?_profile= / X-Laith-Profile request profiling — inside auth,
+# outside the ETag layer so a profiled request always runs its endpoint
+from backend.profiling import ProfilingMiddleware
+app.add_middleware(ProfilingMiddleware)
+
 # Auth middleware — must be added BEFORE CORSMiddleware (Starlette processes
 # middleware in reverse order, so CORS runs first, then auth)
 from backend.cf_auth import CloudflareAuthMiddleware
@@ -237,6 +330,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost: compress whatever the stack produced (gzip, or brotli when installed)
+install_compression(app)
+
+# Latency histogram by route template, wrapped around everything so the
+# number matches what the client waited for (GET /metrics, core.telemetry)
+app.add_middleware(RequestTimingMiddleware)
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 _tape_events_fired: set = set()
@@ -261,6 +361,7 @@ class _TapeCache(_OrderedDict):
             self.popitem(last=False)
 
 _tape_cache = _TapeCache()
+_silq_tape_cache = _TapeCache()
 
 
 _SNAPSHOT_EXTS = ('.csv', '.xlsx', '.ods', '.json')
@@ -312,12 +413,14 @@ def _load(company, product, snapshot):
     if not snaps:
         raise HTTPException(status_code=404, detail="No snapshots found")
     sel = _match_snapshot(snaps, snapshot)
-    # Cache loaded tapes to avoid re-parsing the same file per page load
+    # Cache loaded tapes to avoid re-parsing the same file per page load.
+    # Stored sorted on Deal date so as_of_date cuts are slices (core.time_index).
     _cache_key = sel['filepath']
+    record_cache("tape_klaim", _cache_key in _tape_cache)
     if _cache_key in _tape_cache:
         df = _tape_cache[_cache_key].copy()
     else:
-        df = load_snapshot(sel['filepath'])
+        df = sort_by_date(load_snapshot(sel['filepath']), KLAIM_DATE_COL)
         _tape_cache[_cache_key] = df
         df = df.copy()  # Return a copy so downstream mutations don't corrupt cache
 
@@ -387,63 +490,84 @@ def _integrity_path(company, product, snap_old, snap_new, suffix=''):
 
 # ── AI Response Cache ─────────────────────────────────────────────────────────
 
-import hashlib
-
-def _ai_cache_dir():
-    base = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reports', 'ai_cache')
-    os.makedirs(base, exist_ok=True)
-    return base
+import sqlite3
+from core.ai_cache import AICacheKey, get_ai_cache, usage_from_agent, usage_from_message
+from core.ai_jobs import ai_jobs, stream_job_events
+from core.insight_tabs import PANEL_MODE, insight_tab_map, insight_tabs
+
+def _snapshot_mtime(company: str, product: str, snapshot: str = '', sel: dict | None = None) -> int | None:
+    """Tape mtime for cache freshness (a same-name file replaced on disk).
+    Pass the already-resolved snapshot dict as `sel` to skip the directory
+    listing — endpoints compute this once per request."""
+    path = (sel or {}).get('filepath')
+    if not path:
+        try:
+            snap_file = next((s for s in get_snapshots(company, product) if s['filename'] == snapshot), None)
+            path = snap_file['filepath'] if snap_file else None
+        except Exception:
+            return None  # graceful fallback — cache works without mtime
+    try:
+        return int(os.path.getmtime(path)) if path else None
+    except OSError:
+        return None
 
 def _ai_cache_key(endpoint: str, company: str, product: str,
                   snapshot: str = '', as_of_date: str = '', tab: str = '',
-                  snapshot_date: str = '', currency: str = '') -> str:
-    """Build a deterministic cache filename from request parameters.
+                  snapshot_date: str = '', currency: str = '',
+                  snapshot_mtime: int | None = None) -> AICacheKey:
+    """Build a deterministic cache key from request parameters.
     as_of_date is normalized: if it's empty or >= snapshot_date, it maps
     to the same key (all mean 'use all data from this tape')."""
     # Normalize: treat None/empty/snapshot_date/future as the same "full tape" state
     norm_aod = ''
     if as_of_date and snapshot_date and as_of_date < snapshot_date:
         norm_aod = as_of_date  # genuinely backdated — different data slice
-    raw = f"{endpoint}|{company}|{product}|{snapshot}|{norm_aod}|{tab}|{currency}"
-    # Include file mtime to invalidate cache when same-name file is replaced
-    try:
-        from core.loader import get_snapshots
-        snaps = get_snapshots(company, product)
-        snap_file = next((s for s in snaps if s['filename'] == snapshot), None)
-        if snap_file and os.path.exists(snap_file['filepath']):
-            mtime = str(int(os.path.getmtime(snap_file['filepath'])))
-            raw += f"|{mtime}"
-    except Exception:
-        pass  # graceful fallback — cache works without mtime
-    h = hashlib.sha256(raw.encode()).hexdigest()[:16]
-    safe = f"{company}_{product}_{endpoint}"
-    if tab:
-        safe += f"_{tab}"
-    if snapshot:
-        safe_snap = snapshot.replace('/', '_').replace('\\', '_').replace('.', '_')
-        safe += f"_{safe_snap}"
-    # Append hash to guarantee uniqueness
-    return os.path.join(_ai_cache_dir(), f"{safe}_{h}.json")
-
-def _ai_cache_get(cache_path: str) -> dict | None:
+    if snapshot_mtime is None:
+        snapshot_mtime = _snapshot_mtime(company, product, snapshot)
+    return AICacheKey(endpoint, company, product, snapshot, norm_aod, tab, currency,
+                      tape_mtime=snapshot_mtime)
+
+def _ai_cache_get(cache_key: AICacheKey) -> dict | None:
     """Return cached AI response or None if not cached."""
-    if os.path.exists(cache_path):
-        try:
-            with open(cache_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            return None
-    return None
+    try:
+        return get_ai_cache().get(cache_key)
+    except sqlite3.Error as e:
+        logger.warning("AI cache read failed: %s", e)
+        return None
 
-def _ai_cache_put(cache_path: str, data: dict) -> None:
-    """Write AI response to disk cache."""
+def _ai_cache_put(cache_key: AICacheKey, data: dict, usage: dict | None = None) -> None:
+    """Write AI response (plus tier/model/token/cost metadata) to the cache store."""
     data['cached'] = True
     data['cached_at'] = datetime.now().isoformat()
     try:
-        with open(cache_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
-    except OSError:
-        pass  # Silently fail — caching is best-effort
+        get_ai_cache().put(cache_key, data, usage)
+    except sqlite3.Error as e:
+        logger.warning("AI cache write failed: %s", e)  # best-effort
+
+def _run_ai_job(cache_path: str, tier: str, label: str, generate, refresh: bool = False, wait: bool = True):
+    """Run an AI generation as a single-flight job keyed on its cache path.
+
+    Concurrent identical requests join the in-flight job instead of paying
+    for another generation. wait=False returns 202 with the job id so the
+    client can follow it on /ai-jobs/{job_id}/stream."""
+    from fastapi.responses import JSONResponse
+
+    def _job(job):
+        if not refresh:
+            # A job for this key may have finished (and cached) between the
+            # caller's cache check and this job starting
+            cached = _ai_cache_get(cache_path)
+            if cached:
+                return cached
+        return generate()
+
+    job, _created = ai_jobs.submit(cache_path, _job, tier=tier, label=label)
+    if not wait:
+        return JSONResponse(status_code=202, content={
+            **job.to_dict(include_result=True),
+            'stream_url': f"/ai-jobs/{job.id}/stream",
+        })
+    return job.wait()
 
 
 def _parse_agent_exec_summary_response(response_text: str):
@@ -531,6 +655,17 @@ def _get_analysis_type(company, product):
     config = load_config(company, product)
     return (config or {}).get('analysis_type', 'klaim')
 
+
+def _etag_fx_state(company, product, currency):
+    """FX rates a converted response depends on (None when shown in reporting currency)."""
+    config = load_config(company, product) or {}
+    reporting = config.get('currency')
+    if not currency or currency == reporting:
+        return None
+    rates = get_fx_rates()
+    return [rates.get(reporting), rates.get(currency)]
+
+
 def _resolve_snapshot(company, product, snapshot):
     """Resolve the selected snapshot metadata dict."""
     snaps = get_snapshots(company, product)
@@ -538,12 +673,21 @@ def _resolve_snapshot(company, product, snapshot):
         raise HTTPException(status_code=404, detail="No snapshots found")
     return _match_snapshot(snaps, snapshot)
 
+def _silq_cached_tape(filepath):
+    """Cached SILQ tape sorted on Disbursement_Date. Callers must not mutate it."""
+    record_cache("tape_silq", filepath in _silq_tape_cache)
+    if filepath not in _silq_tape_cache:
+        df, commentary_text = load_silq_snapshot(filepath)
+        _silq_tape_cache[filepath] = (sort_by_date(df, SILQ_DATE_COL), commentary_text)
+    return _silq_tape_cache[filepath]
+
+
 def _silq_load(company, product, snapshot, as_of_date, currency):
     """Load SILQ data (multi-sheet) with currency multiplier applied.
     Returns (df, sel, config, disp, mult, commentary_text, ref_date)."""
     sel = _resolve_snapshot(company, product, snapshot)
-    df, commentary_text = load_silq_snapshot(sel['filepath'])
-    df = filter_silq_by_date(df, as_of_date)
+    df, commentary_text = _silq_cached_tape(sel['filepath'])
+    df = filter_silq_by_date(df, as_of_date) if as_of_date else df.copy()
     config, disp = _currency(company, product, currency)
     mult = apply_multiplier(config, disp)
     # DPD reference date: as-of date if set, otherwise snapshot date
@@ -964,13 +1108,14 @@ def get_platform_stats():
     except Exception:
         pass
 
-    # Session count — JSON files in data/_agent_sessions/ (see
-    # core/agents/session.py). Each file is one multi-turn session.
+    # Session count — rows in the data/_agent_sessions/ index (see
+    # core/agents/session_store.py). Each row is one multi-turn session.
     sessions_count = 0
     sessions_dir = project_root / 'data' / '_agent_sessions'
     if sessions_dir.is_dir():
         try:
-            sessions_count = sum(1 for _ in sessions_dir.glob('*.json'))
+            from core.agents.session_store import get_store
+            sessions_count = get_store(sessions_dir).count()
         except Exception:
             pass
 
@@ -1051,8 +1196,10 @@ def list_product_snapshots(company: str, product: str, db: Session = Depends(get
 def get_product_config(company: str, product: str):
     config = load_config(company, product)
     if not config:
-        return {'currency': 'USD', 'description': '', 'usd_rate': 1.0, 'configured': False}
-    return {**config, 'configured': True}
+        return {'currency': 'USD', 'description': '', 'usd_rate': 1.0, 'configured': False,
+                'insight_tabs': insight_tab_map('klaim')}
+    return {**config, 'configured': True,
+            'insight_tabs': insight_tab_map(config.get('analysis_type', 'klaim'))}
 
 @app.get("/companies/{company}/products/{product}/date-range")
 def get_date_range(company: str, product: str, snapshot: Optional[str] = None):
@@ -1710,6 +1857,96 @@ def get_hhi_timeseries(company: str, product: str, currency: Optional[str] = Non
         'warning': warning,
     }
 
+# ── As-of sweep (backtesting) ────────────────────────────────────────────────
+
+# SILQ / Aajil have no cumulative form of their summaries yet, so the sweep
+# evaluates these compute functions on the sorted tape's prefix per cut-off.
+_SLICE_SWEEPS = {
+    'silq': {
+        'collection_rate': (compute_silq_summary, ('total_deals', 'total_disbursed', 'collection_rate', 'overdue_rate')),
+        'par':             (compute_silq_summary, ('par30', 'par60', 'par90',
+                                                   'lifetime_par30', 'lifetime_par60', 'lifetime_par90')),
+        'hhi':             (compute_silq_summary, ('hhi_shop', 'top_1_shop_pct')),
+    },
+    'aajil': {
+        'collection_rate': (compute_aajil_summary, ('total_deals', 'collection_rate', 'collection_rate_realised', 'write_off_rate')),
+        'par':             (compute_aajil_delinquency, ('par_1_inst', 'par_2_inst', 'par_3_inst',
+                                                        'par_1_inst_lifetime', 'par_2_inst_lifetime', 'par_3_inst_lifetime')),
+        'hhi':             (compute_aajil_summary, ('hhi_customer', 'hhi_customer_clean')),
+    },
+}
+
+
+def _parse_sweep_dates(dates):
+    try:
+        return [pd.Timestamp(d.strip()) for d in dates.split(',') if d.strip()]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid dates '{dates}' — expected comma-separated YYYY-MM-DD")
+
+
+@app.get("/companies/{company}/products/{product}/charts/as-of-sweep")
+def get_as_of_sweep(company: str, product: str, metric: str = 'collection_rate',
+                    points: int = 12, dates: Optional[str] = None,
+                    snapshot: Optional[str] = None, currency: Optional[str] = None):
+    """Backtest a metric at many as-of dates in one call.
+
+    Cut-offs are the comma-separated `dates`, or else the last `points`
+    month-ends up to the snapshot's latest deal. Each point matches what the
+    metric's chart returns for that as_of_date on the same snapshot.
+    """
+    if metric not in SWEEP_METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'. Available: {', '.join(SWEEP_METRICS)}")
+    cutoffs = _parse_sweep_dates(dates) if dates else None
+    if not 1 <= (len(cutoffs) if cutoffs else points) <= MAX_SWEEP_POINTS:
+        raise HTTPException(status_code=400, detail=f"Sweep needs 1-{MAX_SWEEP_POINTS} cut-off dates")
+
+    analysis_type = _get_analysis_type(company, product)
+    config, disp = _currency(company, product, currency)
+    mult = apply_multiplier(config, disp)
+    aux = None
+    if analysis_type == 'klaim':
+        df, sel = _load(company, product, snapshot)
+        date_col = KLAIM_DATE_COL
+    elif analysis_type == 'silq':
+        sel = _resolve_snapshot(company, product, snapshot)
+        df, _ = _silq_cached_tape(sel['filepath'])
+        date_col = SILQ_DATE_COL
+    elif analysis_type == 'aajil':
+        sel = _resolve_snapshot(company, product, snapshot)
+        if sel['filepath'].endswith('.json'):
+            raise HTTPException(status_code=400, detail="As-of sweep needs a loan tape, not a JSON summary")
+        df, aux = _aajil_cached_tape(sel['filepath'])
+        date_col = AAJIL_DATE_COL
+    else:
+        raise HTTPException(status_code=400, detail=f"As-of sweep is not available for {analysis_type} products")
+
+    if cutoffs is None:
+        cutoffs = sweep_cutoffs(df[date_col], points)
+
+    if analysis_type == 'klaim':
+        try:
+            results = as_of_sweep(df, metric, cutoffs, mult=mult, date_col=date_col)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        method = 'cumulative'
+    else:
+        fn, keys = _SLICE_SWEEPS[analysis_type][metric]
+        kwargs = {'aux': aux} if analysis_type == 'aajil' else {}
+
+        def _point(prefix, cutoff):
+            out = fn(prefix, mult, ref_date=cutoff, **kwargs)
+            return {k: out.get(k) for k in keys}
+        results = sweep_by_slices(df, date_col, cutoffs, _point)
+        method = 'slice'
+
+    return {
+        'metric': metric,
+        'snapshot': sel['filename'],
+        'currency': disp,
+        'method': method,
+        'points': results,
+    }
+
 # ── Ejari summary endpoint ────────────────────────────────────────────────────
 
 from collections import OrderedDict
@@ -1761,9 +1998,7 @@ def get_aajil_summary_endpoint(company: str, product: str, snapshot: Optional[st
             _aajil_cache[filepath] = parse_aajil_data(filepath)
         return _aajil_cache[filepath]
     # Tape mode: return computed summary + static qualitative data
-    if filepath not in _aajil_tape_cache:
-        _aajil_tape_cache[filepath] = load_aajil_snapshot(filepath)
-    df, aux = _aajil_tape_cache[filepath]
+    df, aux = _aajil_cached_tape(filepath)
     from core.analysis_aajil import compute_aajil_summary as _cs, AAJIL_QUALITATIVE_DATA
     summary = _cs(df, mult=1, aux=aux)
     return {**summary, **AAJIL_QUALITATIVE_DATA}
@@ -1890,6 +2125,15 @@ AAJIL_CHART_MAP = {
 }
 
 
+def _aajil_cached_tape(filepath):
+    """Cached Aajil (deals, aux) with deals sorted on Invoice Date."""
+    record_cache("tape_aajil", filepath in _aajil_tape_cache)
+    if filepath not in _aajil_tape_cache:
+        deals, aux = load_aajil_snapshot(filepath)
+        _aajil_tape_cache[filepath] = (sort_by_date(deals, AAJIL_DATE_COL), aux)
+    return _aajil_tape_cache[filepath]
+
+
 def _aajil_tape_load(company, product, snapshot, as_of_date, currency):
     """Load Aajil multi-sheet tape. Returns (df, aux, sel, config, disp, mult, ref_date) or None tuple if JSON."""
     sel = _resolve_snapshot(company, product, snapshot)
@@ -1898,9 +2142,7 @@ def _aajil_tape_load(company, product, snapshot, as_of_date, currency):
     if filepath.endswith('.json'):
         return None, None, sel, {}, 'SAR', 1, None
 
-    if filepath not in _aajil_tape_cache:
-        _aajil_tape_cache[filepath] = load_aajil_snapshot(filepath)
-    df, aux = _aajil_tape_cache[filepath]
+    df, aux = _aajil_cached_tape(filepath)
     df = filter_aajil_by_date(df, as_of_date)
     config, disp = _currency(company, product, currency)
     mult = apply_multiplier(config, disp)
@@ -2016,7 +2258,8 @@ def generate_integrity_report(company: str, product: str, request: dict):
         "report":    cached['consistency'],
     }]
 
-    # Generate AI analysis and PDF
+    # Generate AI analysis and PDF (reporter pulls in the anthropic SDK + reportlab)
+    from core.reporter import generate_ai_analysis, save_pdf_report
     analysis_text = generate_ai_analysis(company, product, checks)
     pdf_path      = save_pdf_report(company, product, analysis_text, checks)
     questions     = _extract_questions(analysis_text)
@@ -2072,53 +2315,201 @@ def get_integrity_notes(company: str, product: str,
 
 # ── AI Cache Management ───────────────────────────────────────────────────────
 
+def _ai_insight_tabs(analysis_type: str) -> list:
+    """`tab` values the dashboard's AI insight panels request (core.insight_tabs)."""
+    return insight_tabs(analysis_type)
+
+def _dashboard_currency(company: str, product: str) -> str:
+    """Currency the dashboard sends by default — the product config's, as
+    served by /config and picked up by CompanyContext."""
+    return (load_config(company, product) or {}).get('currency') or 'USD'
+
 @app.get("/companies/{company}/products/{product}/ai-cache-status")
 def get_ai_cache_status(company: str, product: str,
                         snapshot: Optional[str] = None,
-                        as_of_date: Optional[str] = None):
-    """Check which AI outputs are cached for this company/product/snapshot."""
+                        as_of_date: Optional[str] = None,
+                        currency: Optional[str] = None):
+    """Check which AI outputs are cached for this company/product/snapshot.
+
+    Reports the view for `currency` (default: the product's reporting
+    currency, which the dashboard sends). One indexed query over the cache
+    store; payloads are never read."""
     sel = _resolve_snapshot(company, product, snapshot)
     snap_key = sel.get('filename', snapshot or '')
     snap_date = sel.get('date', '')
     aod = as_of_date or ''
+    norm_aod = aod if aod and snap_date and aod < snap_date else ''
 
-    endpoints = {
-        'commentary': _ai_cache_key('commentary', company, product, snap_key, aod, snapshot_date=snap_date),
-        'executive_summary': _ai_cache_key('executive_summary', company, product, snap_key, aod, snapshot_date=snap_date),
-    }
-
-    # Check common tab insights
-    at = _get_analysis_type(company, product)
-    if at == 'silq':
-        tabs = ['delinquency', 'collections', 'concentration', 'cohort', 'yield-margins', 'tenure']
-    elif at in ('ejari_summary', 'tamara_summary'):
-        tabs = []
-    elif at == 'aajil':
-        tabs = ['traction', 'delinquency', 'collections', 'cohort', 'concentration',
-                'yield-margins', 'loss-waterfall', 'customer-segments']
-    else:
-        tabs = ['deployment', 'collection', 'denial-trend', 'ageing', 'revenue',
-                'concentration', 'cohort', 'actual-vs-expected', 'returns', 'risk-migration']
-
-    tab_cache = {}
-    for t in tabs:
-        path = _ai_cache_key('tab_insight', company, product, snap_key, aod, t, snapshot_date=snap_date)
-        c = _ai_cache_get(path)
-        if c:
-            tab_cache[t] = c.get('cached_at', True)
+    try:
+        rows = get_ai_cache().status(company, product, snap_key,
+                                     tape_mtime=_snapshot_mtime(company, product, snap_key, sel))
+    except sqlite3.Error as e:
+        logger.warning("AI cache status failed: %s", e)
+        rows = []
+    # Rows keyed without a currency are the same reporting-currency view
+    view_ccy = currency or _dashboard_currency(company, product)
+    rows = [r for r in rows if r['as_of_date'] == norm_aod and r['currency'] in ('', view_ccy)]
 
     result = {}
-    for name, path in endpoints.items():
-        c = _ai_cache_get(path)
-        if c:
-            result[name] = {'cached': True, 'cached_at': c.get('cached_at', ''), 'generated_at': c.get('generated_at', '')}
+    for name in ('commentary', 'executive_summary'):
+        row = next((r for r in rows if r['endpoint'] == name), None)
+        if row:
+            result[name] = {'cached': True, 'cached_at': row['cached_at'],
+                            'model': row['model'], 'cost_usd': row['cost_usd']}
         else:
             result[name] = {'cached': False}
 
+    tab_cache = {}
+    for r in rows:
+        if r['endpoint'] == 'tab_insight':
+            tab_cache[r['tab']] = max(r['cached_at'], tab_cache.get(r['tab'], ''))
     result['tab_insights'] = tab_cache
     result['total_cached'] = sum(1 for v in result.values() if isinstance(v, dict) and v.get('cached')) + len(tab_cache)
     return result
 
+@app.get("/ai-cache-stats")
+def get_ai_cache_stats():
+    """AI cache store size, hit counts and generation cost saved, per endpoint."""
+    return get_ai_cache().stats()
+
+# Pregeneration jobs run in their own tier so a full-snapshot sweep never
+# takes more than LAITH_AI_JOBS_PREGEN slots from interactive requests
+_PREGEN_TIER = 'pregen'
+_PREGEN_ENDPOINTS = ('commentary', 'executive_summary', 'tab_insight')
+
+def pregenerate_ai_outputs(company: str, product: str, snapshot: Optional[str] = None,
+                           currency: Optional[str] = None, refresh: bool = False,
+                           include: Optional[list] = None, mode: Optional[str] = None,
+                           timeout: Optional[float] = None) -> dict:
+    """Generate every AI panel for a snapshot up front and fill the AI cache.
+
+    Builds the full target list (commentary, executive summary, one insight
+    per dashboard tab), skips targets already cached unless `refresh`, and
+    submits the rest to the AI job queue in one go. Each job uses the same
+    key as the dashboard's own request — the product's reporting currency
+    unless `currency` is given, the tab values from core.insight_tabs and
+    the panels' agent mode unless `mode` is given — so the panel hits the
+    cache, and an analyst who opens one while the sweep is running joins
+    the pregeneration job instead of starting a second call. `include`
+    limits the sweep to some of _PREGEN_ENDPOINTS.
+    """
+    import time as _time
+    sel = _resolve_snapshot(company, product, snapshot)
+    snap_key = sel.get('filename', snapshot or '')
+    snap_date = sel.get('date', '')
+    mtime = _snapshot_mtime(company, product, snap_key, sel)
+    at = _get_analysis_type(company, product)
+    currency = currency or _dashboard_currency(company, product)
+    mode = mode or PANEL_MODE
+    wanted = set(include or _PREGEN_ENDPOINTS)
+    unknown = wanted - set(_PREGEN_ENDPOINTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown AI outputs: {sorted(unknown)}")
+
+    targets = []
+    if 'commentary' in wanted:
+        targets.append(('commentary', '', lambda key: _generate_ai_commentary(
+            company, product, snap_key, None, currency, mode, key, snap_key)))
+    if 'executive_summary' in wanted:
+        targets.append(('executive_summary', '', lambda key: _generate_executive_summary(
+            company, product, snap_key, None, currency, mode, key, snap_key, sel)))
+    if 'tab_insight' in wanted:
+        for tab in _ai_insight_tabs(at):
+            targets.append(('tab_insight', tab, lambda key, tab=tab: _generate_tab_insight(
+                company, product, tab, snap_key, None, currency, mode, key)))
+
+    started = _time.time()
+    results, jobs = [], []
+    for endpoint, tab, generate in targets:
+        key = _ai_cache_key(endpoint, company, product, snap_key, '', tab,
+                            snapshot_date=snap_date, currency=currency, snapshot_mtime=mtime)
+        entry = {'endpoint': endpoint, 'tab': tab}
+        if not refresh and _ai_cache_get(key):
+            results.append({**entry, 'status': 'cached'})
+            continue
+        label = f"pregen {endpoint}{'.' + tab if tab else ''} {company}/{product} {snap_key}"
+        job, created = ai_jobs.submit(
+            key, lambda job, generate=generate, key=key: generate(key),
+            tier=_PREGEN_TIER, label=label)
+        jobs.append((entry, job, created))
+
+    for entry, job, created in jobs:
+        try:
+            job.wait(timeout)
+            results.append({**entry, 'status': 'generated' if created else 'joined', 'job_id': job.id})
+        except Exception as e:
+            results.append({**entry, 'status': 'error', 'job_id': job.id,
+                            'error': f"{type(e).__name__}: {e}"})
+
+    counts = {}
+    for r in results:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    logger.info("AI pregeneration %s/%s %s: %s in %.1fs", company, product, snap_key,
+                counts, _time.time() - started)
+    return {
+        'company': company,
+        'product': product,
+        'snapshot': snap_key,
+        'targets': results,
+        'counts': counts,
+        'elapsed_s': round(_time.time() - started, 2),
+    }
+
+@app.post("/companies/{company}/products/{product}/ai-pregenerate")
+def post_ai_pregenerate(company: str, product: str,
+                        snapshot: Optional[str] = None,
+                        currency: Optional[str] = None,
+                        refresh: bool = False,
+                        only: Optional[str] = None,
+                        mode: Optional[str] = None):
+    """Fill the AI cache for every panel of a snapshot (see pregenerate_ai_outputs).
+
+    `only` is a comma-separated subset of commentary, executive_summary, tab_insight."""
+    include = [s.strip() for s in only.split(',') if s.strip()] if only else None
+    return pregenerate_ai_outputs(company, product, snapshot, currency, refresh, include, mode)
+
+def _pregenerate_on_ingest(payload):
+    """TAPE_INGESTED listener (opt-in via LAITH_AI_PREGENERATE_ON_INGEST=1).
+    Runs the sweep on a daemon thread so the request that loaded the tape
+    isn't held up."""
+    import threading
+    company, product, snapshot = payload.get('company'), payload.get('product'), payload.get('snapshot')
+    if not (company and product and snapshot):
+        return
+
+    def _run():
+        try:
+            pregenerate_ai_outputs(company, product, snapshot)
+        except Exception as e:
+            logger.warning("AI pregeneration for %s/%s %s failed: %s", company, product, snapshot, e)
+
+    threading.Thread(target=_run, name=f"ai-pregen-{company}", daemon=True).start()
+
+@app.get("/ai-jobs")
+def list_ai_jobs():
+    """In-flight and recently finished AI jobs, per-tier load, coalescing stats."""
+    return ai_jobs.stats()
+
+@app.get("/ai-jobs/{job_id}")
+def get_ai_job(job_id: str):
+    job = ai_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict(include_result=True)
+
+@app.get("/ai-jobs/{job_id}/stream")
+async def stream_ai_job(job_id: str, request: Request):
+    """SSE: replayed + live progress for a job, ending with `done` (carrying the result) or `error`."""
+    from fastapi.responses import StreamingResponse
+    job = ai_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return StreamingResponse(
+        stream_job_events(job, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+    )
+
 # ── AI endpoints ──────────────────────────────────────────────────────────────
 
 def _check_backdated(as_of_date: str | None, snapshot_date: str) -> None:
@@ -2148,19 +2539,29 @@ def get_ai_commentary(company: str, product: str,
                       as_of_date: Optional[str] = None,
                       currency: Optional[str] = None,
                       refresh: bool = False,
-                      mode: Optional[str] = None):
+                      mode: Optional[str] = None,
+                      wait: bool = True):
     # Resolve snapshot first for consistent cache key
     sel_for_key = _resolve_snapshot(company, product, snapshot)
     snap_key = sel_for_key.get('filename', snapshot or '')
     snap_date = sel_for_key.get('date', '')
     _check_backdated(as_of_date, snap_date)
-    cache_path = _ai_cache_key('commentary', company, product, snap_key, as_of_date or '', snapshot_date=snap_date, currency=currency or '')
+    cache_path = _ai_cache_key('commentary', company, product, snap_key, as_of_date or '', snapshot_date=snap_date, currency=currency or '',
+                               snapshot_mtime=_snapshot_mtime(company, product, snap_key, sel_for_key))
 
     if not refresh:
         cached = _ai_cache_get(cache_path)
         if cached:
             return cached
 
+    return _run_ai_job(
+        cache_path, 'structured', f"commentary {company}/{product} {snap_key}",
+        lambda: _generate_ai_commentary(company, product, snapshot, as_of_date, currency, mode, cache_path, snap_key),
+        refresh=refresh, wait=wait,
+    )
+
+
+def _generate_ai_commentary(company, product, snapshot, as_of_date, currency, mode, cache_path, snap_key):
     at = _get_analysis_type(company, product)
 
     if at == 'silq':
@@ -2266,7 +2667,7 @@ Professional tone, suitable for an investment committee memo. Be specific and da
         'generated_at': datetime.now().isoformat(),
         'as_of_date':   as_of_date or sel.get('date', ''),
     }
-    _ai_cache_put(cache_path, result)
+    _ai_cache_put(cache_path, result, usage_from_message(msg))
     log_activity(AI_COMMENTARY, company, product, f"Generated AI commentary for {snap_key}")
     return result
 
@@ -2911,7 +3312,8 @@ def get_executive_summary(company: str, product: str,
                           as_of_date: Optional[str] = None,
                           currency: Optional[str] = None,
                           refresh: bool = False,
-                          mode: Optional[str] = None):
+                          mode: Optional[str] = None,
+                          wait: bool = True):
     """AI Executive Summary — holistic analysis of ALL computed metrics.
 
     Returns top 5-10 findings ranked by business impact with severity levels.
@@ -2922,13 +3324,24 @@ def get_executive_summary(company: str, product: str,
     snap_key = sel_for_key.get('filename', snapshot or '')
     snap_date = sel_for_key.get('date', '')
     _check_backdated(as_of_date, snap_date)
-    cache_path = _ai_cache_key('executive_summary', company, product, snap_key, as_of_date or '', snapshot_date=snap_date, currency=currency or '')
+    cache_path = _ai_cache_key('executive_summary', company, product, snap_key, as_of_date or '', snapshot_date=snap_date, currency=currency or '',
+                               snapshot_mtime=_snapshot_mtime(company, product, snap_key, sel_for_key))
 
     if not refresh:
         cached = _ai_cache_get(cache_path)
         if cached:
             return cached
 
+    return _run_ai_job(
+        cache_path, 'judgment', f"executive_summary {company}/{product} {snap_key}",
+        lambda: _generate_executive_summary(company, product, snapshot, as_of_date, currency, mode,
+                                            cache_path, snap_key, sel_for_key),
+        refresh=refresh, wait=wait,
+    )
+
+
+def _generate_executive_summary(company, product, snapshot, as_of_date, currency, mode,
+                                cache_path, snap_key, sel_for_key):
     # Agent mode: skip manual context building — agent pulls data dynamically
     if mode == 'agent':
         try:
@@ -3157,7 +3570,7 @@ Return ONLY the JSON object, no other text."""
         # collapsible "Informed by N sources" footer in the Exec Summary UI.
         'asset_class_sources': _asset_class_sources,
     }
-    _ai_cache_put(cache_path, result)
+    _ai_cache_put(cache_path, result, usage_from_message(msg))
     log_activity(AI_EXECUTIVE_SUMMARY, company, product, f"Generated executive summary for {snap_key}")
     return result
 
@@ -3174,14 +3587,16 @@ async def get_executive_summary_stream(
 ):
     """Stream the agent-driven executive summary via SSE.
 
-    The analyst agent runs with max_turns=20 in a background producer task;
-    StreamEvents are drained through an asyncio.Queue. A ``: keepalive\\n\\n``
+    The analyst agent runs with max_turns=20 as a single-flight AI job
+    (core.ai_jobs) keyed on the summary's cache path — concurrent viewers of
+    the same company subscribe to one run instead of starting their own.
+    Job events are drained through an asyncio.Queue. A ``: keepalive\\n\\n``
     SSE comment is emitted after 20s of idle — mirrors memo_generate_stream —
     so Cloudflare's ~100s edge-proxy cap can't kill long agent runs (Aajil
     legitimately exceeds 100s end-to-end). See tasks/lessons.md CF+SSE entry.
 
     Event types (heartbeats aside):
-      start    — {company, product, snapshot}
+      start    — {company, product, snapshot, job_id}
       cached   — {from_cache: true}  (only on disk-cache hit)
       text / tool_call / tool_result / budget_warning — forwarded from runtime
       result   — {narrative, findings, asset_class_sources, generated_at, ...}
@@ -3199,7 +3614,8 @@ async def get_executive_summary_stream(
     _check_backdated(as_of_date, snap_date)
     cache_path = _ai_cache_key(
         'executive_summary', company, product, snap_key, as_of_date or '',
-        snapshot_date=snap_date, currency=currency or ''
+        snapshot_date=snap_date, currency=currency or '',
+        snapshot_mtime=_snapshot_mtime(company, product, snap_key, sel_for_key),
     )
 
     _sse_headers = {
@@ -3241,8 +3657,20 @@ async def get_executive_summary_stream(
         section_guidance=guidance,
     )
 
-    async def _stream():
-        import threading as _threading
+    def _agent_job(job):
+        """Run the analyst agent in an ai-jobs worker, publishing its events.
+
+        Runs on the worker thread's own event loop so the SYNC blocking parts
+        of the agent never touch uvicorn's loop (see tasks/lessons.md
+        2026-04-19 entry). The job outlives any single client: a second
+        viewer joins the same job, and a disconnect doesn't cancel the run,
+        so the result still lands in the cache."""
+        if not refresh:
+            cached = _ai_cache_get(cache_path)
+            if cached:
+                job.publish("cached", {"from_cache": True})
+                return cached
+
         from core.agents.config import load_agent_config
         from core.agents.runtime import AgentRunner
         from core.agents.session import AgentSession
@@ -3259,94 +3687,20 @@ async def get_executive_summary_stream(
             "company": company, "product": product, "type": "executive_summary",
         })
         runner = AgentRunner(config)
-
-        queue: _asyncio.Queue = _asyncio.Queue()
-        SENTINEL = object()
-        stop_event = _threading.Event()
-        loop = _asyncio.get_event_loop()
-
-        def _thread_push(item):
-            # Thread-safe enqueue onto the main event loop's asyncio.Queue.
-            # Called from the producer thread.
-            try:
-                loop.call_soon_threadsafe(queue.put_nowait, item)
-            except RuntimeError:
-                # Loop already closed (client disconnected + handler exited) — drop.
-                pass
-
-        # Run the agent's async stream in a DEDICATED thread with its own loop.
-        # The analyst agent uses the SYNC Anthropic client, whose blocking HTTP
-        # reads would otherwise freeze uvicorn's main event loop — killing
-        # heartbeats AND preventing the consumer below from draining the queue.
-        # See tasks/lessons.md 2026-04-19 entry; mirrors memo_generate_stream's
-        # ThreadPoolExecutor offload (backend/agents.py).
-        def _producer_thread():
-            import asyncio as _a
-            t_loop = _a.new_event_loop()
-            _a.set_event_loop(t_loop)
-            try:
-                async def _drain():
-                    async for event in runner.stream(prompt, session):
-                        if stop_event.is_set():
-                            break
-                        _thread_push(event)
-                t_loop.run_until_complete(_drain())
-            except Exception as e:
-                _thread_push(("__error__", e))
-            finally:
-                _thread_push(SENTINEL)
-                try:
-                    t_loop.close()
-                except Exception:
-                    pass
-
-        producer_thread = _threading.Thread(target=_producer_thread, daemon=True)
-        producer_thread.start()
-        HEARTBEAT_INTERVAL_S = 20
         full_text: list = []
-        agent_done_data: dict = {}
-        stream_error: Optional[str] = None
-        emitted_result = False
-
-        # Announce the stream immediately — gives the client something to
-        # render (status chip, elapsed timer) while the first Claude turn spins up.
-        yield f"event: start\ndata: {json.dumps({'company': company, 'product': product, 'snapshot': snap_key})}\n\n"
-        last_yield = _time.monotonic()
-
-        try:
-            while True:
-                if await request.is_disconnected():
-                    stop_event.set()
-                    return
-
-                try:
-                    event = await _asyncio.wait_for(queue.get(), timeout=0.5)
-                except _asyncio.TimeoutError:
-                    if _time.monotonic() - last_yield >= HEARTBEAT_INTERVAL_S:
-                        yield ": keepalive\n\n"
-                        last_yield = _time.monotonic()
-                    continue
+        outcome: dict = {}
 
-                if event is SENTINEL:
-                    break
-
-                if isinstance(event, tuple) and event and event[0] == "__error__":
-                    stream_error = f"{type(event[1]).__name__}: {event[1]}"
-                    yield f"event: error\ndata: {json.dumps({'message': stream_error})}\n\n"
-                    last_yield = _time.monotonic()
-                    continue
-
-                # StreamEvent from the agent runtime
+        async def _drain():
+            async for event in runner.stream(prompt, session):
                 if event.type == "text":
                     full_text.append(event.data.get("delta", ""))
 
                 if event.type == "done":
                     # Agent finished (no more tool calls). Parse the
-                    # accumulated text, cache, emit our structured result,
-                    # then fall through so the outer done below summarises
-                    # metadata — we swallow the runtime's done because it
-                    # duplicates meaning.
-                    agent_done_data = dict(event.data or {})
+                    # accumulated text and cache; the runtime's done is
+                    # swallowed — subscribers emit one terminal done of
+                    # their own with this metadata.
+                    job.publish("agent_done", dict(event.data or {}))
 
                     response_text = "".join(full_text)
                     narrative, findings, analytics_coverage, _parsed_ok = _parse_agent_exec_summary_response(response_text)
@@ -3359,7 +3713,7 @@ async def get_executive_summary_stream(
                     except Exception as _mind_err:
                         logger.debug("exec_summary_stream: asset_class_sources fetch failed: %s", _mind_err)
 
-                    result_payload = {
+                    outcome["result"] = {
                         "narrative": narrative,
                         "findings": findings,
                         "analytics_coverage": analytics_coverage,
@@ -3370,47 +3724,104 @@ async def get_executive_summary_stream(
                     }
 
                     try:
-                        _ai_cache_put(cache_path, result_payload)
+                        _ai_cache_put(cache_path, outcome["result"],
+                                      usage_from_agent(config.model, event.data or {}))
                         log_activity(
                             AI_EXECUTIVE_SUMMARY, company, product,
                             f"Generated streaming executive summary for {snap_key}",
                         )
                     except Exception as _cache_err:
                         logger.warning("exec_summary_stream: cache write failed: %s", _cache_err)
+                    continue
 
-                    yield f"event: result\ndata: {json.dumps(result_payload, default=str)}\n\n"
-                    last_yield = _time.monotonic()
-                    emitted_result = True
-                    # Swallow the runtime's done — we emit a single terminal
-                    # `done` in the finally block so the client has one place
-                    # to hang "stream complete" UI off.
+                if event.type == "error":
+                    # The runtime returns right after yielding error (no done).
+                    # Published under its own name so it can't be mistaken for
+                    # the job's terminal error event.
+                    outcome.setdefault("error", (event.data or {}).get("message") or "agent runtime error")
+                    job.publish("agent_error", dict(event.data or {}))
                     continue
 
                 # Pass through every other event (text, tool_call, tool_result,
-                # budget_warning, error) exactly as the runtime emitted it.
-                yield event.to_sse()
-                last_yield = _time.monotonic()
+                # budget_warning) exactly as the runtime emitted it.
+                job.publish(event.type, event.data)
 
-                # Capture runtime-yielded error events into stream_error so the
-                # terminal `done` payload carries the message. Without this,
-                # onError in the frontend would fire with the real message, then
-                # onDone would clobber it with the fallback "Stream ended without
-                # a result" because d.error was empty. The runtime has already
-                # returned after yielding error (runtime.py:491-499), so the
-                # producer thread will push SENTINEL shortly.
-                if event.type == "error" and stream_error is None:
-                    stream_error = (event.data or {}).get("message") or "agent runtime error"
+        import asyncio as _a
+        try:
+            _a.run(_drain())
         finally:
             # Internal session — no persistence. Safe-delete best-effort.
             try:
                 session.delete()
             except Exception:
                 pass
-            # Signal the producer thread to stop. It'll push SENTINEL and
-            # exit on its next iteration. We don't join here — the thread is
-            # daemon + best-effort; a lingering request to Anthropic will
-            # unwind on its own.
-            stop_event.set()
+        if "result" not in outcome:
+            raise RuntimeError(outcome.get("error") or "Stream ended without a result")
+        return outcome["result"]
+
+    async def _stream():
+        job, _created = ai_jobs.submit(
+            cache_path, _agent_job, tier="judgment",
+            label=f"executive_summary {company}/{product} {snap_key}",
+        )
+        HEARTBEAT_INTERVAL_S = 20
+        agent_done_data: dict = {}
+        stream_error: Optional[str] = None
+        emitted_result = False
+
+        # Announce the stream immediately — gives the client something to
+        # render (status chip, elapsed timer) while the first Claude turn spins up.
+        yield f"event: start\ndata: {json.dumps({'company': company, 'product': product, 'snapshot': snap_key, 'job_id': job.id})}\n\n"
+        last_yield = _time.monotonic()
+
+        queue = job.subscribe()
+        try:
+            while True:
+                if await request.is_disconnected():
+                    return
+
+                try:
+                    event_type, payload = await _asyncio.wait_for(queue.get(), timeout=0.5)
+                except _asyncio.TimeoutError:
+                    if _time.monotonic() - last_yield >= HEARTBEAT_INTERVAL_S:
+                        # SSE comment line — ignored by clients, keeps CF edge alive
+                        yield ": keepalive\n\n"
+                        last_yield = _time.monotonic()
+                    continue
+
+                if event_type == "done":
+                    # Job finished — emit our structured result. Jobs started
+                    # by the sync endpoint land here too (no progress events).
+                    if payload.get("result") is not None:
+                        yield f"event: result\ndata: {json.dumps(payload['result'], default=str)}\n\n"
+                        emitted_result = True
+                    break
+
+                if event_type == "error":
+                    # Job raised. The agent's own error was already forwarded.
+                    if stream_error is None:
+                        stream_error = payload.get("message") or "agent runtime error"
+                        yield f"event: error\ndata: {json.dumps({'message': stream_error})}\n\n"
+                    break
+
+                if event_type == "agent_done":
+                    agent_done_data = payload
+                    continue
+
+                if event_type == "agent_error":
+                    # Capture runtime-yielded error events into stream_error so the
+                    # terminal `done` payload carries the message. Without this,
+                    # onError in the frontend would fire with the real message, then
+                    # onDone would clobber it with the fallback "Stream ended without
+                    # a result" because d.error was empty.
+                    if stream_error is None:
+                        stream_error = payload.get("message") or "agent runtime error"
+                    event_type = "error"
+
+                yield f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+                last_yield = _time.monotonic()
+        finally:
+            job.unsubscribe(queue)
 
         # Terminal done — merges agent metadata when we have it.
         done_payload = {
@@ -3433,19 +3844,29 @@ def get_tab_insight(company: str, product: str,
                     as_of_date: Optional[str] = None,
                     currency: Optional[str] = None,
                     refresh: bool = False,
-                    mode: Optional[str] = None):
+                    mode: Optional[str] = None,
+                    wait: bool = True):
     """Generate a short AI insight for a specific dashboard tab. Cached per (company, product, snapshot, as_of_date, tab)."""
     sel_for_key = _resolve_snapshot(company, product, snapshot)
     snap_key = sel_for_key.get('filename', snapshot or '')
     snap_date = sel_for_key.get('date', '')
     _check_backdated(as_of_date, snap_date)
-    cache_path = _ai_cache_key('tab_insight', company, product, snap_key, as_of_date or '', tab, snapshot_date=snap_date, currency=currency or '')
+    cache_path = _ai_cache_key('tab_insight', company, product, snap_key, as_of_date or '', tab, snapshot_date=snap_date, currency=currency or '',
+                               snapshot_mtime=_snapshot_mtime(company, product, snap_key, sel_for_key))
 
     if not refresh:
         cached = _ai_cache_get(cache_path)
         if cached:
             return cached
 
+    return _run_ai_job(
+        cache_path, 'structured', f"tab_insight.{tab} {company}/{product} {snap_key}",
+        lambda: _generate_tab_insight(company, product, tab, snapshot, as_of_date, currency, mode, cache_path),
+        refresh=refresh, wait=wait,
+    )
+
+
+def _generate_tab_insight(company, product, tab, snapshot, as_of_date, currency, mode, cache_path):
     at = _get_analysis_type(company, product)
 
     if at == 'silq':
@@ -3476,7 +3897,7 @@ def get_tab_insight(company: str, product: str,
     else:
         if tab == 'deployment':
             tab_data = {'monthly_deployment': compute_deployment(df, mult)[-12:]}
-        elif tab == 'collection':
+        elif tab in ('collection', 'collection-velocity'):
             cv = compute_collection_velocity(df, mult, as_of_date)
             tab_data = {'buckets': cv['buckets'], 'recent_monthly': cv['monthly'][-12:]}
         elif tab == 'denial-trend':
@@ -3554,7 +3975,7 @@ Be direct and specific — no generic commentary. No headers, just prose."""
         log_prefix=f"ai-tab-insight.{tab}",
     )
     result = {'insight': msg.content[0].text, 'tab': tab}
-    _ai_cache_put(cache_path, result)
+    _ai_cache_put(cache_path, result, usage_from_message(msg))
     log_activity(AI_TAB_INSIGHT, company, product, f"Generated tab insight: {tab}")
     return result
 
@@ -3951,32 +4372,18 @@ def _load_facility_params(company, product):
     # Merge with document-extracted values (legal takes baseline, manual overrides)
     return merge_facility_params(company, product, manual)
 
-def _portfolio_load(company, product, snapshot, as_of_date, currency, db=None):
-    """Load a snapshot from DB for portfolio computation.
-
-    DB is the authoritative source after Session 31. Tape files populate DB via
-    scripts/ingest_tape.py (one snapshot per file); Integration API writes land
-    in a rolling daily live snapshot (scripts/ingest_tape.py or the API writes
-    directly). There is no tape-fallback read path — if the requested snapshot
-    doesn't exist in DB, the endpoint 404s. `snapshot` accepts a snapshot name
-    (e.g. "2026-04-15_uae_healthcare"), a filename with extension, or an ISO
-    date; `None` resolves to the latest snapshot by `taken_at`.
-
-    Only supported for klaim + silq analysis types. Ejari/Tamara/Aajil use
-    non-tape ingestion (pre-computed summaries, data rooms) and don't participate
-    in portfolio analytics.
-    """
-    config = load_config(company, product)
+def _portfolio_analysis_type(config):
+    """analysis_type of a portfolio-capable product; 400 for the others."""
     analysis_type = config.get('analysis_type', '') if config else ''
-    disp = currency or (config['currency'] if config else 'USD')
-    mult = apply_multiplier(config, disp)
-
     if analysis_type not in ('klaim', 'silq'):
         raise HTTPException(
             status_code=400,
             detail=f"Portfolio analytics not available for analysis_type={analysis_type!r}",
         )
+    return analysis_type
 
+def _resolve_portfolio_snapshot(company, product, snapshot, as_of_date, db):
+    """The DB Snapshot row a portfolio request reads (see _portfolio_load)."""
     if db is None:
         raise HTTPException(status_code=503, detail="Database unavailable")
 
@@ -4001,6 +4408,47 @@ def _portfolio_load(company, product, snapshot, as_of_date, currency, db=None):
         date_match = resolve_snapshot(db, company, product, snapshot=as_of_date)
         if date_match is not None and str(date_match.taken_at) == str(as_of_date):
             snap = date_match
+    return snap
+
+def _portfolio_tape_identity(company, product, snap):
+    """Identity of the data behind a DB snapshot: the row (a re-ingest gets a new
+    id or ingested_at) plus, for tape-sourced snapshots, the tape file's path,
+    size and mtime so a same-name file replaced on disk is noticed too."""
+    tape, fp = None, None
+    if snap.source == 'tape':
+        try:
+            tape = next((t['filepath'] for t in get_snapshots(company, product)
+                         if os.path.splitext(t['filename'])[0] == snap.name), None)
+            if tape:
+                st = os.stat(tape)
+                fp = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            tape, fp = None, None
+    return (str(snap.id), str(snap.ingested_at), snap.row_count, tape, fp)
+
+def _portfolio_load(company, product, snapshot, as_of_date, currency, db=None, snap=None):
+    """Load a snapshot from DB for portfolio computation.
+
+    DB is the authoritative source after Session 31. Tape files populate DB via
+    scripts/ingest_tape.py (one snapshot per file); Integration API writes land
+    in a rolling daily live snapshot (scripts/ingest_tape.py or the API writes
+    directly). There is no tape-fallback read path — if the requested snapshot
+    doesn't exist in DB, the endpoint 404s. `snapshot` accepts a snapshot name
+    (e.g. "2026-04-15_uae_healthcare"), a filename with extension, or an ISO
+    date; `None` resolves to the latest snapshot by `taken_at`.
+
+    Only supported for klaim + silq analysis types. Ejari/Tamara/Aajil use
+    non-tape ingestion (pre-computed summaries, data rooms) and don't participate
+    in portfolio analytics. Pass `snap` when the caller already resolved it
+    with _resolve_portfolio_snapshot.
+    """
+    config = load_config(company, product)
+    analysis_type = _portfolio_analysis_type(config)
+    disp = currency or (config['currency'] if config else 'USD')
+    mult = apply_multiplier(config, disp)
+
+    if snap is None:
+        snap = _resolve_portfolio_snapshot(company, product, snapshot, as_of_date, db)
 
     df = load_from_db(db, company, product, snapshot_id=snap.id)
     if as_of_date:
@@ -4014,13 +4462,18 @@ def _portfolio_load(company, product, snapshot, as_of_date, currency, db=None):
         'source': snap.source,
     }
     ref_date = as_of_date or sel['date']
+    facility_params = _portfolio_facility_params(company, product, config, db)
+
+    return df, sel, config, disp, mult, ref_date, facility_params, analysis_type
 
+
+def _portfolio_facility_params(company, product, config, db):
+    """Saved facility params, overlaid with DB facility config and the product usd_rate."""
     facility_params = _load_facility_params(company, product)
     facility_params.update(db_facility_config(db, company, product))
     if config and 'usd_rate' in config:
         facility_params.setdefault('usd_rate', config['usd_rate'])
-
-    return df, sel, config, disp, mult, ref_date, facility_params, analysis_type
+    return facility_params
 
 
 @app.get("/companies/{company}/products/{product}/portfolio/borrowing-base")
@@ -4165,8 +4618,13 @@ def get_portfolio_covenants(company: str, product: str,
         result = compute_klaim_covenants(df, mult, ref_date, fp)
 
     # --- Consecutive breach tracking (EoD determination per MMA 18.3) ---
+    # Prior periods come from the covenant ledger (every tape, computed once);
+    # page-view history covers products whose ledger hasn't been backfilled.
+    ledger = None
     try:
+        ledger = load_ledger(company, product)
         history = _load_covenant_history(company, product)
+        history.update(ledger_history(ledger, before=result.get('test_date')))
         result = annotate_covenant_eod(result, history)
         _save_covenant_history(company, product, result)
     except Exception:
@@ -4182,13 +4640,17 @@ def get_portfolio_covenants(company: str, product: str,
             prev_idx = current_idx - 1
             if prev_idx >= 0:
                 prev_snap = snaps[prev_idx]
-                prev_df = load_from_db(db, company, product, snapshot_id=prev_snap['id'])
                 prev_ref = prev_snap['date']
-                if atype == 'silq':
-                    prev_result = portfolio_covenants(prev_df, mult, prev_ref, fp)
-                else:
-                    prev_result = compute_klaim_covenants(prev_df, mult, prev_ref, fp)
-                prev_by_name = {c['name']: c for c in prev_result['covenants']}
+                # Ledger rows are in reporting currency; covenant values are ratios/days,
+                # but only reuse them when computed with the same facility params.
+                prev_by_name = ledger_entry(ledger or {}, prev_snap['name'], params_fingerprint(fp))
+                if prev_by_name is None:
+                    prev_df = load_from_db(db, company, product, snapshot_id=prev_snap['id'])
+                    if atype == 'silq':
+                        prev_result = portfolio_covenants(prev_df, mult, prev_ref, fp)
+                    else:
+                        prev_result = compute_klaim_covenants(prev_df, mult, prev_ref, fp)
+                    prev_by_name = {c['name']: c for c in prev_result['covenants']}
                 curr_dt = pd.to_datetime(ref_date)
                 prev_dt = pd.to_datetime(prev_ref)
                 days_between = max((curr_dt - prev_dt).days, 1)
@@ -4204,6 +4666,22 @@ def get_portfolio_covenants(company: str, product: str,
             'data_source': 'database', 'snapshot_source': sel.get('source', 'tape')}
 
 
+@app.get("/companies/{company}/products/{product}/portfolio/covenant-ledger")
+def get_covenant_ledger(company: str, product: str, refresh: bool = False):
+    """Covenant results for every snapshot, oldest first, from the covenant ledger.
+
+    refresh=true computes any missing or stale entries first (serially; use
+    scripts/backfill_covenant_ledger.py --workers N for a full backfill).
+    """
+    config = load_config(company, product)
+    if not config:
+        raise HTTPException(status_code=404, detail=f"Unknown product {company}/{product}")
+    report = update_ledger(company, product) if refresh else None
+    ledger = load_ledger(company, product)
+    return {**covenant_series(ledger), 'computed': report['computed'] if report else [],
+            'errors': report['errors'] if report else {}}
+
+
 @app.get("/companies/{company}/products/{product}/portfolio/flow")
 def get_portfolio_flow(company: str, product: str,
                         snapshot: Optional[str] = None,
@@ -4249,6 +4727,53 @@ def save_facility_params(company: str, product: str, request: dict):
     return {'saved': True, 'params': params}
 
 
+@app.post("/companies/{company}/products/{product}/portfolio/what-if")
+def post_portfolio_what_if(company: str, product: str, request: dict,
+                           snapshot: Optional[str] = None,
+                           as_of_date: Optional[str] = None,
+                           currency: Optional[str] = None,
+                           db: Session = Depends(get_db)):
+    """Borrowing base, headroom and covenant pass/fail for many facility_params variants.
+
+    Body: {"variants": [{param: value, ...}, ...]} and/or {"grid": {param: [values]}}
+    (cartesian product). Each variant overrides the saved facility params; an
+    empty body scores the saved params alone. The snapshot is resolved first
+    and the tape-dependent state cached per (snapshot identity, as_of_date,
+    currency), so repeated sweeps skip the DB load entirely while a newly
+    ingested or replaced tape is picked up at once. Only live snapshots,
+    which take Integration API writes in place, rely on the state TTL.
+    Facility params are always re-read.
+    """
+    request = request or {}
+    try:
+        variants = list(request.get('variants') or [])
+        if request.get('grid'):
+            variants += expand_grid(request['grid'])
+        if not all(isinstance(v, dict) for v in variants):
+            raise ValueError("Each variant must be an object of facility_params overrides")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _portfolio_analysis_type(load_config(company, product))
+    snap = _resolve_portfolio_snapshot(company, product, snapshot, as_of_date, db)
+
+    def _build():
+        df, sel, config, disp, mult, ref_date, _, atype = _portfolio_load(
+            company, product, snapshot, as_of_date, currency, db=db, snap=snap)
+        return build_facility_state(atype, df, mult, ref_date), sel, config, disp
+
+    key = (company, product, _portfolio_tape_identity(company, product, snap), as_of_date, currency)
+    (state, sel, config, disp), hit = get_state_cache().get_or_build(
+        key, _build, expires=snap.source == 'live')
+    fp = _portfolio_facility_params(company, product, config, db)
+    try:
+        result = evaluate_whatif(state, fp, variants or [{}])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, 'currency': disp, 'snapshot': sel['date'], 'state_cached': hit,
+            'state_build_s': state.built_s}
+
+
 @app.post("/companies/{company}/products/{product}/portfolio/compliance-cert")
 def generate_compliance_certificate(company: str, product: str,
                                      request: dict = None,
@@ -4615,585 +5140,7 @@ def generate_pdf_report(company: str, product: str, request: dict = {}):
 # ══════════════════════════════════════════════════════════════════════════════
 # Research Hub — Data Room, Research Intelligence, Living Mind
 # ══════════════════════════════════════════════════════════════════════════════
+# Endpoints live in backend/research_hub.py; included last to keep route order.
 
-_dataroom_engine = DataRoomEngine()
-_analytics_snapshot = AnalyticsSnapshotEngine()
-_research_engine = DualResearchEngine()
-_memo_generator = MemoGenerator()
-_memo_storage = MemoStorage()
-
-
-# ── Data Room endpoints ──────────────────────────────────────────────────────
-
-@app.post("/companies/{company}/products/{product}/dataroom/snapshot-analytics")
-def dataroom_snapshot_analytics(company: str, product: str,
-                                 snapshot: Optional[str] = None,
-                                 currency: Optional[str] = None):
-    """Snapshot current analytics (tape summary, PAR, DSO, etc.) into the data room.
-
-    This makes platform-computed analytics searchable alongside data room documents.
-    Call once per snapshot to capture the analytical state.
-    """
-    at = _get_analysis_type(company, product)
-
-    if at in ('ejari_summary', 'tamara_summary', 'aajil'):
-        # For read-only summaries, snapshot the parsed data
-        try:
-            snaps = get_snapshots(company, product)
-            if not snaps:
-                return {'snapshotted': 0, 'message': 'No snapshots found'}
-            snap_filename = snaps[-1]['filename']
-
-            if at == 'tamara_summary':
-                filepath = snaps[-1]['filepath']
-                if filepath not in _tamara_cache:
-                    _tamara_cache[filepath] = parse_tamara_data(filepath)
-                data = _tamara_cache[filepath]
-                docs = _analytics_snapshot.snapshot_ai_output(
-                    company, product, 'parsed_summary', data, snap_filename)
-                return {'snapshotted': 1 if docs else 0, 'snapshot': snap_filename}
-            else:
-                return {'snapshotted': 0, 'message': 'Ejari snapshot not yet supported'}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-
-    # For tape-based companies (Klaim, SILQ): snapshot key analytics
-    try:
-        if at == 'silq':
-            df, sel, config, disp, mult, _, ref_date = _silq_load(company, product, snapshot, None, currency)
-            summary = compute_silq_summary(df, mult, ref_date=ref_date)
-            docs = _analytics_snapshot.snapshot_tape_analytics(
-                company, product, sel['filename'], summary=summary)
-        else:
-            df, sel = _load(company, product, snapshot)
-            config, disp = _currency(company, product, currency)
-            mult = apply_multiplier(config, disp)
-            summary = compute_summary(df, config, disp, sel['date'], None)
-
-            # Compute additional key analytics for the snapshot
-            par_data = None
-            dso_data = None
-            try:
-                par_data = compute_par(df, mult, None)
-            except Exception:
-                pass
-            try:
-                dso_data = compute_dso(df, mult, None)
-            except Exception:
-                pass
-
-            docs = _analytics_snapshot.snapshot_tape_analytics(
-                company, product, sel['filename'],
-                summary=summary, par=par_data, dso=dso_data)
-
-        return {'snapshotted': len(docs), 'snapshot': sel['filename']}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/analytics-timeline")
-def dataroom_analytics_timeline(company: str, product: str,
-                                  doc_type: Optional[str] = None):
-    """Get all analytics snapshots over time for trend analysis."""
-    return _analytics_snapshot.get_analytics_timeline(company, product, doc_type)
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/documents")
-def dataroom_documents(company: str, product: str):
-    """List all ingested documents from the data room registry."""
-    return _dataroom_engine.catalog(company, product)
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/stats")
-def dataroom_stats(company: str, product: str):
-    """Aggregate data room stats: total docs, chunks, pages, by type."""
-    return _dataroom_engine.get_stats(company, product)
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/documents/{doc_id}")
-def dataroom_document_detail(company: str, product: str, doc_id: str):
-    """Get a single document with its chunks and metadata."""
-    result = _dataroom_engine.get_document(company, product, doc_id)
-    if result.get('error'):
-        raise HTTPException(status_code=404, detail=result['error'])
-    return result
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/documents/{doc_id}/view")
-def dataroom_document_view(company: str, product: str, doc_id: str):
-    """Stream the original file for viewing in browser."""
-    import mimetypes
-    result = _dataroom_engine.get_document(company, product, doc_id)
-    if result.get('error'):
-        raise HTTPException(status_code=404, detail=result['error'])
-    filepath = result.get('filepath', '')
-    if not filepath:
-        raise HTTPException(status_code=404, detail="Source file not found on disk")
-    # Normalize path separators (registry may have Windows backslashes on Linux)
-    filepath = filepath.replace('\\', os.sep).replace('/', os.sep)
-    # If relative path, resolve against project root
-    if not os.path.isabs(filepath):
-        filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', filepath)
-    filepath = os.path.normpath(filepath)
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Source file not found on disk")
-    content_type = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
-    return FileResponse(filepath, media_type=content_type, filename=os.path.basename(filepath))
-
-
-@app.post("/companies/{company}/products/{product}/dataroom/ingest")
-def dataroom_ingest(company: str, product: str, source_dir: Optional[str] = None):
-    """Scan and ingest a data room directory.
-
-    If source_dir not provided, uses a default path pattern based on company.
-    """
-    if not source_dir:
-        # Default: company-level dataroom folder inside the platform data directory
-        source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', company, 'dataroom')
-        if not os.path.exists(source_dir):
-            raise HTTPException(status_code=400,
-                              detail=f"No data room directory found at data/{company}/dataroom/. "
-                                     f"Create the folder and add documents, or provide source_dir parameter.")
-
-    result = _dataroom_engine.ingest(company, product, source_dir)
-    log_activity(DATAROOM_INGEST, company, product, f"Ingested data room: {result.get('documents_ingested', '?')} documents")
-
-    return result
-
-
-@app.post("/companies/{company}/products/{product}/dataroom/upload")
-def dataroom_upload_file(company: str, product: str, filepath: str):
-    """Ingest a single file into the data room."""
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=400, detail=f"File not found: {filepath}")
-    result = _dataroom_engine.ingest_file(company, product, filepath)
-    if result.get('error'):
-        raise HTTPException(status_code=400, detail=result['error'])
-    return result
-
-
-@app.post("/companies/{company}/products/{product}/dataroom/refresh")
-def dataroom_refresh(company: str, product: str, source_dir: Optional[str] = None):
-    """Incremental re-scan of the data room directory."""
-    if not source_dir:
-        source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', company, 'dataroom')
-        if not os.path.exists(source_dir):
-            raise HTTPException(status_code=400,
-                              detail=f"No data room directory found at data/{company}/dataroom/. "
-                                     f"Create the folder and add documents, or provide source_dir parameter.")
-    result = _dataroom_engine.refresh(company, product, source_dir)
-    if result.get('error'):
-        raise HTTPException(status_code=400, detail=result['error'])
-    return result
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/search")
-def dataroom_search(company: str, product: str, q: str, top_k: int = 10):
-    """Search across all ingested documents."""
-    if not q or len(q.strip()) < 2:
-        raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
-    return _dataroom_engine.search(company, product, q.strip(), top_k=min(top_k, 50))
-
-
-@app.get("/companies/{company}/products/{product}/dataroom/health")
-def dataroom_health_one(company: str, product: str):
-    """Per-company dataroom health audit (Tier 2.2).
-
-    Surfaces orphan registry entries, missing chunks, index status, last
-    ingest timestamp and unclassified docs. Drives the OperatorCenter
-    Data Rooms card and `dataroom_ctl audit`.
-    """
-    return _dataroom_engine.audit(company, product)
-
-
-@app.get("/dataroom/health")
-def dataroom_health_all():
-    """Global dataroom health across every onboarded company.
-
-    Iterates all companies with a dataroom/ folder and audits the first
-    available product (dataroom is company-level; product is just the
-    event-bus key). Returns a list so the OperatorCenter can render a
-    health matrix in one fetch.
-    """
-    reports = []
-    for co in get_companies():
-        # Only audit companies that actually have a dataroom folder on disk.
-        co_dr = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), '..', 'data', co, 'dataroom'
-        )
-        if not os.path.isdir(co_dr):
-            continue
-        prods = get_products(co)
-        prod = prods[0] if prods else ""
-        try:
-            reports.append(_dataroom_engine.audit(co, prod))
-        except Exception as e:
-            reports.append({
-                "company": co,
-                "product": prod,
-                "error": str(e),
-            })
-    return {"datarooms": reports}
-
-
-# ── Research Intelligence endpoints ──────────────────────────────────────────
-
-@app.post("/companies/{company}/products/{product}/research/query")
-def research_query(company: str, product: str, question: str,
-                   include_analytics: bool = True, top_k: int = 10):
-    """Ask a question across all ingested documents using Claude RAG.
-
-    Uses Claude RAG with internal document chunks, analytics snapshots,
-    and mind context for research synthesis.
-    """
-    result = _research_engine.query(
-        company=company,
-        product=product,
-        question=question,
-        include_analytics=include_analytics,
-    )
-    log_activity(RESEARCH_QUERY, company, product, f"Research: {question[:80]}")
-    return result
-
-
-@app.post("/companies/{company}/products/{product}/research/chat")
-def research_chat(company: str, product: str, body: dict = {}):
-    """Research chat endpoint — matches frontend postResearchChat() signature.
-    Body: {question: str, history: list}
-    """
-    question = body.get('question', '')
-    if not question or len(question.strip()) < 2:
-        raise HTTPException(status_code=400, detail="Question required")
-    # Delegate to the query endpoint logic
-    return research_query(company, product, question.strip())
-
-
-# ── Living Mind endpoints ────────────────────────────────────────────────────
-
-@app.get("/companies/{company}/products/{product}/mind/profile")
-def mind_profile(company: str, product: str):
-    """Get the company mind profile — synthesized knowledge about this company."""
-    cm = CompanyMind(company, product)
-    return cm.get_company_profile()
-
-
-@app.get("/companies/{company}/products/{product}/mind/context")
-def mind_context_preview(company: str, product: str,
-                          task_type: str = "executive_summary"):
-    """Preview what the 6-layer mind context looks like for a given task type."""
-    ctx = build_mind_context(company, product, task_type)
-    return {
-        'framework_length': len(ctx.framework),
-        'master_mind_length': len(ctx.master_mind),
-        'asset_class_length': len(ctx.asset_class),
-        'methodology_length': len(ctx.methodology),
-        'company_mind_length': len(ctx.company_mind),
-        'thesis_length': len(ctx.thesis),
-        'total_entries': ctx.total_entries,
-        'is_empty': ctx.is_empty,
-        'formatted_preview': ctx.formatted[:2000] if ctx.formatted else '',
-    }
-
-
-@app.post("/companies/{company}/products/{product}/mind/record")
-def mind_record(company: str, product: str,
-                category: str, content: str,
-                metadata: Optional[str] = None):
-    """Record an entry in the company mind.
-
-    category: correction, finding, ic_feedback, data_quality, session_lesson
-    """
-    cm = CompanyMind(company, product)
-    meta = json.loads(metadata) if metadata else {}
-
-    if category == 'correction':
-        entry = cm.record_correction(
-            meta.get('correction_category', 'general'),
-            meta.get('original', ''),
-            meta.get('corrected', content),
-            meta.get('reason', ''),
-        )
-    elif category == 'finding':
-        entry = cm.record_research_finding(
-            content,
-            confidence=meta.get('confidence', 'medium'),
-            source_docs=meta.get('source_docs', []),
-        )
-    elif category == 'ic_feedback':
-        entry = cm.record_ic_feedback(content, memo_id=meta.get('memo_id'))
-    elif category == 'data_quality':
-        entry = cm.record_data_quality_note(content, meta.get('tape_or_doc', ''))
-    elif category == 'session_lesson':
-        entry = cm.record_session_lesson(content, meta.get('lesson_category', 'general'))
-    else:
-        raise HTTPException(status_code=400,
-                          detail=f"Unknown category: {category}. "
-                                 f"Valid: correction, finding, ic_feedback, data_quality, session_lesson")
-
-    log_activity(MIND_ENTRY_RECORDED, company, product, f"Recorded {category}: {content[:60]}")
-    return {'recorded': True, 'entry_id': entry.id, 'category': entry.category}
-
-
-@app.get("/mind/master/context")
-def master_mind_context(task_type: str = "executive_summary"):
-    """Preview the master mind (fund-level) context."""
-    master = MasterMind()
-    ctx = master.get_context_for_prompt(task_type)
-    return {
-        'entry_count': ctx.entry_count,
-        'categories': ctx.categories_included,
-        'formatted_preview': ctx.formatted[:2000] if ctx.formatted else '',
-    }
-
-
-@app.post("/mind/master/record")
-def master_mind_record(category: str, content: str,
-                        source: Optional[str] = None,
-                        metadata: Optional[str] = None):
-    """Record an entry in the master mind (fund-level).
-
-    category: preference, cross_company, framework_evolution, ic_norm, writing_style
-    """
-    master = MasterMind()
-    meta = json.loads(metadata) if metadata else {}
-
-    if category == 'preference':
-        entry = master.record_analytical_preference(content, source or 'manual')
-    elif category == 'cross_company':
-        entry = master.record_cross_company_pattern(
-            content,
-            companies=meta.get('companies', []),
-            evidence=meta.get('evidence', ''),
-        )
-    elif category == 'framework_evolution':
-        entry = master.record_framework_evolution(content, meta.get('reason', ''), meta.get('date', ''))
-    elif category == 'ic_norm':
-        entry = master.record_ic_norm(content, meta.get('norm_category', 'general'))
-    elif category == 'writing_style':
-        entry = master.record_writing_style(content, source or 'manual')
-    else:
-        raise HTTPException(status_code=400,
-                          detail=f"Unknown category: {category}. "
-                                 f"Valid: preference, cross_company, framework_evolution, ic_norm, writing_style")
-
-    return {'recorded': True, 'entry_id': entry.id, 'category': entry.category}
-
-
-# ── Memo Engine endpoints ────────────────────────────────────────────────────
-
-@app.get("/memo-templates")
-def get_memo_templates():
-    """List all available IC memo templates with full section definitions.
-
-    Returns full shape expected by frontend: each template includes its
-    ordered sections array ({key, title, required, source}). The frontend
-    relies on these keys to drive section toggles and must match the
-    backend's authoritative section keys to avoid silent drops during
-    generation.
-    """
-    result = []
-    for key, tmpl in MEMO_TEMPLATES.items():
-        sections = [
-            {
-                "key": s["key"],
-                "title": s["title"],
-                "required": s.get("required", False),
-                "source": s.get("source", "mixed"),
-            }
-            for s in tmpl["sections"]
-        ]
-        result.append({
-            "key": key,
-            "name": tmpl["name"],
-            "description": tmpl["description"],
-            "section_count": len(sections),
-            "required_sections": sum(1 for s in sections if s["required"]),
-            "sections": sections,
-        })
-    return result
-
-
-@app.get("/companies/{company}/products/{product}/memos")
-def list_company_memos(company: str, product: str, status: Optional[str] = None):
-    """List all memos for a company/product."""
-    return _memo_storage.list_memos(company=company, product=product, status=status)
-
-
-@app.post("/companies/{company}/products/{product}/memos/generate")
-def generate_memo(company: str, product: str, body: dict = {}):
-    """Generate a full IC memo using AI.
-
-    Body: {template: str, custom_sections: list[str] | null, title: str | null}
-    """
-    template_key = body.get('template', 'credit_memo')
-    custom_sections = body.get('custom_sections')
-    title = body.get('title')
-
-    tmpl = get_template(template_key)
-    if not tmpl:
-        raise HTTPException(status_code=400, detail=f"Unknown template: {template_key}")
-
-    try:
-        memo = _memo_generator.generate_full_memo(
-            company=company,
-            product=product,
-            template_key=template_key,
-            custom_sections=custom_sections,
-        )
-
-        if title:
-            memo['title'] = title
-
-        # Capture transient research packs before save strips them
-        research_packs_copy = dict(memo.get('_research_packs') or {})
-
-        # Save to storage
-        memo_id = _memo_storage.save(memo)
-        memo['id'] = memo_id
-
-        # Best-effort: record memo thesis to Company Mind so future memos
-        # see the prior stance and can flag drift.
-        try:
-            from core.memo.agent_research import record_memo_thesis_to_mind
-            record_memo_thesis_to_mind(memo, research_packs=research_packs_copy)
-        except Exception as e:
-            logger.warning("Thesis recording failed: %s", e)
-
-        log_activity(MEMO_GENERATED, company, product, f"Generated {template_key} memo: {memo_id}")
-        return memo
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Memo generation failed: {str(e)[:500]}")
-
-
-@app.get("/companies/{company}/products/{product}/memos/{memo_id}")
-def get_memo_endpoint(company: str, product: str, memo_id: str,
-             version: Optional[int] = None):
-    """Get a memo (latest version by default)."""
-    memo = _memo_storage.load(company, product, memo_id, version=version)
-    if not memo or memo.get('error'):
-        raise HTTPException(status_code=404, detail=memo.get('error', 'Memo not found'))
-    return memo
-
-
-@app.get("/companies/{company}/products/{product}/memos/{memo_id}/versions")
-def list_memo_versions(company: str, product: str, memo_id: str):
-    """List all versions of a memo."""
-    memo = _memo_storage.load(company, product, memo_id)
-    if not memo:
-        raise HTTPException(status_code=404, detail='Memo not found')
-    return {'memo_id': memo_id, 'current_version': memo.get('version', 1),
-            'versions': list(range(1, memo.get('version', 1) + 1))}
-
-
-@app.patch("/companies/{company}/products/{product}/memos/{memo_id}/sections/{section_key}")
-def update_memo_section_endpoint(company: str, product: str, memo_id: str,
-                         section_key: str, body: dict = {}):
-    """Update a single section (creates new version)."""
-    content = body.get('content', '')
-    if not content:
-        raise HTTPException(status_code=400, detail="Content required")
-
-    # Capture old content before update (needed for learning engine)
-    old_content = ''
-    try:
-        old_memo = _memo_storage.load(company, product, memo_id)
-        if old_memo:
-            for s in old_memo.get('sections', []):
-                if s.get('key') == section_key:
-                    old_content = s.get('content', '')
-                    break
-    except Exception:
-        pass
-
-    result = _memo_storage.update_section(company, product, memo_id, section_key, content)
-    if not result or result.get('error'):
-        raise HTTPException(status_code=404, detail=result.get('error', 'Update failed'))
-
-    # Record the edit in the company mind for learning
-    try:
-        cm = CompanyMind(company, product)
-        cm.record_memo_edit(memo_id, section_key, old_content, content)
-    except Exception:
-        pass
-
-    # Fire MEMO_EDITED event for Intelligence System
-    try:
-        from core.mind.event_bus import event_bus, Events
-        event_bus.publish(Events.MEMO_EDITED, {
-            "company": company, "product": product,
-            "section_key": section_key,
-            "ai_version": old_content,
-            "analyst_version": content,
-            "memo_id": memo_id,
-        })
-    except Exception:
-        pass
-
-    return result
-
-
-@app.post("/companies/{company}/products/{product}/memos/{memo_id}/sections/{section_key}/regenerate")
-def regenerate_memo_section_endpoint(company: str, product: str, memo_id: str,
-                             section_key: str, mode: Optional[str] = None):
-    """Regenerate one section using AI while preserving the rest."""
-    memo = _memo_storage.load(company, product, memo_id)
-    if not memo:
-        raise HTTPException(status_code=404, detail='Memo not found')
-
-    # Agent mode — use memo_writer agent for richer output
-    if mode == "agent":
-        try:
-            from core.agents.internal import generate_agent_section_regen
-            content = generate_agent_section_regen(company, product, memo_id, section_key)
-            if content:
-                _memo_storage.update_section(company, product, memo_id, section_key, content)
-                return {"section_key": section_key, "content": content}
-        except Exception:
-            pass  # Fall through to legacy
-
-    try:
-        new_section = _memo_generator.regenerate_section(memo, section_key)
-        if not new_section:
-            raise HTTPException(status_code=500, detail="Section regeneration returned empty")
-
-        _memo_storage.update_section(company, product, memo_id, section_key, new_section.get('content', ''))
-        return new_section
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)[:500]}")
-
-
-@app.patch("/companies/{company}/products/{product}/memos/{memo_id}/status")
-def update_memo_status_endpoint(company: str, product: str, memo_id: str, body: dict = {}):
-    """Change memo status (draft->review->final->archived)."""
-    new_status = body.get('status', '')
-    valid = ('draft', 'review', 'final', 'archived')
-    if new_status not in valid:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Valid: {valid}")
-
-    result = _memo_storage.update_status(memo_id, new_status)
-    if not result or result.get('error'):
-        raise HTTPException(status_code=404, detail=result.get('error', 'Status update failed'))
-    return result
-
-
-@app.post("/companies/{company}/products/{product}/memos/{memo_id}/export-pdf")
-def export_memo_to_pdf(company: str, product: str, memo_id: str):
-    """Export a memo as a dark-themed PDF."""
-    memo = _memo_storage.load(company, product, memo_id)
-    if not memo:
-        raise HTTPException(status_code=404, detail='Memo not found')
-
-    try:
-        pdf_bytes = export_memo_pdf(memo, company, product)
-        from fastapi.responses import Response
-        filename = f"{company}_{product}_{memo.get('template', 'memo')}_{memo_id[:8]}.pdf"
-        log_activity(MEMO_EXPORTED, company, product, f"Exported memo PDF: {filename}")
-        return Response(
-            content=pdf_bytes,
-            media_type='application/pdf',
-            headers={'Content-Disposition': f'inline; filename="{filename}"'},
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)[:500]}")
+from backend.research_hub import router as research_hub_router
+app.include_router(research_hub_router)
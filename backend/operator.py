@@ -3,34 +3,56 @@ Operator Command Center — Backend endpoints for the Laith platform operator da
 
 Provides:
 - GET  /operator/status         — Aggregate health, commands, gaps, freshness
+                                  (cached per company, ETag / If-None-Match aware)
 - GET  /operator/todo           — Personal follow-up list
 - POST /operator/todo           — Add follow-up item
 - PATCH /operator/todo/{id}     — Update follow-up item (toggle complete, edit)
 - DELETE /operator/todo/{id}    — Delete follow-up item
+- GET  /operator/performance    — Request / compute latency and cache hit ratios
+                                  (process telemetry, never cached)
+- GET  /operator/profiles       — Request profiles captured with ?_profile= (admin)
+- GET  /operator/profiles/{id}  — Profile metadata + hottest functions (admin)
+- GET  /operator/profiles/{id}/download — .prof / .folded artifact (admin)
 - GET  /operator/mind           — Browse all mind entries (master + company)
 - PATCH /operator/mind/{id}     — Promote/archive a mind entry
 - POST /operator/digest         — Generate weekly digest (Slack or JSON)
 """
 
+import hashlib
 import json
+import logging
 import os
+import threading
+import time
 import uuid
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
 from core.loader import get_companies, get_products, get_snapshots, DATA_DIR
 from core.config import load_config
 from core.activity_log import read_activity_log
+from backend.cf_auth import require_admin
+from backend.http_cache import if_none_match_matches
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/operator", tags=["operator"])
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _TODO_PATH = _PROJECT_ROOT / "tasks" / "operator_todo.json"
 _REPORTS_DIR = _PROJECT_ROOT / "reports"
+_DEEP_WORK_PATH = _REPORTS_DIR / "deep-work" / "progress.json"
+
+# Health snapshots older than this are refreshed in the background. Events
+# (tape ingested, document ingested, mind entry created) invalidate a single
+# company immediately, so the TTL only bounds drift from out-of-band changes
+# such as a tape file dropped into data/ by sync-data.ps1.
+_HEALTH_TTL_SECONDS = 300
 
 # ── Command Registry (static) ────────────────────────────────────────────────
 
@@ -123,19 +145,16 @@ def _compute_company_health(company: str, product: str, config: dict) -> dict:
                 pass
 
     # AI cache coverage
-    ai_cache_dir = _REPORTS_DIR / "ai_cache"
     ai_cached = {"commentary": False, "executive_summary": False, "tab_insights": 0}
-    if ai_cache_dir.is_dir():
-        prefix = f"{company}_{product}_"
-        for cf in ai_cache_dir.iterdir():
-            if not cf.name.startswith(prefix):
-                continue
-            if "commentary" in cf.name and "tab" not in cf.name:
-                ai_cached["commentary"] = True
-            elif "executive_summary" in cf.name:
-                ai_cached["executive_summary"] = True
-            elif "tab_insight" in cf.name:
+    try:
+        from core.ai_cache import get_ai_cache
+        for row in get_ai_cache().status(company, product):
+            if row["endpoint"] in ("commentary", "executive_summary"):
+                ai_cached[row["endpoint"]] = True
+            elif row["endpoint"] == "tab_insight":
                 ai_cached["tab_insights"] += 1
+    except Exception as e:
+        logger.debug("AI cache coverage unavailable for %s/%s: %s", company, product, e)
 
     # Gaps detection
     gaps = _detect_gaps(company, product, config, snaps, legal_extracted,
@@ -340,6 +359,201 @@ def _read_all_mind_entries() -> List[Dict[str, Any]]:
     return entries
 
 
+# ── Health cache ──────────────────────────────────────────────────────────────
+
+class _HealthCache:
+    """Per-(company, product) health snapshots, refreshed off the request path.
+
+    `get()` never recomputes a populated cache inline: expired or invalidated
+    entries are handed to a single background refresher thread and the last
+    good snapshot is served in the meantime. Only a cold cache (first request
+    after startup) is computed synchronously.
+
+    `version` increments whenever a refresh changes the stored health, which
+    lets the status endpoint derive an ETag without touching the payload.
+    """
+
+    def __init__(self, ttl_seconds: int = _HEALTH_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], dict] = {}
+        self._computed_at: Dict[Tuple[str, str], float] = {}
+        self._dirty: set = set()  # company names, or "*" for everything
+        self._refreshing = False
+        self._loaded = False
+        self.version = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def invalidate(self, company: Optional[str] = None) -> None:
+        """Mark one company (all products) or everything as stale."""
+        with self._lock:
+            self._dirty.add(company or "*")
+        self._schedule_refresh()
+
+    def ensure_fresh(self) -> None:
+        """Compute a cold cache inline; hand expired or invalidated entries
+        to the background refresher. Cheap when nothing is stale."""
+        if not self._loaded:
+            self.refresh()
+        elif self._needs_refresh():
+            self._schedule_refresh()
+
+    def get(self) -> List[dict]:
+        """Return health for every company/product, newest available."""
+        self.ensure_fresh()
+        return self.entries()
+
+    def entries(self) -> List[dict]:
+        """Current snapshots as stored, without any staleness check."""
+        with self._lock:
+            return [self._entries[k] for k in sorted(self._entries)]
+
+    def clear(self) -> None:
+        """Drop every snapshot. Used by tests for a clean state."""
+        with self._lock:
+            self._entries.clear()
+            self._computed_at.clear()
+            self._dirty.clear()
+            self._loaded = False
+            self.version += 1
+
+    def refresh(self, force: bool = False) -> None:
+        """Recompute stale, invalidated or new company/products synchronously."""
+        now = time.monotonic()
+        with self._lock:
+            dirty_companies = set(self._dirty)
+            self._dirty.clear()
+            computed_at = dict(self._computed_at)
+
+        live = [(co, prod) for co in get_companies() if not co.startswith("_")
+                for prod in get_products(co)]
+        fresh: Dict[Tuple[str, str], dict] = {}
+        for key in live:
+            co, prod = key
+            stale = (
+                force
+                or "*" in dirty_companies
+                or co in dirty_companies
+                or key not in computed_at
+                or now - computed_at[key] > self.ttl_seconds
+            )
+            if not stale:
+                continue
+            try:
+                config = load_config(co, prod) or {}
+                fresh[key] = _compute_company_health(co, prod, config)
+            except Exception as e:
+                logger.warning("operator health failed for %s/%s: %s", co, prod, e)
+
+        with self._lock:
+            changed = False
+            for key in list(self._entries):
+                if key not in live:
+                    del self._entries[key]
+                    self._computed_at.pop(key, None)
+                    changed = True
+            for key, health in fresh.items():
+                if self._entries.get(key) != health:
+                    changed = True
+                self._entries[key] = health
+                self._computed_at[key] = now
+            if changed:
+                self.version += 1
+            self._loaded = True
+
+    def _needs_refresh(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._dirty:
+                return True
+            return any(now - t > self.ttl_seconds for t in self._computed_at.values())
+
+    def warm(self) -> None:
+        """Start a background refresh — called at startup so the first
+        /status request doesn't pay for a cold compute."""
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("operator health refresh failed: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="operator-health-refresh", daemon=True).start()
+
+
+_health_cache = _HealthCache()
+_listeners_registered = False
+
+
+def _on_company_changed(payload: Dict[str, Any]) -> None:
+    """Event bus handler — invalidate the affected company's health."""
+    company = payload.get("company")
+    if company:
+        _health_cache.invalidate(company)
+
+
+def register_operator_listeners() -> None:
+    """Subscribe the health cache to events that change company health.
+
+    Safe to call multiple times — guards against double registration.
+    """
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+
+    from core.mind.event_bus import event_bus, Events
+
+    for event_type in (
+        Events.TAPE_INGESTED,
+        Events.DOCUMENT_INGESTED,
+        Events.MIND_ENTRY_CREATED,
+        Events.THESIS_UPDATED,
+    ):
+        event_bus.subscribe(event_type, _on_company_changed)
+    _health_cache.warm()
+
+
+def _file_fingerprint(path: Path) -> str:
+    """Cheap change marker for a file — size + mtime, no read."""
+    try:
+        st = path.stat()
+        return f"{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        return "-"
+
+
+def _status_etag() -> str:
+    """Strong ETag for /status built from stat() calls only.
+
+    Covers every input of the payload: the health cache version plus the
+    activity log, todo list and deep-work progress files.
+    """
+    from core import activity_log
+
+    parts = [
+        str(_health_cache.version),
+        _file_fingerprint(activity_log._LOG_PATH),
+        _file_fingerprint(_TODO_PATH),
+        _file_fingerprint(_DEEP_WORK_PATH),
+    ]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
 # ── Pydantic Models ───────────────────────────────────────────────────────────
 
 class TodoCreate(BaseModel):
@@ -356,18 +570,10 @@ class TodoUpdate(BaseModel):
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
-@router.get("/status")
-def get_operator_status():
-    """Aggregate operator status across all companies, commands, and activity."""
-    companies_health = []
-
-    for co in get_companies():
-        if co.startswith("_"):
-            continue
-        for prod in get_products(co):
-            config = load_config(co, prod) or {}
-            health = _compute_company_health(co, prod, config)
-            companies_health.append(health)
+def _build_operator_status(companies_health: Optional[List[dict]] = None) -> Dict[str, Any]:
+    """Assemble the operator status payload from the health cache."""
+    if companies_health is None:
+        companies_health = _health_cache.get()
 
     # Activity log (recent 50)
     activity = read_activity_log(limit=50)
@@ -376,11 +582,10 @@ def get_operator_status():
     todos = _load_todos()
 
     # Deep work sessions
-    progress_path = _REPORTS_DIR / "deep-work" / "progress.json"
     deep_work_sessions = []
-    if progress_path.exists():
+    if _DEEP_WORK_PATH.exists():
         try:
-            with open(progress_path) as f:
+            with open(_DEEP_WORK_PATH) as f:
                 dw = json.load(f)
             deep_work_sessions = dw.get("sessions", [])
         except Exception:
@@ -396,6 +601,79 @@ def get_operator_status():
     }
 
 
+@router.get("/status")
+def get_operator_status(request: Request, response: Response, refresh: bool = False):
+    """Aggregate operator status across all companies, commands, and activity.
+
+    Per-company health is served from `_health_cache`. The response carries a
+    strong ETag; a matching `If-None-Match` returns 304 without building the
+    payload, so the Operator Center can poll cheaply. TTL expiry is checked
+    before the ETag comparison, so a polling client still triggers the
+    background refresh and sees the new ETag once it lands. `refresh=true`
+    forces a synchronous recompute of every company.
+    """
+    if refresh:
+        _health_cache.refresh(force=True)
+    else:
+        _health_cache.ensure_fresh()
+
+    etag = _status_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not refresh and if_none_match_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return _build_operator_status(_health_cache.entries())
+
+
+@router.get("/performance")
+def get_operator_performance(top: int = 10, reset: bool = False):
+    """Slowest routes and compute functions, tape load times and cache hit ratios.
+
+    Served apart from /status because it changes on every request and would
+    defeat that endpoint's ETag. Numbers cover this process since start (or
+    the last `reset=true`); GET /metrics exposes the same data to Prometheus.
+    """
+    from core.telemetry import ENABLED, get_telemetry
+
+    telemetry = get_telemetry()
+    summary = telemetry.summary(top=max(1, min(top, 50)))
+    if reset:
+        telemetry.reset()
+    return {"generated_at": datetime.now(timezone.utc).isoformat(), "enabled": ENABLED, **summary}
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def get_operator_profiles(limit: int = 50):
+    """Request profiles captured from live traffic, newest first.
+
+    An admin adds `?_profile=1` (cProfile) or `?_profile=sample` (stack
+    sampling), or the X-Laith-Profile header, to any dashboard request;
+    backend.profiling stores the artifact with its route, parameters and
+    tape identity under reports/profiles/.
+    """
+    from backend.profiling import list_profiles
+
+    return {"profiles": list_profiles(limit=max(1, min(limit, 200)))}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_operator_profile(profile_id: str):
+    """Full metadata of one profile, including its hottest functions."""
+    from backend.profiling import load_profile
+
+    return load_profile(profile_id)
+
+
+@router.get("/profiles/{profile_id}/download", dependencies=[Depends(require_admin)])
+def download_operator_profile(profile_id: str):
+    """The raw artifact: pstats .prof (snakeviz, flameprof) or .folded stacks (flamegraph.pl, speedscope)."""
+    from backend.profiling import artifact_path
+
+    path = artifact_path(profile_id)
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
 @router.get("/todo")
 def get_operator_todos():
     """Get all operator follow-up items."""
@@ -544,7 +822,7 @@ def generate_operator_digest(webhook_url: Optional[str] = None):
     If webhook_url is provided, sends to Slack. Otherwise returns JSON.
     """
     # Get full status
-    status = get_operator_status()
+    status = _build_operator_status()
 
     # Build digest sections
     lines = ["*Laith Operator Digest*", f"Generated: {date.today().isoformat()}", ""]
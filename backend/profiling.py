@@ -0,0 +1,384 @@
+"""
+backend/profiling.py
+Admin-only, request-scoped profiling for slow dashboard calls.
+
+"The Returns tab is slow" is hard to reproduce away from production
+tapes and traffic, so an admin can ask the live API to profile one
+request:
+
+    GET /companies/klaim/products/UAE_healthcare/charts/returns-analysis?_profile=1
+    (or header  X-Laith-Profile: 1)
+
+  1 / cprofile   deterministic cProfile of the endpoint → .prof (pstats;
+                 open with snakeviz, or `flameprof` for a flamegraph)
+  sample         stack sampling every LAITH_PROFILE_SAMPLE_MS (default 5)
+                 → .folded collapsed stacks (flamegraph.pl, speedscope)
+
+ProfilingMiddleware checks the caller with cf_auth.require_admin (403
+otherwise), drops If-None-Match so the ETag layer can't answer 304
+without running the endpoint, and afterwards writes the artifact plus a
+.json sidecar — route, parameters, tape identity (file, size, mtime),
+status, duration, top functions — under reports/profiles/. The response
+carries X-Laith-Profile-Id; the Operator Center lists the artifacts.
+
+The profiler runs inside the endpoint itself (ProfiledRoute wraps it),
+i.e. on the threadpool thread that executes a sync handler, so other
+requests in flight don't leak into the profile.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(os.getenv("LAITH_PROFILE_DIR", str(_PROJECT_ROOT / "reports" / "profiles")))
+MAX_PROFILES = int(os.getenv("LAITH_PROFILE_KEEP", "200"))
+SAMPLE_INTERVAL = float(os.getenv("LAITH_PROFILE_SAMPLE_MS", "5")) / 1000
+
+HEADER = b"x-laith-profile"
+QUERY = "_profile"
+MODES = {"1": "cprofile", "true": "cprofile", "cprofile": "cprofile", "sample": "sample"}
+TOP_N = 25
+
+_PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}Z_[a-z0-9_-]+_[0-9a-f]{8}$")
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("laith_request_profile", default=None)
+
+
+# ── Profilers ────────────────────────────────────────────────────────────────
+
+class RequestProfile:
+    """One profiled request: set by the middleware, filled in by the endpoint wrapper."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.captured = False
+        self.profiler: Optional[cProfile.Profile] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def run(self, fn, *args, **kwargs):
+        self.captured = True
+        if self.mode == "sample":
+            with _Sampler(self, threading.get_ident(), sys._getframe()):
+                return fn(*args, **kwargs)
+        self.profiler = cProfile.Profile()
+        return self.profiler.runcall(fn, *args, **kwargs)
+
+    async def run_async(self, fn, *args, **kwargs):
+        # Coroutines interleave on the event loop: the profile may include
+        # other requests' work while this one awaits.
+        self.captured = True
+        if self.mode == "sample":
+            with _Sampler(self, threading.get_ident(), sys._getframe()):
+                return await fn(*args, **kwargs)
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self.profiler.disable()
+
+    def top(self, n: int = TOP_N) -> List[Dict[str, Any]]:
+        """Hottest functions: by cumulative time (cprofile) or self samples (sample)."""
+        if self.profiler is not None:
+            return sorted(self._cprofile_rows(), key=lambda r: -r["cumulative_ms"])[:n]
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        total = max(self.samples, 1)
+        return [{"function": frame, "self_samples": count, "samples": inclusive[frame],
+                 "self_pct": round(count / total * 100, 1)}
+                for frame, count in own.most_common(n)]
+
+    def hottest(self) -> Optional[str]:
+        """The function with the most self time — the one-line answer for the listing."""
+        if self.profiler is not None:
+            rows = self._cprofile_rows()
+            return max(rows, key=lambda r: r["self_ms"])["function"] if rows else None
+        rows = self.top(1)
+        return rows[0]["function"] if rows else None
+
+    def _cprofile_rows(self) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        return [{"function": f"{name} ({_short(filename)}:{line})", "calls": nc,
+                 "self_ms": round(tt * 1000, 2), "cumulative_ms": round(ct * 1000, 2)}
+                for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items()]
+
+
+class _Sampler:
+    """Collapsed-stack sampler for one thread, stopping at the wrapper's frame."""
+
+    def __init__(self, profile: RequestProfile, ident: int, stop_frame):
+        self.profile = profile
+        self.ident = ident
+        self.stop_frame = stop_frame
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="laith-profile-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+    def _loop(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.ident)
+            stack = []
+            while frame is not None and frame is not self.stop_frame:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.profile.stacks[";".join(reversed(stack))] += 1
+                self.profile.samples += 1
+
+
+def _short(filename: str) -> str:
+    try:
+        return str(Path(filename).resolve().relative_to(_PROJECT_ROOT))
+    except ValueError:
+        parts = Path(filename).parts
+        return "/".join(parts[-2:]) if len(parts) > 1 else filename
+
+
+# ── Endpoint wrapper ─────────────────────────────────────────────────────────
+
+def profiled(endpoint):
+    """Run `endpoint` under the current request's profiler, if one was requested."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or profile.captured:
+                return await endpoint(*args, **kwargs)
+            return await profile.run_async(endpoint, *args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or profile.captured:
+                return endpoint(*args, **kwargs)
+            return profile.run(endpoint, *args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled per request (see ProfilingMiddleware)."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+# ── Middleware ───────────────────────────────────────────────────────────────
+
+def _requested_mode(scope) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == HEADER:
+            return MODES.get(value.decode("latin-1").strip().lower())
+    query = scope.get("query_string", b"").decode("latin-1")
+    if QUERY not in query:
+        return None
+    from urllib.parse import parse_qs
+    values = parse_qs(query).get(QUERY)
+    return MODES.get(values[-1].strip().lower()) if values else None
+
+
+def _authorise(request: Request):
+    """cf_auth.require_admin, called outside FastAPI's dependency injection."""
+    from backend.cf_auth import get_current_user, require_admin
+    from core.database import get_db
+
+    db_gen = get_db()
+    try:
+        return require_admin(get_current_user(request, next(db_gen)))
+    finally:
+        db_gen.close()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: profile requests flagged with ?_profile= / X-Laith-Profile (admins only)."""
+
+    def __init__(self, app, directory: Optional[Path] = None):
+        self.app = app
+        self.directory = directory
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            user = await run_in_threadpool(_authorise, Request(scope))
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+
+        profile_id = _profile_id(scope.get("path", ""))
+        # Never 304: the point is to run the endpoint
+        scope = dict(scope, headers=[(k, v) for k, v in scope["headers"] if k != b"if-none-match"])
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = dict(message, headers=list(message.get("headers", []))
+                               + [(b"x-laith-profile-id", profile_id.encode())])
+            await send(message)
+
+        profile = RequestProfile(mode)
+        token = _current.set(profile)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - t0
+            if profile.captured:
+                try:
+                    await run_in_threadpool(save_profile, profile, profile_id, scope, status["code"],
+                                            elapsed, getattr(user, "email", None), self.directory)
+                except Exception as e:
+                    logger.warning("Saving profile %s failed: %s", profile_id, e)
+            else:
+                logger.info("Profile requested for %s but the route is not profiled", scope.get("path"))
+
+
+# ── Artifacts ────────────────────────────────────────────────────────────────
+
+def _profile_id(path: str) -> str:
+    words = re.sub(r"[^a-z0-9]+", " ", path.lower()).split()
+    while len("-".join(words)) > 60:          # keep the tail: the chart name
+        words.pop(0)
+    slug = "-".join(words) or "root"
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}_{slug}_{uuid.uuid4().hex[:8]}"
+
+
+def _tape_identity(scope) -> Optional[Dict[str, Any]]:
+    """The tape a company/product route resolved to — the key to reproducing the profile."""
+    params = scope.get("path_params") or {}
+    company, product = params.get("company"), params.get("product")
+    if not company or not product:
+        return None
+    from urllib.parse import parse_qs
+    snapshot = (parse_qs(scope.get("query_string", b"").decode("latin-1")).get("snapshot") or [None])[-1]
+    identity: Dict[str, Any] = {"company": company, "product": product, "snapshot": snapshot}
+    try:
+        from backend.main import _resolve_snapshot
+        sel = _resolve_snapshot(company, product, snapshot)
+        stat = os.stat(sel["filepath"])
+        identity.update(filename=sel["filename"], tape_date=sel.get("date"), size=stat.st_size,
+                        mtime=datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(timespec="seconds"))
+    except Exception as e:            # DB-backed snapshot or bad params: keep what we have
+        identity["error"] = str(getattr(e, "detail", e))[:200]
+    return identity
+
+
+def save_profile(profile: RequestProfile, profile_id: str, scope, status: int, elapsed: float,
+                 user: Optional[str] = None, directory: Optional[Path] = None) -> Dict[str, Any]:
+    """Write the artifact and its .json sidecar; returns the sidecar dict."""
+    from urllib.parse import parse_qsl
+    directory = Path(directory or PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if profile.profiler is not None:
+        artifact = f"{profile_id}.prof"
+        profile.profiler.dump_stats(str(directory / artifact))
+    else:
+        artifact = f"{profile_id}.folded"
+        body = "".join(f"{stack} {count}\n" for stack, count in profile.stacks.most_common())
+        (directory / artifact).write_text(body, encoding="utf-8")
+
+    route = scope.get("route")
+    meta = {
+        "id": profile_id,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": profile.mode,
+        "method": scope.get("method"),
+        "path": scope.get("path"),
+        "route": getattr(route, "path", None),
+        "params": {k: v for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+                   if k != QUERY},
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 1),
+        "user": user,
+        "tape": _tape_identity(scope),
+        "artifact": artifact,
+        "samples": profile.samples if profile.mode == "sample" else None,
+        "hottest": profile.hottest(),
+        "top": profile.top(),
+    }
+    tmp = directory / f".{profile_id}.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, directory / f"{profile_id}.json")
+    _prune(directory)
+    logger.info("Profiled %s %s in %.0f ms → %s", meta["method"], meta["path"], elapsed * 1000, artifact)
+    return meta
+
+
+def _prune(directory: Path, keep: int = None) -> None:
+    keep = MAX_PROFILES if keep is None else keep
+    sidecars = sorted(directory.glob("*.json"))
+    for old in sidecars[:max(len(sidecars) - keep, 0)]:
+        for path in directory.glob(f"{old.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def list_profiles(limit: int = 50, directory: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Newest-first sidecars without the `top` table."""
+    directory = Path(directory or PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    out = []
+    for path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta.pop("top", None)
+        out.append(meta)
+    return out
+
+
+def load_profile(profile_id: str, directory: Optional[Path] = None) -> Dict[str, Any]:
+    """Sidecar for `profile_id`; 404 for unknown or malformed ids."""
+    path = Path(directory or PROFILE_DIR) / f"{profile_id}.json"
+    if not _PROFILE_ID.match(profile_id) or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def artifact_path(profile_id: str, directory: Optional[Path] = None) -> Path:
+    meta = load_profile(profile_id, directory)
+    path = Path(directory or PROFILE_DIR) / meta["artifact"]
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Artifact for '{profile_id}' is missing")
+    return path
@@ -0,0 +1,650 @@
+"""
+backend/research_hub.py
+Research Hub API — Data Room, Research Intelligence, Living Mind, IC memos.
+
+The engines behind these endpoints (DataRoomEngine, DualResearchEngine,
+MemoGenerator, the reportlab memo PDF exporter) are heavy to import and
+build, and most API processes serve tape analytics long before anyone opens
+the research hub. They are constructed on first use through the getters
+below instead of at app import, so they stay off the cold-start path.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from core.activity_log import (
+    log_activity, DATAROOM_INGEST, MEMO_EXPORTED, MEMO_GENERATED, MIND_ENTRY_RECORDED, RESEARCH_QUERY,
+)
+from core.analysis import apply_multiplier, compute_dso, compute_par, compute_summary
+from core.analysis_silq import compute_silq_summary
+from core.analysis_tamara import parse_tamara_data
+from core.loader import get_companies, get_products, get_snapshots
+from core.memo.templates import MEMO_TEMPLATES, get_template
+from core.mind import MasterMind, CompanyMind, build_mind_context
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Research Hub"])
+
+
+# ── Engines (built on first use) ─────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _dataroom_engine():
+    from core.dataroom.engine import DataRoomEngine
+    return DataRoomEngine()
+
+
+@lru_cache(maxsize=None)
+def _analytics_snapshot():
+    from core.dataroom.analytics_snapshot import AnalyticsSnapshotEngine
+    return AnalyticsSnapshotEngine()
+
+
+@lru_cache(maxsize=None)
+def _research_engine():
+    from core.research.dual_engine import DualResearchEngine
+    return DualResearchEngine()
+
+
+@lru_cache(maxsize=None)
+def _memo_generator():
+    from core.memo.generator import MemoGenerator
+    return MemoGenerator()
+
+
+@lru_cache(maxsize=None)
+def _memo_storage():
+    from core.memo.storage import MemoStorage
+    return MemoStorage()
+
+
+# ── Data Room endpoints ──────────────────────────────────────────────────────
+
+@router.post("/companies/{company}/products/{product}/dataroom/snapshot-analytics")
+def dataroom_snapshot_analytics(company: str, product: str,
+                                 snapshot: Optional[str] = None,
+                                 currency: Optional[str] = None):
+    """Snapshot current analytics (tape summary, PAR, DSO, etc.) into the data room.
+
+    This makes platform-computed analytics searchable alongside data room documents.
+    Call once per snapshot to capture the analytical state.
+    """
+    from backend.main import _currency, _get_analysis_type, _load, _silq_load, _tamara_cache
+
+    at = _get_analysis_type(company, product)
+
+    if at in ('ejari_summary', 'tamara_summary', 'aajil'):
+        # For read-only summaries, snapshot the parsed data
+        try:
+            snaps = get_snapshots(company, product)
+            if not snaps:
+                return {'snapshotted': 0, 'message': 'No snapshots found'}
+            snap_filename = snaps[-1]['filename']
+
+            if at == 'tamara_summary':
+                filepath = snaps[-1]['filepath']
+                if filepath not in _tamara_cache:
+                    _tamara_cache[filepath] = parse_tamara_data(filepath)
+                data = _tamara_cache[filepath]
+                docs = _analytics_snapshot().snapshot_ai_output(
+                    company, product, 'parsed_summary', data, snap_filename)
+                return {'snapshotted': 1 if docs else 0, 'snapshot': snap_filename}
+            else:
+                return {'snapshotted': 0, 'message': 'Ejari snapshot not yet supported'}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # For tape-based companies (Klaim, SILQ): snapshot key analytics
+    try:
+        if at == 'silq':
+            df, sel, config, disp, mult, _, ref_date = _silq_load(company, product, snapshot, None, currency)
+            summary = compute_silq_summary(df, mult, ref_date=ref_date)
+            docs = _analytics_snapshot().snapshot_tape_analytics(
+                company, product, sel['filename'], summary=summary)
+        else:
+            df, sel = _load(company, product, snapshot)
+            config, disp = _currency(company, product, currency)
+            mult = apply_multiplier(config, disp)
+            summary = compute_summary(df, config, disp, sel['date'], None)
+
+            # Compute additional key analytics for the snapshot
+            par_data = None
+            dso_data = None
+            try:
+                par_data = compute_par(df, mult, None)
+            except Exception:
+                pass
+            try:
+                dso_data = compute_dso(df, mult, None)
+            except Exception:
+                pass
+
+            docs = _analytics_snapshot().snapshot_tape_analytics(
+                company, product, sel['filename'],
+                summary=summary, par=par_data, dso=dso_data)
+
+        return {'snapshotted': len(docs), 'snapshot': sel['filename']}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/analytics-timeline")
+def dataroom_analytics_timeline(company: str, product: str,
+                                  doc_type: Optional[str] = None):
+    """Get all analytics snapshots over time for trend analysis."""
+    return _analytics_snapshot().get_analytics_timeline(company, product, doc_type)
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/documents")
+def dataroom_documents(company: str, product: str):
+    """List all ingested documents from the data room registry."""
+    return _dataroom_engine().catalog(company, product)
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/stats")
+def dataroom_stats(company: str, product: str):
+    """Aggregate data room stats: total docs, chunks, pages, by type."""
+    return _dataroom_engine().get_stats(company, product)
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/documents/{doc_id}")
+def dataroom_document_detail(company: str, product: str, doc_id: str):
+    """Get a single document with its chunks and metadata."""
+    result = _dataroom_engine().get_document(company, product, doc_id)
+    if result.get('error'):
+        raise HTTPException(status_code=404, detail=result['error'])
+    return result
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/documents/{doc_id}/view")
+def dataroom_document_view(company: str, product: str, doc_id: str):
+    """Stream the original file for viewing in browser."""
+    import mimetypes
+    result = _dataroom_engine().get_document(company, product, doc_id)
+    if result.get('error'):
+        raise HTTPException(status_code=404, detail=result['error'])
+    filepath = result.get('filepath', '')
+    if not filepath:
+        raise HTTPException(status_code=404, detail="Source file not found on disk")
+    # Normalize path separators (registry may have Windows backslashes on Linux)
+    filepath = filepath.replace('\\', os.sep).replace('/', os.sep)
+    # If relative path, resolve against project root
+    if not os.path.isabs(filepath):
+        filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', filepath)
+    filepath = os.path.normpath(filepath)
+    if not os.path.exists(filepath):
+        raise HTTPException(status_code=404, detail="Source file not found on disk")
+    content_type = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+    return FileResponse(filepath, media_type=content_type, filename=os.path.basename(filepath))
+
+
+@router.post("/companies/{company}/products/{product}/dataroom/ingest")
+def dataroom_ingest(company: str, product: str, source_dir: Optional[str] = None):
+    """Scan and ingest a data room directory.
+
+    If source_dir not provided, uses a default path pattern based on company.
+    """
+    if not source_dir:
+        # Default: company-level dataroom folder inside the platform data directory
+        source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', company, 'dataroom')
+        if not os.path.exists(source_dir):
+            raise HTTPException(status_code=400,
+                              detail=f"No data room directory found at data/{company}/dataroom/. "
+                                     f"Create the folder and add documents, or provide source_dir parameter.")
+
+    result = _dataroom_engine().ingest(company, product, source_dir)
+    log_activity(DATAROOM_INGEST, company, product, f"Ingested data room: {result.get('documents_ingested', '?')} documents")
+
+    return result
+
+
+@router.post("/companies/{company}/products/{product}/dataroom/upload")
+def dataroom_upload_file(company: str, product: str, filepath: str):
+    """Ingest a single file into the data room."""
+    if not os.path.exists(filepath):
+        raise HTTPException(status_code=400, detail=f"File not found: {filepath}")
+    result = _dataroom_engine().ingest_file(company, product, filepath)
+    if result.get('error'):
+        raise HTTPException(status_code=400, detail=result['error'])
+    return result
+
+
+@router.post("/companies/{company}/products/{product}/dataroom/refresh")
+def dataroom_refresh(company: str, product: str, source_dir: Optional[str] = None):
+    """Incremental re-scan of the data room directory."""
+    if not source_dir:
+        source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', company, 'dataroom')
+        if not os.path.exists(source_dir):
+            raise HTTPException(status_code=400,
+                              detail=f"No data room directory found at data/{company}/dataroom/. "
+                                     f"Create the folder and add documents, or provide source_dir parameter.")
+    result = _dataroom_engine().refresh(company, product, source_dir)
+    if result.get('error'):
+        raise HTTPException(status_code=400, detail=result['error'])
+    return result
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/search")
+def dataroom_search(company: str, product: str, q: str, top_k: int = 10):
+    """Search across all ingested documents."""
+    if not q or len(q.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
+    return _dataroom_engine().search(company, product, q.strip(), top_k=min(top_k, 50))
+
+
+@router.get("/companies/{company}/products/{product}/dataroom/health")
+def dataroom_health_one(company: str, product: str):
+    """Per-company dataroom health audit (Tier 2.2).
+
+    Surfaces orphan registry entries, missing chunks, index status, last
+    ingest timestamp and unclassified docs. Drives the OperatorCenter
+    Data Rooms card and `dataroom_ctl audit`.
+    """
+    return _dataroom_engine().audit(company, product)
+
+
+@router.get("/dataroom/health")
+def dataroom_health_all():
+    """Global dataroom health across every onboarded company.
+
+    Iterates all companies with a dataroom/ folder and audits the first
+    available product (dataroom is company-level; product is just the
+    event-bus key). Returns a list so the OperatorCenter can render a
+    health matrix in one fetch.
+    """
+    reports = []
+    for co in get_companies():
+        # Only audit companies that actually have a dataroom folder on disk.
+        co_dr = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '..', 'data', co, 'dataroom'
+        )
+        if not os.path.isdir(co_dr):
+            continue
+        prods = get_products(co)
+        prod = prods[0] if prods else ""
+        try:
+            reports.append(_dataroom_engine().audit(co, prod))
+        except Exception as e:
+            reports.append({
+                "company": co,
+                "product": prod,
+                "error": str(e),
+            })
+    return {"datarooms": reports}
+
+
+# ── Research Intelligence endpoints ──────────────────────────────────────────
+
+@router.post("/companies/{company}/products/{product}/research/query")
+def research_query(company: str, product: str, question: str,
+                   include_analytics: bool = True, top_k: int = 10):
+    """Ask a question across all ingested documents using Claude RAG.
+
+    Uses Claude RAG with internal document chunks, analytics snapshots,
+    and mind context for research synthesis.
+    """
+    result = _research_engine().query(
+        company=company,
+        product=product,
+        question=question,
+        include_analytics=include_analytics,
+    )
+    log_activity(RESEARCH_QUERY, company, product, f"Research: {question[:80]}")
+    return result
+
+
+@router.post("/companies/{company}/products/{product}/research/chat")
+def research_chat(company: str, product: str, body: dict = {}):
+    """Research chat endpoint — matches frontend postResearchChat() signature.
+    Body: {question: str, history: list}
+    """
+    question = body.get('question', '')
+    if not question or len(question.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Question required")
+    # Delegate to the query endpoint logic
+    return research_query(company, product, question.strip())
+
+
+# ── Living Mind endpoints ────────────────────────────────────────────────────
+
+@router.get("/companies/{company}/products/{product}/mind/profile")
+def mind_profile(company: str, product: str):
+    """Get the company mind profile — synthesized knowledge about this company."""
+    cm = CompanyMind(company, product)
+    return cm.get_company_profile()
+
+
+@router.get("/companies/{company}/products/{product}/mind/context")
+def mind_context_preview(company: str, product: str,
+                          task_type: str = "executive_summary"):
+    """Preview what the 6-layer mind context looks like for a given task type."""
+    ctx = build_mind_context(company, product, task_type)
+    return {
+        'framework_length': len(ctx.framework),
+        'master_mind_length': len(ctx.master_mind),
+        'asset_class_length': len(ctx.asset_class),
+        'methodology_length': len(ctx.methodology),
+        'company_mind_length': len(ctx.company_mind),
+        'thesis_length': len(ctx.thesis),
+        'total_entries': ctx.total_entries,
+        'is_empty': ctx.is_empty,
+        'formatted_preview': ctx.formatted[:2000] if ctx.formatted else '',
+    }
+
+
+@router.post("/companies/{company}/products/{product}/mind/record")
+def mind_record(company: str, product: str,
+                category: str, content: str,
+                metadata: Optional[str] = None):
+    """Record an entry in the company mind.
+
+    category: correction, finding, ic_feedback, data_quality, session_lesson
+    """
+    cm = CompanyMind(company, product)
+    meta = json.loads(metadata) if metadata else {}
+
+    if category == 'correction':
+        entry = cm.record_correction(
+            meta.get('correction_category', 'general'),
+            meta.get('original', ''),
+            meta.get('corrected', content),
+            meta.get('reason', ''),
+        )
+    elif category == 'finding':
+        entry = cm.record_research_finding(
+            content,
+            confidence=meta.get('confidence', 'medium'),
+            source_docs=meta.get('source_docs', []),
+        )
+    elif category == 'ic_feedback':
+        entry = cm.record_ic_feedback(content, memo_id=meta.get('memo_id'))
+    elif category == 'data_quality':
+        entry = cm.record_data_quality_note(content, meta.get('tape_or_doc', ''))
+    elif category == 'session_lesson':
+        entry = cm.record_session_lesson(content, meta.get('lesson_category', 'general'))
+    else:
+        raise HTTPException(status_code=400,
+                          detail=f"Unknown category: {category}. "
+                                 f"Valid: correction, finding, ic_feedback, data_quality, session_lesson")
+
+    log_activity(MIND_ENTRY_RECORDED, company, product, f"Recorded {category}: {content[:60]}")
+    return {'recorded': True, 'entry_id': entry.id, 'category': entry.category}
+
+
+@router.get("/mind/master/context")
+def master_mind_context(task_type: str = "executive_summary"):
+    """Preview the master mind (fund-level) context."""
+    master = MasterMind()
+    ctx = master.get_context_for_prompt(task_type)
+    return {
+        'entry_count': ctx.entry_count,
+        'categories': ctx.categories_included,
+        'formatted_preview': ctx.formatted[:2000] if ctx.formatted else '',
+    }
+
+
+@router.post("/mind/master/record")
+def master_mind_record(category: str, content: str,
+                        source: Optional[str] = None,
+                        metadata: Optional[str] = None):
+    """Record an entry in the master mind (fund-level).
+
+    category: preference, cross_company, framework_evolution, ic_norm, writing_style
+    """
+    master = MasterMind()
+    meta = json.loads(metadata) if metadata else {}
+
+    if category == 'preference':
+        entry = master.record_analytical_preference(content, source or 'manual')
+    elif category == 'cross_company':
+        entry = master.record_cross_company_pattern(
+            content,
+            companies=meta.get('companies', []),
+            evidence=meta.get('evidence', ''),
+        )
+    elif category == 'framework_evolution':
+        entry = master.record_framework_evolution(content, meta.get('reason', ''), meta.get('date', ''))
+    elif category == 'ic_norm':
+        entry = master.record_ic_norm(content, meta.get('norm_category', 'general'))
+    elif category == 'writing_style':
+        entry = master.record_writing_style(content, source or 'manual')
+    else:
+        raise HTTPException(status_code=400,
+                          detail=f"Unknown category: {category}. "
+                                 f"Valid: preference, cross_company, framework_evolution, ic_norm, writing_style")
+
+    return {'recorded': True, 'entry_id': entry.id, 'category': entry.category}
+
+
+# ── Memo Engine endpoints ────────────────────────────────────────────────────
+
+@router.get("/memo-templates")
+def get_memo_templates():
+    """List all available IC memo templates with full section definitions.
+
+    Returns full shape expected by frontend: each template includes its
+    ordered sections array ({key, title, required, source}). The frontend
+    relies on these keys to drive section toggles and must match the
+    backend's authoritative section keys to avoid silent drops during
+    generation.
+    """
+    result = []
+    for key, tmpl in MEMO_TEMPLATES.items():
+        sections = [
+            {
+                "key": s["key"],
+                "title": s["title"],
+                "required": s.get("required", False),
+                "source": s.get("source", "mixed"),
+            }
+            for s in tmpl["sections"]
+        ]
+        result.append({
+            "key": key,
+            "name": tmpl["name"],
+            "description": tmpl["description"],
+            "section_count": len(sections),
+            "required_sections": sum(1 for s in sections if s["required"]),
+            "sections": sections,
+        })
+    return result
+
+
+@router.get("/companies/{company}/products/{product}/memos")
+def list_company_memos(company: str, product: str, status: Optional[str] = None):
+    """List all memos for a company/product."""
+    return _memo_storage().list_memos(company=company, product=product, status=status)
+
+
+@router.post("/companies/{company}/products/{product}/memos/generate")
+def generate_memo(company: str, product: str, body: dict = {}):
+    """Generate a full IC memo using AI.
+
+    Body: {template: str, custom_sections: list[str] | null, title: str | null}
+    """
+    template_key = body.get('template', 'credit_memo')
+    custom_sections = body.get('custom_sections')
+    title = body.get('title')
+
+    tmpl = get_template(template_key)
+    if not tmpl:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template_key}")
+
+    def _generate(job):
+        memo = _memo_generator().generate_full_memo(
+            company=company,
+            product=product,
+            template_key=template_key,
+            custom_sections=custom_sections,
+            progress_cb=job.publish,
+        )
+
+        if title:
+            memo['title'] = title
+
+        # Capture transient research packs before save strips them
+        research_packs_copy = dict(memo.get('_research_packs') or {})
+
+        # Save to storage
+        memo_id = _memo_storage().save(memo)
+        memo['id'] = memo_id
+
+        # Best-effort: record memo thesis to Company Mind so future memos
+        # see the prior stance and can flag drift.
+        try:
+            from core.memo.agent_research import record_memo_thesis_to_mind
+            record_memo_thesis_to_mind(memo, research_packs=research_packs_copy)
+        except Exception as e:
+            logger.warning("Thesis recording failed: %s", e)
+
+        log_activity(MEMO_GENERATED, company, product, f"Generated {template_key} memo: {memo_id}")
+        return memo
+
+    # Identical concurrent requests share one generation (and one saved memo)
+    from core.ai_jobs import ai_jobs, make_job_key
+    job_key = make_job_key('memo', company, product, template_key, sorted(custom_sections or []), title)
+    try:
+        return ai_jobs.run(job_key, _generate, tier='memo', label=f"memo {company}/{product} {template_key}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Memo generation failed: {str(e)[:500]}")
+
+
+@router.get("/companies/{company}/products/{product}/memos/{memo_id}")
+def get_memo_endpoint(company: str, product: str, memo_id: str,
+             version: Optional[int] = None):
+    """Get a memo (latest version by default)."""
+    memo = _memo_storage().load(company, product, memo_id, version=version)
+    if not memo or memo.get('error'):
+        raise HTTPException(status_code=404, detail=memo.get('error', 'Memo not found'))
+    return memo
+
+
+@router.get("/companies/{company}/products/{product}/memos/{memo_id}/versions")
+def list_memo_versions(company: str, product: str, memo_id: str):
+    """List all versions of a memo."""
+    memo = _memo_storage().load(company, product, memo_id)
+    if not memo:
+        raise HTTPException(status_code=404, detail='Memo not found')
+    return {'memo_id': memo_id, 'current_version': memo.get('version', 1),
+            'versions': list(range(1, memo.get('version', 1) + 1))}
+
+
+@router.patch("/companies/{company}/products/{product}/memos/{memo_id}/sections/{section_key}")
+def update_memo_section_endpoint(company: str, product: str, memo_id: str,
+                         section_key: str, body: dict = {}):
+    """Update a single section (creates new version)."""
+    content = body.get('content', '')
+    if not content:
+        raise HTTPException(status_code=400, detail="Content required")
+
+    # Capture old content before update (needed for learning engine)
+    old_content = ''
+    try:
+        old_memo = _memo_storage().load(company, product, memo_id)
+        if old_memo:
+            for s in old_memo.get('sections', []):
+                if s.get('key') == section_key:
+                    old_content = s.get('content', '')
+                    break
+    except Exception:
+        pass
+
+    result = _memo_storage().update_section(company, product, memo_id, section_key, content)
+    if not result or result.get('error'):
+        raise HTTPException(status_code=404, detail=result.get('error', 'Update failed'))
+
+    # Record the edit in the company mind for learning
+    try:
+        cm = CompanyMind(company, product)
+        cm.record_memo_edit(memo_id, section_key, old_content, content)
+    except Exception:
+        pass
+
+    # Fire MEMO_EDITED event for Intelligence System
+    try:
+        from core.mind.event_bus import event_bus, Events
+        event_bus.publish(Events.MEMO_EDITED, {
+            "company": company, "product": product,
+            "section_key": section_key,
+            "ai_version": old_content,
+            "analyst_version": content,
+            "memo_id": memo_id,
+        })
+    except Exception:
+        pass
+
+    return result
+
+
+@router.post("/companies/{company}/products/{product}/memos/{memo_id}/sections/{section_key}/regenerate")
+def regenerate_memo_section_endpoint(company: str, product: str, memo_id: str,
+                             section_key: str, mode: Optional[str] = None):
+    """Regenerate one section using AI while preserving the rest."""
+    memo = _memo_storage().load(company, product, memo_id)
+    if not memo:
+        raise HTTPException(status_code=404, detail='Memo not found')
+
+    # Agent mode — use memo_writer agent for richer output
+    if mode == "agent":
+        try:
+            from core.agents.internal import generate_agent_section_regen
+            content = generate_agent_section_regen(company, product, memo_id, section_key)
+            if content:
+                _memo_storage().update_section(company, product, memo_id, section_key, content)
+                return {"section_key": section_key, "content": content}
+        except Exception:
+            pass  # Fall through to legacy
+
+    try:
+        new_section = _memo_generator().regenerate_section(memo, section_key)
+        if not new_section:
+            raise HTTPException(status_code=500, detail="Section regeneration returned empty")
+
+        _memo_storage().update_section(company, product, memo_id, section_key, new_section.get('content', ''))
+        return new_section
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)[:500]}")
+
+
+@router.patch("/companies/{company}/products/{product}/memos/{memo_id}/status")
+def update_memo_status_endpoint(company: str, product: str, memo_id: str, body: dict = {}):
+    """Change memo status (draft->review->final->archived)."""
+    new_status = body.get('status', '')
+    valid = ('draft', 'review', 'final', 'archived')
+    if new_status not in valid:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Valid: {valid}")
+
+    result = _memo_storage().update_status(memo_id, new_status)
+    if not result or result.get('error'):
+        raise HTTPException(status_code=404, detail=result.get('error', 'Status update failed'))
+    return result
+
+
+@router.post("/companies/{company}/products/{product}/memos/{memo_id}/export-pdf")
+def export_memo_to_pdf(company: str, product: str, memo_id: str):
+    """Export a memo as a dark-themed PDF."""
+    memo = _memo_storage().load(company, product, memo_id)
+    if not memo:
+        raise HTTPException(status_code=404, detail='Memo not found')
+
+    try:
+        from core.memo.pdf_export import export_memo_pdf
+        pdf_bytes = export_memo_pdf(memo, company, product)
+        from fastapi.responses import Response
+        filename = f"{company}_{product}_{memo.get('template', 'memo')}_{memo_id[:8]}.pdf"
+        log_activity(MEMO_EXPORTED, company, product, f"Exported memo PDF: {filename}")
+        return Response(
+            content=pdf_bytes,
+            media_type='application/pdf',
+            headers={'Content-Disposition': f'inline; filename="{filename}"'},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)[:500]}")
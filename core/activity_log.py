@@ -5,19 +5,48 @@ Records all significant platform actions to a single JSONL file for
 operator visibility. Import and call log_activity() from any endpoint.
 
 Storage: reports/activity_log.jsonl (append-only)
+
+Layout on disk:
+- activity_log.jsonl            — active segment, oldest event first
+- activity_index/<company>.idx  — per-company byte offsets into the active
+                                  segment (8-byte little-endian, append-only)
+- activity_archive/*.jsonl.gz   — rotated segments, named by the UTC time
+                                  range they cover
+
+Reads are newest-first. The latest N events come from reverse block reads
+of the active segment (or N index lookups when filtered by company), so
+their cost is O(N) regardless of how large the log has grown. Archives are
+only opened when the active segment can't satisfy the request.
 """
 
+import gzip
+import hashlib
 import json
 import logging
-from datetime import datetime, timezone
+import os
+import re
+import struct
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _LOG_PATH = _PROJECT_ROOT / "reports" / "activity_log.jsonl"
 
+# Rotation thresholds — whichever trips first archives the active segment
+_MAX_LOG_BYTES = 10 * 1024 * 1024
+_MAX_LOG_AGE_DAYS = 90
+
+_BLOCK_SIZE = 64 * 1024
+_OFFSET = struct.Struct("<Q")
+_INDEX_READY_MARKER = "_ready"
+_ARCHIVE_TS_FORMAT = "%Y%m%dT%H%M%S"
+
+_write_lock = threading.Lock()
+
 # Action types
 TAPE_LOADED = "tape_loaded"
 AI_COMMENTARY = "ai_commentary"
@@ -67,9 +96,16 @@ def log_activity(
     }
 
     try:
-        _LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        with _write_lock:
+            _LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _maybe_rotate()
+            _ensure_index()
+            line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+            with open(_LOG_PATH, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            if company:
+                _append_index(company, offset)
     except Exception as e:
         logger.warning("activity_log: failed to write event: %s", e)
 
@@ -86,26 +122,346 @@ def read_activity_log(limit: int = 50, company: Optional[str] = None) -> List[Di
     Returns:
         List of event dicts, sorted by timestamp descending.
     """
-    if not _LOG_PATH.exists():
+    if limit <= 0:
         return []
 
-    events = []
+    events: List[Dict[str, Any]] = []
     try:
-        with open(_LOG_PATH, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        indexed = _read_company_tail(company, limit) if company else None
+        if indexed is not None:
+            events = indexed
+        else:
+            for event in _iter_events_reverse(_LOG_PATH):
+                if company and event.get("company") != company:
                     continue
-                try:
-                    event = json.loads(line)
+                events.append(event)
+                if len(events) >= limit:
+                    return events
+
+        # Active segment exhausted — continue into archives, newest first
+        if len(events) < limit:
+            for archive in reversed(_list_archives()):
+                for event in _iter_archive_reverse(archive):
                     if company and event.get("company") != company:
                         continue
                     events.append(event)
-                except json.JSONDecodeError:
-                    continue
+                    if len(events) >= limit:
+                        return events
     except Exception as e:
         logger.warning("activity_log: failed to read: %s", e)
 
-    # Return newest first, limited
-    events.reverse()
     return events[:limit]
+
+
+def read_activity_range(
+    start: Optional[Union[datetime, str]] = None,
+    end: Optional[Union[datetime, str]] = None,
+    company: Optional[str] = None,
+    limit: Optional[int] = None,
+    log_path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Read events with `start < timestamp <= end`, newest first.
+
+    The log is time-ordered, so the reverse scan stops at the first event
+    at or before `start`; archives entirely outside the range are skipped by
+    name without being decompressed.
+
+    Args:
+        start: Exclusive lower bound (datetime or ISO string). None = no bound.
+        end: Inclusive upper bound. None = now.
+        company: Filter to a specific company (optional).
+        limit: Max events to return (optional).
+        log_path: Active segment to read instead of the platform log.
+
+    Returns:
+        List of event dicts, sorted by timestamp descending.
+    """
+    path = Path(log_path) if log_path else _LOG_PATH
+    start_key = _ts_key(start)
+    end_key = _ts_key(end)
+
+    events: List[Dict[str, Any]] = []
+
+    def _scan(source: Iterator[Dict[str, Any]]) -> bool:
+        """Collect matching events; return True when the scan can stop."""
+        for event in source:
+            ts = _ts_key(event.get("timestamp", ""))
+            if not ts:
+                continue
+            if end_key and ts > end_key:
+                continue
+            if start_key and ts <= start_key:
+                return True
+            if company and event.get("company") != company:
+                continue
+            events.append(event)
+            if limit is not None and len(events) >= limit:
+                return True
+        return False
+
+    try:
+        if _scan(_iter_events_reverse(path)):
+            return events
+        for archive in reversed(_list_archives(path)):
+            first, last = _archive_bounds(archive)
+            # Archive names are second-precision — compare at that precision
+            if start_key and last and last < start_key[:19]:
+                break
+            if end_key and first and first > end_key:
+                continue
+            if _scan(_iter_archive_reverse(archive)):
+                break
+    except Exception as e:
+        logger.warning("activity_log: failed to read range: %s", e)
+
+    return events
+
+
+def rotate_activity_log() -> Optional[Path]:
+    """Archive the active segment to a gzip file and start a fresh one.
+
+    Returns:
+        Path of the archive written, or None if there was nothing to rotate.
+    """
+    with _write_lock:
+        return _rotate()
+
+
+# ── Segment reading ──────────────────────────────────────────────────────────
+
+def _iter_lines_reverse(path: Path, block_size: int = _BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield non-empty lines of a file last-to-first, reading fixed blocks
+    from the end so only the bytes actually consumed are read."""
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if tail.strip():
+            yield tail
+
+
+def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _iter_events_reverse(path: Path) -> Iterator[Dict[str, Any]]:
+    for line in _iter_lines_reverse(path):
+        event = _parse(line)
+        if event is not None:
+            yield event
+
+
+def _iter_archive_reverse(archive: Path) -> Iterator[Dict[str, Any]]:
+    """Archives are bounded by _MAX_LOG_BYTES, so decompress in one go."""
+    try:
+        with gzip.open(archive, "rb") as f:
+            lines = f.read().split(b"\n")
+    except OSError as e:
+        logger.warning("activity_log: unreadable archive %s: %s", archive.name, e)
+        return
+    for line in reversed(lines):
+        if line.strip():
+            event = _parse(line)
+            if event is not None:
+                yield event
+
+
+# ── Per-company index ────────────────────────────────────────────────────────
+
+def _index_dir(log_path: Optional[Path] = None) -> Path:
+    return (log_path or _LOG_PATH).parent / "activity_index"
+
+
+def _index_path(company: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", company)
+    digest = hashlib.sha1(company.encode("utf-8")).hexdigest()[:8]
+    return _index_dir() / f"{safe}-{digest}.idx"
+
+
+def _append_index(company: str, offset: int) -> None:
+    with open(_index_path(company), "ab") as f:
+        f.write(_OFFSET.pack(offset))
+
+
+def _ensure_index() -> None:
+    """Build the per-company index from the active segment if it predates
+    the index (one-time migration) or the index was deleted."""
+    idx_dir = _index_dir()
+    marker = idx_dir / _INDEX_READY_MARKER
+    if marker.exists():
+        return
+    idx_dir.mkdir(parents=True, exist_ok=True)
+    for stale in idx_dir.glob("*.idx"):
+        stale.unlink()
+
+    offsets: Dict[str, List[int]] = {}
+    if _LOG_PATH.exists():
+        with open(_LOG_PATH, "rb") as f:
+            offset = 0
+            for line in f:
+                event = _parse(line) if line.strip() else None
+                if event and event.get("company"):
+                    offsets.setdefault(event["company"], []).append(offset)
+                offset += len(line)
+    for company, offs in offsets.items():
+        with open(_index_path(company), "wb") as f:
+            f.write(b"".join(_OFFSET.pack(o) for o in offs))
+    marker.touch()
+
+
+def _read_company_tail(company: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """Latest `limit` events for one company via the offset index.
+
+    Returns None when the index isn't usable, so the caller falls back to a
+    filtered reverse scan.
+    """
+    if not (_index_dir() / _INDEX_READY_MARKER).exists() or not _LOG_PATH.exists():
+        return None
+    path = _index_path(company)
+    if not path.exists():
+        return []
+
+    size = path.stat().st_size - path.stat().st_size % _OFFSET.size
+    count = min(limit, size // _OFFSET.size)
+    with open(path, "rb") as f:
+        f.seek(size - count * _OFFSET.size)
+        raw = f.read(count * _OFFSET.size)
+    offsets = [o for (o,) in _OFFSET.iter_unpack(raw)]
+
+    events = []
+    with open(_LOG_PATH, "rb") as log:
+        for offset in reversed(offsets):
+            log.seek(offset)
+            event = _parse(log.readline())
+            if event is None or event.get("company") != company:
+                logger.warning("activity_log: index for %s is stale — scanning", company)
+                return None
+            events.append(event)
+    return events
+
+
+# ── Rotation ─────────────────────────────────────────────────────────────────
+
+def _ts_key(value: Optional[Union[datetime, str]]) -> str:
+    """Normalise a datetime / ISO string to a sortable UTC ISO string."""
+    if not value:
+        return ""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return ""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _archive_dir(log_path: Optional[Path] = None) -> Path:
+    return (log_path or _LOG_PATH).parent / "activity_archive"
+
+
+def _list_archives(log_path: Optional[Path] = None) -> List[Path]:
+    """Archives oldest first (names sort chronologically)."""
+    archive_dir = _archive_dir(log_path)
+    if not archive_dir.is_dir():
+        return []
+    return sorted(archive_dir.glob("activity_log.*.jsonl.gz"))
+
+
+def _archive_bounds(archive: Path) -> tuple:
+    """(first, last) timestamp keys encoded in an archive name."""
+    try:
+        span = archive.name[len("activity_log."):-len(".jsonl.gz")]
+        first, last = span.split("_")[:2]
+        return tuple(
+            datetime.strptime(t, _ARCHIVE_TS_FORMAT).replace(tzinfo=timezone.utc).isoformat()
+            for t in (first, last)
+        )
+    except ValueError:
+        return ("", "")
+
+
+def _first_timestamp() -> Optional[datetime]:
+    try:
+        with open(_LOG_PATH, "rb") as f:
+            for line in f:
+                event = _parse(line) if line.strip() else None
+                if event:
+                    return _parse_ts(event.get("timestamp"))
+    except OSError:
+        pass
+    return None
+
+
+def _maybe_rotate() -> None:
+    try:
+        size = _LOG_PATH.stat().st_size
+    except OSError:
+        return
+    if size >= _MAX_LOG_BYTES:
+        _rotate()
+        return
+    first = _first_timestamp()
+    if first and datetime.now(timezone.utc) - first > timedelta(days=_MAX_LOG_AGE_DAYS):
+        _rotate()
+
+
+def _rotate() -> Optional[Path]:
+    if not _LOG_PATH.exists() or _LOG_PATH.stat().st_size == 0:
+        return None
+
+    first = _first_timestamp() or datetime.now(timezone.utc)
+    last_event = next(_iter_events_reverse(_LOG_PATH), None)
+    last = _parse_ts(last_event.get("timestamp")) if last_event else None
+    last = last or datetime.now(timezone.utc)
+
+    archive_dir = _archive_dir()
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    stem = (
+        f"activity_log.{first.astimezone(timezone.utc).strftime(_ARCHIVE_TS_FORMAT)}"
+        f"_{last.astimezone(timezone.utc).strftime(_ARCHIVE_TS_FORMAT)}"
+    )
+    archive = archive_dir / f"{stem}.jsonl.gz"
+    n = 1
+    while archive.exists():
+        archive = archive_dir / f"{stem}_{n}.jsonl.gz"
+        n += 1
+
+    with open(_LOG_PATH, "rb") as src, gzip.open(archive, "wb") as dst:
+        for block in iter(lambda: src.read(_BLOCK_SIZE), b""):
+            dst.write(block)
+    _LOG_PATH.unlink()
+
+    # Offsets pointed into the archived segment — start a fresh index
+    idx_dir = _index_dir()
+    if idx_dir.is_dir():
+        for stale in idx_dir.glob("*.idx"):
+            stale.unlink()
+        (idx_dir / _INDEX_READY_MARKER).unlink(missing_ok=True)
+
+    logger.info("activity_log: rotated to %s", archive.name)
+    return archive
+
+
+def _parse_ts(ts: Optional[str]) -> Optional[datetime]:
+    try:
+        value = datetime.fromisoformat(ts.replace("Z", "+00:00")) if ts else None
+    except (ValueError, AttributeError):
+        return None
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
@@ -7,7 +7,7 @@ dependencies beyond `anthropic>=0.52`.
 
 Architecture:
     AgentRunner   — multi-turn tool-use execution loop with streaming
-    AgentSession  — persistent conversation state (JSON files)
+    AgentSession  — persistent conversation state (append-only logs + index)
     AgentConfig   — identity (AGENT.md) + tools + model + limits
     ToolRegistry  — central tool registration and dispatch
 
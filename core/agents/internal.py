@@ -139,11 +139,14 @@ def generate_agent_tab_insight(
         "actual-vs-expected": "get_collection_velocity",
         "deployment": "get_deployment",
         "collection": "get_collection_velocity",
+        "collection-velocity": "get_collection_velocity",
         "denial-trend": "get_denial_trend",
         "ageing": "get_ageing_breakdown",
         "revenue": "get_returns_analysis",
         "portfolio-tab": "get_concentration",
+        "concentration": "get_concentration",
         "cohort-analysis": "get_cohort_analysis",
+        "cohort": "get_cohort_analysis",
         "returns": "get_returns_analysis",
         "risk-migration": "get_covenants",
         "loss-waterfall": "get_loss_waterfall",
@@ -6,22 +6,48 @@ This is the core engine that implements the agent pattern:
 2. If Claude responds with tool_use → execute tools → send results back → repeat
 3. If Claude responds with text → yield to user → done
 
-Supports both synchronous (run) and streaming (stream) execution.
+Supports both non-streaming (run) and streaming (stream) execution. Both
+are fully async: model calls go through the SDK's AsyncAnthropic client and
+tool handlers (blocking pandas / file work) run on a bounded thread pool, so
+an active stream never holds the event loop. Many analyst streams can share
+one uvicorn worker.
 """
 
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import functools
 import json
 import logging
 import os
+import threading
 import time
 import traceback
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for tool handlers dispatched from the async paths. Bounded so a
+# burst of sessions can't spawn unbounded threads; a handler that outlives
+# its timeout keeps its worker until it returns, hence the generous default.
+_TOOL_WORKERS = int(os.getenv("LAITH_AGENT_TOOL_WORKERS", "32"))
+_tool_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_tool_pool_lock = threading.Lock()
+
+
+def _tool_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the process-wide tool executor, creating it on first use."""
+    global _tool_pool
+    if _tool_pool is None:
+        with _tool_pool_lock:
+            if _tool_pool is None:
+                _tool_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=_TOOL_WORKERS, thread_name_prefix="agent-tool",
+                )
+    return _tool_pool
+
 
 class BudgetExceededError(Exception):
     """Raised when token budget is exhausted."""
@@ -164,9 +190,13 @@ class AgentRunner:
 
     @classmethod
     def _timeout_for_tool(cls, tool_name: str) -> int:
-        """Return the timeout (seconds) for a given tool, honouring prefix overrides."""
+        """Return the timeout (seconds) for a given tool, honouring prefix overrides.
+
+        Accepts both the registry form ("external.web_search") and the
+        underscored API form Claude sends back ("external_web_search").
+        """
         for prefix, override in cls.TOOL_TIMEOUT_OVERRIDES_BY_PREFIX.items():
-            if tool_name.startswith(prefix):
+            if tool_name.startswith(prefix) or tool_name.startswith(prefix.replace(".", "_")):
                 return override
         return cls.TOOL_TIMEOUT_SECONDS
 
@@ -174,40 +204,100 @@ class AgentRunner:
         """Initialize with an AgentConfig."""
         from core.agents.config import AgentConfig
         self._config: AgentConfig = config
-        self._client = None
         self._tool_call_memos: Dict[str, str] = {}  # memoize tool results per session
         self._session_tool_calls: int = 0  # track total tool calls in session
 
     def _get_client(self):
-        """Return the shared Anthropic client (retry + backoff configured)."""
-        if self._client is None:
-            from core.ai_client import get_client
-            self._client = get_client()
-        return self._client
+        """Return the AsyncAnthropic client for the running loop (retry + backoff configured)."""
+        from core.ai_client import get_async_client
+        return get_async_client()
 
-    def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
-        """Execute a tool by name with memoization, timeout, and session limits."""
+    def _begin_tool_call(self, tool_name: str, tool_input: Dict[str, Any]):
+        """Apply session limits and memoization ahead of a tool call.
+
+        Returns (memo_key, handler, early_result). When early_result is not
+        None it is the final answer (limit hit, memo hit, unknown tool) and
+        the handler must not run.
+        """
         # Session tool call limit
         self._session_tool_calls += 1
         if self._session_tool_calls > self.MAX_TOOL_CALLS_PER_SESSION:
-            return f"Error: Session tool call limit reached ({self.MAX_TOOL_CALLS_PER_SESSION}). End your analysis with what you have."
+            return None, None, f"Error: Session tool call limit reached ({self.MAX_TOOL_CALLS_PER_SESSION}). End your analysis with what you have."
 
         # Build memo key from tool name + sorted args
         memo_key = f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
         if memo_key in self._tool_call_memos:
             logger.debug("Tool %s: returning memoized result", tool_name)
             self._session_tool_calls -= 1  # Don't count memoized hits
-            return self._tool_call_memos[memo_key]
+            return memo_key, None, self._tool_call_memos[memo_key]
 
         handler = self._config.get_handler(tool_name)
         if handler is None:
-            return f"Error: Unknown tool '{tool_name}'"
+            return memo_key, None, f"Error: Unknown tool '{tool_name}'"
+        return memo_key, handler, None
+
+    def _finish_tool_call(self, memo_key: str, result: Any) -> str:
+        """Serialize, truncate and memoize a handler's return value."""
+        if not isinstance(result, str):
+            result = json.dumps(result, default=str, indent=2)
+        # Truncate very long results to avoid context overflow
+        if len(result) > 15_000:
+            result = result[:15_000] + "\n\n... [truncated — result too long]"
+        self._tool_call_memos[memo_key] = result
+        return result
+
+    async def _execute_tool_async(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
+        """Async counterpart of _execute_tool — the handler runs on the shared tool pool."""
+        memo_key, handler, early = self._begin_tool_call(tool_name, tool_input)
+        if early is not None:
+            return early
+
+        tool_timeout = self._timeout_for_tool(tool_name)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(_tool_executor(), functools.partial(handler, **tool_input)),
+                timeout=tool_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Tool %s timed out after %ds", tool_name, tool_timeout)
+            return f"Tool error ({tool_name}): Timed out after {tool_timeout}s"
+        except Exception as e:
+            error_msg = f"Tool error ({tool_name}): {type(e).__name__}: {e}"
+            logger.error(error_msg, exc_info=True)
+            return error_msg
+        return self._finish_tool_call(memo_key, result)
+
+    def _schedule_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[asyncio.Task]:
+        """Start every tool call of one turn concurrently on the shared pool.
+
+        Returns one task per call, in call order, so callers can await them
+        in order and keep tool_result messages aligned with the tool_use
+        blocks. Each call keeps its own _timeout_for_tool budget; turn
+        latency is roughly the slowest tool rather than the sum. Identical
+        calls (same name and args) within the turn share one execution.
+        """
+        by_key: Dict[str, asyncio.Task] = {}
+        tasks = []
+        for tool_name, tool_input in calls:
+            key = f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+            if key not in by_key:
+                by_key[key] = asyncio.ensure_future(self._execute_tool_async(tool_name, tool_input))
+            tasks.append(by_key[key])
+        return tasks
+
+    def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
+        """Execute a tool by name with memoization, timeout, and session limits.
+
+        Blocking variant for synchronous callers; the runner itself uses
+        _execute_tool_async.
+        """
+        memo_key, handler, early = self._begin_tool_call(tool_name, tool_input)
+        if early is not None:
+            return early
 
         try:
             # Execute with timeout
-            import signal
-            import threading
-
             result_container = [None]
             error_container = [None]
 
@@ -229,14 +319,7 @@ class AgentRunner:
             if error_container[0] is not None:
                 raise error_container[0]
 
-            result = result_container[0]
-            if not isinstance(result, str):
-                result = json.dumps(result, default=str, indent=2)
-            # Truncate very long results to avoid context overflow
-            if len(result) > 15_000:
-                result = result[:15_000] + "\n\n... [truncated — result too long]"
-            self._tool_call_memos[memo_key] = result
-            return result
+            return self._finish_tool_call(memo_key, result_container[0])
         except Exception as e:
             error_msg = f"Tool error ({tool_name}): {type(e).__name__}: {e}"
             logger.error(error_msg, exc_info=True)
@@ -271,7 +354,7 @@ class AgentRunner:
             # session, so marking the last tool with cache_control lets
             # Anthropic reuse it on turns 2+.
             from core.ai_client import cache_last_tool as _cache_last_tool
-            response = self._get_client().messages.create(
+            response = await self._get_client().messages.create(
                 model=self._config.model,
                 max_tokens=self._config.max_tokens_per_response,
                 system=[{
@@ -308,9 +391,10 @@ class AgentRunner:
                     stopped_reason="end_turn",
                 )
 
-            # Execute tools
-            for tool_use in tool_uses:
-                result = self._execute_tool(tool_use.name, tool_use.input)
+            # Execute tools (concurrently; results consumed in block order)
+            tasks = self._schedule_tools([(tu.name, tu.input) for tu in tool_uses])
+            for tool_use, task in zip(tool_uses, tasks):
+                result = await task
                 tool_calls_made.append({
                     "tool": tool_use.name,
                     "input": tool_use.input,
@@ -377,7 +461,7 @@ class AgentRunner:
                 output_tokens = 0
 
                 from core.ai_client import cache_last_tool as _cache_last_tool
-                with self._get_client().messages.stream(
+                async with self._get_client().messages.stream(
                     model=self._config.model,
                     max_tokens=self._config.max_tokens_per_response,
                     system=[{
@@ -389,7 +473,7 @@ class AgentRunner:
                     messages=session.messages,
                     temperature=self._config.temperature,
                 ) as stream:
-                    for event in stream:
+                    async for event in stream:
                         if hasattr(event, "type"):
                             if event.type == "content_block_start":
                                 block = event.content_block
@@ -463,30 +547,37 @@ class AgentRunner:
                     session.save()
                     return
 
-                # Execute tools
+                # Execute tools concurrently; results are yielded in block order
+                # as soon as each (and every earlier) call has finished
                 consecutive_errors = 0
-                for tu in tool_uses:
-                    result = self._execute_tool(tu["name"], tu["input"])
-                    is_error = result.startswith("Tool error") or result.startswith("Error:")
-                    if is_error:
-                        consecutive_errors += 1
-                    else:
-                        consecutive_errors = 0
-
-                    yield StreamEvent("tool_result", {
-                        "tool": tu["name"],
-                        "preview": result[:300],
-                        "is_error": is_error,
-                    })
-
-                    session.add_tool_result(tu["id"], result, is_error=is_error)
-
-                    if consecutive_errors >= 3:
-                        yield StreamEvent("error", {
-                            "message": "3 consecutive tool errors — stopping to avoid loop"
+                tasks = self._schedule_tools([(tu["name"], tu["input"]) for tu in tool_uses])
+                try:
+                    for tu, task in zip(tool_uses, tasks):
+                        result = await task
+                        is_error = result.startswith("Tool error") or result.startswith("Error:")
+                        if is_error:
+                            consecutive_errors += 1
+                        else:
+                            consecutive_errors = 0
+
+                        yield StreamEvent("tool_result", {
+                            "tool": tu["name"],
+                            "preview": result[:300],
+                            "is_error": is_error,
                         })
-                        session.save()
-                        return
+
+                        session.add_tool_result(tu["id"], result, is_error=is_error)
+
+                        if consecutive_errors >= 3:
+                            yield StreamEvent("error", {
+                                "message": "3 consecutive tool errors — stopping to avoid loop"
+                            })
+                            session.save()
+                            return
+                finally:
+                    # Early stop or client disconnect — drop calls nobody will read
+                    for task in tasks:
+                        task.cancel()
 
             except BudgetExceededError as e:
                 yield StreamEvent("error", {"message": str(e)})
@@ -2,22 +2,24 @@
 Agent Session — persistent conversation state.
 
 Sessions store the full Anthropic message history so agents can maintain
-multi-turn context. Stored as JSON files in data/_agent_sessions/.
+multi-turn context. Stored in data/_agent_sessions/ as an append-only
+message log per session plus a SQLite summary index (see session_store).
 
 Sessions auto-expire after AGENT_SESSION_EXPIRY_HOURS (default 24).
 """
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import time
 import uuid
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from core.agents.session_store import get_store
+
 logger = logging.getLogger(__name__)
 
 _SESSIONS_DIR = Path("data/_agent_sessions")
@@ -37,6 +39,10 @@ class AgentSession:
     total_input_tokens: int = 0
     total_output_tokens: int = 0
     turn_count: int = 0
+    # Persistence cursor: messages already in the log, and the block count
+    # of the last one (add_tool_result grows it in place)
+    _synced: int = field(default=0, init=False, repr=False, compare=False)
+    _synced_tail: int = field(default=-1, init=False, repr=False, compare=False)
 
     # ── Factory ──────────────────────────────────────────────────────────
 
@@ -58,61 +64,86 @@ class AgentSession:
 
     # ── Persistence ──────────────────────────────────────────────────────
 
-    def _path(self) -> Path:
-        return _SESSIONS_DIR / f"{self.session_id}.json"
-
-    def save(self) -> None:
-        """Persist session to disk."""
-        self.last_active = time.time()
-        _SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
-        data = {
+    def _summary(self) -> Dict[str, Any]:
+        return {
             "session_id": self.session_id,
             "agent_name": self.agent_name,
-            "messages": self.messages,
             "metadata": self.metadata,
             "created_at": self.created_at,
             "last_active": self.last_active,
             "total_input_tokens": self.total_input_tokens,
             "total_output_tokens": self.total_output_tokens,
             "turn_count": self.turn_count,
+            "message_count": len(self.messages),
         }
-        self._path().write_text(json.dumps(data, default=str), encoding="utf-8")
+
+    @staticmethod
+    def _tail_size(message: Dict[str, Any]) -> int:
+        content = message.get("content")
+        return len(content) if isinstance(content, list) else -1
+
+    def _mark_synced(self) -> None:
+        self._synced = len(self.messages)
+        self._synced_tail = self._tail_size(self.messages[-1]) if self.messages else -1
+
+    def save(self) -> None:
+        """Persist session to disk — appends only messages changed since the last save."""
+        self.last_active = time.time()
+        store = get_store(_SESSIONS_DIR)
+        n = len(self.messages)
+        if n < self._synced:
+            # History was truncated — the log can't express that as an append
+            store.rewrite(self._summary(), self.messages)
+        else:
+            start = self._synced
+            if start and self._tail_size(self.messages[start - 1]) != self._synced_tail:
+                start -= 1  # tool results were grouped into the last persisted message
+            store.append(self._summary(), [(i, self.messages[i]) for i in range(start, n)])
+        self._mark_synced()
 
     @classmethod
     def load(cls, session_id: str) -> Optional["AgentSession"]:
         """Load session from disk. Returns None if not found or expired."""
-        path = _SESSIONS_DIR / f"{session_id}.json"
-        if not path.exists():
-            return None
-
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning("Failed to load session %s: %s", session_id, e)
+        store = get_store(_SESSIONS_DIR)
+        summary = store.get_summary(session_id)
+        if summary is None and (_SESSIONS_DIR / f"{session_id}.json").exists():
+            store.migrate_legacy()  # legacy file written after this process opened the store
+            summary = store.get_summary(session_id)
+        if summary is None:
             return None
 
         # Check expiry
-        last_active = data.get("last_active", 0)
+        last_active = summary.get("last_active", 0)
         if time.time() - last_active > _EXPIRY_HOURS * 3600:
             logger.info("Session %s expired, removing", session_id)
-            path.unlink(missing_ok=True)
+            store.delete(session_id)
             return None
 
-        return cls(
-            session_id=data["session_id"],
-            agent_name=data["agent_name"],
-            messages=data.get("messages", []),
-            metadata=data.get("metadata", {}),
-            created_at=data.get("created_at", 0),
+        try:
+            messages, records = store.read_messages(session_id)
+        except OSError as e:
+            logger.warning("Failed to load session %s: %s", session_id, e)
+            return None
+
+        session = cls(
+            session_id=summary["session_id"],
+            agent_name=summary["agent_name"],
+            messages=messages,
+            metadata=summary.get("metadata", {}),
+            created_at=summary.get("created_at", 0),
             last_active=last_active,
-            total_input_tokens=data.get("total_input_tokens", 0),
-            total_output_tokens=data.get("total_output_tokens", 0),
-            turn_count=data.get("turn_count", 0),
+            total_input_tokens=summary.get("total_input_tokens", 0),
+            total_output_tokens=summary.get("total_output_tokens", 0),
+            turn_count=summary.get("turn_count", 0),
         )
+        if records > 2 * len(messages) + 8:
+            store.rewrite(summary, messages)  # compact accumulated replace records
+        session._mark_synced()
+        return session
 
     def delete(self) -> None:
         """Remove session from disk."""
-        self._path().unlink(missing_ok=True)
+        get_store(_SESSIONS_DIR).delete(self.session_id)
 
     # ── Message management ───────────────────────────────────────────────
 
@@ -160,21 +191,13 @@ class AgentSession:
         if not _SESSIONS_DIR.exists():
             return 0
 
-        removed = 0
-        cutoff = time.time() - _EXPIRY_HOURS * 3600
-        for path in _SESSIONS_DIR.glob("*.json"):
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                if data.get("last_active", 0) < cutoff:
-                    path.unlink()
-                    removed += 1
-            except (json.JSONDecodeError, OSError):
-                path.unlink(missing_ok=True)
-                removed += 1
-
-        if removed:
-            logger.info("Cleaned up %d expired agent sessions", removed)
-        return removed
+        store = get_store(_SESSIONS_DIR)
+        expired = store.expired_ids(time.time() - _EXPIRY_HOURS * 3600)
+        store.delete_many(expired)
+
+        if expired:
+            logger.info("Cleaned up %d expired agent sessions", len(expired))
+        return len(expired)
 
     @classmethod
     def list_recent(cls, limit: int = 20) -> List[Dict[str, Any]]:
@@ -182,21 +205,12 @@ class AgentSession:
         if not _SESSIONS_DIR.exists():
             return []
 
-        sessions = []
-        for path in _SESSIONS_DIR.glob("*.json"):
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                sessions.append({
-                    "session_id": data["session_id"],
-                    "agent_name": data["agent_name"],
-                    "metadata": data.get("metadata", {}),
-                    "created_at": data.get("created_at", 0),
-                    "last_active": data.get("last_active", 0),
-                    "turn_count": data.get("turn_count", 0),
-                    "total_tokens": data.get("total_input_tokens", 0) + data.get("total_output_tokens", 0),
-                })
-            except (json.JSONDecodeError, OSError):
-                continue
-
-        sessions.sort(key=lambda s: s["last_active"], reverse=True)
-        return sessions[:limit]
+        return [{
+            "session_id": s["session_id"],
+            "agent_name": s["agent_name"],
+            "metadata": s["metadata"],
+            "created_at": s["created_at"],
+            "last_active": s["last_active"],
+            "turn_count": s["turn_count"],
+            "total_tokens": s["total_input_tokens"] + s["total_output_tokens"],
+        } for s in get_store(_SESSIONS_DIR).list_recent(limit)]
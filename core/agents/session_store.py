@@ -0,0 +1,270 @@
+"""
+Agent Session Store — append-only message logs + SQLite summary index.
+
+AgentSession.save() used to re-serialize the whole message history (tool
+results run up to 15k chars each) to {session_id}.json on every turn, and
+list_recent / cleanup_expired json-loaded every session file, messages
+included, just to read a handful of summary fields.
+
+Layout under the sessions directory:
+    {session_id}.jsonl  — one record per line: {"i": index, "m": message}.
+                          Saves append only the messages added since the
+                          last save. A record whose index already exists
+                          replaces that message (tool results grouped into
+                          the previous user turn after it was persisted).
+    index.sqlite3       — one row per session with the summary fields;
+                          listing and expiry are indexed queries that never
+                          touch the logs.
+
+Writes are O(delta): one append plus one row upsert. Legacy
+{session_id}.json files are migrated the first time a directory is opened
+(see SessionStore.migrate_legacy) and then removed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SUMMARY_FIELDS = (
+    "session_id", "agent_name", "metadata", "created_at", "last_active",
+    "total_input_tokens", "total_output_tokens", "turn_count", "message_count",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id          TEXT PRIMARY KEY,
+    agent_name          TEXT NOT NULL,
+    metadata            TEXT NOT NULL DEFAULT '{}',
+    created_at          REAL NOT NULL DEFAULT 0,
+    last_active         REAL NOT NULL DEFAULT 0,
+    total_input_tokens  INTEGER NOT NULL DEFAULT 0,
+    total_output_tokens INTEGER NOT NULL DEFAULT 0,
+    turn_count          INTEGER NOT NULL DEFAULT 0,
+    message_count       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions (last_active);
+"""
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=str) + "\n"
+
+
+class SessionStore:
+    """Session persistence rooted at one directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # ── Setup ────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.root / INDEX_FILENAME), timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+            self._ready = True
+            self.migrate_legacy()
+
+    def log_path(self, session_id: str) -> Path:
+        return self.root / f"{session_id}.jsonl"
+
+    # ── Index ────────────────────────────────────────────────────────────
+
+    def _upsert(self, summary: Dict[str, Any]) -> None:
+        row = {**summary, "metadata": json.dumps(summary.get("metadata") or {}, default=str)}
+        cols = ", ".join(_SUMMARY_FIELDS)
+        params = ", ".join(f":{c}" for c in _SUMMARY_FIELDS)
+        updates = ", ".join(f"{c}=excluded.{c}" for c in _SUMMARY_FIELDS[1:])
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT INTO sessions ({cols}) VALUES ({params}) "
+                f"ON CONFLICT(session_id) DO UPDATE SET {updates}",
+                {c: row.get(c, 0) for c in _SUMMARY_FIELDS},
+            )
+
+    @staticmethod
+    def _row_to_summary(row: sqlite3.Row) -> Dict[str, Any]:
+        summary = dict(row)
+        try:
+            summary["metadata"] = json.loads(summary["metadata"] or "{}")
+        except json.JSONDecodeError:
+            summary["metadata"] = {}
+        return summary
+
+    def get_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return self._row_to_summary(row) if row else None
+
+    def list_recent(self, limit: int) -> List[Dict[str, Any]]:
+        self._ensure()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM sessions ORDER BY last_active DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_summary(r) for r in rows]
+
+    def active_since(self, cutoff: float) -> List[Dict[str, Any]]:
+        """Summaries of sessions active after `cutoff`, most recent first."""
+        self._ensure()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM sessions WHERE last_active > ? ORDER BY last_active DESC", (cutoff,)
+            ).fetchall()
+        return [self._row_to_summary(r) for r in rows]
+
+    def count(self) -> int:
+        self._ensure()
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def expired_ids(self, cutoff: float) -> List[str]:
+        self._ensure()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT session_id FROM sessions WHERE last_active < ?", (cutoff,)
+            ).fetchall()
+        return [r["session_id"] for r in rows]
+
+    # ── Message log ──────────────────────────────────────────────────────
+
+    def append(self, summary: Dict[str, Any], records: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Append (index, message) records to the log and upsert the summary row."""
+        self._ensure()
+        chunk = "".join(_encode({"i": i, "m": m}) for i, m in records).encode("utf-8")
+        with open(self.log_path(summary["session_id"]), "ab+") as f:
+            if chunk and f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    chunk = b"\n" + chunk  # don't glue onto a torn line from a crash
+            f.write(chunk)
+        self._upsert(summary)
+
+    def rewrite(self, summary: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+        """Replace the whole log (history was truncated, or compaction)."""
+        self._ensure()
+        path = self.log_path(summary["session_id"])
+        fd, tmp = tempfile.mkstemp(dir=str(self.root), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.writelines(_encode({"i": i, "m": m}) for i, m in enumerate(messages))
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._upsert(summary)
+
+    def read_messages(self, session_id: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Replay a session log. Returns (messages, record_count)."""
+        path = self.log_path(session_id)
+        messages: List[Dict[str, Any]] = []
+        records = 0
+        if not path.exists():
+            return messages, records
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line)
+                    i, msg = rec["i"], rec["m"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # A torn final append after a crash — keep what we have
+                    logger.warning("Session %s: skipping bad log line %d", session_id, line_no)
+                    continue
+                records += 1
+                if i < len(messages):
+                    messages[i] = msg
+                else:
+                    messages.append(msg)
+        return messages, records
+
+    def delete(self, session_id: str) -> None:
+        self._ensure()
+        self.log_path(session_id).unlink(missing_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def delete_many(self, session_ids: List[str]) -> None:
+        if not session_ids:
+            return
+        self._ensure()
+        for sid in session_ids:
+            self.log_path(sid).unlink(missing_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(s,) for s in session_ids])
+
+    # ── Migration ────────────────────────────────────────────────────────
+
+    def migrate_legacy(self) -> int:
+        """Convert {session_id}.json files to log + index row. Returns count migrated.
+
+        Unreadable legacy files are removed, matching what cleanup_expired
+        did with them before.
+        """
+        migrated = 0
+        for path in sorted(self.root.glob("*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                messages = data.get("messages", [])
+                summary = {
+                    "session_id": data["session_id"],
+                    "agent_name": data["agent_name"],
+                    "metadata": data.get("metadata", {}),
+                    "created_at": data.get("created_at", 0),
+                    "last_active": data.get("last_active", 0),
+                    "total_input_tokens": data.get("total_input_tokens", 0),
+                    "total_output_tokens": data.get("total_output_tokens", 0),
+                    "turn_count": data.get("turn_count", 0),
+                    "message_count": len(messages),
+                }
+            except (json.JSONDecodeError, KeyError, OSError) as e:
+                logger.warning("Dropping unreadable legacy session %s: %s", path.name, e)
+                path.unlink(missing_ok=True)
+                continue
+            self.rewrite(summary, messages)
+            path.unlink(missing_ok=True)
+            migrated += 1
+        if migrated:
+            logger.info("Migrated %d legacy agent sessions to %s", migrated, self.root)
+        return migrated
+
+
+_stores: Dict[str, SessionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(root: Path) -> SessionStore:
+    """Shared SessionStore for a directory (one per path per process)."""
+    key = str(Path(root).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SessionStore(Path(root))
+        return store
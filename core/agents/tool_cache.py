@@ -0,0 +1,274 @@
+"""
+Tool Result Cache — process-wide cache for deterministic agent tools.
+
+AgentRunner memoizes tool calls per runner instance, so every analyst
+chat, agent commentary run, compliance check and memo draft recomputed
+`analytics.get_par_analysis` & co. from scratch — reloading and
+re-analysing the tape each time. Analytics tools are pure functions of
+(arguments, tape file, product config), so their text results can be
+shared across sessions and users.
+
+Key = sha256(tool name, normalized args, tape content hash, config
+fingerprint). Normalization drops None-valued args and resolves
+`snapshot` (None / filename / date) to the concrete file it selects, so
+"latest" and the explicit filename share an entry. The tape content hash
+is computed once per file version (path, size, mtime) and reused.
+
+Eviction: LRU bounded by LAITH_TOOL_CACHE_SIZE entries (default 512) and
+a TTL of LAITH_TOOL_CACHE_TTL seconds (default 3600) — the TTL also
+bounds drift from live FX rates on USD-converted results. Setting
+LAITH_TOOL_CACHE_DISK=1 also persists entries under reports/tool_cache/
+so results survive restarts and are shared between worker processes.
+
+Exceptions are never cached. Stats are exposed via GET /agents/tool-cache
+and included in GET /agents/rate-limits.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAX_ENTRIES = int(os.getenv("LAITH_TOOL_CACHE_SIZE", "512"))
+_TTL_SECONDS = float(os.getenv("LAITH_TOOL_CACHE_TTL", "3600"))
+_DISK_ENABLED = os.getenv("LAITH_TOOL_CACHE_DISK", "").lower() in ("1", "true", "yes")
+_DISK_DIR = Path("reports/tool_cache")
+
+# Config files that change tool output without changing the tape
+_CONTEXT_FILES = ("config.json", "facility_params.json", "methodology.json")
+
+# (path, size, mtime_ns) → sha256 of file bytes
+_content_hashes: Dict[Tuple[str, int, int], str] = {}
+_content_lock = threading.Lock()
+
+
+def file_content_hash(path: str) -> str:
+    """sha256 of a file's bytes, memoized per (path, size, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _content_lock:
+        cached = _content_hashes.get(key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _content_lock:
+        _content_hashes[key] = digest
+    return digest
+
+
+def _stat_fingerprint(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def tape_identity(company: str, product: str, snapshot: Optional[str] = None,
+                  all_snapshots: bool = False) -> Optional[Dict[str, Any]]:
+    """What a tool's output depends on besides its arguments.
+
+    Returns {"tapes": {filename: content_hash}, "context": {file: [size, mtime]}},
+    or None when the snapshot can't be resolved (the call is then not cached).
+    """
+    from core.agents.tools._helpers import resolve_snapshot
+    from core.loader import DATA_DIR, get_snapshots
+
+    try:
+        if all_snapshots:
+            selected = get_snapshots(company, product)
+        else:
+            selected = [resolve_snapshot(company, product, snapshot)]
+        tapes = {s["filename"]: file_content_hash(s["filepath"]) for s in selected}
+    except (OSError, ValueError) as e:
+        logger.debug("Tool cache: no tape identity for %s/%s: %s", company, product, e)
+        return None
+    product_dir = os.path.join(DATA_DIR, company, product)
+    context = {name: _stat_fingerprint(os.path.join(product_dir, name)) for name in _CONTEXT_FILES}
+    return {"tapes": tapes, "context": context}
+
+
+class ToolResultCache:
+    """Thread-safe TTL + LRU cache of tool result strings with hit metrics."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES, ttl_seconds: float = _TTL_SECONDS,
+                 disk_dir: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()  # key → (created, tool, result)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._per_tool: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    @staticmethod
+    def make_key(tool_name: str, args: Dict[str, Any], identity: Dict[str, Any]) -> str:
+        payload = json.dumps([tool_name, args, identity], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ── Lookup / store ───────────────────────────────────────────────────
+
+    def get(self, key: str, tool_name: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._per_tool[tool_name]["hits"] += 1
+                return entry[2]
+
+        entry = self._disk_get(key, now)
+        with self._lock:
+            if entry:
+                self._store(key, entry)
+                self._hits += 1
+                self._disk_hits += 1
+                self._per_tool[tool_name]["hits"] += 1
+                return entry[2]
+            self._misses += 1
+            self._per_tool[tool_name]["misses"] += 1
+        return None
+
+    def put(self, key: str, tool_name: str, result: str) -> None:
+        entry = (time.time(), tool_name, result)
+        with self._lock:
+            self._store(key, entry)
+        self._disk_put(key, entry)
+
+    def _store(self, key: str, entry: Tuple[float, str, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    # ── Optional disk tier ───────────────────────────────────────────────
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / f"{key}.json" if self.disk_dir else None
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str, str]]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            d = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if now - d.get("created", 0) > self.ttl_seconds:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return d["created"], d["tool"], d["result"]
+
+    def _disk_put(self, key: str, entry: Tuple[float, str, str]) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.disk_dir), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created": entry[0], "tool": entry[1], "result": entry[2]}, f)
+            os.replace(tmp, path)
+            self._disk_prune()
+        except OSError as e:
+            logger.warning("Tool cache: disk write failed for %s: %s", entry[1], e)
+
+    def _disk_prune(self) -> None:
+        """Keep the disk tier within max_entries, dropping the oldest files."""
+        files = list(self.disk_dir.glob("*.json"))
+        excess = len(files) - self.max_entries
+        if excess <= 0:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for p in files[:excess]:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    # ── Admin ────────────────────────────────────────────────────────────
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._disk_hits = 0
+            self._evictions = self._expirations = 0
+            self._per_tool.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self.disk_dir is not None,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "per_tool": {k: dict(v) for k, v in sorted(self._per_tool.items())},
+            }
+
+
+# Global singleton
+tool_cache = ToolResultCache(disk_dir=_DISK_DIR if _DISK_ENABLED else None)
+
+
+def cached_tool(tool_name: str, handler: Callable[..., str], all_snapshots: bool = False) -> Callable[..., str]:
+    """Wrap a deterministic tape-backed tool handler with the shared cache.
+
+    The handler must take `company` and `product`; `snapshot` is resolved
+    through tape_identity. `all_snapshots=True` keys on every snapshot of
+    the product (cross-snapshot trend tools).
+    """
+    @functools.wraps(handler)
+    def wrapper(**kwargs):
+        args = {k: v for k, v in kwargs.items() if v is not None}
+        company, product = args.get("company"), args.get("product")
+        identity = None
+        if company and product:
+            identity = tape_identity(company, product, args.pop("snapshot", None), all_snapshots)
+        if identity is None:
+            return handler(**kwargs)
+
+        key = tool_cache.make_key(tool_name, args, identity)
+        result = tool_cache.get(key, tool_name)
+        if result is not None:
+            return result
+        result = handler(**kwargs)
+        if isinstance(result, str):
+            tool_cache.put(key, tool_name, result)
+        return result
+
+    return wrapper
@@ -18,32 +18,46 @@ logger = logging.getLogger(__name__)
 _DATA_DIR = Path("data")
 
 
-def load_tape(
+def resolve_snapshot(
     company: str,
     product: str,
     snapshot: Optional[str] = None,
-    as_of_date: Optional[str] = None,
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    """Load a tape snapshot, optionally filtered by date.
+) -> Dict[str, Any]:
+    """Pick a snapshot by filename or date; latest when unspecified or unmatched.
 
     Returns:
-        (df, sel) where sel = {filename, filepath, date}
+        sel = {filename, filepath, date}
     """
-    from core.loader import get_snapshots, load_snapshot
-    from core.analysis import filter_by_date
+    from core.loader import get_snapshots
 
     snaps = get_snapshots(company, product)
     if not snaps:
         raise ValueError(f"No snapshots found for {company}/{product}")
 
-    # Select snapshot
     sel = snaps[-1]  # default: latest
     if snapshot:
         for s in snaps:
             if s["filename"] == snapshot or s.get("date") == snapshot:
                 sel = s
                 break
+    return sel
+
+
+def load_tape(
+    company: str,
+    product: str,
+    snapshot: Optional[str] = None,
+    as_of_date: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load a tape snapshot, optionally filtered by date.
+
+    Returns:
+        (df, sel) where sel = {filename, filepath, date}
+    """
+    from core.loader import load_snapshot
+    from core.analysis import filter_by_date
 
+    sel = resolve_snapshot(company, product, snapshot)
     df = load_snapshot(sel["filepath"])
     if as_of_date:
         df = filter_by_date(df, as_of_date)
@@ -62,20 +76,10 @@ def load_silq_tape(
     Returns:
         (df, sel, commentary_text)
     """
-    from core.loader import get_snapshots, load_silq_snapshot
+    from core.loader import load_silq_snapshot
     from core.analysis import filter_by_date
 
-    snaps = get_snapshots(company, product)
-    if not snaps:
-        raise ValueError(f"No snapshots found for {company}/{product}")
-
-    sel = snaps[-1]
-    if snapshot:
-        for s in snaps:
-            if s["filename"] == snapshot or s.get("date") == snapshot:
-                sel = s
-                break
-
+    sel = resolve_snapshot(company, product, snapshot)
     df, commentary = load_silq_snapshot(sel["filepath"])
     if as_of_date:
         df = filter_by_date(df, as_of_date)
@@ -94,20 +98,10 @@ def load_aajil_tape(
     Returns:
         (df, sel, aux_data)
     """
-    from core.loader import get_snapshots, load_aajil_snapshot
+    from core.loader import load_aajil_snapshot
     from core.analysis import filter_by_date
 
-    snaps = get_snapshots(company, product)
-    if not snaps:
-        raise ValueError(f"No snapshots found for {company}/{product}")
-
-    sel = snaps[-1]
-    if snapshot:
-        for s in snaps:
-            if s["filename"] == snapshot or s.get("date") == snapshot:
-                sel = s
-                break
-
+    sel = resolve_snapshot(company, product, snapshot)
     df, aux = load_aajil_snapshot(sel["filepath"])
     if as_of_date:
         df = filter_by_date(df, as_of_date)
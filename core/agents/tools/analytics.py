@@ -10,6 +10,7 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
+from core.agents.tool_cache import cached_tool
 from core.agents.tools import registry
 from core.agents.tools._helpers import (
     detect_analysis_type,
@@ -965,5 +966,10 @@ _TOOLS = [
     ("analytics.get_metric_trend", "Get a cross-snapshot time series for a single metric (e.g., collection_rate across the last N tapes). Useful for spotting trends in judgment sections. Only works for companies with raw tape snapshots (not ejari_summary or tamara_summary).", _TREND_SCHEMA, _get_metric_trend),
 ]
 
+# Every analytics tool is a pure function of its args, the tape and the
+# product config — share results across sessions via the tool cache.
+_ALL_SNAPSHOT_TOOLS = {"analytics.get_metric_trend"}
+
 for name, desc, schema, handler in _TOOLS:
-    registry.register(name, desc, schema, handler)
+    registry.register(name, desc, schema,
+                      cached_tool(name, handler, all_snapshots=name in _ALL_SNAPSHOT_TOOLS))
@@ -85,7 +85,29 @@ def _get_facility_params(company: str, product: str) -> str:
         return f"Error reading facility params: {e}"
 
 
+def _format_ledger(company: str, product: str, ledger: dict) -> str:
+    from core.covenant_ledger import covenant_series
+
+    trend = covenant_series(ledger)
+    lines = [f"Covenant History — {company}/{product} ({len(trend['snapshots'])} snapshots, covenant ledger):"]
+    for cov_name, points in trend["series"].items():
+        lines.append(f"\n  {cov_name}:")
+        for p in points[-5:]:  # Last 5 snapshots
+            if not p.get("available", True):
+                status = "N/A"
+            else:
+                status = "PASS" if p.get("compliant") else "BREACH"
+            lines.append(f"    {p['date']}: {status} (actual={p.get('current')}, threshold={p.get('threshold')})")
+    return "\n".join(lines)
+
+
 def _get_covenant_history(company: str, product: str) -> str:
+    from core.covenant_ledger import load_ledger
+
+    ledger = load_ledger(company, product)
+    if ledger["snapshots"]:
+        return _format_ledger(company, product, ledger)
+
     history_path = Path(f"data/{company}/{product}/covenant_history.json")
     if not history_path.exists():
         return f"No covenant history available for {company}/{product}"
@@ -100,8 +122,8 @@ def _get_covenant_history(company: str, product: str) -> str:
                 if isinstance(records, list):
                     for r in records[-5:]:  # Last 5 records
                         date = r.get("date", "?")
-                        status = r.get("status", "?")
-                        actual = r.get("actual", "?")
+                        status = "PASS" if r.get("compliant", True) else "BREACH"
+                        actual = r.get("current", "?")
                         lines.append(f"    {date}: {status} (actual={actual})")
 
         return "\n".join(lines)
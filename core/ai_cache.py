@@ -0,0 +1,326 @@
+"""
+AI Response Cache — one indexed SQLite store for every cached AI output.
+
+The cache used to be one JSON file per key under reports/ai_cache/. Each
+lookup listed the product's snapshots and stat'ed the tape to fold its
+mtime into the filename hash, and /ai-cache-status built 20+ keys and
+opened each file to report what was cached. Nothing recorded what a
+response cost, and stale files (old mtimes) were never cleaned up.
+
+Now every response is a row in reports/ai_cache/ai_cache.sqlite3:
+
+    key (endpoint + params hash) | endpoint, company, product, snapshot,
+    tab, as_of_date, currency | tape_mtime | payload (JSON) | tier, model,
+    input_tokens, output_tokens, cost_usd | size_bytes, created_at,
+    last_hit_at, hits
+
+- The tape mtime is a column rather than part of the key. A replaced tape
+  reads as a miss and the next put overwrites the row in place, so stale
+  entries don't pile up.
+- status() answers "what's cached for this snapshot" with one indexed
+  query and never reads payloads.
+- evict() drops rows older than LAITH_AI_CACHE_MAX_AGE_DAYS (default 30),
+  then least-recently-hit rows until the payloads fit in
+  LAITH_AI_CACHE_MAX_MB (default 256). It runs every 50 puts.
+- Legacy JSON files are imported lazily. On a miss, the old filename is
+  derived from the same params; if that file exists it moves into the
+  store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DIR = Path(__file__).resolve().parent.parent / "reports" / "ai_cache"
+DB_FILENAME = "ai_cache.sqlite3"
+_MAX_BYTES = int(float(os.getenv("LAITH_AI_CACHE_MAX_MB", "256")) * 1024 * 1024)
+_MAX_AGE_SECONDS = float(os.getenv("LAITH_AI_CACHE_MAX_AGE_DAYS", "30")) * 86400
+_EVICT_EVERY_PUTS = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    key           TEXT PRIMARY KEY,
+    endpoint      TEXT NOT NULL,
+    company       TEXT NOT NULL,
+    product       TEXT NOT NULL,
+    snapshot      TEXT NOT NULL DEFAULT '',
+    tab           TEXT NOT NULL DEFAULT '',
+    as_of_date    TEXT NOT NULL DEFAULT '',
+    currency      TEXT NOT NULL DEFAULT '',
+    tape_mtime    INTEGER,
+    payload       TEXT NOT NULL,
+    tier          TEXT,
+    model         TEXT,
+    input_tokens  INTEGER,
+    output_tokens INTEGER,
+    cost_usd      REAL,
+    size_bytes    INTEGER NOT NULL,
+    created_at    REAL NOT NULL,
+    last_hit_at   REAL,
+    hits          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ai_cache_scope ON ai_cache (company, product, snapshot);
+CREATE INDEX IF NOT EXISTS idx_ai_cache_created ON ai_cache (created_at);
+"""
+
+# Columns returned by status queries (everything but the payload)
+_META_COLUMNS = (
+    "key", "endpoint", "company", "product", "snapshot", "tab", "as_of_date",
+    "currency", "tape_mtime", "tier", "model", "input_tokens", "output_tokens",
+    "cost_usd", "size_bytes", "created_at", "last_hit_at", "hits",
+)
+
+
+class AICacheKey(str):
+    """Cache key that also carries the scope columns for its row.
+
+    A str subclass so it can still be used as a dict or job key (the AI job
+    layer coalesces on it). The string is stable across tape replacements;
+    the tape mtime travels alongside it and is checked on read.
+    """
+
+    endpoint: str
+    company: str
+    product: str
+    snapshot: str
+    as_of_date: str
+    tab: str
+    currency: str
+    tape_mtime: Optional[int]
+
+    def __new__(cls, endpoint: str, company: str, product: str, snapshot: str = "",
+                as_of_date: str = "", tab: str = "", currency: str = "",
+                tape_mtime: Optional[int] = None) -> "AICacheKey":
+        raw = f"{endpoint}|{company}|{product}|{snapshot}|{as_of_date}|{tab}|{currency}"
+        key = super().__new__(cls, f"{endpoint}:{hashlib.sha256(raw.encode()).hexdigest()[:24]}")
+        key.endpoint, key.company, key.product = endpoint, company, product
+        key.snapshot, key.as_of_date, key.tab, key.currency = snapshot, as_of_date, tab, currency
+        key.tape_mtime = tape_mtime
+        return key
+
+    def legacy_filename(self) -> str:
+        """Filename the pre-SQLite cache used for these params."""
+        raw = (f"{self.endpoint}|{self.company}|{self.product}|{self.snapshot}|"
+               f"{self.as_of_date}|{self.tab}|{self.currency}")
+        if self.tape_mtime is not None:
+            raw += f"|{self.tape_mtime}"
+        h = hashlib.sha256(raw.encode()).hexdigest()[:16]
+        safe = f"{self.company}_{self.product}_{self.endpoint}"
+        if self.tab:
+            safe += f"_{self.tab}"
+        if self.snapshot:
+            safe += "_" + self.snapshot.replace('/', '_').replace('\\', '_').replace('.', '_')
+        return f"{safe}_{h}.json"
+
+
+def usage_from_message(msg: Any) -> Dict[str, Any]:
+    """Tier/model/token/cost metadata from a core.ai_client.complete() response."""
+    from core.ai_client import estimate_cost
+
+    meta = getattr(msg, "_laith_metadata", None) or {}
+    usage = getattr(msg, "usage", None)
+    in_tok = getattr(usage, "input_tokens", None)
+    out_tok = getattr(usage, "output_tokens", None)
+    model = meta.get("model") or getattr(msg, "model", None)
+    cost = None
+    if model and in_tok is not None and out_tok is not None:
+        cost = estimate_cost(model, in_tok, out_tok, meta.get("cache_read_tokens", 0))
+    return {"tier": meta.get("tier"), "model": model, "input_tokens": in_tok,
+            "output_tokens": out_tok, "cost_usd": cost}
+
+
+def usage_from_agent(model: str, done_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Same metadata from an agent run's `done` event (token totals across turns)."""
+    from core.ai_client import estimate_cost
+
+    in_tok = done_data.get("total_input_tokens")
+    out_tok = done_data.get("total_output_tokens")
+    model = model if isinstance(model, str) else None
+    cost = estimate_cost(model, in_tok, out_tok) if model and in_tok is not None and out_tok is not None else None
+    return {"tier": "agent", "model": model, "input_tokens": in_tok,
+            "output_tokens": out_tok, "cost_usd": cost}
+
+
+class AICacheStore:
+    """SQLite-backed AI response cache."""
+
+    def __init__(self, root: Path = _CACHE_DIR, max_bytes: int = _MAX_BYTES,
+                 max_age_seconds: float = _MAX_AGE_SECONDS):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._ready = False
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    with closing(sqlite3.connect(str(self.root / DB_FILENAME), timeout=10)) as conn, conn:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                    self._ready = True
+        conn = sqlite3.connect(str(self.root / DB_FILENAME), timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ── Lookup / store ───────────────────────────────────────────────────
+
+    def get(self, key: AICacheKey) -> Optional[Dict[str, Any]]:
+        """Cached payload, or None on miss / tape replaced since caching."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT payload, tape_mtime FROM ai_cache WHERE key = ?",
+                               (str(key),)).fetchone()
+            if row is not None and _is_fresh(row["tape_mtime"], key.tape_mtime):
+                conn.execute("UPDATE ai_cache SET hits = hits + 1, last_hit_at = ? WHERE key = ?",
+                             (time.time(), str(key)))
+                try:
+                    return json.loads(row["payload"])
+                except json.JSONDecodeError:
+                    return None
+        if row is None:
+            return self._import_legacy(key)
+        return None
+
+    def put(self, key: AICacheKey, payload: Dict[str, Any],
+            usage: Optional[Dict[str, Any]] = None) -> None:
+        usage = usage or {}
+        body = json.dumps(payload, default=str)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, endpoint, company, product, snapshot, tab, "
+                "as_of_date, currency, tape_mtime, payload, tier, model, input_tokens, output_tokens, "
+                "cost_usd, size_bytes, created_at, last_hit_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, 0)",
+                (str(key), key.endpoint, key.company, key.product, key.snapshot, key.tab,
+                 key.as_of_date, key.currency, key.tape_mtime, body, usage.get("tier"),
+                 usage.get("model"), usage.get("input_tokens"), usage.get("output_tokens"),
+                 usage.get("cost_usd"), len(body.encode("utf-8")), time.time()),
+            )
+        with self._lock:
+            self._puts += 1
+            due = self._puts % _EVICT_EVERY_PUTS == 0
+        if due:
+            self.evict()
+
+    def _import_legacy(self, key: AICacheKey) -> Optional[Dict[str, Any]]:
+        path = self.root / key.legacy_filename()
+        if not path.exists():
+            return None
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return None
+        self.put(key, payload)
+        path.unlink(missing_ok=True)
+        logger.info("AI cache: imported legacy %s", path.name)
+        return payload
+
+    # ── Bulk queries ─────────────────────────────────────────────────────
+
+    def status(self, company: str, product: str, snapshot: Optional[str] = None,
+               tape_mtime: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Metadata rows (no payloads) for a company/product[/snapshot].
+
+        Rows whose tape_mtime no longer matches are excluded — they'd miss
+        on get() anyway.
+        """
+        sql = f"SELECT {', '.join(_META_COLUMNS)} FROM ai_cache WHERE company = ? AND product = ?"
+        params: List[Any] = [company, product]
+        if snapshot is not None:
+            sql += " AND snapshot = ?"
+            params.append(snapshot)
+        with closing(self._connect()) as conn:
+            rows = [dict(r) for r in conn.execute(sql + " ORDER BY created_at DESC", params)]
+        if snapshot is not None:
+            rows = [r for r in rows if _is_fresh(r["tape_mtime"], tape_mtime)]
+        for r in rows:
+            r["cached_at"] = datetime.fromtimestamp(r["created_at"]).isoformat()
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(size_bytes), 0) AS bytes, "
+                "COALESCE(SUM(hits), 0) AS hits, COALESCE(SUM(cost_usd), 0) AS cost, "
+                "COALESCE(SUM(cost_usd * hits), 0) AS saved FROM ai_cache").fetchone()
+            by_endpoint = {
+                r["endpoint"]: {"entries": r["n"], "bytes": r["bytes"], "hits": r["hits"]}
+                for r in conn.execute(
+                    "SELECT endpoint, COUNT(*) AS n, SUM(size_bytes) AS bytes, SUM(hits) AS hits "
+                    "FROM ai_cache GROUP BY endpoint")
+            }
+        return {
+            "entries": total["n"],
+            "bytes": total["bytes"],
+            "max_bytes": self.max_bytes,
+            "max_age_days": round(self.max_age_seconds / 86400, 2),
+            "hits": total["hits"],
+            "generation_cost_usd": round(total["cost"], 4),
+            "cost_saved_usd": round(total["saved"], 4),
+            "by_endpoint": by_endpoint,
+        }
+
+    # ── Eviction / admin ─────────────────────────────────────────────────
+
+    def evict(self) -> int:
+        """Apply the age then size bounds. Returns rows removed."""
+        removed = 0
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute("DELETE FROM ai_cache WHERE created_at < ?",
+                               (time.time() - self.max_age_seconds,))
+            removed += cur.rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM ai_cache").fetchone()[0]
+            if total > self.max_bytes:
+                victims, freed = [], 0
+                for r in conn.execute("SELECT key, size_bytes FROM ai_cache "
+                                      "ORDER BY COALESCE(last_hit_at, created_at) ASC"):
+                    if total - freed <= self.max_bytes:
+                        break
+                    victims.append((r["key"],))
+                    freed += r["size_bytes"]
+                conn.executemany("DELETE FROM ai_cache WHERE key = ?", victims)
+                removed += len(victims)
+        if removed:
+            logger.info("AI cache: evicted %d entries", removed)
+        return removed
+
+    def delete(self, company: str, product: str, snapshot: Optional[str] = None) -> int:
+        sql, params = "DELETE FROM ai_cache WHERE company = ? AND product = ?", [company, product]
+        if snapshot is not None:
+            sql += " AND snapshot = ?"
+            params.append(snapshot)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(sql, params).rowcount
+
+
+def _is_fresh(row_mtime: Optional[int], current_mtime: Optional[int]) -> bool:
+    """A row is fresh unless both mtimes are known and differ."""
+    return row_mtime is None or current_mtime is None or row_mtime == current_mtime
+
+
+_store: Optional[AICacheStore] = None
+_store_lock = threading.Lock()
+
+
+def get_ai_cache() -> AICacheStore:
+    """Process-wide AI cache store (reports/ai_cache/)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AICacheStore()
+        return _store
@@ -1,8 +1,9 @@
 """
 Central Anthropic API client — model tier routing, retry/backoff, prompt caching.
 
-All AI calls across the platform should go through `complete()` or `get_client()`
-here instead of instantiating `anthropic.Anthropic()` directly. This ensures:
+All AI calls across the platform should go through `complete()`, `get_client()`
+or `get_async_client()` here instead of instantiating `anthropic.Anthropic()`
+directly. This ensures:
 
 - Consistent retry/backoff on RateLimitError (SDK built-in, max_retries=3)
 - Tier-based model selection (auto/structured/research/judgment/polish)
@@ -22,9 +23,11 @@ Opus 4.7 falls back to 4.6 automatically if the model ID isn't recognised.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import time
+import weakref
 from typing import Any, Dict, List, Optional, Union
 
 import anthropic
@@ -148,10 +151,40 @@ def get_client() -> anthropic.Anthropic:
     return _CLIENT_SINGLETON
 
 
+# AsyncAnthropic wraps an httpx.AsyncClient whose connection pool is bound to
+# the event loop it first ran on. Agent runners are driven both from the
+# uvicorn loop and from short-lived loops in worker threads
+# (core.agents.internal.run_agent_sync), so keep one client per loop.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anthropic.AsyncAnthropic]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> anthropic.AsyncAnthropic:
+    """Return the AsyncAnthropic client for the running event loop.
+
+    Same key and retry configuration as get_client(). Must be called from
+    inside a coroutine. ANTHROPIC_BASE_URL is honoured by the SDK, which is
+    how the load test points runners at scripts/fake_model_server.py.
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        max_retries = int(os.getenv("LAITH_AI_MAX_RETRIES", "3"))
+        client = anthropic.AsyncAnthropic(
+            api_key=_load_api_key(),
+            max_retries=max_retries,
+        )
+        _ASYNC_CLIENTS[loop] = client
+        logger.debug("Async Anthropic client initialized for loop %x", id(loop))
+    return client
+
+
 def reset_client_for_tests() -> None:
     """Reset singleton. Used by test fixtures that need a fresh client."""
     global _CLIENT_SINGLETON
     _CLIENT_SINGLETON = None
+    _ASYNC_CLIENTS.clear()
     _RESOLVED_MODELS.clear()
 
 
@@ -0,0 +1,330 @@
+"""
+AI Job Queue — single-flight deduplication + bounded execution for AI generations.
+
+The AI endpoints (/ai-commentary, /ai-executive-summary, /ai-tab-insight)
+and the memo generator check the disk cache and then call the model
+synchronously. Three analysts opening the same company at once all miss
+the cache and pay for three identical generations.
+
+Every generation now runs as an AIJob keyed on its cache key
+(backend.main._ai_cache_key for the AI endpoints). While a job is queued
+or running, any identical request joins it instead of starting another:
+sync callers block on the shared result, async callers get the job id
+back and can subscribe to its progress over SSE (GET /ai-jobs/{id}/stream).
+
+Jobs run on a bounded worker pool (LAITH_AI_JOB_WORKERS, default 8) with
+per-tier concurrency caps (LAITH_AI_JOBS_<TIER>, e.g. LAITH_AI_JOBS_JUDGMENT)
+so a burst of Opus-tier summaries can't starve cheap tab insights. Jobs
+over their tier cap wait FIFO in a per-tier queue. Finished jobs are kept
+for LAITH_AI_JOB_RETAIN_S seconds (default 300) so late subscribers still
+get the result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAX_WORKERS = int(os.getenv("LAITH_AI_JOB_WORKERS", "8"))
+_RETAIN_SECONDS = float(os.getenv("LAITH_AI_JOB_RETAIN_S", "300"))
+
+# Default concurrent jobs per tier (model tiers from core.ai_client, "memo"
+# for whole-memo pipelines, which fan out internally, and "pregen" for
+# snapshot-wide AI cache sweeps, see backend.main.pregenerate_ai_outputs)
+_DEFAULT_TIER_LIMITS = {
+    "auto": 8,
+    "structured": 6,
+    "research": 4,
+    "judgment": 3,
+    "polish": 2,
+    "memo": 2,
+    "pregen": 3,
+}
+
+TERMINAL_EVENTS = ("done", "error")
+
+
+def _tier_limit(tier: str) -> int:
+    env = os.getenv(f"LAITH_AI_JOBS_{tier.upper()}")
+    if env:
+        return max(1, int(env))
+    return _DEFAULT_TIER_LIMITS.get(tier, 4)
+
+
+def make_job_key(*parts: Any) -> str:
+    """Stable key for jobs that have no cache path of their own (e.g. memos)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+
+class AIJob:
+    """One in-flight (or recently finished) AI generation."""
+
+    def __init__(self, key: str, tier: str, label: str, fn: Callable[["AIJob"], Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.tier = tier
+        self.label = label
+        self.fn = fn
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.joined = 0  # requests coalesced onto this job after it was created
+        self._events: List[Tuple[str, Any]] = []
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    # ── Progress / subscription ──────────────────────────────────────────
+
+    def publish(self, event_type: str, payload: Any = None) -> None:
+        """Record a progress event and fan it out to SSE subscribers. Thread-safe."""
+        event = (event_type, payload if payload is not None else {})
+        with self._lock:
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # subscriber's loop is gone
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of (event_type, payload) for the running loop: past events replayed, then live."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            for event in self._events:
+                queue.put_nowait(event)
+            self._subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    # ── Completion ───────────────────────────────────────────────────────
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Block until finished; return the result or re-raise the job's exception."""
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"AI job {self.id} ({self.label}) still {self.status}")
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    def _finish(self, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        self.finished_at = time.time()
+        if exc is None:
+            self.status, self.result = "done", result
+            self.publish("done", {"job_id": self.id, "result": result})
+        else:
+            self.status, self.exception = "error", exc
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.publish("error", {"job_id": self.id, "message": self.error})
+        self._finished.set()
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        d = {
+            "job_id": self.id,
+            "label": self.label,
+            "tier": self.tier,
+            "status": self.status,
+            "joined": self.joined,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": len(self._events),
+        }
+        if self.error:
+            d["error"] = self.error
+        if include_result and self.status == "done":
+            d["result"] = self.result
+        return d
+
+
+class AIJobQueue:
+    """Single-flight job registry + tier-capped worker pool."""
+
+    def __init__(self, max_workers: int = _MAX_WORKERS, retain_seconds: float = _RETAIN_SECONDS,
+                 tier_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.retain_seconds = retain_seconds
+        self._tier_limits = dict(tier_limits or {})
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._inflight: Dict[str, AIJob] = {}          # key → queued/running job
+        self._jobs: "OrderedDict[str, AIJob]" = OrderedDict()  # id → job (incl. recently finished)
+        self._pending: Dict[str, Deque[Tuple[int, AIJob]]] = {}
+        self._running: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._stats = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0}
+
+    def tier_limit(self, tier: str) -> int:
+        return self._tier_limits.get(tier) or _tier_limit(tier)
+
+    # ── Submission ───────────────────────────────────────────────────────
+
+    def submit(self, key: str, fn: Callable[[AIJob], Any], tier: str = "structured",
+               label: str = "") -> Tuple[AIJob, bool]:
+        """Start `fn(job)` for `key`, or join the job already in flight for it.
+
+        Returns (job, created). `fn` receives the job so it can publish
+        progress events; its return value becomes the job result.
+        """
+        with self._lock:
+            self._prune()
+            job = self._inflight.get(key)
+            if job is not None:
+                job.joined += 1
+                self._stats["coalesced"] += 1
+                return job, False
+            job = AIJob(key, tier, label or key, fn)
+            self._inflight[key] = job
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+            self._pending.setdefault(tier, deque()).append((next(self._seq), job))
+            to_start = self._dispatch()
+        for j in to_start:
+            self._start(j)
+        return job, True
+
+    def run(self, key: str, fn: Callable[[AIJob], Any], tier: str = "structured",
+            label: str = "", timeout: Optional[float] = None) -> Any:
+        """submit() then block for the result (sync endpoints)."""
+        job, _ = self.submit(key, fn, tier, label)
+        return job.wait(timeout)
+
+    def get(self, job_id: str) -> Optional[AIJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, key: str) -> Optional[AIJob]:
+        """The queued/running job for a key, if any."""
+        with self._lock:
+            return self._inflight.get(key)
+
+    # ── Scheduling ───────────────────────────────────────────────────────
+
+    def _dispatch(self) -> List[AIJob]:
+        """Pick pending jobs that fit the worker and tier caps (caller holds lock)."""
+        started: List[AIJob] = []
+        while sum(self._running.values()) < self.max_workers:
+            candidates = [
+                (q[0][0], tier) for tier, q in self._pending.items()
+                if q and self._running.get(tier, 0) < self.tier_limit(tier)
+            ]
+            if not candidates:
+                break
+            _, tier = min(candidates)  # oldest eligible job first
+            _, job = self._pending[tier].popleft()
+            self._running[tier] = self._running.get(tier, 0) + 1
+            job.status = "running"
+            job.started_at = time.time()
+            started.append(job)
+        return started
+
+    def _start(self, job: AIJob) -> None:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="ai-job")
+        self._executor.submit(self._execute, job)
+
+    def _execute(self, job: AIJob) -> None:
+        try:
+            result = job.fn(job)
+        except BaseException as e:  # surfaced to every waiter
+            logger.warning("AI job %s (%s) failed: %s", job.id, job.label, e)
+            outcome: Tuple[Any, Optional[BaseException]] = (None, e)
+        else:
+            outcome = (result, None)
+        with self._lock:
+            self._running[job.tier] -= 1
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            self._stats["completed" if outcome[1] is None else "failed"] += 1
+            to_start = self._dispatch()
+        job._finish(*outcome)
+        for j in to_start:
+            self._start(j)
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than retain_seconds (caller holds lock)."""
+        cutoff = time.time() - self.retain_seconds
+        for job_id in [jid for jid, j in self._jobs.items()
+                       if j.finished_at is not None and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    # ── Introspection ────────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune()
+            tiers = sorted(set(self._running) | set(self._pending))
+            return {
+                **self._stats,
+                "max_workers": self.max_workers,
+                "tiers": {
+                    t: {"running": self._running.get(t, 0),
+                        "queued": len(self._pending.get(t, ())),
+                        "limit": self.tier_limit(t)}
+                    for t in tiers
+                },
+                "jobs": [j.to_dict() for j in reversed(self._jobs.values())],
+            }
+
+
+# Global singleton
+ai_jobs = AIJobQueue()
+
+
+async def stream_job_events(job: AIJob, is_disconnected: Optional[Callable] = None,
+                            heartbeat_s: float = 20.0):
+    """SSE lines for a job: replayed + live progress, ending at done/error.
+
+    Emits a `: keepalive` comment after `heartbeat_s` idle seconds (same
+    Cloudflare idle-cap workaround as the other SSE endpoints).
+    """
+    import json
+
+    queue = job.subscribe()
+    try:
+        yield f"event: job\ndata: {json.dumps(job.to_dict())}\n\n"
+        last_yield = time.monotonic()
+        while True:
+            if is_disconnected is not None and await is_disconnected():
+                return
+            try:
+                event_type, payload = await asyncio.wait_for(queue.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                if time.monotonic() - last_yield >= heartbeat_s:
+                    yield ": keepalive\n\n"
+                    last_yield = time.monotonic()
+                continue
+            yield f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+            last_yield = time.monotonic()
+            if event_type in TERMINAL_EVENTS:
+                return
+    finally:
+        job.unsubscribe(queue)
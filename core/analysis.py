@@ -6,6 +6,9 @@ All functions take a DataFrame + params, return plain Python dicts/lists.
 import pandas as pd
 import numpy as np
 
+from core.telemetry import instrument_module
+from core.time_index import ensure_datetime, filter_sorted
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -36,13 +39,14 @@ def apply_multiplier(config, display_currency):
 def filter_by_date(df, as_of_date=None):
     """Filter DataFrame to deals on or before as_of_date.
 
-    Returns a copy — never mutates the input DataFrame.
+    Returns a copy — never mutates the input DataFrame. On a tape indexed
+    by core.time_index.sort_by_date the cut is a searchsorted slice.
     """
     if 'Deal date' in df.columns:
-        df = df.copy()
-        df['Deal date'] = pd.to_datetime(df['Deal date'], errors='coerce', format='mixed')
+        parsed = ensure_datetime(df, 'Deal date')
         if as_of_date:
-            df = df[df['Deal date'] <= pd.to_datetime(as_of_date)]
+            return filter_sorted(parsed, 'Deal date', as_of_date)
+        return parsed if parsed is not df else df.copy()
     return df
 
 
@@ -3277,4 +3281,8 @@ def compute_cdr_ccr(df, mult, as_of_date=None):
             'population': 'total_originated',
             'confidence': 'A',
         },
-    }
\ No newline at end of file
+    }
+
+
+# Latency / input-row / output-size telemetry for every compute_* above
+instrument_module(globals())
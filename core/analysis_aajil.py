@@ -21,6 +21,9 @@ import json
 import numpy as np
 import pandas as pd
 
+from core.telemetry import instrument_module
+from core.time_index import filter_sorted
+
 # ── Column aliases (Deals sheet) ─────────────────────────────────────────────
 C_TXN_ID       = 'Transaction ID'
 C_DEAL_TYPE    = 'Deal Type'           # Bullet / EMI
@@ -73,8 +76,7 @@ def filter_aajil_by_date(df, as_of_date):
     """Filter deals to Invoice Date <= as_of_date. Returns a copy."""
     if as_of_date is None:
         return df.copy()
-    cutoff = pd.to_datetime(as_of_date)
-    return df[df[C_INVOICE_DATE] <= cutoff].copy()
+    return filter_sorted(df, C_INVOICE_DATE, as_of_date)
 
 
 def _bucket_industry(series):
@@ -1425,3 +1427,7 @@ def get_aajil_summary(data):
         'total_collected': co.get('gmv_sar', 0),
         'total_customers': co.get('total_customers', 0),
     }
+
+
+# Latency / input-row / output-size telemetry for every compute_* above
+instrument_module(globals())
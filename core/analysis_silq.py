@@ -13,6 +13,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from core.telemetry import instrument_module
+from core.time_index import ROW_POS_COL, filter_sorted
+
 
 # ── Column aliases ────────────────────────────────────────────────────────────
 # Map short names to actual column names (which include currency suffix)
@@ -39,8 +42,7 @@ def filter_silq_by_date(df, as_of_date):
     """Filter loans to those disbursed on or before as_of_date."""
     if not as_of_date or C_DISB_DATE not in df.columns:
         return df
-    cutoff = pd.to_datetime(as_of_date)
-    return df[df[C_DISB_DATE] <= cutoff].copy()
+    return filter_sorted(df, C_DISB_DATE, as_of_date)
 
 
 def _dpd(df, ref_date=None):
@@ -440,12 +442,15 @@ def compute_silq_concentration(df, mult=1):
     # Credit limit utilization
     utilization = []
     if C_SHOP_ID in df.columns and C_OUTSTANDING in df.columns and C_SHOP_LIMIT in df.columns:
-        shop_util = df.groupby(C_SHOP_ID).agg(
+        # Limit from each shop's first row in tape file order; cached tapes
+        # are re-sorted by date and carry the file position in ROW_POS_COL
+        in_file_order = df.sort_values(ROW_POS_COL, kind='stable') if ROW_POS_COL in df.columns else df
+        shop_util = in_file_order.groupby(C_SHOP_ID).agg(
             outstanding=(C_OUTSTANDING, 'sum'),
             limit=(C_SHOP_LIMIT, 'first'),
         )
         shop_util['util_pct'] = (shop_util['outstanding'] / shop_util['limit'] * 100).clip(0, 100)
-        for shop_id, row in shop_util.sort_values('util_pct', ascending=False).head(15).iterrows():
+        for shop_id, row in shop_util.sort_values('util_pct', ascending=False, kind='stable').head(15).iterrows():
             utilization.append({
                 'shop_id': _safe(shop_id),
                 'outstanding': _safe(row['outstanding'] * mult),
@@ -1621,3 +1626,7 @@ def compute_silq_cdr_ccr(df, mult=1, ref_date=None):
             'confidence': 'A',
         },
     }
+
+
+# Latency / input-row / output-size telemetry for every compute_* above
+instrument_module(globals())
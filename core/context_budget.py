@@ -0,0 +1,355 @@
+"""
+Context Budget — token-aware assembly of AI prompt context.
+
+build_mind_context, the memo section prompts, the research RAG prompt and
+the executive-summary builders each concatenated mind layers, data room
+chunks, analytics text and prior sections with no shared limit. The only
+guard was ClaudeQueryEngine's blind 60k-character cut, which could slice a
+source in half and dropped the tail whatever it held.
+
+Callers now split their context into ContextBlocks and call pack():
+
+    1. Estimate tokens per block (same word x 1.3 heuristic as the data
+       room chunker, floored at chars / 4 for number-dense text).
+    2. Score relevance against the call's query (section guidance,
+       research question) as the share of query terms the block mentions.
+    3. Rank: required blocks first, then priority, relevance, and original
+       position as the final tie-break, so the same inputs always pack
+       the same way.
+    4. Walk the ranking. A block mostly contained in something already
+       kept (5-word shingles) is dropped as a duplicate. A block that only
+       shares a leading/trailing run with kept text (the 100-token overlap
+       between consecutive data room chunks) has that run trimmed.
+    5. Keep blocks while they fit the budget; truncatable blocks are cut
+       at a line boundary to fill the remainder, the rest are dropped.
+
+Kept blocks come back in their original order, so prompt structure and
+source numbering are unchanged. PackResult.report() records what was
+dropped, trimmed or truncated and why; callers surface it in their
+metadata (generation_meta, research responses, MindLayeredContext).
+
+Budgets default per call site and can be overridden with
+LAITH_CONTEXT_BUDGET_<NAME> (e.g. LAITH_CONTEXT_BUDGET_MEMO_SECTION=6000);
+0 disables the limit (dedupe still applies).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default input-token budgets per call site
+_DEFAULT_BUDGETS = {
+    "mind": 3000,            # build_mind_context, all layers combined
+    "memo_section": 8000,    # memo section user prompt (analytics, data room, prior sections)
+    "research": 12000,       # ClaudeQueryEngine RAG prompt
+}
+
+_SHINGLE = 5                 # words per shingle for duplicate detection
+_DUPLICATE_CONTAINMENT = 0.8 # share of a block's shingles already kept → duplicate
+_MIN_TRIM_WORDS = 12         # shorter shared runs are left alone
+_MIN_TRUNCATE_TOKENS = 64    # don't bother truncating into a tiny remainder
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9.%/-]*")
+_STOPWORDS = frozenset("""
+    a an and are as at be been but by for from has have how in into is it its
+    of on or per than that the their then there these this those to was were
+    what when where which while who why will with within without should would
+    section include including provide write use using also any all each
+""".split())
+
+_ENTRY_RE = re.compile(r"^\s*(?:[-*•]\s|\d+[.)]\s|\[)")
+_HEADING_RE = re.compile(r"^\s*(?:#{1,6}\s|-{3}\s.*\s-{3}\s*$|={3}\s)")
+
+
+def context_budget(name: str, default: Optional[int] = None) -> Optional[int]:
+    """Token budget for a call site: env override, else the built-in default.
+    Returns None when the budget is disabled (0)."""
+    env = os.getenv(f"LAITH_CONTEXT_BUDGET_{name.upper()}")
+    value = int(env) if env else (default if default is not None else _DEFAULT_BUDGETS.get(name, 0))
+    return value if value and value > 0 else None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input-token count for prompt budgeting (not billing)."""
+    if not text:
+        return 0
+    return max(int(len(text.split()) * 1.3), (len(text) + 3) // 4)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def query_terms(query: str) -> frozenset:
+    """Content words of a query, for relevance scoring."""
+    return frozenset(w for w in _words(query or "") if len(w) > 2 and w not in _STOPWORDS)
+
+
+def score_relevance(text: str, terms: Iterable[str]) -> float:
+    """Share of query terms that appear in the text (0..1)."""
+    terms = frozenset(terms)
+    if not terms or not text:
+        return 0.0
+    return len(terms & set(_words(text))) / len(terms)
+
+
+@dataclass
+class ContextBlock:
+    """One candidate piece of prompt context."""
+
+    key: str                          # stable id, reported when dropped
+    text: str
+    source: str = ""                  # group the caller reassembles from ("analytics", "dataroom", ...)
+    priority: int = 0                 # higher packs first
+    relevance: Optional[float] = None # None → scored against the pack() query
+    required: bool = False            # always kept, charged against the budget first
+    truncatable: bool = False         # may be cut at a line boundary to fit
+    heading: Tuple[Tuple[int, str, bool], ...] = ()  # (line_no, text, blank_before) headings above
+    blank_before: bool = False        # layout for join_entries()
+    tokens: int = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = estimate_tokens(self.text)
+
+    def _set_text(self, text: str) -> None:
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+@dataclass
+class PackResult:
+    """Blocks kept by pack(), in original order, plus what happened to the rest."""
+
+    blocks: List[ContextBlock]
+    budget: Optional[int]
+    input_tokens: int
+    dropped: List[Dict[str, Any]] = field(default_factory=list)
+    trimmed: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def used_tokens(self) -> int:
+        return sum(b.tokens for b in self.blocks)
+
+    def by_source(self, source: str) -> List[ContextBlock]:
+        return [b for b in self.blocks if b.source == source]
+
+    def text(self, sep: str = "\n\n", source: Optional[str] = None) -> str:
+        blocks = self.blocks if source is None else self.by_source(source)
+        return sep.join(b.text for b in blocks)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "input_tokens": self.input_tokens,
+            "used_tokens": self.used_tokens,
+            "saved_tokens": self.input_tokens - self.used_tokens,
+            "kept": len(self.blocks),
+            "dropped": self.dropped,
+            "trimmed": self.trimmed,
+        }
+
+
+# ── Overlap detection ────────────────────────────────────────────────────────
+
+def _spans(text: str) -> List[Tuple[str, int, int]]:
+    """(normalized word, start, end) for each whitespace-separated token."""
+    out = []
+    for m in re.finditer(r"\S+", text):
+        w = m.group().lower().strip(".,;:()[]{}\"'*`")
+        if w:
+            out.append((w, m.start(), m.end()))
+    return out
+
+
+def _shingles(words: List[str]) -> List[Tuple[str, ...]]:
+    if len(words) < _SHINGLE:
+        return [tuple(words)] if words else []
+    return [tuple(words[i:i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+
+
+def _trim_overlap(text: str, seen: Dict[Tuple[str, ...], str]) -> Tuple[str, int]:
+    """Strip a leading/trailing run already present in kept text. Returns (text, words_cut)."""
+    spans = _spans(text)
+    words = [w for w, _, _ in spans]
+    sh = _shingles(words)
+    if len(sh) < 2:
+        return text, 0
+    lead = 0
+    while lead < len(sh) and sh[lead] in seen:
+        lead += 1
+    tail = 0
+    while tail < len(sh) - lead and sh[len(sh) - 1 - tail] in seen:
+        tail += 1
+    # Shingle runs → word runs (a run of k shingles covers k + SHINGLE - 1 words)
+    lead_words = lead + _SHINGLE - 1 if lead else 0
+    tail_words = tail + _SHINGLE - 1 if tail else 0
+    start = spans[lead_words][1] if lead_words >= _MIN_TRIM_WORDS and lead_words < len(spans) else 0
+    end = spans[len(spans) - tail_words - 1][2] \
+        if tail_words >= _MIN_TRIM_WORDS and len(spans) - tail_words - 1 >= 0 else len(text)
+    if start == 0 and end == len(text):
+        return text, 0
+    cut = (lead_words if start else 0) + (tail_words if end < len(text) else 0)
+    body = text[start:end].strip()
+    return (("…" if start else "") + body + ("…" if end < len(text) else "")), cut
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Longest line-boundary prefix within max_tokens (word cut for a single long line)."""
+    out: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        t = estimate_tokens(line) + 1
+        if used + t > max_tokens:
+            if not out:
+                words = line.split()
+                keep = max(1, int(max_tokens / 1.3) - 1)
+                out.append(" ".join(words[:keep]))
+            break
+        out.append(line)
+        used += t
+    return "\n".join(out).rstrip() + "\n[…truncated to fit context budget]"
+
+
+# ── Packing ──────────────────────────────────────────────────────────────────
+
+def pack(blocks: List[ContextBlock], budget: Optional[int], query: str = "",
+         dedupe: bool = True) -> PackResult:
+    """Fill `budget` tokens from `blocks` (see module docstring for the algorithm).
+
+    Blocks are modified in place when trimmed or truncated. budget=None
+    keeps everything that isn't a duplicate.
+    """
+    terms = query_terms(query)
+    for b in blocks:
+        if b.relevance is None:
+            b.relevance = score_relevance(b.text, terms)
+    input_tokens = sum(b.tokens for b in blocks)
+    order = sorted(range(len(blocks)), key=lambda i: (
+        not blocks[i].required, -blocks[i].priority, -(blocks[i].relevance or 0.0), i))
+
+    seen: Dict[Tuple[str, ...], str] = {}
+    kept: set = set()
+    dropped: List[Dict[str, Any]] = []
+    trimmed: List[Dict[str, Any]] = []
+    used = 0
+
+    def _drop(b: ContextBlock, reason: str, **extra) -> None:
+        dropped.append({"key": b.key, "source": b.source, "tokens": b.tokens,
+                        "reason": reason, **extra})
+
+    for i in order:
+        b = blocks[i]
+        if dedupe and not b.required and b.text.strip():
+            sh = _shingles([w for w, _, _ in _spans(b.text)])
+            hits = [seen[s] for s in sh if s in seen]
+            if sh and len(hits) / len(sh) >= _DUPLICATE_CONTAINMENT:
+                _drop(b, "duplicate", duplicate_of=max(set(hits), key=hits.count))
+                continue
+            if hits:
+                before = b.tokens
+                text, cut = _trim_overlap(b.text, seen)
+                if cut:
+                    b._set_text(text)
+                    trimmed.append({"key": b.key, "source": b.source, "reason": "overlap",
+                                    "tokens_saved": before - b.tokens})
+
+        remaining = None if budget is None else budget - used
+        if not b.required and remaining is not None and b.tokens > remaining:
+            if b.truncatable and remaining >= _MIN_TRUNCATE_TOKENS:
+                before = b.tokens
+                b._set_text(_truncate(b.text, remaining - 8))
+                trimmed.append({"key": b.key, "source": b.source, "reason": "truncated",
+                                "tokens_saved": before - b.tokens})
+            else:
+                _drop(b, "over_budget", relevance=round(b.relevance or 0.0, 3))
+                continue
+
+        kept.add(i)
+        used += b.tokens
+        if dedupe:
+            for s in _shingles([w for w, _, _ in _spans(b.text)]):
+                seen.setdefault(s, b.key)
+
+    if budget is not None and used > budget:
+        logger.info("Context budget: required blocks alone use %d of %d tokens", used, budget)
+    return PackResult(
+        blocks=[blocks[i] for i in sorted(kept)],
+        budget=budget,
+        input_tokens=input_tokens,
+        dropped=dropped,
+        trimmed=trimmed,
+    )
+
+
+# ── Markdown-ish entry lists (mind layers) ───────────────────────────────────
+
+def split_entries(text: str, source: str, priority: int = 0, **kw: Any) -> List[ContextBlock]:
+    """Split a formatted context layer into one block per entry.
+
+    Headings (``#``, ``--- x ---``, ``=== x ===``) attach to the entries under
+    them and are re-emitted by join_entries() only if one of those entries
+    survives. Bullets, numbered items, ``[category]`` lines and blank lines
+    start a new entry; other lines continue the current one. Joining every
+    block reproduces the input.
+    """
+    blocks: List[ContextBlock] = []
+    headings: List[Tuple[int, str, bool]] = []
+    current: List[str] = []
+    blank = False
+    current_blank = False
+
+    def _flush():
+        if current:
+            blocks.append(ContextBlock(f"{source}:{len(blocks)}", "\n".join(current),
+                                       source=source, priority=priority,
+                                       heading=tuple(headings), blank_before=current_blank, **kw))
+        current.clear()
+
+    for n, line in enumerate(text.splitlines()):
+        if not line.strip():
+            _flush()
+            blank = True
+            continue
+        if _HEADING_RE.match(line):
+            _flush()
+            level = _level(line)
+            # A heading replaces any heading at the same or deeper level
+            headings = [h for h in headings if 0 < _level(h[1]) < level] if level else []
+            headings.append((n, line, blank))
+        elif _ENTRY_RE.match(line) or not current:
+            _flush()
+            current_blank = blank
+            current.append(line)
+        else:
+            current.append(line)
+        blank = False
+    _flush()
+    return blocks
+
+
+def _level(heading: str) -> int:
+    s = heading.lstrip()
+    return len(s) - len(s.lstrip("#")) if s.startswith("#") else 0
+
+
+def join_entries(blocks: List[ContextBlock]) -> str:
+    """Inverse of split_entries for the blocks that were kept."""
+    lines: List[str] = []
+    emitted: set = set()
+    for b in blocks:
+        for h in b.heading:
+            if h not in emitted:
+                if lines and h[2]:
+                    lines.append("")
+                lines.append(h[1])
+                emitted.add(h)
+        if lines and b.blank_before:
+            lines.append("")
+        lines.append(b.text)
+    return "\n".join(lines)
@@ -0,0 +1,271 @@
+"""
+core/covenant_ledger.py
+Incremental covenant ledger — one covenant test per snapshot, computed once.
+
+`covenant_history.json` only grows when someone opens the covenants page for
+a snapshot, so EoD consecutive-breach checks and trend charts silently miss
+every period nobody looked at, and filling the gap meant loading every tape
+by hand. The ledger records compute_klaim_covenants / compute_covenants
+(SILQ) for every tape of a product in data/{company}/{product}/
+covenant_ledger.json, keyed by snapshot name (tape filename without
+extension, same as the DB snapshot name).
+
+An entry is recomputed only when its tape changes (size + mtime), the
+facility params change (fingerprint of the saved + legal-extracted params)
+or LEDGER_VERSION is bumped. `update_ledger()` fills the gaps, optionally
+across worker processes — each tape is an independent load + compute — and
+is run on tape ingest and by scripts/backfill_covenant_ledger.py.
+
+Rows are stored compactly as lists against a shared `fields` header and in
+the product's reporting currency (mult=1). Readers:
+  - ledger_history()  → covenant_history.json shape for annotate_covenant_eod
+  - covenant_series() → per-covenant trend across snapshots
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.config import load_config
+from core.loader import DATA_DIR, get_snapshots
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FILENAME = 'covenant_ledger.json'
+# Bump when covenant math in core/portfolio.py changes — every entry is recomputed.
+LEDGER_VERSION = 1
+FIELDS = ['current', 'compliant', 'available', 'partial', 'method', 'period', 'eod_rule', 'threshold']
+LEDGER_TYPES = ('klaim', 'silq')
+
+_write_lock = threading.Lock()
+
+
+def ledger_path(company: str, product: str) -> str:
+    return os.path.join(DATA_DIR, company, product, LEDGER_FILENAME)
+
+
+def load_ledger(company: str, product: str) -> Dict[str, Any]:
+    path = ledger_path(company, product)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                ledger = json.load(f)
+            if ledger.get('fields') == FIELDS:
+                return ledger
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Unreadable covenant ledger %s: %s", path, e)
+    return {'version': LEDGER_VERSION, 'fields': FIELDS, 'snapshots': {}}
+
+
+def _save_ledger(company: str, product: str, entries: Dict[str, Dict]) -> Dict[str, Any]:
+    """Merge entries into the on-disk ledger and write it atomically."""
+    path = ledger_path(company, product)
+    with _write_lock:
+        ledger = load_ledger(company, product)
+        ledger['version'] = LEDGER_VERSION
+        ledger['snapshots'].update(entries)
+        ledger['snapshots'] = dict(sorted(ledger['snapshots'].items(),
+                                          key=lambda kv: (kv[1].get('date') or '', kv[0])))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(ledger, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+    return ledger
+
+
+def facility_params(company: str, product: str, config: Optional[Dict] = None) -> Dict[str, Any]:
+    """Saved facility params merged with legal-extracted values, as the portfolio pages use them."""
+    from core.legal_compliance import merge_facility_params
+
+    path = os.path.join(DATA_DIR, company, product, 'facility_params.json')
+    manual = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            manual = json.load(f)
+    params = merge_facility_params(company, product, manual)
+    config = config if config is not None else load_config(company, product)
+    if config and 'usd_rate' in config:
+        params.setdefault('usd_rate', config['usd_rate'])
+    return params
+
+
+def params_fingerprint(params: Dict[str, Any]) -> str:
+    """Stable hash of the params that can move a covenant result."""
+    material = {k: v for k, v in (params or {}).items()
+                if not k.startswith('_') and k not in ('updated_at', 'slack_webhook_url')}
+    blob = json.dumps(material, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+
+def tape_fingerprint(filepath: str) -> str:
+    st = os.stat(filepath)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _compact(result: Dict[str, Any]) -> Dict[str, List]:
+    return {c['name']: [c.get(f) for f in FIELDS] for c in result.get('covenants', [])}
+
+
+def compute_entry(analysis_type: str, filepath: str, ref_date: Optional[str],
+                  params: Dict[str, Any]) -> Dict[str, Any]:
+    """Load one tape and run its covenant test. Top-level so worker processes can pickle it."""
+    if analysis_type == 'silq':
+        from core.loader import load_silq_snapshot
+        from core.portfolio import compute_covenants
+        df, _ = load_silq_snapshot(filepath)
+        result = compute_covenants(df, 1, ref_date, params)
+    else:
+        from core.loader import load_snapshot
+        from core.portfolio import compute_klaim_covenants
+        df = load_snapshot(filepath)
+        result = compute_klaim_covenants(df, 1, ref_date, params)
+    return {
+        'date': ref_date,
+        'test_date': result.get('test_date'),
+        'tape': tape_fingerprint(filepath),
+        'params': params_fingerprint(params),
+        'ledger_version': LEDGER_VERSION,
+        'computed_at': datetime.now().isoformat(timespec='seconds'),
+        'breach_count': result.get('breach_count', 0),
+        'covenants': _compact(result),
+    }
+
+
+def _is_current(entry: Optional[Dict], snap: Dict, params_fp: str) -> bool:
+    return bool(entry) and entry.get('ledger_version') == LEDGER_VERSION \
+        and entry.get('params') == params_fp and entry.get('tape') == tape_fingerprint(snap['filepath'])
+
+
+def update_ledger(company: str, product: str, snapshots: Optional[List[str]] = None,
+                  workers: int = 1, force: bool = False) -> Dict[str, Any]:
+    """Compute missing or stale ledger entries; returns a small report.
+
+    snapshots: tape filenames or snapshot names to limit the run to
+    (default: every tape of the product). workers > 1 fans the tapes out
+    across processes. Failures are reported per snapshot and never abort
+    the rest of the run.
+    """
+    config = load_config(company, product) or {}
+    analysis_type = config.get('analysis_type', '')
+    report = {'company': company, 'product': product, 'computed': [], 'skipped': [], 'errors': {}}
+    if analysis_type not in LEDGER_TYPES:
+        report['errors']['*'] = f"No covenant ledger for analysis_type={analysis_type!r}"
+        return report
+
+    params = facility_params(company, product, config)
+    params_fp = params_fingerprint(params)
+    ledger = load_ledger(company, product)
+    wanted = set(snapshots) if snapshots else None
+
+    todo = []
+    for snap in get_snapshots(company, product):
+        name = os.path.splitext(snap['filename'])[0]
+        if wanted is not None and snap['filename'] not in wanted and name not in wanted:
+            continue
+        if not snap['filename'].endswith(('.csv', '.xlsx', '.ods')):
+            continue
+        if not force and _is_current(ledger['snapshots'].get(name), snap, params_fp):
+            report['skipped'].append(name)
+            continue
+        todo.append((name, snap))
+
+    entries = {}
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = {name: pool.submit(compute_entry, analysis_type, snap['filepath'], snap['date'], params)
+                       for name, snap in todo}
+            for name, fut in futures.items():
+                try:
+                    entries[name] = fut.result()
+                except Exception as e:
+                    report['errors'][name] = str(e)
+    else:
+        for name, snap in todo:
+            try:
+                entries[name] = compute_entry(analysis_type, snap['filepath'], snap['date'], params)
+            except Exception as e:
+                report['errors'][name] = str(e)
+
+    for name, err in report['errors'].items():
+        logger.warning("Covenant ledger %s/%s %s failed: %s", company, product, name, err)
+    if entries:
+        _save_ledger(company, product, entries)
+    report['computed'] = sorted(entries)
+    return report
+
+
+def record_snapshot(company: str, product: str, tape_filename: str) -> Dict[str, Any]:
+    """Ledger hook for tape arrival — computes just the new tape."""
+    return update_ledger(company, product, snapshots=[tape_filename])
+
+
+# ── Readers ──────────────────────────────────────────────────────────────────
+
+def _rows(ledger: Dict[str, Any]):
+    """(name, entry, {covenant: {field: value}}) oldest-first."""
+    fields = ledger.get('fields', FIELDS)
+    for name, entry in ledger.get('snapshots', {}).items():
+        covs = {cov: dict(zip(fields, row)) for cov, row in entry.get('covenants', {}).items()}
+        yield name, entry, covs
+
+
+def ledger_history(ledger: Dict[str, Any], before: Optional[str] = None,
+                   limit: int = 24) -> Dict[str, List[Dict]]:
+    """covenant_history.json-shaped records (newest first) for EoD-ruled covenants.
+
+    before: only periods tested strictly before this date — the prior
+    periods for a covenant test run as of that date.
+    """
+    history: Dict[str, List[Dict]] = {}
+    for _, entry, covs in reversed(list(_rows(ledger))):
+        test_date = entry.get('test_date') or entry.get('date') or ''
+        if before and test_date >= str(before)[:10]:
+            continue
+        for cov, rec in covs.items():
+            if not rec.get('eod_rule'):
+                continue
+            records = history.setdefault(cov, [])
+            if len(records) < limit:
+                records.append({'period': rec.get('period') or test_date, 'compliant': rec.get('compliant'),
+                                'current': rec.get('current'), 'date': test_date, 'method': rec.get('method')})
+    return history
+
+
+def covenant_series(ledger: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-covenant trend across snapshots, oldest first."""
+    snapshots, series = [], {}
+    for name, entry, covs in _rows(ledger):
+        date = entry.get('date')
+        snapshots.append({'snapshot': name, 'date': date, 'breach_count': entry.get('breach_count', 0)})
+        for cov, rec in covs.items():
+            series.setdefault(cov, []).append({
+                'snapshot': name, 'date': date, 'current': rec.get('current'),
+                'threshold': rec.get('threshold'), 'compliant': rec.get('compliant'),
+                'available': rec.get('available'), 'method': rec.get('method'),
+            })
+    return {'snapshots': snapshots, 'series': series}
+
+
+def ledger_entry(ledger: Dict[str, Any], snapshot_name: str,
+                 params_fp: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+    """Covenant rows for one snapshot, or None when missing / computed with other params."""
+    entry = ledger.get('snapshots', {}).get(snapshot_name)
+    if not entry or entry.get('ledger_version') != LEDGER_VERSION:
+        return None
+    if params_fp is not None and entry.get('params') != params_fp:
+        return None
+    fields = ledger.get('fields', FIELDS)
+    return {cov: dict(zip(fields, row)) for cov, row in entry.get('covenants', {}).items()}
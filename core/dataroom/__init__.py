@@ -14,11 +14,20 @@ Usage:
     hits = engine.search("Tamara", "KSA", "covenant compliance")
 """
 
-from .engine import DataRoomEngine
-from .classifier import DocumentType, classify_document
-from .chunker import chunk_document
-from .parsers import get_parser, PARSER_REGISTRY
-from .parsers.base import ParseResult, BaseParser
+import importlib
+
+# Exports resolve on first access so importing one submodule (e.g. the
+# chunker or classifier) doesn't pull in the engine and every parser.
+_EXPORTS = {
+    "DataRoomEngine": ".engine",
+    "DocumentType": ".classifier",
+    "classify_document": ".classifier",
+    "chunk_document": ".chunker",
+    "get_parser": ".parsers",
+    "PARSER_REGISTRY": ".parsers",
+    "ParseResult": ".parsers.base",
+    "BaseParser": ".parsers.base",
+}
 
 __all__ = [
     "DataRoomEngine",
@@ -30,3 +39,12 @@ __all__ = [
     "ParseResult",
     "BaseParser",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
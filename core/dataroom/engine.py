@@ -84,7 +84,7 @@ _SUPPORTED_EXTENSIONS = {
 # and any future engine-written state that lives inside the dataroom dir.
 _EXCLUDE_FILENAMES = {"config.json", "methodology.json", "registry.json",
                       "index.pkl", "meta.json", "ingest_log.jsonl",
-                      "covenant_history.json", "facility_params.json",
+                      "covenant_history.json", "covenant_ledger.json", "facility_params.json",
                       "debtor_validation.json", "payment_schedule.json"}
 
 # Directories to skip during recursive scan (prevents ingesting engine output)
@@ -0,0 +1,501 @@
+"""
+core/facility_whatif.py
+Facility what-if engine — borrowing base, headroom and covenant pass/fail
+for many facility_params variants against one tape.
+
+The portfolio functions in core/portfolio.py recompute eligibility, ageing
+and per-group exposure from the raw tape for a single facility_params dict.
+Treasury sweeps advance rates, concentration thresholds, facility_drawn and
+cash balances interactively, so that work was repeated for every slider
+position even though none of it depends on the parameters.
+
+Here the tape-dependent state is built once per (tape, as-of, currency):
+  - param-free covenant / limit values are taken from the portfolio
+    functions themselves, so the grid can never disagree with the pages;
+  - the pieces a parameter can move are kept as arrays — outstanding by
+    deal age (suffix sums answer "outstanding older than N days" for any
+    N), outstanding per payer group / shop (threshold excess is a matrix
+    op across variants).
+`evaluate(state, base_params, variants)` then scores every variant with
+numpy in one call. Each variant is a dict of facility_params overrides on
+top of the saved params; results match calling compute_*_borrowing_base /
+concentration_limits / covenants with the merged params.
+
+States are cached process-wide (LRU LAITH_WHATIF_STATE_CACHE_SIZE, default
+32), keyed by the caller on tape identity. Entries for live snapshots also
+expire after LAITH_WHATIF_STATE_TTL seconds (default 300) — those take
+Integration API writes during the day without changing identity.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.analysis_silq import (
+    _dpd, _ensure_str_shop_id, C_OUTSTANDING, C_SHOP_ID, C_STATUS,
+)
+from core.portfolio import (
+    APPROVED_RECIPIENT_LIMIT, CONC_TIERS,
+    _klaim_deal_age_days, _klaim_outstanding,
+    compute_concentration_limits, compute_covenants,
+    compute_klaim_concentration_limits, compute_klaim_covenants,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_VARIANTS = 5000
+
+_STATE_CACHE_SIZE = int(os.getenv("LAITH_WHATIF_STATE_CACHE_SIZE", "32"))
+_STATE_TTL_SECONDS = float(os.getenv("LAITH_WHATIF_STATE_TTL", "300"))
+
+# Numeric facility_params each engine understands, with the defaults the
+# portfolio functions use when a key is absent.
+KLAIM_PARAMS = {
+    'advance_rate': 0.90, 'cash_balance': 0, 'facility_limit': 0, 'facility_drawn': 0,
+    'ineligibility_age_days': 91, 'single_payer_limit': 0.10,
+    'single_receivable_limit': 0.005, 'top10_limit': 0.50, 'single_customer_limit': 0.10,
+    'extended_age_limit': 0.05, 'wal_threshold_days': 70, 'extended_age_upper_days': 90,
+    'par30_limit': 0.07, 'par60_limit': 0.05, 'collection_ratio_limit': 0.25,
+    'paid_vs_due_limit': 0.95, 'cash_ratio_limit': 3.0,
+    'net_cash_burn': 0, 'net_cash_burn_3m_avg': None,
+    'parent_cash_balance': 0, 'parent_net_cash_burn': 0, 'parent_net_cash_burn_3m_avg': None,
+}
+SILQ_PARAMS = {
+    'advance_rate': 0.80, 'cash_balance': 0, 'facility_limit': 0, 'facility_drawn': 0,
+    'equity_injection': 0, 'usd_rate': 0.2667,
+}
+
+
+def _suffix_sum(sorted_keys: np.ndarray, suffix: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Σ values with key > t for each t, given keys sorted ascending and suffix sums."""
+    return suffix[np.searchsorted(sorted_keys, thresholds, side='right')]
+
+
+def _excess(amounts: np.ndarray, base: np.ndarray, limit: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-variant (Σ excess over base*limit, any breach) for group amounts.
+
+    amounts: (G,), base: (V,), limit: (V,) or (V, G). A group breaches when
+    amount / base > limit; bases <= 0 never breach.
+    """
+    if amounts.size == 0:
+        zero = np.zeros(len(base))
+        return zero, zero.astype(bool)
+    lim = limit if limit.ndim == 2 else limit[:, None]
+    allowed = base[:, None] * lim
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(base[:, None] > 0, amounts[None, :] / np.where(base > 0, base, 1)[:, None], 0)
+    over = (pct > lim) & (base[:, None] > 0)
+    return np.where(over, amounts[None, :] - allowed, 0).sum(axis=1), over.any(axis=1)
+
+
+# ── Tape state ───────────────────────────────────────────────────────────────
+
+@dataclass
+class FacilityState:
+    """Everything facility_params cannot change, for one tape + as-of + currency."""
+    analysis_type: str
+    mult: float
+    ref_date: Any
+    total_ar: float
+    # Outstanding by age / DPD key: sorted keys + suffix sums (len n+1)
+    age_keys: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    age_suffix: np.ndarray = field(default_factory=lambda: np.zeros(1))
+    group_out: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    group_ids: List[str] = field(default_factory=list)
+    payer_out: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    fixed: Dict[str, Any] = field(default_factory=dict)
+    built_s: float = 0.0
+
+    def outstanding_older_than(self, days: np.ndarray) -> np.ndarray:
+        return _suffix_sum(self.age_keys, self.age_suffix, days)
+
+
+def _age_index(age: np.ndarray, out: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Undated deals never satisfy an age comparison, so they drop out here
+    keep = ~np.isnan(age)
+    age, out = age[keep], out[keep]
+    order = np.argsort(age, kind='stable')
+    suffix = np.concatenate([np.cumsum(out[order][::-1])[::-1], [0.0]])
+    return age[order].astype(float), suffix
+
+
+def _covenant_map(result: Dict) -> Dict[str, Dict]:
+    return {c['name']: c for c in result.get('covenants', [])}
+
+
+def _limit_map(result: Dict) -> Dict[str, Dict]:
+    return {l['name']: l for l in result.get('limits', [])}
+
+
+def build_klaim_state(df, mult=1, ref_date=None) -> FacilityState:
+    t0 = time.perf_counter()
+    active = df[df['Status'] == 'Executed'].copy() if 'Status' in df.columns else df.copy()
+    outstanding = _klaim_outstanding(active, mult)
+    out = outstanding.to_numpy(dtype=float)
+    age = _klaim_deal_age_days(active, ref_date).to_numpy(dtype=float)
+    age_keys, age_suffix = _age_index(age, out)
+
+    inelig_denied = 0.0
+    if 'Purchase value' in active.columns and 'Denied by insurance' in active.columns:
+        denied_pct = active['Denied by insurance'].fillna(0) / active['Purchase value'].replace(0, 1)
+        inelig_denied = float(outstanding[denied_pct > 0.5].sum())
+
+    active['_out'] = outstanding
+    group_out = (active.groupby('Group')['_out'].sum() if 'Group' in active.columns else None)
+    payer_col = next((c for c in ('Payer', 'Insurance company', 'Group') if c in active.columns), None)
+    payer_out = active.groupby(payer_col)['_out'].sum().to_numpy(dtype=float) if payer_col else np.zeros(0)
+
+    covenants = _covenant_map(compute_klaim_covenants(df, mult, ref_date, {}))
+    limits = _limit_map(compute_klaim_concentration_limits(df, mult, ref_date, {}))
+    total_ar = float(outstanding.sum())
+    fixed = {
+        'inelig_denied': inelig_denied,
+        'wal_active': covenants['Weighted average life of receivables']['current'],
+        'par30': covenants['PAR30 (Portfolio at Risk > 30 days)']['current'],
+        'par60': covenants['PAR60 (Portfolio at Risk > 60 days)']['current'],
+        'collection_ratio': covenants['Collection Ratio (cumulative)']['current'],
+        'paid_vs_due': covenants['Paid vs Due Ratio']['current'],
+        'max_receivable_pct': limits['Single receivable limit']['current'],
+        'top10_pct': limits['Top-10 Receivables Concentration']['current'],
+        'worst_customer_pct': limits['Single customer concentration']['current'],
+        'worst_payer_pct': limits['Single payer concentration']['current'],
+        'has_group': 'Group' in active.columns,
+        'has_payer': payer_col is not None,
+    }
+    return FacilityState(
+        analysis_type='klaim', mult=mult, ref_date=ref_date, total_ar=total_ar,
+        age_keys=age_keys, age_suffix=age_suffix,
+        group_out=group_out.to_numpy(dtype=float) if group_out is not None else np.zeros(0),
+        group_ids=[str(g) for g in group_out.index] if group_out is not None else [],
+        payer_out=payer_out, fixed=fixed, built_s=round(time.perf_counter() - t0, 4),
+    )
+
+
+def build_silq_state(df, mult=1, ref_date=None) -> FacilityState:
+    t0 = time.perf_counter()
+    df = _ensure_str_shop_id(df)
+    active = df[df[C_STATUS] != 'Closed'].copy() if C_STATUS in df.columns else df.copy()
+    has_out = C_OUTSTANDING in active.columns
+    total_ar = float(active[C_OUTSTANDING].sum() * mult) if has_out else 0.0
+    dpd = _dpd(active, ref_date)
+    inelig_dpd = float(active.loc[dpd > 60, C_OUTSTANDING].sum() * mult) if has_out else 0.0
+
+    shop_out = None
+    if C_SHOP_ID in active.columns and has_out:
+        shop_out = active.groupby(C_SHOP_ID)[C_OUTSTANDING].sum() * mult
+
+    covenants = _covenant_map(compute_covenants(df, mult, ref_date, {}))
+    limits = _limit_map(compute_concentration_limits(df, mult, ref_date, {}))
+    fixed_covenants = {name: {'current': c['current'], 'compliant': c['compliant'],
+                              'available': c['available'], 'partial': c['partial']}
+                       for name, c in covenants.items() if name != 'Loan-to-Value Ratio'}
+    fixed_limits = {name: l['compliant'] for name, l in limits.items()
+                    if name != 'Single Borrower Limit'}
+    fixed = {
+        'inelig_dpd': inelig_dpd,
+        'total_receivables': float(df[C_OUTSTANDING].sum() * mult) if C_OUTSTANDING in df.columns else 0.0,
+        'covenants': fixed_covenants,
+        'limits': fixed_limits,
+    }
+    return FacilityState(
+        analysis_type='silq', mult=mult, ref_date=ref_date, total_ar=total_ar,
+        group_out=shop_out.to_numpy(dtype=float) if shop_out is not None else np.zeros(0),
+        group_ids=[str(s) for s in shop_out.index] if shop_out is not None else [],
+        fixed=fixed, built_s=round(time.perf_counter() - t0, 4),
+    )
+
+
+def build_facility_state(analysis_type: str, df, mult=1, ref_date=None) -> FacilityState:
+    if analysis_type == 'silq':
+        return build_silq_state(df, mult, ref_date)
+    if analysis_type == 'klaim':
+        return build_klaim_state(df, mult, ref_date)
+    raise ValueError(f"What-if analysis is not available for analysis_type={analysis_type!r}")
+
+
+# ── Variants ─────────────────────────────────────────────────────────────────
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    """Cartesian product of {param: [values]} as a list of override dicts."""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    for k in keys:
+        if not isinstance(grid[k], (list, tuple)) or not grid[k]:
+            raise ValueError(f"Grid axis '{k}' must be a non-empty list")
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def _param(merged: List[Dict], key: str, default) -> np.ndarray:
+    try:
+        return np.array([float(p.get(key, default) if p.get(key, default) is not None else np.nan)
+                         for p in merged], dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"facility_params '{key}' must be numeric in every variant")
+
+
+def _check_keys(variants: List[Dict], known: Dict[str, Any], extra: Sequence[str] = ()) -> None:
+    for v in variants:
+        unknown = set(v) - set(known) - set(extra)
+        if unknown:
+            raise ValueError(f"Unsupported what-if parameter(s): {', '.join(sorted(unknown))}")
+
+
+def _cash_cover(merged, mult, cash_key, burn_key, burn_3m_key):
+    """Cash / max(net burn, 3M avg net burn) — mirrors compute_klaim_covenants."""
+    cash = _param(merged, cash_key, 0) * mult
+    burn = _param(merged, burn_key, 0) * mult
+    # An absent 3M average defaults to the (already converted) prior-month burn
+    burn_3m = np.array([float(p[burn_3m_key]) if p.get(burn_3m_key) is not None else np.nan
+                        for p in merged])
+    burn_3m = np.where(np.isnan(burn_3m), burn, burn_3m) * mult
+    denom = np.maximum(burn, burn_3m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(denom > 0, cash / np.where(denom > 0, denom, 1), 0.0)
+    return ratio, denom > 0
+
+
+def _evaluate_klaim(state: FacilityState, merged: List[Dict]) -> Dict[str, Any]:
+    m, fx = state.mult, state.fixed
+    total_ar = state.total_ar
+    n = len(merged)
+
+    # Borrowing base
+    inelig = state.outstanding_older_than(_param(merged, 'ineligibility_age_days', 91)) + fx['inelig_denied']
+    eligible = np.maximum(total_ar - inelig, 0)
+    payer_limit = _param(merged, 'single_payer_limit', 0.10)
+    conc_adj = _excess(state.group_out, eligible, payer_limit)[0] if fx['has_group'] else np.zeros(n)
+    eligible_after = np.maximum(eligible - conc_adj, 0)
+    adjusted_pool = eligible_after * _param(merged, 'advance_rate', 0.90)
+    cash = _param(merged, 'cash_balance', 0) * m
+    bb = adjusted_pool + cash
+    limit = _param(merged, 'facility_limit', 0) * m
+    drawn = _param(merged, 'facility_drawn', 0) * m
+    has_limit = limit != 0
+    safe_limit = np.where(has_limit, limit, 1)
+    available = np.where(has_limit, np.maximum(np.minimum(bb, limit) - drawn, 0), bb)
+    headroom = np.where(has_limit, (limit - bb) / safe_limit * 100, 0)
+
+    # Concentration limits
+    wal_days = _param(merged, 'wal_threshold_days', 70)
+    upper = _param(merged, 'extended_age_upper_days', 90)
+    ext_amount = np.where(upper > wal_days,
+                          state.outstanding_older_than(wal_days) - state.outstanding_older_than(upper), 0)
+    ext_pct = ext_amount / total_ar if total_ar > 0 else np.zeros(n)
+    ext_limit = _param(merged, 'extended_age_limit', 0.05)
+    base = np.full(n, total_ar)
+    payer_adj = _excess(state.payer_out, base, payer_limit)[0] if fx['has_payer'] else np.zeros(n)
+    limits = {
+        'Single receivable limit': fx['max_receivable_pct'] <= _param(merged, 'single_receivable_limit', 0.005),
+        'Top-10 Receivables Concentration': fx['top10_pct'] <= _param(merged, 'top10_limit', 0.50),
+        'Single customer concentration': (fx['worst_customer_pct'] <= _param(merged, 'single_customer_limit', 0.10)
+                                          if fx['has_group'] and total_ar > 0 else np.ones(n, bool)),
+        'Single payer concentration': (fx['worst_payer_pct'] <= payer_limit
+                                       if fx['has_payer'] and total_ar > 0 else np.ones(n, bool)),
+        'Extended Age Receivables Concentration Limit': ext_pct <= ext_limit,
+    }
+
+    # Covenants: (current, compliant, counted) — counted = available and not partial
+    cash_ratio, cash_ok = _cash_cover(merged, m, 'cash_balance', 'net_cash_burn', 'net_cash_burn_3m_avg')
+    parent_ratio, parent_ok = _cash_cover(merged, m, 'parent_cash_balance', 'parent_net_cash_burn',
+                                          'parent_net_cash_burn_3m_avg')
+    cash_limit = _param(merged, 'cash_ratio_limit', 3.0)
+    wal_ok = (fx['wal_active'] <= wal_days) | (ext_pct <= ext_limit)
+    everywhere = np.ones(n, bool)
+    covenants = {
+        'Minimum Consolidated Cash Balance': (cash_ratio, np.where(cash_ok, cash_ratio >= cash_limit, True), cash_ok),
+        'Weighted average life of receivables': (np.full(n, fx['wal_active']), wal_ok, everywhere),
+        'PAR30 (Portfolio at Risk > 30 days)': (np.full(n, fx['par30']),
+                                                fx['par30'] < _param(merged, 'par30_limit', 0.07), everywhere),
+        'PAR60 (Portfolio at Risk > 60 days)': (np.full(n, fx['par60']),
+                                                fx['par60'] < _param(merged, 'par60_limit', 0.05), everywhere),
+        'Collection Ratio (cumulative)': (np.full(n, fx['collection_ratio']),
+                                          fx['collection_ratio'] >= _param(merged, 'collection_ratio_limit', 0.25),
+                                          ~everywhere),
+        'Paid vs Due Ratio': (np.full(n, fx['paid_vs_due']),
+                              fx['paid_vs_due'] >= _param(merged, 'paid_vs_due_limit', 0.95), everywhere),
+        'Parent Minimum Cash Balance': (parent_ratio, np.where(parent_ok, parent_ratio >= cash_limit, True), parent_ok),
+    }
+    return {
+        'borrowing_base': bb, 'eligible_ar': eligible, 'ineligible': inelig,
+        'concentration_adjustment': conc_adj, 'adjusted_pool_balance': adjusted_pool,
+        'available_to_draw': available, 'headroom_pct': headroom,
+        'payer_concentration_adjustment': payer_adj, 'extended_age_pct': ext_pct,
+        'limits': limits, 'covenants': covenants,
+    }
+
+
+def _silq_tier(drawn_usd: np.ndarray) -> np.ndarray:
+    caps = np.array([cap for cap, _ in CONC_TIERS])
+    pcts = np.array([pct for _, pct in CONC_TIERS])
+    idx = np.minimum(np.searchsorted(caps, drawn_usd, side='left'), len(caps) - 1)
+    return pcts[idx]
+
+
+def _evaluate_silq(state: FacilityState, merged: List[Dict]) -> Dict[str, Any]:
+    m, fx = state.mult, state.fixed
+    n = len(merged)
+    total_ar = state.total_ar
+    drawn_raw = _param(merged, 'facility_drawn', 0)
+    threshold = _silq_tier(drawn_raw * _param(merged, 'usd_rate', 0.2667))
+
+    # Per-shop limit: approved recipients get the flat limit, others the tier
+    shop_limit = np.repeat(threshold[:, None], len(state.group_ids), axis=1)
+    col = {s: i for i, s in enumerate(state.group_ids)}
+    for v, p in enumerate(merged):
+        for s in p.get('approved_recipients', None) or []:
+            if str(s) in col:
+                shop_limit[v, col[str(s)]] = APPROVED_RECIPIENT_LIMIT
+    base = np.full(n, total_ar)
+    inelig_conc, borrower_breach = _excess(state.group_out, base, shop_limit)
+
+    eligible = np.maximum(total_ar - (fx['inelig_dpd'] + inelig_conc), 0)
+    bb = eligible * _param(merged, 'advance_rate', 0.80)
+    limit = _param(merged, 'facility_limit', 0) * m
+    drawn = drawn_raw * m
+    has_limit = limit != 0
+    safe_limit = np.where(has_limit, limit, 1)
+    available = np.where(has_limit, np.maximum(np.minimum(bb, limit) - drawn, 0), bb)
+    headroom = np.where(has_limit, available / safe_limit * 100, 0)
+
+    cash = _param(merged, 'cash_balance', 0) * m
+    equity = _param(merged, 'equity_injection', 0) * m
+    denom = fx['total_receivables'] + cash + equity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ltv = np.where(denom > 0, (drawn - cash) / np.where(denom > 0, denom, 1), 0.0)
+    ltv_ok = drawn > 0
+
+    limits = {'Single Borrower Limit': ~borrower_breach}
+    limits.update({name: np.full(n, ok) for name, ok in fx['limits'].items()})
+    covenants = {name: (np.full(n, c['current']), np.full(n, c['compliant']),
+                        np.full(n, c['available'] and not c['partial']))
+                 for name, c in fx['covenants'].items()}
+    covenants['Loan-to-Value Ratio'] = (ltv, np.where(ltv_ok, ltv <= 0.75, True), ltv_ok)
+    return {
+        'borrowing_base': bb, 'eligible_ar': eligible,
+        'ineligible': fx['inelig_dpd'] + inelig_conc, 'concentration_adjustment': inelig_conc,
+        'available_to_draw': available, 'headroom_pct': headroom,
+        'concentration_threshold': threshold,
+        'limits': limits, 'covenants': covenants,
+    }
+
+
+def evaluate(state: FacilityState, base_params: Optional[Dict] = None,
+             variants: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    """Score every variant (facility_params overrides) against a cached state.
+
+    Returns {'grid': [...], 'covenant_names': [...], 'limit_names': [...]}
+    with one row per variant in input order. Covenants that are unavailable
+    or partial for a variant report compliant=None and are not counted,
+    matching the breach counts on the covenant page.
+    """
+    variants = variants if variants is not None else [{}]
+    if not variants:
+        raise ValueError("No what-if variants given")
+    if len(variants) > MAX_VARIANTS:
+        raise ValueError(f"At most {MAX_VARIANTS} what-if variants per call (got {len(variants)})")
+    if state.analysis_type == 'silq':
+        _check_keys(variants, SILQ_PARAMS, extra=('approved_recipients',))
+        engine = _evaluate_silq
+    else:
+        _check_keys(variants, KLAIM_PARAMS)
+        engine = _evaluate_klaim
+    base_params = dict(base_params or {})
+    merged = [{**base_params, **v} for v in variants]
+    out = engine(state, merged)
+
+    covenants, limits = out.pop('covenants'), out.pop('limits')
+    scalars = {k: np.asarray(v, dtype=float) for k, v in out.items()}
+    grid = []
+    for i, v in enumerate(variants):
+        row: Dict[str, Any] = {'params': v}
+        row.update({k: float(a[i]) for k, a in scalars.items()})
+        cov_rows, breaches = {}, 0
+        for name, (current, compliant, counted) in covenants.items():
+            ok = bool(compliant[i]) if bool(counted[i]) else None
+            breaches += ok is False
+            cov_rows[name] = {'current': float(current[i]), 'compliant': ok}
+        lim_rows = {name: bool(flags[i]) for name, flags in limits.items()}
+        row['covenants'] = cov_rows
+        row['covenant_breaches'] = breaches
+        row['covenants_pass'] = breaches == 0
+        row['limits'] = lim_rows
+        row['limit_breaches'] = sum(1 for ok in lim_rows.values() if not ok)
+        grid.append(row)
+    return {
+        'analysis_type': state.analysis_type,
+        'variants': len(grid),
+        'covenant_names': list(covenants),
+        'limit_names': list(limits),
+        'grid': grid,
+    }
+
+
+# ── State cache ──────────────────────────────────────────────────────────────
+
+class FacilityStateCache:
+    """Thread-safe LRU cache of FacilityState keyed by tape identity.
+
+    The TTL applies only to entries stored with expires=True (live
+    snapshots, whose data changes under a fixed identity).
+    """
+
+    def __init__(self, max_entries: int = _STATE_CACHE_SIZE, ttl_seconds: float = _STATE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, bool, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any],
+                     expires: bool = True) -> Tuple[Any, bool]:
+        """Return (value, hit). Builds outside the lock; errors are not cached.
+
+        expires=False keeps the entry until LRU eviction — for keys that
+        already change whenever the underlying data does.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (not entry[1] or now - entry[0] <= self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[2], True
+            self._entries.pop(key, None)
+            self._misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = (time.time(), expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'ttl_seconds': self.ttl_seconds, 'hits': self._hits, 'misses': self._misses,
+                    'hit_rate': round(self._hits / total, 4) if total else 0.0}
+
+
+_state_cache = FacilityStateCache()
+
+
+def get_state_cache() -> FacilityStateCache:
+    return _state_cache
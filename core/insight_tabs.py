@@ -0,0 +1,61 @@
+"""
+Insight Tabs — which dashboard tabs carry an AI insight panel, per analysis type.
+
+Single source of truth for the `tab` value the panel sends to
+/ai-tab-insight. The product config endpoint serves INSIGHT_TABS for the
+product's analysis type as `insight_tabs`; the frontend's ChartTab looks its
+sidebar slug up there, and AI pregeneration sweeps exactly these values — so
+a pregenerated insight has the same cache key as the panel's request.
+
+Keys are sidebar slugs (config.json `tabs`), values the insight `tab`
+parameter. Analysis types without an entry have no tab insight panels.
+"""
+
+# Insight panels request agent mode (TabInsight.jsx, AICommentary.jsx and the
+# streamed executive summary all run the analyst agent)
+PANEL_MODE = 'agent'
+
+INSIGHT_TABS = {
+    'klaim': {
+        'actual-vs-expected': 'actual-vs-expected',
+        'deployment':         'deployment',
+        'collection':         'collection-velocity',
+        'collections-timing': 'collections-timing',
+        'denial-trend':       'denial-trend',
+        'ageing':             'ageing',
+        'revenue':            'revenue',
+        'portfolio-tab':      'concentration',
+        'cohort-analysis':    'cohort',
+        'loss-waterfall':     'loss-waterfall',
+        'recovery-analysis':  'recovery-analysis',
+        'returns':            'returns',
+        'underwriting-drift': 'underwriting-drift',
+        'segment-analysis':   'segment-analysis',
+        'seasonality':        'seasonality',
+        'cdr-ccr':            'cdr-ccr',
+        'risk-migration':     'risk-migration',
+    },
+    'silq': {
+        'delinquency':        'delinquency',
+        'collections':        'collections',
+        'concentration':      'concentration',
+        'cohort-analysis':    'cohort',
+        'yield-margins':      'yield-margins',
+        'tenure':             'tenure',
+        'covenants':          'covenants',
+        'seasonality':        'seasonality',
+        'loss-waterfall':     'loss-waterfall',
+        'underwriting-drift': 'underwriting-drift',
+        'cdr-ccr':            'cdr-ccr',
+    },
+}
+
+
+def insight_tab_map(analysis_type):
+    """Sidebar slug → insight tab for an analysis type ({} when it has no panels)."""
+    return dict(INSIGHT_TABS.get(analysis_type, {}))
+
+
+def insight_tabs(analysis_type):
+    """Distinct insight tab values for an analysis type, in sidebar order."""
+    return list(dict.fromkeys(INSIGHT_TABS.get(analysis_type, {}).values()))
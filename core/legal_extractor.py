@@ -23,8 +23,6 @@ import time
 import logging
 from datetime import datetime, timezone
 
-import anthropic
-
 from core.legal_parser import (
     parse_legal_document,
     save_parsed_cache,
@@ -44,6 +42,7 @@ _client = None
 def _get_client():
     global _client
     if _client is None:
+        import anthropic
         _client = anthropic.Anthropic()
     return _client
 
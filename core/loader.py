@@ -2,6 +2,8 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from core.telemetry import timed_load
+
 # Resolve data directory relative to project root
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # this is the core/ folder
 BASE_DIR = os.path.dirname(BASE_DIR)  # go up one level to credit-platform/
@@ -29,7 +31,7 @@ def get_snapshots(company, product):
     
     # Known non-data files to exclude from snapshot discovery
     _EXCLUDE = {'config.json', 'methodology.json', 'covenant_history.json',
-                 'facility_params.json', 'debtor_validation.json'}
+                 'covenant_ledger.json', 'facility_params.json', 'debtor_validation.json'}
     for file in os.listdir(product_path):
         if file in _EXCLUDE:
             continue
@@ -346,4 +348,10 @@ def select_snapshot(company, product):
             print(f"\nLoading: {selected['filename']}")
             return selected
         except ValueError:
-            print("Please enter a valid number")
\ No newline at end of file
+            print("Please enter a valid number")
+
+
+# Tape load + parse latency (core.telemetry); the API's tape caches record hit/miss
+load_snapshot = timed_load(load_snapshot)
+load_silq_snapshot = timed_load(load_silq_snapshot)
+load_aajil_snapshot = timed_load(load_aajil_snapshot)
@@ -24,11 +24,20 @@ Usage:
     pdf_bytes = export_memo_pdf(memo, "Tamara", "KSA")
 """
 
-from .templates import get_template, list_templates, SourceLayer, MEMO_TEMPLATES
-from .analytics_bridge import AnalyticsBridge
-from .generator import MemoGenerator
-from .storage import MemoStorage
-from .pdf_export import export_memo_pdf
+import importlib
+
+# Exports resolve on first access so importing the templates (the API
+# lists them) doesn't load the generator and the reportlab PDF exporter.
+_EXPORTS = {
+    "get_template": ".templates",
+    "list_templates": ".templates",
+    "SourceLayer": ".templates",
+    "MEMO_TEMPLATES": ".templates",
+    "AnalyticsBridge": ".analytics_bridge",
+    "MemoGenerator": ".generator",
+    "MemoStorage": ".storage",
+    "export_memo_pdf": ".pdf_export",
+}
 
 __all__ = [
     "get_template",
@@ -40,3 +49,12 @@ __all__ = [
     "MemoStorage",
     "export_memo_pdf",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -10,16 +10,32 @@ Supports all analysis types:
   - silq: POS lending (raw tape)
   - ejari_summary: Rent Now Pay Later (ODS workbook)
   - tamara_summary: BNPL data room (JSON snapshot)
+
+Computed section contexts are shared process-wide (SectionContextCache). The
+builders overlap heavily across a memo — portfolio_analytics, credit_quality
+and concentration back several section keys each across the four templates —
+and every memo job, regeneration and agent memo tool used to rebuild them from
+the tape. Entries are keyed by (company, product, resolved snapshot, display
+currency, builder) plus the tape and config file fingerprints, so a replaced
+tape or edited config never serves stale numbers. Concurrent requests for the
+same key wait on the first computation instead of running their own.
+LAITH_MEMO_CONTEXT_CACHE_SIZE (default 256) bounds the LRU and
+LAITH_MEMO_CONTEXT_CACHE_TTL seconds (default 3600) bounds FX drift on
+converted currencies.
 """
 
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import pandas as pd
 
 from core.config import load_config
-from core.loader import get_companies, get_products, get_snapshots, load_snapshot
+from core.loader import DATA_DIR, get_companies, get_products, get_snapshots, load_snapshot
 from core.analysis import (
     apply_multiplier,
     filter_by_date,
@@ -40,6 +56,12 @@ logger = logging.getLogger(__name__)
 # Project root
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
+_CONTEXT_CACHE_SIZE = int(os.getenv("LAITH_MEMO_CONTEXT_CACHE_SIZE", "256"))
+_CONTEXT_CACHE_TTL = float(os.getenv("LAITH_MEMO_CONTEXT_CACHE_TTL", "3600"))
+
+# Config files that change builder output without changing the tape
+_CONTEXT_FILES = ("config.json", "facility_params.json", "methodology.json")
+
 
 def _safe(v):
     """Convert to JSON-safe Python type."""
@@ -153,6 +175,97 @@ def _attach_disclosure(metric: dict, dct, field_name: str) -> dict:
     return metric
 
 
+
+# ── Shared computed-context cache ───────────────────────────────────────────
+
+class _NoTapeData(Exception):
+    """Raised inside a cached computation when the tape can't be loaded, so
+    the miss isn't cached and the caller returns the no-data context."""
+
+def _file_fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class SectionContextCache:
+    """Thread-safe, single-flight TTL + LRU cache of section builder outputs.
+
+    `get_or_compute` returns (value, status) where status is "hit" (served
+    from cache), "joined" (waited on another thread's computation of the same
+    key) or "miss" (computed here). Exceptions are never cached — waiters
+    retry the computation themselves.
+    """
+
+    def __init__(self, max_entries: int = _CONTEXT_CACHE_SIZE,
+                 ttl_seconds: float = _CONTEXT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0, "joined": 0, "evictions": 0}
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], dict]) -> Tuple[dict, str]:
+        status = "miss"
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and time.time() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    entry = None
+                if entry:
+                    self._entries.move_to_end(key)
+                    status = "joined" if status == "joined" else "hit"
+                    self._counts[status] += 1
+                    return entry[1], status
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            event.wait()
+            status = "joined"
+
+        try:
+            value = compute()
+        except BaseException:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+            raise
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+            self._inflight.pop(key, None)
+            self._counts["miss"] += 1
+        event.set()
+        return value, "miss"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counts["hit"] + self._counts["miss"] + self._counts["joined"]
+            served = self._counts["hit"] + self._counts["joined"]
+            return {**self._counts, "entries": len(self._entries),
+                    "hit_rate": round(served / lookups, 4) if lookups else 0.0}
+
+
+_context_cache = SectionContextCache()
+
+
+def get_context_cache() -> SectionContextCache:
+    """The process-wide section context cache."""
+    return _context_cache
+
+
 class AnalyticsBridge:
     """Pulls live analytics from tape/portfolio endpoints into memo sections.
 
@@ -163,6 +276,8 @@ class AnalyticsBridge:
     def __init__(self):
         """Initialize the bridge. No external dependencies needed."""
         self._snapshot_cache = {}
+        # Memo sections call in from parallel workers — load each tape once
+        self._load_lock = threading.Lock()
 
     # ── Data loading ────────────────────────────────────────────────────────
 
@@ -177,10 +292,11 @@ class AnalyticsBridge:
 
         Returns (None, None, None, None, None) if data is unavailable.
         """
-        cache_key = (company, product, snapshot)
-        if cache_key in self._snapshot_cache:
-            return self._snapshot_cache[cache_key]
+        with self._load_lock:
+            return self._load_data_locked(company, product, snapshot)
 
+    def _load_data_locked(self, company: str, product: str,
+                          snapshot: Optional[str]) -> tuple:
         try:
             config = load_config(company, product)
             if not config:
@@ -191,23 +307,17 @@ class AnalyticsBridge:
 
             # Summary-only types (Ejari, Tamara) do not have raw tapes
             if analysis_type in ("ejari_summary", "tamara_summary"):
-                result = (None, config, None, None, None)
-                self._snapshot_cache[cache_key] = result
-                return result
+                return None, config, None, None, None
 
-            snapshots = get_snapshots(company, product)
-            if not snapshots:
+            snap = self._resolve_snapshot(company, product, snapshot)
+            if snap is None:
                 logger.warning("No snapshots for %s/%s", company, product)
                 return None, config, None, None, None
 
-            # Pick the requested snapshot or the latest
-            if snapshot:
-                snap = next(
-                    (s for s in snapshots if s["filename"] == snapshot),
-                    snapshots[-1],
-                )
-            else:
-                snap = snapshots[-1]
+            # Keyed on the resolved file so "latest" follows a new tape
+            cache_key = (company, product, snap["filename"])
+            if cache_key in self._snapshot_cache:
+                return self._snapshot_cache[cache_key]
 
             aux = None
 
@@ -233,6 +343,34 @@ class AnalyticsBridge:
             logger.error("Failed to load data for %s/%s: %s", company, product, e)
             return None, None, None, None, None
 
+    @staticmethod
+    def _resolve_snapshot(company: str, product: str,
+                          snapshot: Optional[str] = None) -> Optional[dict]:
+        """The requested snapshot by filename, else the latest; None if none."""
+        snapshots = get_snapshots(company, product)
+        if not snapshots:
+            return None
+        if snapshot:
+            return next((s for s in snapshots if s["filename"] == snapshot),
+                        snapshots[-1])
+        return snapshots[-1]
+
+    def _context_key(self, company: str, product: str, snapshot: Optional[str],
+                     currency: str, builder: str) -> Optional[Tuple]:
+        """Cache key for one builder's output, or None when the tape can't
+        be resolved (the call is then computed uncached)."""
+        try:
+            snap = self._resolve_snapshot(company, product, snapshot)
+        except Exception:
+            return None
+        if snap is None:
+            return None
+        product_dir = os.path.join(DATA_DIR, company, product)
+        return (company, product, snap["filename"], currency, builder,
+                _file_fingerprint(snap["filepath"]),
+                tuple(_file_fingerprint(os.path.join(product_dir, f))
+                      for f in _CONTEXT_FILES))
+
     def _load_summary_data(self, company: str, product: str) -> Optional[dict]:
         """Load pre-computed summary data for Ejari/Tamara types."""
         try:
@@ -275,13 +413,13 @@ class AnalyticsBridge:
           - text: pre-formatted narrative paragraph
           - charts_data: raw data dict for reference
           - available: whether analytics data was found
+          - cache: {status, builder, snapshot} for tape-backed builders —
+            status is hit / joined / miss against the shared
+            SectionContextCache (or "uncached" when the tape can't be keyed)
 
         Handles gracefully when data is unavailable.
         """
-        df, config, snap_fn, snap_date, aux = self._load_data(
-            company, product, snapshot
-        )
-
+        config = load_config(company, product)
         analysis_type = config.get("analysis_type", "") if config else ""
         reported_ccy = config.get("currency", "USD") if config else "USD"
         display_ccy = currency or reported_ccy
@@ -292,18 +430,12 @@ class AnalyticsBridge:
                 company, product, section_key, analysis_type
             )
 
-        # If no DataFrame, return empty context
-        if df is None:
-            return {
-                "metrics": [],
-                "text": f"No tape data available for {company}/{product}.",
-                "charts_data": {},
-                "available": False,
-            }
-
-        mult = apply_multiplier(config, display_ccy)
-        is_silq = analysis_type == "silq" or company.lower() == "silq"
-        is_aajil = analysis_type == "aajil" or company.lower() == "aajil"
+        no_tape = {
+            "metrics": [],
+            "text": f"No tape data available for {company}/{product}.",
+            "charts_data": {},
+            "available": False,
+        }
 
         # Dispatch to the appropriate section builder
         builder_map = {
@@ -323,6 +455,8 @@ class AnalyticsBridge:
 
         builder = builder_map.get(section_key)
         if builder is None:
+            if not config or self._resolve_snapshot(company, product, snapshot) is None:
+                return no_tape
             return {
                 "metrics": [],
                 "text": "",
@@ -330,12 +464,30 @@ class AnalyticsBridge:
                 "available": True,
             }
 
-        try:
+        def _compute() -> dict:
+            df, cfg, _snap_fn, snap_date, aux = self._load_data(
+                company, product, snapshot
+            )
+            if df is None:
+                raise _NoTapeData()
+            mult = apply_multiplier(cfg, display_ccy)
+            is_silq = analysis_type == "silq" or company.lower() == "silq"
+            is_aajil = analysis_type == "aajil" or company.lower() == "aajil"
             return builder(
-                df, config, mult, display_ccy, snap_date,
+                df, cfg, mult, display_ccy, snap_date,
                 is_silq=is_silq, is_aajil=is_aajil, aux=aux,
                 company=company, product=product,
             )
+
+        builder_name = builder.__name__.replace("_build_", "", 1)
+        key = self._context_key(company, product, snapshot, display_ccy, builder_name)
+        try:
+            if key is None:
+                ctx, status = _compute(), "uncached"
+            else:
+                ctx, status = _context_cache.get_or_compute(key, _compute)
+        except _NoTapeData:
+            return no_tape
         except Exception as e:
             logger.error("Analytics bridge error for section '%s': %s",
                          section_key, e)
@@ -346,6 +498,14 @@ class AnalyticsBridge:
                 "available": False,
             }
 
+        # Cached dicts are shared — hand out copies of the mutable top level
+        return {
+            **ctx,
+            "metrics": [dict(m) for m in ctx.get("metrics", [])],
+            "cache": {"status": status, "builder": builder_name,
+                      "snapshot": key[2] if key else None},
+        }
+
     def _get_summary_section_context(self, company: str, product: str,
                                      section_key: str,
                                      analysis_type: str) -> dict:
@@ -7,7 +7,12 @@ Stages:
   3. Auto Sections      — cheap templated content (Haiku) — parallel with stage 2
   4. Research Packs     — short-burst agent runs per judgment section (Sonnet, 5-turn cap)
   5. Judgment Synthesis — one Opus call per judgment section, sequential (for coherence)
-  6. Polish Pass        — single Opus call rewriting the whole memo for coherence
+  6. Polish Pass        — per-section Opus call with the whole memo as coherence context
+
+The stages are not run as barriers. Each section's generation, citation audit
+and polish are nodes in a dependency graph (core.memo.scheduler) — a section
+is audited as soon as it is drafted and polished as soon as its own audit and
+the full draft body are in, while slower sections are still being written.
 
 Model routing (all via core.ai_client):
   auto       → Haiku 4    (appendix)
@@ -17,8 +22,8 @@ Model routing (all via core.ai_client):
   polish     → Opus 4.7   (final whole-memo pass)
 
 Rate-limit engineering: retries handled by core.ai_client.get_client() with max_retries=3.
-A `LAITH_PARALLEL_SECTIONS` env var (default 3) caps concurrent stage-2 calls to
-avoid bursting past org ITPM limits.
+A `LAITH_PARALLEL_SECTIONS` env var (default 3) caps concurrent model calls across
+the whole graph to avoid bursting past org ITPM limits.
 """
 
 from __future__ import annotations
@@ -27,6 +32,8 @@ import concurrent.futures
 import json
 import logging
 import os
+import re
+import threading
 import time
 import uuid
 from datetime import datetime, timezone
@@ -34,6 +41,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from .templates import get_template, MEMO_TEMPLATES
 from .analytics_bridge import AnalyticsBridge
+from .scheduler import DAGScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +90,38 @@ def classify_section(section_def: Dict[str, Any]) -> str:
     return "structured"
 
 
+def section_dependencies(sections: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Map each section key to the section keys whose drafts it reads.
+
+    A template section may declare `depends_on: [keys]`; keys not present in
+    this memo (custom section subsets) are dropped. Undeclared sections get the
+    pipeline default: structured/auto sections read nothing, judgment sections
+    read every non-judgment section plus the judgment sections before them in
+    template order (the coherence chain the sequential stage 5 used to give).
+    The order of each list is the order drafts are shown to the section as
+    prior context: declared lists follow template order, the judgment default
+    puts body sections first and then earlier judgment sections.
+    """
+    keys = [s["key"] for s in sections]
+    order = {k: i for i, k in enumerate(keys)}
+    body = [s["key"] for s in sections if classify_section(s) != "judgment"]
+    deps: Dict[str, List[str]] = {}
+    judgment_seen: List[str] = []
+    for s in sections:
+        key = s["key"]
+        declared = s.get("depends_on")
+        if declared is not None:
+            wanted = {k for k in declared if k in order and k != key}
+            deps[key] = sorted(wanted, key=order.__getitem__)
+        elif classify_section(s) == "judgment":
+            deps[key] = body + judgment_seen
+        else:
+            deps[key] = []
+        if classify_section(s) == "judgment":
+            judgment_seen = judgment_seen + [key]
+    return deps
+
+
 # ── Prompt builders ──────────────────────────────────────────────────────────
 
 def _build_section_system_prompt(company: str, product: str,
@@ -197,6 +237,108 @@ def _build_prior_text(prior_sections: List[Dict[str, Any]], char_cap_per_section
     return "\n\n".join(parts)
 
 
+# ── Section context budget ───────────────────────────────────────────────────
+
+_DATAROOM_HIT_SPLIT = re.compile(r"\n\n(?=\[\d+\] Source: )")
+
+
+def _fit_section_context(section: Dict[str, Any], analytics_text: str, research_text: str,
+                         research_pack_text: str, prior_sections: List[Dict[str, Any]]
+                         ) -> Tuple[str, str, str, str, Dict[str, Any]]:
+    """Fit a section's user-prompt context to LAITH_CONTEXT_BUDGET_MEMO_SECTION.
+
+    Analytics is always kept (the section's numbers come from it). The
+    research pack, data room hits and prior sections compete for the rest
+    by priority and relevance to the section guidance; overlapping data
+    room hits are deduped. Judgment sections late in a memo carry every
+    prior section, which is where most of the savings come from.
+
+    Returns (analytics, research, research_pack, prior, budget_report).
+    """
+    from core.context_budget import ContextBlock, context_budget, pack
+
+    blocks = []
+    if analytics_text:
+        blocks.append(ContextBlock("analytics", analytics_text, "analytics", required=True))
+    if research_pack_text:
+        blocks.append(ContextBlock("research_pack", research_pack_text, "research_pack",
+                                   priority=3, truncatable=True))
+    for i, hit in enumerate(_DATAROOM_HIT_SPLIT.split(research_text) if research_text else []):
+        blocks.append(ContextBlock(f"dataroom:{i + 1}", hit, "dataroom", priority=2, truncatable=True))
+    for ps in prior_sections:
+        text = _build_prior_text([ps])
+        if text:
+            blocks.append(ContextBlock(f"prior:{ps.get('key', '')}", text, "prior", priority=1))
+
+    result = pack(blocks, context_budget("memo_section"),
+                  query=f"{section.get('title', '')} {section.get('guidance', '')}")
+    return (
+        result.text(source="analytics"),
+        result.text(source="dataroom"),
+        result.text(source="research_pack"),
+        result.text(source="prior"),
+        result.report(),
+    )
+
+
+# ── Polish eligibility ───────────────────────────────────────────────────────
+
+def _is_polishable(section: Dict[str, Any]) -> bool:
+    """Skip errored/auto/empty sections. Sections with generated_by unset
+    (e.g. hand-assembled fixtures) are still eligible; only explicit "error"
+    placeholders are excluded."""
+    return bool((section.get("content") or "").strip()
+                and section.get("generated_by") != "error"
+                and section.get("source") != _SOURCE_AUTO)
+
+
+def _polish_crash_record(key: str, e: BaseException) -> Dict[str, Any]:
+    return {"key": key, "content": None, "error": f"future_crash: {e}",
+            "tokens_in": 0, "tokens_out": 0, "cache_read": 0,
+            "elapsed": 0, "model": None}
+
+
+# ── Citation audit source excerpts ───────────────────────────────────────────
+
+# Cap on distinct sources searched per memo — keeps audit prompts bounded.
+_MAX_AUDIT_SOURCES = 30
+
+
+class _SourceExcerpts:
+    """Lazily-fetched data room excerpts shared by every section audit.
+
+    Audits now start as soon as their section is drafted rather than after
+    the whole memo, so excerpts can't be prefetched up front. Each source is
+    searched at most once (the lock serialises the lookup) and the first
+    _MAX_AUDIT_SOURCES distinct sources asked for are the only ones searched.
+    """
+
+    def __init__(self, dataroom: Any, company: str, product: str):
+        self._dataroom = dataroom
+        self._company = company
+        self._product = product
+        self._cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, source: str) -> Optional[str]:
+        with self._lock:
+            if source in self._cache:
+                return self._cache[source]
+            if len(self._cache) >= _MAX_AUDIT_SOURCES:
+                return None
+            text = None
+            try:
+                hits = self._dataroom.search(self._company, self._product, source, top_k=2)
+                if hits:
+                    excerpts = [(h.get("text") or h.get("content") or "")[:300]
+                                for h in hits[:2]]
+                    text = "\n---\n".join(excerpts)
+            except Exception as e:
+                logger.debug("Citation validation: search failed for '%s': %s", source, e)
+            self._cache[source] = text
+            return text
+
+
 # ── MemoGenerator ────────────────────────────────────────────────────────────
 
 class MemoGenerator:
@@ -328,7 +470,6 @@ class MemoGenerator:
             research_chunks = self._get_research_chunks(company, product, section_def)
 
         analytics_text = self._format_analytics(analytics_context)
-        prior_text = _build_prior_text(prior_sections or [])
 
         # Research pack (judgment sections)
         research_pack_text = ""
@@ -336,6 +477,10 @@ class MemoGenerator:
             from core.memo.agent_research import format_pack_for_prompt
             research_pack_text = format_pack_for_prompt(research_pack)
 
+        analytics_text, research_text, research_pack_text, prior_text, budget_report = \
+            _fit_section_context(section_def, analytics_text, research_chunks or "",
+                                 research_pack_text, prior_sections or [])
+
         # Mind context — use section guidance as query_text for graph-aware scoring
         mind_ctx = self._get_mind_context(
             company, product, section_key,
@@ -346,7 +491,7 @@ class MemoGenerator:
             company, product, template["name"], mind_ctx,
         )
         user_prompt = _build_section_user_prompt(
-            section_def, analytics_text, research_chunks or "",
+            section_def, analytics_text, research_text,
             prior_text, research_pack_text,
         )
 
@@ -386,6 +531,8 @@ class MemoGenerator:
             "tokens_out": resp.usage.output_tokens,
             "cache_read_tokens": meta.get("cache_read_tokens", 0),
             "elapsed_s": round(elapsed, 2),
+            "context_budget": budget_report,
+            "analytics_cache": (analytics_context or {}).get("cache"),
         }
 
         return {
@@ -470,226 +617,130 @@ class MemoGenerator:
             "generated_at": datetime.now(timezone.utc).isoformat(),
         }
 
-    # ── Stage 2+3: parallel structured + auto ───────────────────────────────
+    # ── Stage 2+3: structured + auto sections ───────────────────────────────
 
-    def _generate_parallel(self, company: str, product: str, template_key: str,
-                           sections: List[Dict[str, Any]],
-                           snapshot: Optional[str], currency: Optional[str],
-                           progress_cb: Optional[callable] = None
-                           ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Fan out structured + auto sections across a thread pool.
-
-        Returns `(sections, errors)` where `sections` is always len(input)
-        (error placeholders fill any slot whose future failed or never
-        returned), and `errors` is a list of per-section failure records.
-
-        Defensive against the Stage 2 truncation bug observed 2026-04-18:
-        - catches BaseException (SystemExit/GeneratorExit) from any future
-          so one bad task can't tear down the as_completed loop
-        - backfills None slots with explicit error objects so downstream
-          stages always see a full section list in template order
-        """
-        if not sections:
-            return [], []
-
-        max_workers = min(_PARALLEL_CAP, len(sections))
-        results: List[Optional[Dict[str, Any]]] = [None] * len(sections)
-        parallel_errors: List[Dict[str, Any]] = []
-
-        def _emit_section_error(key: str, err: str, stage: str) -> None:
-            """Emit section_error SSE event so UI can render failures."""
-            if progress_cb:
-                try:
-                    progress_cb("section_error",
-                                {"key": key, "error": err, "stage": stage})
-                except Exception:
-                    pass
-
-        def _worker(idx: int, sect: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
-            tier = classify_section(sect)
-            if progress_cb:
-                try:
-                    progress_cb("section_start", {"key": sect["key"], "tier": tier})
-                except Exception:
-                    pass
+    def _emit(self, progress_cb: Optional[callable], event: str,
+              payload: Dict[str, Any]) -> None:
+        if progress_cb:
             try:
-                out = self.generate_section(
-                    company=company, product=product,
-                    template_key=template_key, section_key=sect["key"],
-                    tier=tier,
-                    prior_sections=[],  # parallel sections don't see each other
-                    snapshot=snapshot, currency=currency,
-                )
-            except Exception as e:
-                logger.error("Parallel section '%s' failed: %s", sect["key"], e)
-                out = {
-                    "key": sect["key"], "title": sect["title"],
-                    "content": f"[Section generation failed: {e}]",
-                    "metrics": [], "citations": [],
-                    "generated_by": "error", "source": sect.get("source"),
-                    "error_detail": str(e), "error_stage": "parallel_worker",
-                }
-                _emit_section_error(sect["key"], str(e), "parallel_worker")
-            if progress_cb:
-                try:
-                    progress_cb("section_done", {"key": sect["key"], "tier": tier})
-                except Exception:
-                    pass
-            return idx, out
+                progress_cb(event, payload)
+            except Exception:
+                pass
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = [pool.submit(_worker, i, s) for i, s in enumerate(sections)]
-            for fut in concurrent.futures.as_completed(futures):
-                try:
-                    idx, section = fut.result()
-                    results[idx] = section
-                except BaseException as e:
-                    # Includes SystemExit / GeneratorExit which can leak from
-                    # progress_cb when an SSE client disconnects mid-flight.
-                    # Log with full traceback; loop continues so remaining
-                    # futures still get drained.
-                    logger.error(
-                        "Future propagated %s in parallel dispatch: %s",
-                        type(e).__name__, e, exc_info=True,
-                    )
-                    parallel_errors.append({
-                        "error": str(e),
-                        "type": type(e).__name__,
-                        "stage": "parallel_future",
-                    })
-
-        # Backfill any slots that never got a result (future crashed before
-        # returning). Each becomes an explicit error-object section so the
-        # memo has a full 12-entry section list and downstream stages can
-        # still run citation audit + polish on the sections that succeeded.
-        for idx, slot in enumerate(results):
-            if slot is None:
-                sect = sections[idx]
-                results[idx] = {
-                    "key": sect["key"], "title": sect["title"],
-                    "content": "[Section failed in parallel dispatch — see memo errors]",
-                    "metrics": [], "citations": [],
-                    "generated_by": "error", "source": sect.get("source"),
-                    "error_detail": "no_result_from_pool",
-                    "error_stage": "parallel_backfill",
-                }
-                parallel_errors.append({
-                    "section": sect["key"],
-                    "error": "no_result_from_pool",
-                    "stage": "parallel_backfill",
-                })
-                _emit_section_error(sect["key"], "no_result_from_pool",
-                                    "parallel_backfill")
+    @staticmethod
+    def _error_section(sect: Dict[str, Any], content: str, detail: str,
+                       stage: str) -> Dict[str, Any]:
+        """Explicit error-object section so downstream stages always see a
+        full section list in template order."""
+        return {
+            "key": sect["key"], "title": sect["title"],
+            "content": content,
+            "metrics": [], "citations": [],
+            "generated_by": "error", "source": sect.get("source"),
+            "error_detail": detail, "error_stage": stage,
+        }
 
-        return results, parallel_errors
+    def _generate_body_section(self, company: str, product: str, template_key: str,
+                               sect: Dict[str, Any],
+                               snapshot: Optional[str], currency: Optional[str],
+                               progress_cb: Optional[callable] = None
+                               ) -> Dict[str, Any]:
+        """Generate one structured/auto section. Body sections don't see each
+        other, so they carry no dependencies and run as soon as a worker frees
+        up. Exceptions become an error placeholder and a section_error event.
+        """
+        tier = classify_section(sect)
+        self._emit(progress_cb, "section_start", {"key": sect["key"], "tier": tier})
+        try:
+            out = self.generate_section(
+                company=company, product=product,
+                template_key=template_key, section_key=sect["key"],
+                tier=tier,
+                prior_sections=[],  # parallel sections don't see each other
+                snapshot=snapshot, currency=currency,
+            )
+        except Exception as e:
+            logger.error("Parallel section '%s' failed: %s", sect["key"], e)
+            out = self._error_section(sect, f"[Section generation failed: {e}]",
+                                      str(e), "parallel_worker")
+            self._emit(progress_cb, "section_error",
+                       {"key": sect["key"], "error": str(e), "stage": "parallel_worker"})
+        self._emit(progress_cb, "section_done", {"key": sect["key"], "tier": tier})
+        return out
 
     # ── Stage 4+5: judgment sections with research packs ────────────────────
 
-    def _generate_judgment_sections(self, company: str, product: str, template_key: str,
-                                    judgment_sections: List[Dict[str, Any]],
-                                    body_sections: List[Dict[str, Any]],
-                                    snapshot: Optional[str], currency: Optional[str],
-                                    progress_cb: Optional[callable] = None
-                                    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
-        """Sequential generation of ai_guided sections with preceding body context.
+    def _generate_judgment_section(self, company: str, product: str, template_key: str,
+                                   sect: Dict[str, Any],
+                                   prior_sections: List[Dict[str, Any]],
+                                   snapshot: Optional[str], currency: Optional[str],
+                                   progress_cb: Optional[callable] = None
+                                   ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Research pack + Opus synthesis for one ai_guided section.
 
-        Each judgment section gets a research pack first, then an Opus synthesis call.
-        Sequential order preserves coherence — each sees prior judgment sections too.
+        `prior_sections` are the drafts this section depends on (body sections
+        plus earlier judgment sections by default — see section_dependencies),
+        shown both to the research agent and to the synthesis call.
 
         Returns:
-            (sections_list, packs_by_key, errors) — the synthesized sections,
-            the raw research packs keyed by section_key, and a list of
-            per-section failure records. One section failing must not block
-            subsequent judgment sections.
+            (section, pack, errors) — the synthesized section (an error
+            placeholder on failure), the raw research pack or None, and a
+            list of failure records. Never raises on model/agent errors.
         """
         from core.memo.agent_research import generate_research_pack
 
-        out: List[Dict[str, Any]] = []
-        packs_by_key: Dict[str, Dict[str, Any]] = {}
         errors: List[Dict[str, Any]] = []
+        self._emit(progress_cb, "research_start", {"key": sect["key"]})
 
-        def _emit_section_error(key: str, err: str, stage: str) -> None:
-            if progress_cb:
-                try:
-                    progress_cb("section_error",
-                                {"key": key, "error": err, "stage": stage})
-                except Exception:
-                    pass
+        # Mind context for research pack
+        mind_ctx_str = self._get_mind_context(
+            company, product, sect["key"],
+            query_text=f"{sect.get('title', '')} {sect.get('guidance', '')}",
+        )
 
-        for sect in judgment_sections:
-            if progress_cb:
-                try:
-                    progress_cb("research_start", {"key": sect["key"]})
-                except Exception:
-                    pass
-
-            # Mind context for research pack
-            mind_ctx_str = self._get_mind_context(
-                company, product, sect["key"],
-                query_text=f"{sect.get('title', '')} {sect.get('guidance', '')}",
+        try:
+            pack = generate_research_pack(
+                company=company, product=product,
+                section_key=sect["key"],
+                section_title=sect.get("title", sect["key"]),
+                section_guidance=sect.get("guidance", ""),
+                body_so_far=prior_sections,
+                mind_ctx=mind_ctx_str,
+                max_turns=5,
             )
+        except Exception as e:
+            logger.warning("Research pack failed for '%s': %s", sect["key"], e)
+            pack = None
+            errors.append({"section": sect["key"], "error": str(e),
+                           "stage": "research_pack"})
 
-            try:
-                pack = generate_research_pack(
-                    company=company, product=product,
-                    section_key=sect["key"],
-                    section_title=sect.get("title", sect["key"]),
-                    section_guidance=sect.get("guidance", ""),
-                    body_so_far=body_sections + out,
-                    mind_ctx=mind_ctx_str,
-                    max_turns=5,
-                )
-            except Exception as e:
-                logger.warning("Research pack failed for '%s': %s", sect["key"], e)
-                pack = None
-                errors.append({"section": sect["key"], "error": str(e),
-                               "stage": "research_pack"})
-
-            if pack:
-                packs_by_key[sect["key"]] = pack
+        self._emit(progress_cb, "research_done", {"key": sect["key"],
+                                                  "has_pack": bool(pack)})
+        self._emit(progress_cb, "section_start", {"key": sect["key"], "tier": "judgment"})
 
-            if progress_cb:
-                try:
-                    progress_cb("research_done", {"key": sect["key"],
-                                                   "has_pack": bool(pack)})
-                    progress_cb("section_start", {"key": sect["key"], "tier": "judgment"})
-                except Exception:
-                    pass
-
-            # Synthesis — judgment tier (Opus) sees body + prior judgment sections.
-            # Wrap in try/except so one synthesis failure doesn't block the rest.
-            try:
-                section = self.generate_section(
-                    company=company, product=product,
-                    template_key=template_key, section_key=sect["key"],
-                    tier="judgment",
-                    prior_sections=body_sections + out,
-                    research_pack=pack,
-                    snapshot=snapshot, currency=currency,
-                )
-            except Exception as e:
-                logger.error("Judgment synthesis failed for '%s': %s",
-                             sect["key"], e, exc_info=True)
-                section = {
-                    "key": sect["key"], "title": sect["title"],
-                    "content": f"[Judgment synthesis failed: {e}]",
-                    "metrics": [], "citations": [],
-                    "generated_by": "error", "source": sect.get("source"),
-                    "error_detail": str(e), "error_stage": "judgment_synthesis",
-                }
-                errors.append({"section": sect["key"], "error": str(e),
-                               "stage": "judgment_synthesis"})
-                _emit_section_error(sect["key"], str(e), "judgment_synthesis")
-
-            out.append(section)
-
-            if progress_cb:
-                try:
-                    progress_cb("section_done", {"key": sect["key"], "tier": "judgment"})
-                except Exception:
-                    pass
-
-        return out, packs_by_key, errors
+        # Synthesis — judgment tier (Opus) sees its prior drafts. Wrapped so
+        # one synthesis failure doesn't block later judgment sections.
+        try:
+            section = self.generate_section(
+                company=company, product=product,
+                template_key=template_key, section_key=sect["key"],
+                tier="judgment",
+                prior_sections=prior_sections,
+                research_pack=pack,
+                snapshot=snapshot, currency=currency,
+            )
+        except Exception as e:
+            logger.error("Judgment synthesis failed for '%s': %s",
+                         sect["key"], e, exc_info=True)
+            section = self._error_section(sect, f"[Judgment synthesis failed: {e}]",
+                                          str(e), "judgment_synthesis")
+            errors.append({"section": sect["key"], "error": str(e),
+                           "stage": "judgment_synthesis"})
+            self._emit(progress_cb, "section_error",
+                       {"key": sect["key"], "error": str(e), "stage": "judgment_synthesis"})
+
+        self._emit(progress_cb, "section_done", {"key": sect["key"], "tier": "judgment"})
+        return section, (pack or None), errors
 
     # ── Stage 5.5: citation validation ──────────────────────────────────────
 
@@ -708,6 +759,18 @@ class MemoGenerator:
         "  - The snippet is suspiciously specific without source-matching content\n"
     )
 
+    @staticmethod
+    def _citation_entries(section: Dict[str, Any]) -> List[Tuple[int, Dict[str, Any]]]:
+        """(index, citation) pairs worth auditing in one section."""
+        entries: List[Tuple[int, Dict[str, Any]]] = []
+        for i, c in enumerate(section.get("citations") or []):
+            if not isinstance(c, dict):
+                continue
+            if not c.get("source") and not c.get("snippet"):
+                continue
+            entries.append((i, c))
+        return entries
+
     def _validate_citations(self, memo: Dict[str, Any],
                             company: str, product: str) -> List[Dict[str, Any]]:
         """Per-section citation audit — parallelized Sonnet calls.
@@ -717,8 +780,11 @@ class MemoGenerator:
         memos with many citations produced truncated JSON (one combined list
         exceeded max_tokens and failed to parse).
 
-        Source excerpts are fetched once and shared across per-section calls
-        so dataroom search cost does not scale with section count.
+        Source excerpts are fetched once per source and shared across
+        per-section calls (_SourceExcerpts) so dataroom search cost does not
+        scale with section count. generate_full_memo runs the same per-section
+        audit as graph nodes; this whole-memo form serves callers holding a
+        finished memo.
 
         An "issue" record looks like:
             {section_key, citation_index, source, reason, severity}
@@ -728,131 +794,24 @@ class MemoGenerator:
         if self._dataroom is None:
             return []
 
-        # Group citations by section_key
         by_section: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
         for s in memo.get("sections", []):
-            entries: List[Tuple[int, Dict[str, Any]]] = []
-            for i, c in enumerate(s.get("citations") or []):
-                if not isinstance(c, dict):
-                    continue
-                if not c.get("source") and not c.get("snippet"):
-                    continue
-                entries.append((i, c))
+            entries = self._citation_entries(s)
             if entries:
                 by_section[s["key"]] = entries
 
         if not by_section:
             return []
 
-        # Pre-fetch source excerpts once, shared across all section audits.
-        unique_sources = {c.get("source", "")
-                          for entries in by_section.values()
-                          for _, c in entries
-                          if c.get("source")}
-        source_excerpts: Dict[str, str] = {}
-        for src in list(unique_sources)[:30]:  # cap to keep prompt bounded
-            try:
-                hits = self._dataroom.search(company, product, src, top_k=2)
-                if hits:
-                    excerpts = []
-                    for h in hits[:2]:
-                        txt = (h.get("text") or h.get("content") or "")[:300]
-                        excerpts.append(txt)
-                    source_excerpts[src] = "\n---\n".join(excerpts)
-            except Exception as e:
-                logger.debug("Citation validation: search failed for '%s': %s", src, e)
-
-        def _audit_section(section_key: str,
-                           entries: List[Tuple[int, Dict[str, Any]]]
-                           ) -> List[Dict[str, Any]]:
-            cit_lines = []
-            relevant_sources = set()
-            for idx, c in entries:
-                cit_lines.append(
-                    f"[{section_key}::{idx}] source='{c.get('source', '')}' "
-                    f"snippet='{(c.get('snippet') or '')[:200]}'"
-                )
-                if c.get("source"):
-                    relevant_sources.add(c.get("source"))
-            citations_block = "\n".join(cit_lines)
-
-            excerpts_block = ""
-            if relevant_sources:
-                lines = ["\n--- DATA ROOM EXCERPTS (for grounding) ---"]
-                for src in relevant_sources:
-                    txt = source_excerpts.get(src)
-                    if txt:
-                        lines.append(f"\n## {src}\n{txt[:500]}")
-                excerpts_block = "\n".join(lines)
-
-            user_prompt = (
-                "Review these citations. For each one that is clearly "
-                "unverifiable, emit an issue. Return strict JSON:\n\n"
-                "```json\n"
-                '{"issues": [\n'
-                '  {"section_key": "...", "citation_index": 0, '
-                '"source": "...", "reason": "...", "severity": "low|medium|high"},\n'
-                "  ...\n"
-                "]}\n"
-                "```\n\n"
-                "If NO citations are problematic, return: {\"issues\": []}\n\n"
-                "## Citations to audit:\n\n"
-                f"{citations_block}\n"
-                f"{excerpts_block}"
-            )
-
-            from core.ai_client import complete
-            try:
-                resp = complete(
-                    tier="structured",  # Sonnet — fast, cheap
-                    system=self._CITATION_AUDIT_SYSTEM_PROMPT,
-                    messages=[{"role": "user", "content": user_prompt}],
-                    max_tokens=_MAX_TOKENS_CITATION_AUDIT,
-                    temperature=0.1,  # Deterministic: same input → same flags
-                    log_prefix=f"memo.citation_audit.{company}.{section_key}",
-                )
-            except Exception as e:
-                logger.warning("Citation audit failed for section '%s': %s",
-                               section_key, e)
-                return []
-
-            text = resp.content[0].text if resp.content else ""
-            if text.strip().startswith("```"):
-                first = text.find("{")
-                last = text.rfind("}")
-                if 0 <= first < last:
-                    text = text[first:last + 1]
-
-            try:
-                parsed = json.loads(text)
-            except json.JSONDecodeError:
-                logger.warning("Citation audit JSON parse failed for section "
-                               "'%s' — treating as no issues", section_key)
-                return []
-
-            issues = parsed.get("issues", [])
-            if not isinstance(issues, list):
-                return []
-
-            out: List[Dict[str, Any]] = []
-            for issue in issues:
-                if not isinstance(issue, dict):
-                    continue
-                out.append({
-                    "section_key": str(issue.get("section_key", "") or section_key),
-                    "citation_index": int(issue.get("citation_index", 0)) if str(issue.get("citation_index", "")).isdigit() else 0,
-                    "source": str(issue.get("source", "")),
-                    "reason": str(issue.get("reason", "")),
-                    "severity": str(issue.get("severity", "medium")).lower(),
-                })
-            return out
+        excerpts = _SourceExcerpts(self._dataroom, company, product)
 
         # Parallel execution across sections
         max_workers = min(_PARALLEL_CAP, len(by_section))
         all_issues: List[Dict[str, Any]] = []
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = [pool.submit(_audit_section, sk, entries)
+            futures = [pool.submit(self._audit_section_citations,
+                                   company, product, sk, entries, excerpts)
                        for sk, entries in by_section.items()]
             for fut in concurrent.futures.as_completed(futures):
                 try:
@@ -869,6 +828,93 @@ class MemoGenerator:
         )
         return all_issues
 
+    def _audit_section_citations(self, company: str, product: str, section_key: str,
+                                 entries: List[Tuple[int, Dict[str, Any]]],
+                                 excerpts: "_SourceExcerpts") -> List[Dict[str, Any]]:
+        """One Sonnet audit call over one section's citations. Never raises on
+        model or parse errors — those are treated as no issues."""
+        cit_lines = []
+        relevant_sources = set()
+        for idx, c in entries:
+            cit_lines.append(
+                f"[{section_key}::{idx}] source='{c.get('source', '')}' "
+                f"snippet='{(c.get('snippet') or '')[:200]}'"
+            )
+            if c.get("source"):
+                relevant_sources.add(c.get("source"))
+        citations_block = "\n".join(cit_lines)
+
+        excerpts_block = ""
+        if relevant_sources:
+            lines = ["\n--- DATA ROOM EXCERPTS (for grounding) ---"]
+            for src in relevant_sources:
+                txt = excerpts.get(src)
+                if txt:
+                    lines.append(f"\n## {src}\n{txt[:500]}")
+            excerpts_block = "\n".join(lines)
+
+        user_prompt = (
+            "Review these citations. For each one that is clearly "
+            "unverifiable, emit an issue. Return strict JSON:\n\n"
+            "```json\n"
+            '{"issues": [\n'
+            '  {"section_key": "...", "citation_index": 0, '
+            '"source": "...", "reason": "...", "severity": "low|medium|high"},\n'
+            "  ...\n"
+            "]}\n"
+            "```\n\n"
+            "If NO citations are problematic, return: {\"issues\": []}\n\n"
+            "## Citations to audit:\n\n"
+            f"{citations_block}\n"
+            f"{excerpts_block}"
+        )
+
+        from core.ai_client import complete
+        try:
+            resp = complete(
+                tier="structured",  # Sonnet — fast, cheap
+                system=self._CITATION_AUDIT_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_prompt}],
+                max_tokens=_MAX_TOKENS_CITATION_AUDIT,
+                temperature=0.1,  # Deterministic: same input → same flags
+                log_prefix=f"memo.citation_audit.{company}.{section_key}",
+            )
+        except Exception as e:
+            logger.warning("Citation audit failed for section '%s': %s",
+                           section_key, e)
+            return []
+
+        text = resp.content[0].text if resp.content else ""
+        if text.strip().startswith("```"):
+            first = text.find("{")
+            last = text.rfind("}")
+            if 0 <= first < last:
+                text = text[first:last + 1]
+
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            logger.warning("Citation audit JSON parse failed for section "
+                           "'%s' — treating as no issues", section_key)
+            return []
+
+        issues = parsed.get("issues", [])
+        if not isinstance(issues, list):
+            return []
+
+        out: List[Dict[str, Any]] = []
+        for issue in issues:
+            if not isinstance(issue, dict):
+                continue
+            out.append({
+                "section_key": str(issue.get("section_key", "") or section_key),
+                "citation_index": int(issue.get("citation_index", 0)) if str(issue.get("citation_index", "")).isdigit() else 0,
+                "source": str(issue.get("source", "")),
+                "reason": str(issue.get("reason", "")),
+                "severity": str(issue.get("severity", "medium")).lower(),
+            })
+        return out
+
     # ── Stage 6: per-section polish pass ────────────────────────────────────
 
     def _polish_memo(self, memo: Dict[str, Any]) -> Dict[str, Any]:
@@ -884,10 +930,50 @@ class MemoGenerator:
         through verbatim — only prose is rewritten. Contradictions and citation
         issues are filtered per-section so each call sees only what's relevant.
 
+        generate_full_memo runs the same per-section calls as graph nodes
+        (_polish_context once, then _polish_section per section as its audit
+        lands); this whole-memo form serves backfills and finished memos.
+
         memo["polished"] is True only when all polishable sections succeed. On
         partial failure, successful sections are applied and failed sections
         preserve their pre-polish content; per-section errors are recorded.
         """
+        polishable = [s for s in memo.get("sections", []) if _is_polishable(s)]
+        if not polishable:
+            memo["polished"] = False
+            memo.setdefault("errors", []).append({
+                "section": "polish",
+                "error": "no_polishable_sections",
+            })
+            return memo
+
+        ctx = self._polish_context(memo)
+        citation_issues = memo.get("_citation_issues", [])
+
+        # Parallel execution
+        max_workers = min(_PARALLEL_CAP, len(polishable))
+        results: List[Dict[str, Any]] = []
+        start = time.time()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(self._polish_section, ctx, s, citation_issues)
+                       for s in polishable]
+            for fut in concurrent.futures.as_completed(futures):
+                try:
+                    results.append(fut.result())
+                except BaseException as e:
+                    # Defensive: mirror Stage 2's BaseException discipline so
+                    # a SystemExit/GeneratorExit in one future can't tear down
+                    # the loop and silently skip the rest.
+                    logger.error("Polish future crashed: %s", e, exc_info=True)
+                    results.append(_polish_crash_record("?", e))
+
+        return self._apply_polish(memo, polishable, results, time.time() - start)
+
+    def _polish_context(self, memo: Dict[str, Any]) -> Dict[str, Any]:
+        """Shared inputs for every per-section polish call: the system prompt
+        (with mind context), the contradiction block from all research packs,
+        and the full draft body for cross-section coherence."""
         company = memo.get("company", "")
         product = memo.get("product", "")
         template_name = memo.get("template_name", "")
@@ -908,8 +994,6 @@ class MemoGenerator:
                     seen_desc.add(desc)
                     contradictions.append(c)
 
-        citation_issues = memo.get("_citation_issues", [])
-
         # Build full memo body once — shared coherence context for every call
         body_parts = []
         for s in memo.get("sections", []):
@@ -926,23 +1010,6 @@ class MemoGenerator:
             body_parts.append("")
         full_body = "\n".join(body_parts)
 
-        # Eligible sections — skip errored/auto/empty. Note: sections with
-        # generated_by unset (e.g. hand-assembled fixtures) are still eligible;
-        # only explicit "error" placeholders are excluded.
-        polishable = [
-            s for s in memo.get("sections", [])
-            if (s.get("content") or "").strip()
-            and s.get("generated_by") != "error"
-            and s.get("source") != _SOURCE_AUTO
-        ]
-        if not polishable:
-            memo["polished"] = False
-            memo.setdefault("errors", []).append({
-                "section": "polish",
-                "error": "no_polishable_sections",
-            })
-            return memo
-
         system_prompt = (
             f"You are a senior credit analyst at ACP polishing one section of "
             f"an IC memo for {company}/{product} ({template_name}). Your task "
@@ -986,122 +1053,107 @@ class MemoGenerator:
                 lines.append(f"   Sections involved: *{a}* vs *{b}*")
             contra_block_shared = "\n".join(lines)
 
-        def _polish_one(section: Dict[str, Any]) -> Dict[str, Any]:
-            """Polish a single section. Returns a result record (never raises)."""
-            key = section.get("key", "")
-            title = section.get("title", key)
-            original = (section.get("content") or "").strip()
-
-            # Citation issues ARE keyed by section_key, so filter per-section
-            section_citation_issues = [
-                ci for ci in citation_issues if ci.get("section_key") == key
-            ]
-
-            contra_block = contra_block_shared
-
-            cit_block = ""
-            if section_citation_issues:
-                lines = ["\n## CITATIONS FLAGGED BY VALIDATION\n",
-                         "If preserving them, qualify the claim (e.g., "
-                         "'per management commentary') or remove the citation "
-                         "marker. Do NOT invent a new source."]
-                for ci in section_citation_issues[:10]:
-                    lines.append(
-                        f"- Citation #{ci.get('citation_index')}: "
-                        f"{ci.get('source')} — {ci.get('reason', 'not found')}"
-                    )
-                cit_block = "\n".join(lines)
-
-            user_prompt = (
-                "Polish the section below. Return strict JSON:\n\n"
-                "```json\n"
-                '{"content": "polished section text ..."}\n'
-                "```\n\n"
-                "Return ONLY the JSON object, no surrounding prose.\n"
-                f"{contra_block}"
-                f"{cit_block}"
-                f"\n\n## Section to polish: {title}\n\n"
-                f"{original}\n\n"
-                "## Full memo body (for coherence — do not restate):\n\n"
-                f"{full_body}"
-            )
+        return {"company": company, "system_prompt": system_prompt,
+                "contra_block": contra_block_shared, "full_body": full_body}
 
-            from core.ai_client import complete
-            t_start = time.time()
-            try:
-                resp = complete(
-                    tier="polish",
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}],
-                    max_tokens=_MAX_TOKENS_POLISH_SECTION,
-                    log_prefix=f"memo.polish.{company}.{key}",
+    def _polish_section(self, ctx: Dict[str, Any], section: Dict[str, Any],
+                        citation_issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Polish a single section. Returns a result record (never raises)."""
+        key = section.get("key", "")
+        title = section.get("title", key)
+        original = (section.get("content") or "").strip()
+
+        # Citation issues ARE keyed by section_key, so filter per-section
+        section_citation_issues = [
+            ci for ci in citation_issues if ci.get("section_key") == key
+        ]
+
+        contra_block = ctx["contra_block"]
+
+        cit_block = ""
+        if section_citation_issues:
+            lines = ["\n## CITATIONS FLAGGED BY VALIDATION\n",
+                     "If preserving them, qualify the claim (e.g., "
+                     "'per management commentary') or remove the citation "
+                     "marker. Do NOT invent a new source."]
+            for ci in section_citation_issues[:10]:
+                lines.append(
+                    f"- Citation #{ci.get('citation_index')}: "
+                    f"{ci.get('source')} — {ci.get('reason', 'not found')}"
                 )
-            except Exception as e:
-                logger.warning("Polish call failed for section '%s': %s", key, e)
-                return {"key": key, "content": None, "error": str(e),
-                        "tokens_in": 0, "tokens_out": 0, "cache_read": 0,
-                        "elapsed": time.time() - t_start, "model": None}
-
-            elapsed_one = time.time() - t_start
-            text = resp.content[0].text if resp.content else ""
-            if text.strip().startswith("```"):
-                first_brace = text.find("{")
-                last_brace = text.rfind("}")
-                if 0 <= first_brace < last_brace:
-                    text = text[first_brace:last_brace + 1]
-
-            meta = getattr(resp, "_laith_metadata", {}) or {}
-            tin = resp.usage.input_tokens
-            tout = resp.usage.output_tokens
-            tcache = meta.get("cache_read_tokens", 0) or 0
-            model = meta.get("model")
+            cit_block = "\n".join(lines)
+
+        user_prompt = (
+            "Polish the section below. Return strict JSON:\n\n"
+            "```json\n"
+            '{"content": "polished section text ..."}\n'
+            "```\n\n"
+            "Return ONLY the JSON object, no surrounding prose.\n"
+            f"{contra_block}"
+            f"{cit_block}"
+            f"\n\n## Section to polish: {title}\n\n"
+            f"{original}\n\n"
+            "## Full memo body (for coherence — do not restate):\n\n"
+            f"{ctx['full_body']}"
+        )
 
-            try:
-                parsed = json.loads(text)
-            except json.JSONDecodeError as e:
-                logger.warning("Polish JSON parse failed for section '%s': %s",
-                               key, e)
-                return {"key": key, "content": None,
-                        "error": f"JSON parse: {e}",
-                        "tokens_in": tin, "tokens_out": tout,
-                        "cache_read": tcache, "elapsed": elapsed_one,
-                        "model": model}
-
-            new_content = parsed.get("content", "") if isinstance(parsed, dict) else ""
-            if not isinstance(new_content, str) or not new_content.strip():
-                return {"key": key, "content": None,
-                        "error": "empty_content_field",
-                        "tokens_in": tin, "tokens_out": tout,
-                        "cache_read": tcache, "elapsed": elapsed_one,
-                        "model": model}
-
-            return {"key": key, "content": new_content, "error": None,
+        from core.ai_client import complete
+        t_start = time.time()
+        try:
+            resp = complete(
+                tier="polish",
+                system=ctx["system_prompt"],
+                messages=[{"role": "user", "content": user_prompt}],
+                max_tokens=_MAX_TOKENS_POLISH_SECTION,
+                log_prefix=f"memo.polish.{ctx['company']}.{key}",
+            )
+        except Exception as e:
+            logger.warning("Polish call failed for section '%s': %s", key, e)
+            return {"key": key, "content": None, "error": str(e),
+                    "tokens_in": 0, "tokens_out": 0, "cache_read": 0,
+                    "elapsed": time.time() - t_start, "model": None}
+
+        elapsed_one = time.time() - t_start
+        text = resp.content[0].text if resp.content else ""
+        if text.strip().startswith("```"):
+            first_brace = text.find("{")
+            last_brace = text.rfind("}")
+            if 0 <= first_brace < last_brace:
+                text = text[first_brace:last_brace + 1]
+
+        meta = getattr(resp, "_laith_metadata", {}) or {}
+        tin = resp.usage.input_tokens
+        tout = resp.usage.output_tokens
+        tcache = meta.get("cache_read_tokens", 0) or 0
+        model = meta.get("model")
+
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning("Polish JSON parse failed for section '%s': %s",
+                           key, e)
+            return {"key": key, "content": None,
+                    "error": f"JSON parse: {e}",
                     "tokens_in": tin, "tokens_out": tout,
                     "cache_read": tcache, "elapsed": elapsed_one,
                     "model": model}
 
-        # Parallel execution
-        max_workers = min(_PARALLEL_CAP, len(polishable))
-        results: List[Dict[str, Any]] = []
-        start = time.time()
+        new_content = parsed.get("content", "") if isinstance(parsed, dict) else ""
+        if not isinstance(new_content, str) or not new_content.strip():
+            return {"key": key, "content": None,
+                    "error": "empty_content_field",
+                    "tokens_in": tin, "tokens_out": tout,
+                    "cache_read": tcache, "elapsed": elapsed_one,
+                    "model": model}
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = [pool.submit(_polish_one, s) for s in polishable]
-            for fut in concurrent.futures.as_completed(futures):
-                try:
-                    results.append(fut.result())
-                except BaseException as e:
-                    # Defensive: mirror Stage 2's BaseException discipline so
-                    # a SystemExit/GeneratorExit in one future can't tear down
-                    # the loop and silently skip the rest.
-                    logger.error("Polish future crashed: %s", e, exc_info=True)
-                    results.append({"key": "?", "content": None,
-                                    "error": f"future_crash: {e}",
-                                    "tokens_in": 0, "tokens_out": 0,
-                                    "cache_read": 0, "elapsed": 0, "model": None})
-
-        elapsed = time.time() - start
+        return {"key": key, "content": new_content, "error": None,
+                "tokens_in": tin, "tokens_out": tout,
+                "cache_read": tcache, "elapsed": elapsed_one,
+                "model": model}
 
+    def _apply_polish(self, memo: Dict[str, Any], polishable: List[Dict[str, Any]],
+                      results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        """Write polished prose back into memo sections and record metadata."""
         # Apply polished content — preserve metrics/citations verbatim
         polished_by_key = {r["key"]: r["content"] for r in results
                            if r.get("content") and not r.get("error")}
@@ -1197,39 +1249,145 @@ class MemoGenerator:
             except Exception:
                 pass
 
-        # Stages 2 + 3 — parallel structured + auto.
-        # Returns (sections, errors). Errors are collected for transparency;
-        # downstream stages still run on whatever succeeded.
-        body_sections, parallel_errors = self._generate_parallel(
-            company, product, template_key, non_judgment,
-            snapshot, currency, progress_cb=progress_cb,
-        )
+        # Stages 2-6 as one dependency graph (core.memo.scheduler):
+        #   gen:<key>    — section draft; judgment sections wait on the drafts
+        #                  they read (section_dependencies)
+        #   audit:<key>  — citation audit of that draft, as soon as it lands
+        #   polish:ctx   — shared polish inputs; needs every draft + pack
+        #   polish:<key> — per-section polish once polish:ctx and its own
+        #                  audit are done
+        # Shared state is written by node callables, one key per node.
+        deps = section_dependencies(sections)
+        drafts: Dict[str, Dict[str, Any]] = {}
+        research_packs: Dict[str, Dict[str, Any]] = {}
+        issues_by_key: Dict[str, List[Dict[str, Any]]] = {}
+        polish_results: Dict[str, Dict[str, Any]] = {}
+        shared: Dict[str, Any] = {}
+        parallel_errors: List[Dict[str, Any]] = []
+        judgment_errors: List[Dict[str, Any]] = []
+        run_audit = self._dataroom is not None
+        excerpts = _SourceExcerpts(self._dataroom, company, product) if run_audit else None
+
+        def _draft_node(sect: Dict[str, Any]):
+            key = sect["key"]
+            tier = classify_section(sect)
+
+            def _run() -> None:
+                try:
+                    if tier == "judgment":
+                        prior = [drafts[k] for k in deps[key] if k in drafts]
+                        section, pack, errs = self._generate_judgment_section(
+                            company, product, template_key, sect, prior,
+                            snapshot, currency, progress_cb=progress_cb,
+                        )
+                        if pack:
+                            research_packs[key] = pack
+                        judgment_errors.extend(errs)
+                    else:
+                        section = self._generate_body_section(
+                            company, product, template_key, sect,
+                            snapshot, currency, progress_cb=progress_cb,
+                        )
+                    drafts[key] = section
+                except BaseException as e:
+                    # SystemExit / GeneratorExit can leak from progress_cb when
+                    # an SSE client disconnects mid-flight. Backfill an explicit
+                    # error section so dependents still see a draft, then let
+                    # the scheduler record the node as failed.
+                    stage = "judgment_synthesis" if tier == "judgment" else "parallel_backfill"
+                    logger.error("Section node '%s' propagated %s: %s",
+                                 key, type(e).__name__, e, exc_info=True)
+                    drafts[key] = self._error_section(
+                        sect, "[Section failed in parallel dispatch — see memo errors]",
+                        "no_result_from_pool", stage)
+                    errs = judgment_errors if tier == "judgment" else parallel_errors
+                    errs.append({"error": str(e), "type": type(e).__name__,
+                                 "stage": "parallel_future"})
+                    errs.append({"section": key, "error": "no_result_from_pool",
+                                 "stage": stage})
+                    self._emit(progress_cb, "section_error",
+                               {"key": key, "error": "no_result_from_pool", "stage": stage})
+                    raise
+            return _run
+
+        def _audit_node(key: str):
+            def _run() -> None:
+                entries = self._citation_entries(drafts.get(key) or {})
+                if entries:
+                    issues_by_key[key] = self._audit_section_citations(
+                        company, product, key, entries, excerpts)
+            return _run
+
+        def _polish_ctx_node() -> None:
+            draft_sections = [drafts[s["key"]] for s in sections if s["key"] in drafts]
+            shared["polishable"] = [s for s in draft_sections if _is_polishable(s)]
+            if shared["polishable"]:
+                shared["polish_ctx"] = self._polish_context({
+                    "company": company, "product": product,
+                    "template_name": template["name"],
+                    "sections": draft_sections,
+                    "_research_packs": research_packs,
+                })
+
+        def _polish_node(key: str):
+            def _run() -> None:
+                section = drafts.get(key)
+                ctx = shared.get("polish_ctx")
+                if ctx is None or section is None or not _is_polishable(section):
+                    return
+                polish_results[key] = self._polish_section(
+                    ctx, section, issues_by_key.get(key, []))
+            return _run
+
+        def _sched_progress(event: str, payload: Dict[str, Any]) -> None:
+            # Node/stage timing passes straight through; the stage-level
+            # events the memo UI already listens for are derived from it.
+            progress_cb(event, payload)
+            stage = payload.get("stage")
+            if event == "stage_start" and stage in ("citation_audit", "polish"):
+                progress_cb(f"{stage}_start", {"memo_id": memo_id})
+            elif event == "stage_done" and stage == "citation_audit":
+                progress_cb("citation_audit_done", {
+                    "memo_id": memo_id,
+                    "issues_flagged": sum(len(v) for v in issues_by_key.values()),
+                })
+
+        sched = DAGScheduler(max_workers=_PARALLEL_CAP,
+                             progress_cb=_sched_progress if progress_cb else None)
+        for sect in sections:
+            key = sect["key"]
+            sched.add(f"gen:{key}", _draft_node(sect),
+                      deps=[f"gen:{d}" for d in deps[key]],
+                      stage="section", section=key)
+            if run_audit:
+                sched.add(f"audit:{key}", _audit_node(key), deps=[f"gen:{key}"],
+                          stage="citation_audit", section=key)
+        if polish:
+            sched.add("polish:ctx", _polish_ctx_node,
+                      deps=[f"gen:{s['key']}" for s in sections], stage="polish")
+            for sect in sections:
+                if sect.get("source") == _SOURCE_AUTO:
+                    continue
+                key = sect["key"]
+                node_deps = ["polish:ctx"] + ([f"audit:{key}"] if run_audit else [])
+                sched.add(f"polish:{key}", _polish_node(key), deps=node_deps,
+                          stage="polish", section=key)
 
-        # Preserve template order: rebuild sections list in original order,
-        # filling judgment sections with placeholders we'll replace in stage 5
+        sched_offset = time.time() - t0
+        schedule = sched.run()
+
+        # Template order; any node that somehow left no draft gets a placeholder
         final_sections: List[Dict[str, Any]] = []
-        body_by_key = {s["key"]: s for s in body_sections}
         for sect in sections:
-            if sect["key"] in body_by_key:
-                final_sections.append(body_by_key[sect["key"]])
-            else:
-                # Placeholder for judgment section; will be filled below
-                final_sections.append({"key": sect["key"], "title": sect["title"],
-                                       "content": "", "metrics": [], "citations": [],
-                                       "source": sect.get("source")})
-
-        # Stages 4 + 5 — judgment sections (sequential). Also collect raw
-        # research packs for use by contradiction-aware polish + sidecar save.
-        # Per-section failures are captured in judgment_errors; one failing
-        # section does not block the rest.
-        judgment_results, research_packs, judgment_errors = self._generate_judgment_sections(
-            company, product, template_key, judgment, body_sections,
-            snapshot, currency, progress_cb=progress_cb,
-        )
-        judgment_by_key = {s["key"]: s for s in judgment_results}
-        for i, sect in enumerate(final_sections):
-            if sect["key"] in judgment_by_key:
-                final_sections[i] = judgment_by_key[sect["key"]]
+            section = drafts.get(sect["key"])
+            if section is None:
+                section = self._error_section(
+                    sect, "[Section failed in parallel dispatch — see memo errors]",
+                    "no_result_from_pool", "parallel_backfill")
+                parallel_errors.append({"section": sect["key"],
+                                        "error": "no_result_from_pool",
+                                        "stage": "parallel_backfill"})
+            final_sections.append(section)
 
         # Build memo object
         title = f"{template['name']} \u2014 {company}"
@@ -1238,7 +1396,7 @@ class MemoGenerator:
 
         # Collect ALL error sources for the memo record:
         #   1. sections with generated_by=="error" (synthesized error objects)
-        #   2. parallel_errors (pool-level failures, e.g. GeneratorExit)
+        #   2. parallel_errors (node-level failures, e.g. GeneratorExit)
         #   3. judgment_errors (research-pack or synthesis failures)
         error_sections = [s for s in final_sections if s.get("generated_by") == "error"]
         all_errors: List[Dict[str, Any]] = []
@@ -1252,7 +1410,7 @@ class MemoGenerator:
         all_errors.extend(judgment_errors)
 
         # True only when the whole pipeline produced no usable content — used
-        # to mark the memo as status=error and skip polish.
+        # to mark the memo as status=error.
         has_any_content = any(
             (s.get("content") or "").strip()
             and s.get("generated_by") not in ("error", None)
@@ -1264,6 +1422,8 @@ class MemoGenerator:
         total_tokens_in = 0
         total_tokens_out = 0
         total_cache_read = 0
+        analytics_cache: Dict[str, Any] = {"hit": 0, "joined": 0, "miss": 0,
+                                           "uncached": 0, "sections": {}}
         for s in final_sections:
             m = s.get("generation_meta") or {}
             model = m.get("model_used")
@@ -1272,7 +1432,16 @@ class MemoGenerator:
             total_tokens_in += m.get("tokens_in", 0) or 0
             total_tokens_out += m.get("tokens_out", 0) or 0
             total_cache_read += m.get("cache_read_tokens", 0) or 0
-
+            ac = m.get("analytics_cache")
+            if ac and ac.get("status") in analytics_cache:
+                analytics_cache[ac["status"]] += 1
+                analytics_cache["sections"][s["key"]] = f"{ac['status']}:{ac.get('builder')}"
+        logger.info("Analytics context cache [%s/%s]: %d hit, %d joined, %d built",
+                    company, product, analytics_cache["hit"], analytics_cache["joined"],
+                    analytics_cache["miss"])
+
+        drafted_s = max((t["end_s"] for t in schedule.timings.values()
+                         if t["stage"] == "section"), default=0.0)
         memo = {
             "id": memo_id,
             "company": company,
@@ -1294,52 +1463,40 @@ class MemoGenerator:
                 "total_tokens_in": total_tokens_in,
                 "total_tokens_out": total_tokens_out,
                 "total_cache_read_tokens": total_cache_read,
-                "elapsed_s": round(time.time() - t0, 2),
+                "elapsed_s": round(sched_offset + drafted_s, 2),
                 "parallel_cap": _PARALLEL_CAP,
+                "analytics_cache": analytics_cache,
+                "schedule": schedule.report(),
             },
             # Transient: research packs (stripped before main save, written as sidecar).
             "_research_packs": research_packs,
         }
 
-        # Stage 5.5 — citation validation. Runs as long as there's some content
-        # to audit; no longer short-circuited by any earlier section failure
-        # (that was the 2026-04-18 bug: one Stage 2 error blocked 5.5 + 6).
-        if has_any_content:
-            if progress_cb:
-                try:
-                    progress_cb("citation_audit_start", {"memo_id": memo_id})
-                except Exception:
-                    pass
-            try:
-                citation_issues = self._validate_citations(memo, company, product)
-                if citation_issues:
-                    memo["_citation_issues"] = citation_issues
-            except Exception as e:
-                logger.warning("Citation validation crashed: %s", e)
-                citation_issues = []
-            if progress_cb:
-                try:
-                    progress_cb("citation_audit_done", {
-                        "memo_id": memo_id,
-                        "issues_flagged": len(memo.get("_citation_issues", [])),
-                    })
-                except Exception:
-                    pass
-
-        # Stage 6 — polish. Same gate: any content → run polish.
-        if polish and has_any_content:
-            if progress_cb:
-                try:
-                    progress_cb("polish_start", {"memo_id": memo_id})
-                except Exception:
-                    pass
-            memo = self._polish_memo(memo)
-            if progress_cb:
-                try:
-                    progress_cb("polish_done", {"memo_id": memo_id,
-                                                 "polished": memo.get("polished")})
-                except Exception:
-                    pass
+        # Stage 5.5 — citation issues, gathered in template order.
+        citation_issues = [i for s in sections for i in issues_by_key.get(s["key"], [])]
+        if citation_issues:
+            memo["_citation_issues"] = citation_issues
+        if run_audit:
+            logger.info("Citation audit [%s/%s]: %d issues flagged in %d sections",
+                        company, product, len(citation_issues), len(issues_by_key))
+
+        # Stage 6 — apply polish. Runs as long as there's some content; one
+        # section failing no longer blocks 5.5 + 6 (the 2026-04-18 bug).
+        if polish and has_any_content and not shared.get("polishable"):
+            memo.setdefault("errors", []).append({
+                "section": "polish",
+                "error": "no_polishable_sections",
+            })
+        elif polish and has_any_content:
+            results = list(polish_results.values())
+            results += [_polish_crash_record(t["section"], schedule.errors[k])
+                        for k, t in schedule.timings.items()
+                        if k in schedule.errors and t["stage"] == "polish" and t["section"]]
+            memo = self._apply_polish(memo, shared.get("polishable", []), results,
+                                      schedule.stage_span("polish"))
+            self._emit(progress_cb, "polish_done", {"memo_id": memo_id,
+                                                    "polished": memo.get("polished")})
+
 
         # Terminal-error emit — memo was saved but has no usable content.
         if not has_any_content and progress_cb:
@@ -0,0 +1,249 @@
+"""
+Dependency-graph scheduler for the memo pipeline.
+
+The hybrid pipeline used to run as strict phases: every structured section,
+then the judgment chain, then every citation audit, then every polish call.
+Each phase waited for its slowest member, so one slow dataroom section held
+up the judgment chain and one slow audit held up all polish calls.
+
+Here each unit of work (section generation, citation audit, polish) is a
+node that declares the nodes it reads from. A node is dispatched the moment
+its inputs are done, so full-memo wall-clock tends toward the critical path
+rather than the sum of phase maxima. Concurrency stays bounded by a single
+pool (the same LAITH_PARALLEL_SECTIONS cap the phases used) and, when more
+nodes are ready than workers are free, the node with the longest downstream
+chain goes first so the judgment chain is never starved by polish calls.
+
+Node callables never receive arguments — they close over shared state and
+read whatever their dependencies wrote there. A node that raises (including
+BaseException such as GeneratorExit leaking from an SSE progress callback)
+is recorded as failed; its dependents still run and must tolerate a missing
+input, matching the pipeline's "downstream stages run on whatever succeeded"
+contract.
+
+Per-node timing goes out through `progress_cb` as `node_start` / `node_done`
+events and is summarised in `ScheduleResult.report()` with the realised
+critical path. Nodes sharing a `stage` label also produce `stage_start` (first
+node of the stage dispatched) and `stage_done` (last one finished) events.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Node:
+    """One schedulable unit of work."""
+    key: str
+    fn: Callable[[], Any]
+    deps: Sequence[str] = ()
+    stage: str = ""
+    section: Optional[str] = None
+
+
+@dataclass
+class ScheduleResult:
+    """Outcome of a scheduler run: per-node results, errors and timings."""
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    wall_s: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_s: float = 0.0
+    max_workers: int = 1
+
+    def stage_span(self, stage: str) -> float:
+        """Wall-clock seconds from the first start to the last end of a stage."""
+        rows = [t for t in self.timings.values() if t["stage"] == stage]
+        if not rows:
+            return 0.0
+        return round(max(t["end_s"] for t in rows) - min(t["start_s"] for t in rows), 3)
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-safe summary for generation_meta."""
+        busy = sum(t["elapsed_s"] for t in self.timings.values())
+        return {
+            "max_workers": self.max_workers,
+            "nodes": len(self.timings),
+            "wall_s": round(self.wall_s, 3),
+            "busy_s": round(busy, 3),
+            "critical_path_s": round(self.critical_path_s, 3),
+            "critical_path": list(self.critical_path),
+            "failed": sorted(self.errors),
+            "timings": {k: dict(v) for k, v in self.timings.items()},
+        }
+
+
+class DAGScheduler:
+    """Run a graph of nodes on a bounded thread pool as dependencies clear."""
+
+    def __init__(self, max_workers: int = 3,
+                 progress_cb: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.progress_cb = progress_cb
+        self._nodes: Dict[str, Node] = {}
+
+    def add(self, key: str, fn: Callable[[], Any], deps: Sequence[str] = (),
+            stage: str = "", section: Optional[str] = None) -> str:
+        if key in self._nodes:
+            raise ValueError(f"Duplicate node: {key}")
+        self._nodes[key] = Node(key, fn, tuple(deps), stage, section)
+        return key
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # ── Graph helpers ───────────────────────────────────────────────────────
+
+    def _topo_order(self) -> List[str]:
+        for node in self._nodes.values():
+            for d in node.deps:
+                if d not in self._nodes:
+                    raise ValueError(f"Node '{node.key}' depends on unknown node '{d}'")
+        indeg = {k: len(set(n.deps)) for k, n in self._nodes.items()}
+        children = self._children()
+        order = [k for k in self._nodes if indeg[k] == 0]
+        i = 0
+        while i < len(order):
+            for c in children[order[i]]:
+                indeg[c] -= 1
+                if indeg[c] == 0:
+                    order.append(c)
+            i += 1
+        if len(order) != len(self._nodes):
+            stuck = sorted(k for k, v in indeg.items() if v > 0)
+            raise ValueError(f"Dependency cycle among nodes: {stuck}")
+        return order
+
+    def _children(self) -> Dict[str, List[str]]:
+        children: Dict[str, List[str]] = {k: [] for k in self._nodes}
+        for node in self._nodes.values():
+            for d in dict.fromkeys(node.deps):
+                children[d].append(node.key)
+        return children
+
+    def _emit(self, event: str, payload: Dict[str, Any]) -> None:
+        if self.progress_cb:
+            try:
+                self.progress_cb(event, payload)
+            except Exception:
+                pass
+
+    # ── Execution ───────────────────────────────────────────────────────────
+
+    def run(self) -> ScheduleResult:
+        order = self._topo_order()
+        children = self._children()
+        seq = {k: i for i, k in enumerate(self._nodes)}
+
+        # Downstream chain length (in nodes) — the dispatch priority.
+        rank: Dict[str, int] = {}
+        for k in reversed(order):
+            rank[k] = 1 + max((rank[c] for c in children[k]), default=0)
+
+        result = ScheduleResult(max_workers=self.max_workers)
+        waiting = {k: len(set(n.deps)) for k, n in self._nodes.items()}
+        ready = [k for k in self._nodes if waiting[k] == 0]
+        ready_at = {k: 0.0 for k in ready}
+        stage_left: Dict[str, int] = {}
+        for n in self._nodes.values():
+            if n.stage:
+                stage_left[n.stage] = stage_left.get(n.stage, 0) + 1
+        stage_t0: Dict[str, float] = {}
+        t0 = time.perf_counter()
+
+        def _call(key: str):
+            start = time.perf_counter()
+            try:
+                return key, start, self._nodes[key].fn(), None
+            except BaseException as e:  # noqa: BLE001 — see module docstring
+                return key, start, None, e
+
+        in_flight: Dict[concurrent.futures.Future, str] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while ready or in_flight:
+                ready.sort(key=lambda k: (-rank[k], seq[k]))
+                while ready and len(in_flight) < self.max_workers:
+                    key = ready.pop(0)
+                    node = self._nodes[key]
+                    if node.stage and node.stage not in stage_t0:
+                        stage_t0[node.stage] = time.perf_counter()
+                        self._emit("stage_start", {"stage": node.stage})
+                    self._emit("node_start", {"node": key, "stage": node.stage,
+                                              "section": node.section})
+                    in_flight[pool.submit(_call, key)] = key
+
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for fut in done:
+                    key = in_flight.pop(fut)
+                    node = self._nodes[key]
+                    end = time.perf_counter()
+                    try:
+                        _, start, value, exc = fut.result()
+                    except BaseException as e:  # pool-level failure
+                        start, value, exc = end, None, e
+                    if exc is None:
+                        result.results[key] = value
+                    else:
+                        logger.error("Memo node '%s' raised %s: %s",
+                                     key, type(exc).__name__, exc, exc_info=exc)
+                        result.errors[key] = f"{type(exc).__name__}: {exc}"
+                    timing = {
+                        "stage": node.stage,
+                        "section": node.section,
+                        "deps": list(node.deps),
+                        "queued_s": round(start - t0 - ready_at[key], 3),
+                        "start_s": round(start - t0, 3),
+                        "end_s": round(end - t0, 3),
+                        "elapsed_s": round(end - start, 3),
+                        "status": "error" if exc is not None else "done",
+                    }
+                    result.timings[key] = timing
+                    self._emit("node_done", {"node": key, **{
+                        k: timing[k] for k in ("stage", "section", "status",
+                                               "start_s", "queued_s", "elapsed_s")}})
+                    if node.stage:
+                        stage_left[node.stage] -= 1
+                        if stage_left[node.stage] == 0:
+                            self._emit("stage_done", {
+                                "stage": node.stage,
+                                "elapsed_s": round(end - stage_t0[node.stage], 3)})
+                    for c in children[key]:
+                        waiting[c] -= 1
+                        if waiting[c] == 0:
+                            ready.append(c)
+                            ready_at[c] = time.perf_counter() - t0
+
+        result.wall_s = time.perf_counter() - t0
+        self._critical_path(result, order)
+        return result
+
+    def _critical_path(self, result: ScheduleResult, order: List[str]) -> None:
+        """Longest chain of realised node durations through the graph."""
+        finish: Dict[str, float] = {}
+        via: Dict[str, Optional[str]] = {}
+        for k in order:
+            deps = self._nodes[k].deps
+            best = max(deps, key=lambda d: finish[d], default=None)
+            finish[k] = result.timings[k]["elapsed_s"] + (finish[best] if best else 0.0)
+            via[k] = best
+        if not finish:
+            return
+        tail: Optional[str] = max(order, key=lambda k: finish[k])
+        result.critical_path_s = finish[tail]
+        path: List[str] = []
+        while tail is not None:
+            path.append(tail)
+            tail = via[tail]
+        result.critical_path = path[::-1]
@@ -8,6 +8,8 @@ Each template defines an ordered list of sections with:
   - source: where the primary content comes from (SourceLayer)
   - ai_guided: whether AI generates a full narrative (vs structured data fill)
   - guidance: prompt-level instructions for AI generation
+  - depends_on: optional list of section keys whose drafts this section reads
+    (see generator.section_dependencies for the default when omitted)
 """
 
 from enum import Enum
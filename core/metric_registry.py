@@ -83,9 +83,13 @@ def metric(
         fn._metric_meta = meta
         METRIC_REGISTRY.append(meta)
 
-        @functools.wraps(fn)
-        def wrapper(*args, **kwargs):
-            return fn(*args, **kwargs)
+        # Timed wrapper: latency / input rows / output size land in /metrics
+        from core.telemetry import timed_compute
+        wrapper = timed_compute(fn)
+        if wrapper is fn:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return fn(*args, **kwargs)
         wrapper._metric_meta = meta
         return wrapper
     return decorator
@@ -19,13 +19,19 @@ build_mind_context() assembles a 6-layer knowledge context for any AI prompt:
     Layer 3   -- Methodology (codified company rules)
     Layer 4   -- Company Mind (company-level lessons)
     Layer 5   -- Thesis (investment thesis + drift alerts)
+
+The assembled layers are fitted to a token budget (core.context_budget,
+LAITH_CONTEXT_BUDGET_MIND, default 3000): entries repeated across layers
+are dropped, and when the layers overflow, the least relevant entries of
+the most general layers go first. What was dropped is recorded on
+MindLayeredContext.budget_report.
 """
 
 from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from core.mind.asset_class_mind import AssetClassMind
 from core.mind.company_mind import CompanyMind
@@ -60,6 +66,9 @@ class MindLayeredContext:
     # analysts can see which external sources fed the response.
     asset_class_sources: List[Dict[str, str]] = field(default_factory=list)
 
+    # core.context_budget report from fitting the layers (empty when unbudgeted)
+    budget_report: Dict[str, Any] = field(default_factory=dict)
+
     @property
     def formatted(self) -> str:
         """Return the full formatted context block, layers combined.
@@ -95,6 +104,37 @@ class MindLayeredContext:
         ])
 
 
+# Packing priority per layer: specific, codified knowledge outranks general
+# lessons when the budget is tight
+_LAYER_PRIORITY = {
+    "framework": 5,
+    "methodology": 4,
+    "thesis": 4,
+    "company_mind": 3,
+    "asset_class": 2,
+    "master_mind": 2,
+}
+
+
+def _fit_to_budget(ctx: MindLayeredContext, budget: Optional[int], query: str) -> MindLayeredContext:
+    """Dedupe entries across layers and pack them into `budget` tokens."""
+    from core.context_budget import join_entries, pack, split_entries
+
+    blocks = []
+    for layer, priority in _LAYER_PRIORITY.items():
+        blocks.extend(split_entries(getattr(ctx, layer), layer, priority=priority))
+    if not blocks:
+        return ctx
+    result = pack(blocks, budget, query=query)
+    for layer in _LAYER_PRIORITY:
+        setattr(ctx, layer, join_entries(result.by_source(layer)))
+    ctx.budget_report = result.report()
+    if result.dropped:
+        logger.info("build_mind_context: dropped %d entries (%d -> %d tokens, budget %s)",
+                    len(result.dropped), result.input_tokens, result.used_tokens, budget)
+    return ctx
+
+
 def _graph_query_to_formatted(mind_dir, query_text: str, header: str, categories=None, max_results: int = 15) -> tuple:
     """Use KnowledgeGraph for graph-aware retrieval, return (formatted_str, entry_count)."""
     from core.mind.graph import KnowledgeGraph
@@ -118,6 +158,7 @@ def build_mind_context(
     analysis_type: Optional[str] = None,
     section_key: Optional[str] = None,
     query_text: str = "",
+    budget_tokens: Optional[int] = None,
 ) -> MindLayeredContext:
     """Build 5-layer knowledge context for any AI prompt.
 
@@ -154,6 +195,9 @@ def build_mind_context(
                      "risk_migration"). Used by Layer 4 scoring.
         query_text: Optional query text to enable graph-aware scoring for
                     Layers 2 and 4. When empty, falls back to flat retrieval.
+        budget_tokens: Token budget for all layers combined. None uses
+                    LAITH_CONTEXT_BUDGET_MIND (default 3000); 0 disables the
+                    limit (cross-layer dedupe still applies).
 
     Returns:
         MindLayeredContext with all 5 layers assembled.
@@ -292,7 +336,7 @@ def build_mind_context(
     except Exception as e:
         logger.warning("build_mind_context: Layer 5 (thesis) failed: %s", e)
 
-    return MindLayeredContext(
+    ctx = MindLayeredContext(
         framework=framework_ctx,
         master_mind=master_formatted,
         asset_class=asset_class_formatted,
@@ -302,3 +346,12 @@ def build_mind_context(
         total_entries=total_entries,
         asset_class_sources=asset_class_sources,
     )
+
+    from core.context_budget import context_budget
+    budget = context_budget("mind") if budget_tokens is None else (budget_tokens or None)
+    query = query_text or (section_key or "").replace("_", " ") or task_type
+    try:
+        return _fit_to_budget(ctx, budget, query)
+    except Exception as e:
+        logger.warning("build_mind_context: context budgeting failed: %s", e)
+        return ctx
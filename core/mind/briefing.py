@@ -17,20 +17,31 @@ Urgency scoring:
 - Aging mind entries = LOW
 
 No AI calls — pure file I/O + computation. Target: < 3 seconds.
+
+Caching: per-company inputs (latest tape mtime, thesis pillars, learning
+rule timestamps) are gathered concurrently and memoized against the
+mtime/size of the files they were read from. The whole briefing is reused
+when no input file changed since the last build (same day, same last
+session). Independent sections build in parallel.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+_SESSIONS_DIR = _PROJECT_ROOT / "data" / "_agent_sessions"
+
+_MAX_WORKERS = 8
 
 
 @dataclass
@@ -85,16 +96,36 @@ class Briefing:
         }
 
 
-def generate_morning_briefing(data_dir: Optional[Path] = None) -> Briefing:
+@dataclass
+class CompanyInputs:
+    """Per-company/product files the briefing sections read, pre-parsed."""
+
+    latest_tape_mtime: Optional[float] = None
+    thesis_alerts: List[Dict[str, Any]] = field(default_factory=list)
+    rule_timestamps: List[str] = field(default_factory=list)
+
+
+# Fingerprint → parsed inputs, keyed by product path. Guarded by _cache_lock.
+_inputs_cache: Dict[str, Tuple[tuple, CompanyInputs]] = {}
+_briefing_cache: Dict[str, Tuple[tuple, Briefing]] = {}
+_cache_lock = threading.Lock()
+
+
+def generate_morning_briefing(
+    data_dir: Optional[Path] = None, use_cache: bool = True
+) -> Briefing:
     """Generate a complete morning briefing.
 
     Reads from existing files only — no API calls, no AI.
 
+    Args:
+        data_dir: Data root (defaults to the platform data/ directory).
+        use_cache: Return the previous briefing when no input file changed.
+
     Returns:
         Briefing object with all sections populated.
     """
     data_dir = data_dir or (_PROJECT_ROOT / "data")
-    briefing = Briefing()
 
     # Load analyst context
     from core.mind.analyst import load_analyst_context
@@ -104,38 +135,157 @@ def generate_morning_briefing(data_dir: Optional[Path] = None) -> Briefing:
     # Discover companies
     companies = _discover_companies(data_dir)
 
-    # 1. Since Last Session
-    briefing.since_last_session = _build_since_last_session(
-        companies, last_session, data_dir
+    # Fingerprint every input up front (stat only) — an unchanged fingerprint
+    # means the previous briefing is still accurate.
+    fingerprints = {co["path"]: _company_fingerprint(co) for co in companies}
+    briefing_key = (
+        date.today().isoformat(),
+        ctx.last_session_at,
+        json.dumps(getattr(ctx, "upcoming_ic_dates", {}), sort_keys=True, default=str),
+        tuple(sorted(fingerprints.items())),
+        _file_fingerprint(data_dir.parent / "reports" / "activity_log.jsonl"),
+        _sessions_fingerprint(),
     )
+    cache_id = str(data_dir.resolve())
+    if use_cache:
+        with _cache_lock:
+            cached = _briefing_cache.get(cache_id)
+        if cached and cached[0] == briefing_key:
+            return cached[1]
+
+    briefing = Briefing()
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        # Per-company inputs, gathered concurrently
+        inputs = dict(zip(
+            fingerprints,
+            pool.map(lambda co: _load_company_inputs(co, fingerprints[co["path"]]), companies),
+        ))
+
+        # Sections 1-6 don't depend on each other
+        since = pool.submit(_build_since_last_session, companies, last_session, data_dir)
+        priority = pool.submit(_build_priority_actions, companies, ctx, data_dir, inputs)
+        patterns = pool.submit(_build_cross_company_patterns, data_dir)
+        thesis = pool.submit(_build_thesis_alerts, companies, data_dir, inputs)
+        learning = pool.submit(_build_learning_summary, companies, data_dir, last_session, inputs)
+        agents = pool.submit(_build_agent_activity, last_session)
+
+        briefing.since_last_session = since.result()
+        briefing.priority_actions = priority.result()
+        briefing.cross_company_patterns = patterns.result()
+        briefing.thesis_alerts = thesis.result()
+        briefing.learning_summary = learning.result()
+        briefing.agent_activity = agents.result()
+
+    # 7. Recommendations — depends on every section above
+    briefing.recommendations = _build_recommendations(briefing)
+
+    with _cache_lock:
+        _briefing_cache[cache_id] = (briefing_key, briefing)
+    return briefing
+
+
+def clear_briefing_cache() -> None:
+    """Drop memoized company inputs and briefings."""
+    with _cache_lock:
+        _inputs_cache.clear()
+        _briefing_cache.clear()
+
 
-    # 2. Priority Actions
-    briefing.priority_actions = _build_priority_actions(
-        companies, ctx, data_dir
+def _file_fingerprint(path: Path) -> tuple:
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return ()
+
+
+def _dir_fingerprint(directory: Path, pattern: str) -> tuple:
+    if not directory.is_dir():
+        return ()
+    return tuple(sorted(
+        (p.name,) + _file_fingerprint(p) for p in directory.glob(pattern)
+    ))
+
+
+def _company_fingerprint(co: Dict[str, str]) -> tuple:
+    """mtime/size of every file CompanyInputs is derived from."""
+    co_path = Path(co["path"])
+    mind_dir = co_path.parent / "mind"
+    return (
+        _dir_fingerprint(co_path, "*.csv"),
+        _dir_fingerprint(co_path, "*.xlsx"),
+        _file_fingerprint(mind_dir / "thesis.json"),
+        _dir_fingerprint(mind_dir, "*.jsonl"),
     )
 
-    # 3. Cross-Company Patterns
+
+def _load_company_inputs(co: Dict[str, str], fingerprint: tuple) -> CompanyInputs:
+    """Parse one company's inputs, reusing the memo while files are unchanged."""
+    key = co["path"]
+    with _cache_lock:
+        cached = _inputs_cache.get(key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    co_path = Path(co["path"])
+    mind_dir = co_path.parent / "mind"
+    inputs = CompanyInputs()
+
+    # Tape freshness
+    tapes = list(co_path.glob("*.csv")) + list(co_path.glob("*.xlsx"))
+    if tapes:
+        inputs.latest_tape_mtime = max(f.stat().st_mtime for f in tapes)
+
+    # Thesis pillars under pressure
+    thesis_path = mind_dir / "thesis.json"
+    if thesis_path.exists():
+        try:
+            with open(thesis_path, "r", encoding="utf-8") as f:
+                thesis_data = json.load(f)
+            for pillar in thesis_data.get("pillars", []):
+                if pillar.get("status") in ("weakening", "broken"):
+                    inputs.thesis_alerts.append({
+                        "company": co["company"],
+                        "pillar": pillar.get("claim", ""),
+                        "status": pillar.get("status"),
+                        "last_value": pillar.get("last_value"),
+                        "threshold": pillar.get("threshold"),
+                        "conviction_score": pillar.get("conviction_score", 0),
+                    })
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    # Learning rules — keep timestamps so "new since last session" is a
+    # comparison, not a re-read
+    for jsonl_file in mind_dir.glob("*.jsonl"):
+        try:
+            with open(jsonl_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if '"node_type": "rule"' in line or '"auto_generated": true' in line:
+                        ts = ""
+                        try:
+                            ts = json.loads(line.strip()).get("timestamp", "")
+                        except (json.JSONDecodeError, AttributeError):
+                            pass
+                        inputs.rule_timestamps.append(ts)
+        except OSError:
+            continue
+
+    with _cache_lock:
+        _inputs_cache[key] = (fingerprint, inputs)
+    return inputs
+
+
+def _build_cross_company_patterns(data_dir: Path) -> List[Dict[str, Any]]:
+    """Top cross-company patterns from the intelligence engine."""
     try:
         from core.mind.intelligence import IntelligenceEngine
         engine = IntelligenceEngine(data_dir)
         patterns = engine.detect_cross_company_patterns()
-        briefing.cross_company_patterns = [p.to_dict() for p in patterns[:5]]
+        return [p.to_dict() for p in patterns[:5]]
     except Exception as e:
         logger.warning("Pattern detection failed: %s", e)
-
-    # 4. Thesis Alerts
-    briefing.thesis_alerts = _build_thesis_alerts(companies, data_dir)
-
-    # 5. Learning Summary
-    briefing.learning_summary = _build_learning_summary(companies, data_dir, last_session)
-
-    # 6. Agent Activity
-    briefing.agent_activity = _build_agent_activity(last_session)
-
-    # 7. Recommendations
-    briefing.recommendations = _build_recommendations(briefing)
-
-    return briefing
+        return []
 
 
 def _parse_timestamp(ts: str) -> Optional[datetime]:
@@ -190,25 +340,12 @@ def _build_since_last_session(
             severity="info",
         ))
 
-    # Check activity log for recent events
+    # Check activity log for recent events — time-range read stops at the
+    # first event before last_session instead of parsing the whole log
     activity_path = data_dir.parent / "reports" / "activity_log.jsonl"
     if activity_path.exists():
-        new_events = 0
-        try:
-            with open(activity_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        event = json.loads(line)
-                        ts = _parse_timestamp(event.get("timestamp", ""))
-                        if ts and ts > last_session:
-                            new_events += 1
-                    except json.JSONDecodeError:
-                        continue
-        except OSError:
-            pass
+        from core.activity_log import read_activity_range
+        new_events = len(read_activity_range(start=last_session, log_path=activity_path))
 
         if new_events > 0:
             items.append(BriefingItem(
@@ -221,7 +358,8 @@ def _build_since_last_session(
 
 
 def _build_priority_actions(
-    companies: List[Dict], ctx: Any, data_dir: Path
+    companies: List[Dict], ctx: Any, data_dir: Path,
+    inputs: Optional[Dict[str, CompanyInputs]] = None,
 ) -> List[BriefingItem]:
     """Build prioritized action items."""
     items = []
@@ -229,15 +367,12 @@ def _build_priority_actions(
 
     for co in companies:
         company = co["company"]
-        product = co["product"]
-        co_path = Path(co["path"])
+        co_inputs = _inputs_for(co, inputs)
 
         # Check tape freshness
-        tapes = list(co_path.glob("*.csv")) + list(co_path.glob("*.xlsx"))
-        if tapes:
-            latest = max(tapes, key=lambda f: f.stat().st_mtime)
+        if co_inputs.latest_tape_mtime is not None:
             days_old = (now - datetime.fromtimestamp(
-                latest.stat().st_mtime, tz=timezone.utc
+                co_inputs.latest_tape_mtime, tz=timezone.utc
             )).days
             if days_old > 60:
                 items.append(BriefingItem(
@@ -279,57 +414,31 @@ def _build_priority_actions(
 
 
 def _build_thesis_alerts(
-    companies: List[Dict], data_dir: Path
+    companies: List[Dict], data_dir: Path,
+    inputs: Optional[Dict[str, CompanyInputs]] = None,
 ) -> List[Dict[str, Any]]:
     """Check all theses for drift alerts."""
     alerts = []
     for co in companies:
-        thesis_path = Path(co["path"]).parent / "mind" / "thesis.json"
-        if not thesis_path.exists():
-            continue
-        try:
-            with open(thesis_path, "r", encoding="utf-8") as f:
-                thesis_data = json.load(f)
-            for pillar in thesis_data.get("pillars", []):
-                if pillar.get("status") in ("weakening", "broken"):
-                    alerts.append({
-                        "company": co["company"],
-                        "pillar": pillar.get("claim", ""),
-                        "status": pillar.get("status"),
-                        "last_value": pillar.get("last_value"),
-                        "threshold": pillar.get("threshold"),
-                        "conviction_score": pillar.get("conviction_score", 0),
-                    })
-        except (json.JSONDecodeError, OSError):
-            continue
+        alerts.extend(_inputs_for(co, inputs).thesis_alerts)
     return alerts
 
 
 def _build_learning_summary(
-    companies: List[Dict], data_dir: Path, last_session: Optional[datetime]
+    companies: List[Dict], data_dir: Path, last_session: Optional[datetime],
+    inputs: Optional[Dict[str, CompanyInputs]] = None,
 ) -> Dict[str, Any]:
     """Summarize learning rules generated since last session."""
     total_rules = 0
     new_rules = 0
 
     for co in companies:
-        mind_dir = Path(co["path"]).parent / "mind"
-        for jsonl_file in mind_dir.glob("*.jsonl"):
-            try:
-                with open(jsonl_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if '"node_type": "rule"' in line or '"auto_generated": true' in line:
-                            total_rules += 1
-                            if last_session:
-                                try:
-                                    d = json.loads(line.strip())
-                                    ts = _parse_timestamp(d.get("timestamp", ""))
-                                    if ts and ts > last_session:
-                                        new_rules += 1
-                                except (json.JSONDecodeError, KeyError):
-                                    pass
-            except OSError:
-                continue
+        for raw_ts in _inputs_for(co, inputs).rule_timestamps:
+            total_rules += 1
+            if last_session:
+                ts = _parse_timestamp(raw_ts)
+                if ts and ts > last_session:
+                    new_rules += 1
 
     return {
         "total_rules": total_rules,
@@ -337,29 +446,45 @@ def _build_learning_summary(
     }
 
 
+def _inputs_for(
+    co: Dict[str, str], inputs: Optional[Dict[str, CompanyInputs]]
+) -> CompanyInputs:
+    """Pre-gathered inputs for a company, loading on demand if absent."""
+    if inputs and co["path"] in inputs:
+        return inputs[co["path"]]
+    return _load_company_inputs(co, _company_fingerprint(co))
+
+
+def _sessions_fingerprint() -> tuple:
+    """The session index changes on every save. In WAL mode recent writes
+    land in the -wal file until a checkpoint, so both are covered."""
+    from core.agents.session_store import INDEX_FILENAME
+    index = _SESSIONS_DIR / INDEX_FILENAME
+    return (_file_fingerprint(index), _file_fingerprint(index.with_name(INDEX_FILENAME + "-wal")))
+
+
 def _build_agent_activity(last_session: Optional[datetime]) -> Dict[str, Any]:
     """Summarize agent session activity since last analyst login."""
-    sessions_dir = _PROJECT_ROOT / "data" / "_agent_sessions"
-    if not sessions_dir.exists():
+    if not _SESSIONS_DIR.exists():
         return {"total_sessions": 0, "sessions": []}
 
-    import json
+    from core.agents.session_store import get_store
     cutoff = last_session.timestamp() if last_session else 0
     recent = []
 
-    for path in sessions_dir.glob("*.json"):
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if data.get("last_active", 0) > cutoff:
-                recent.append({
-                    "agent": data.get("agent_name", "?"),
-                    "company": data.get("metadata", {}).get("company", "?"),
-                    "product": data.get("metadata", {}).get("product", "?"),
-                    "turns": data.get("turn_count", 0),
-                    "tokens": data.get("total_input_tokens", 0) + data.get("total_output_tokens", 0),
-                })
-        except Exception:
-            continue
+    try:
+        summaries = get_store(_SESSIONS_DIR).active_since(cutoff)
+    except Exception as e:
+        logger.warning("Agent session index unreadable: %s", e)
+        summaries = []
+    for s in summaries:
+        recent.append({
+            "agent": s.get("agent_name", "?"),
+            "company": s.get("metadata", {}).get("company", "?"),
+            "product": s.get("metadata", {}).get("product", "?"),
+            "turns": s.get("turn_count", 0),
+            "tokens": s.get("total_input_tokens", 0) + s.get("total_output_tokens", 0),
+        })
 
     recent.sort(key=lambda s: s.get("tokens", 0), reverse=True)
 
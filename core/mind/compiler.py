@@ -29,6 +29,7 @@ from typing import Any, Dict, List, Optional
 
 from core.mind.schema import KnowledgeNode, Relation, make_node
 from core.mind.relation_index import RelationIndex
+from core.mind.entity_index import EntityIndex
 from core.mind.entity_extractor import ExtractedEntity
 
 logger = logging.getLogger(__name__)
@@ -265,6 +266,13 @@ class KnowledgeCompiler:
                     ))
 
         self._save_report(report)
+
+        # Fold the nodes appended above into the cross-company lookup index
+        try:
+            EntityIndex(self.mind_dir).sync()
+        except Exception as e:
+            logger.warning("Entity index sync failed for %s/%s: %s", company, product, e)
+
         logger.info(
             "Compilation complete for %s/%s from %s: %d created, %d superseded, "
             "%d reinforced, %d contradictions",
@@ -0,0 +1,212 @@
+"""
+Entity Index — Compiled per-company lookup over entities.jsonl.
+
+Stored per scope as JSON: data/{company}/mind/entity_index.json
+Maps entity_type → entity_key → time-ordered [timestamp, node_id, value]
+rows, so cross-company detectors answer "how many recent values does
+company X have for metric Y" with a bisect instead of re-parsing every
+entity node.
+
+Kept current incrementally: entities.jsonl is append-only, so `sync()`
+parses only the bytes written since the last sync (tracked as
+`source_bytes`). A shrunk or replaced source triggers a full rebuild.
+KnowledgeCompiler.compile calls `sync()` after every run; readers call it
+too, which costs a single stat() when nothing changed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from core.mind.schema import upgrade_entry
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+# Parsed indexes keyed by index path, reused while the file is unchanged
+_loaded: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_loaded_lock = threading.Lock()
+
+
+def _normalize_ts(ts: str) -> str:
+    """UTC ISO timestamp for ordering; '' when unparseable."""
+    try:
+        value = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return ""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+class EntityIndex:
+    """Per-company compiled index of entity nodes.
+
+    Structure::
+
+        {
+          "version": 1,
+          "source_bytes": 12345,
+          "entities": {"METRIC": {"par_30": [[ts, node_id, value], ...]}, ...}
+        }
+
+    Rows are sorted by timestamp. Rows with an unparseable timestamp are
+    stored with ts '' (sorting first) and always count as recent, matching
+    the detectors' historical behaviour.
+    """
+
+    def __init__(self, mind_dir: Path):
+        self.mind_dir = Path(mind_dir)
+        self._source = self.mind_dir / "entities.jsonl"
+        self._path = self.mind_dir / "entity_index.json"
+        self._data = self._load()
+
+    # ── Persistence ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {"version": _INDEX_VERSION, "source_bytes": 0, "entities": {}}
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            st = self._path.stat()
+        except OSError:
+            return self._empty()
+        fingerprint = (st.st_mtime_ns, st.st_size)
+        key = str(self._path)
+        with _loaded_lock:
+            cached = _loaded.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("EntityIndex: failed to load %s: %s", self._path, e)
+            return self._empty()
+        if data.get("version") != _INDEX_VERSION:
+            return self._empty()
+        with _loaded_lock:
+            _loaded[key] = (fingerprint, data)
+        return data
+
+    def _save(self) -> None:
+        """Atomically save the index to disk."""
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.mind_dir), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, str(self._path))
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        st = self._path.stat()
+        with _loaded_lock:
+            _loaded[str(self._path)] = ((st.st_mtime_ns, st.st_size), self._data)
+
+    # ── Incremental compilation ──────────────────────────────────────────
+
+    def sync(self) -> int:
+        """Index entity nodes appended since the last sync.
+
+        Returns:
+            Number of nodes added.
+        """
+        try:
+            size = self._source.stat().st_size
+        except OSError:
+            size = 0
+        offset = self._data.get("source_bytes", 0)
+        if size == offset:
+            return 0
+        if size < offset:
+            # Source was rewritten — start over
+            self._data = self._empty()
+            offset = 0
+
+        # Copy-on-write: the loaded dict may be shared via _loaded
+        self._data = json.loads(json.dumps(self._data))
+        added = 0
+        with open(self._source, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial trailing write — pick it up next sync
+                offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    d = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if self._add(d):
+                    added += 1
+        self._data["source_bytes"] = offset
+        self.mind_dir.mkdir(parents=True, exist_ok=True)
+        self._save()
+        return added
+
+    def _add(self, d: Dict[str, Any]) -> bool:
+        upgrade_entry(d)
+        meta = d.get("metadata") or {}
+        entity_type = meta.get("entity_type", "")
+        entity_key = meta.get("entity_key", "")
+        if not entity_type or not entity_key:
+            return False
+        row = [_normalize_ts(d.get("timestamp", "")), d.get("id", ""), meta.get("value")]
+        rows = self._data["entities"].setdefault(entity_type, {}).setdefault(entity_key, [])
+        if not rows or rows[-1][0] <= row[0]:
+            rows.append(row)
+        else:
+            rows.insert(bisect.bisect_right(rows, row[0], key=_row_ts), row)
+        return True
+
+    # ── Lookups ──────────────────────────────────────────────────────────
+
+    def keys(self, entity_type: str) -> List[str]:
+        """Entity keys of a type present in this company."""
+        return list(self._data["entities"].get(entity_type, {}))
+
+    def values(self, entity_type: str, entity_key: str) -> List[List[Any]]:
+        """Time-ordered [timestamp, node_id, value] rows for one entity."""
+        return list(self._data["entities"].get(entity_type, {}).get(entity_key, []))
+
+    def recent_count(self, entity_type: str, entity_key: str, cutoff: datetime) -> int:
+        """Number of rows at or after `cutoff` (undated rows always count)."""
+        rows = self._data["entities"].get(entity_type, {}).get(entity_key, [])
+        return _count_since(rows, _normalize_ts(cutoff.isoformat()))
+
+    def recent_counts(self, entity_type: str, cutoff: datetime) -> Dict[str, int]:
+        """entity_key → recent row count, for keys with at least one."""
+        cutoff_ts = _normalize_ts(cutoff.isoformat())
+        counts = {}
+        for key, rows in self._data["entities"].get(entity_type, {}).items():
+            n = _count_since(rows, cutoff_ts)
+            if n:
+                counts[key] = n
+        return counts
+
+
+def _row_ts(row: List[Any]) -> str:
+    return row[0]
+
+
+def _count_since(rows: List[List[Any]], cutoff_ts: str) -> int:
+    """Rows with ts >= cutoff_ts plus undated ('' — sorted first) rows."""
+    if not rows:
+        return 0
+    undated = bisect.bisect_right(rows, "", key=_row_ts) if rows[0][0] == "" else 0
+    since = bisect.bisect_left(rows, cutoff_ts, lo=undated, key=_row_ts)
+    return undated + len(rows) - since
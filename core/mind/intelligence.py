@@ -7,6 +7,10 @@ Scans all company mind entries for:
 - Same covenant type under pressure across companies
 
 Scoring: companies_affected × severity × recency.
+
+Detectors read each company's compiled EntityIndex (metric/risk/covenant
+key → time-ordered values) rather than re-parsing entities.jsonl, so a
+scan costs O(companies × distinct keys) instead of O(all entity nodes).
 """
 
 from __future__ import annotations
@@ -19,6 +23,7 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from core.mind.entity_index import EntityIndex
 from core.mind.schema import KnowledgeNode, upgrade_entry
 
 logger = logging.getLogger(__name__)
@@ -123,6 +128,16 @@ class IntelligenceEngine:
                 continue
         return nodes
 
+    def _load_entity_index(self, mind_dir: Path) -> EntityIndex:
+        """Load a company's compiled entity index, catching up on any
+        entities appended since it was last synced."""
+        index = EntityIndex(mind_dir)
+        try:
+            index.sync()
+        except OSError as e:
+            logger.warning("Entity index sync failed for %s: %s", mind_dir, e)
+        return index
+
     def detect_cross_company_patterns(
         self,
         lookback_days: int = 30,
@@ -139,63 +154,39 @@ class IntelligenceEngine:
         cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_days)
         patterns: List[Pattern] = []
 
-        # Collect recent entity nodes by company
-        company_entities: Dict[str, List[KnowledgeNode]] = {}
+        # entity_type → entity_key → {company_key: recent value count}
+        recent: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(dict))
         for co in companies:
             key = f"{co['company']}/{co['product']}"
-            mind_dir = Path(co["mind_dir"])
-            entities = self._load_entity_nodes(mind_dir)
-            # Filter to recent
-            recent = []
-            for e in entities:
-                try:
-                    ts = datetime.fromisoformat(e.timestamp.replace("Z", "+00:00"))
-                    if ts >= cutoff:
-                        recent.append(e)
-                except (ValueError, TypeError):
-                    recent.append(e)
-            if recent:
-                company_entities[key] = recent
+            index = self._load_entity_index(Path(co["mind_dir"]))
+            for entity_type in ("METRIC", "RISK_FLAG", "COVENANT"):
+                for entity_key, n in index.recent_counts(entity_type, cutoff).items():
+                    recent[entity_type][entity_key][key] = n
 
         # Detect metric trends across companies
-        patterns.extend(self._detect_metric_trends(company_entities))
+        patterns.extend(self._detect_metric_trends(recent["METRIC"]))
 
         # Detect risk flag convergence
-        patterns.extend(self._detect_risk_convergence(company_entities))
+        patterns.extend(self._detect_risk_convergence(recent["RISK_FLAG"]))
 
         # Detect covenant pressure
-        patterns.extend(self._detect_covenant_pressure(company_entities))
+        patterns.extend(self._detect_covenant_pressure(recent["COVENANT"]))
 
         # Sort by score
         patterns.sort(key=lambda p: p.score, reverse=True)
         return patterns
 
     def _detect_metric_trends(
-        self, company_entities: Dict[str, List[KnowledgeNode]]
+        self, metric_counts: Dict[str, Dict[str, int]]
     ) -> List[Pattern]:
         """Find same metric moving in same direction across companies."""
-        # Group by metric key across companies
-        metric_by_company: Dict[str, Dict[str, List[KnowledgeNode]]] = defaultdict(dict)
-
-        for company_key, nodes in company_entities.items():
-            for node in nodes:
-                entity_key = node.metadata.get("entity_key", "")
-                if entity_key and node.metadata.get("entity_type") == "METRIC":
-                    if company_key not in metric_by_company[entity_key]:
-                        metric_by_company[entity_key][company_key] = []
-                    metric_by_company[entity_key][company_key].append(node)
-
         patterns = []
-        for metric_key, by_company in metric_by_company.items():
+        for metric_key, by_company in metric_counts.items():
             if len(by_company) < 2:
                 continue
 
-            # Check for supersession patterns (value changed)
-            companies_with_changes = []
-            for company_key, nodes in by_company.items():
-                # If there are multiple nodes, values have changed
-                if len(nodes) >= 2:
-                    companies_with_changes.append(company_key)
+            # If a company has multiple recent values, the metric has changed
+            companies_with_changes = [c for c, n in by_company.items() if n >= 2]
 
             if len(companies_with_changes) >= 2:
                 severity = "warning" if len(companies_with_changes) >= 3 else "info"
@@ -212,21 +203,12 @@ class IntelligenceEngine:
         return patterns
 
     def _detect_risk_convergence(
-        self, company_entities: Dict[str, List[KnowledgeNode]]
+        self, risk_counts: Dict[str, Dict[str, int]]
     ) -> List[Pattern]:
         """Find same risk flags appearing across multiple companies."""
-        risk_by_company: Dict[str, List[str]] = defaultdict(list)
-
-        for company_key, nodes in company_entities.items():
-            for node in nodes:
-                if node.metadata.get("entity_type") == "RISK_FLAG":
-                    risk_key = node.metadata.get("entity_key", "")
-                    if risk_key:
-                        risk_by_company[risk_key].append(company_key)
-
         patterns = []
-        for risk_key, companies in risk_by_company.items():
-            unique = list(set(companies))
+        for risk_key, by_company in risk_counts.items():
+            unique = list(by_company)
             if len(unique) >= 2:
                 patterns.append(Pattern(
                     pattern_type="risk_convergence",
@@ -240,21 +222,12 @@ class IntelligenceEngine:
         return patterns
 
     def _detect_covenant_pressure(
-        self, company_entities: Dict[str, List[KnowledgeNode]]
+        self, covenant_counts: Dict[str, Dict[str, int]]
     ) -> List[Pattern]:
         """Find same covenant types under pressure across companies."""
-        covenant_by_company: Dict[str, List[str]] = defaultdict(list)
-
-        for company_key, nodes in company_entities.items():
-            for node in nodes:
-                if node.metadata.get("entity_type") == "COVENANT":
-                    cov_key = node.metadata.get("entity_key", "")
-                    if cov_key:
-                        covenant_by_company[cov_key].append(company_key)
-
         patterns = []
-        for cov_key, companies in covenant_by_company.items():
-            unique = list(set(companies))
+        for cov_key, by_company in covenant_counts.items():
+            unique = list(by_company)
             if len(unique) >= 2:
                 patterns.append(Pattern(
                     pattern_type="covenant_pressure",
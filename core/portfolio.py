@@ -21,6 +21,7 @@ from core.analysis_silq import (
     C_DISB_DATE, C_REPAY_DEADLINE, C_LAST_COLL, C_LOAN_AGE,
 )
 from core.analysis import filter_by_date, method_to_confidence
+from core.telemetry import instrument_module
 
 
 # ── Concentration limit tiers (from loan documents) ─────────────────────────
@@ -41,6 +42,19 @@ def _conc_threshold(facility_drawn_usd):
     return CONC_TIERS[-1][1]
 
 
+def _shop_limits(shop_ids, approved, threshold_pct):
+    """Per-shop single-borrower limit: approved recipients get the flat limit, others the tier."""
+    is_approved = pd.Index(shop_ids).astype(str).isin(list(approved))
+    return np.where(is_approved, APPROVED_RECIPIENT_LIMIT, threshold_pct)
+
+
+def _excess_over(amounts, base, limit):
+    """Σ (amount - base × limit) over groups whose share of base exceeds the limit."""
+    values = amounts.to_numpy(dtype=float)
+    over = values / base > limit
+    return float((values[over] - base * limit).sum()), over
+
+
 # ── 1. Borrowing Base ───────────────────────────────────────────────────────
 
 def compute_borrowing_base(df, mult=1, ref_date=None, facility_params=None):
@@ -80,19 +94,19 @@ def compute_borrowing_base(df, mult=1, ref_date=None, facility_params=None):
     breaching_shops = []
     if C_SHOP_ID in active.columns and C_OUTSTANDING in active.columns and total_ar > 0:
         shop_out = active.groupby(C_SHOP_ID)[C_OUTSTANDING].sum() * mult
-        for shop_id, amount in shop_out.items():
-            shop_limit = APPROVED_RECIPIENT_LIMIT if str(shop_id) in approved else threshold_pct
-            max_allowed = total_ar * shop_limit
-            if amount > max_allowed:
-                excess = amount - max_allowed
-                inelig_conc += excess
-                breaching_shops.append({
-                    'shop_id': _safe(shop_id),
-                    'outstanding': _safe(amount),
-                    'limit_pct': _safe(shop_limit),
-                    'max_allowed': _safe(max_allowed),
-                    'excess': _safe(excess),
-                })
+        shop_limits = _shop_limits(shop_out.index, approved, threshold_pct)
+        max_allowed = total_ar * shop_limits
+        excess = (shop_out.to_numpy() - max_allowed).clip(min=0)
+        inelig_conc = float(excess.sum())
+        # Only the (few) breaching shops are materialised as dicts
+        for i in np.flatnonzero(shop_out.to_numpy() > max_allowed):
+            breaching_shops.append({
+                'shop_id': _safe(shop_out.index[i]),
+                'outstanding': _safe(shop_out.iloc[i]),
+                'limit_pct': _safe(shop_limits[i]),
+                'max_allowed': _safe(max_allowed[i]),
+                'excess': _safe(excess[i]),
+            })
 
     total_ineligible = inelig_dpd + inelig_conc
     eligible = max(total_ar - total_ineligible, 0)
@@ -198,6 +212,7 @@ def compute_concentration_limits(df, mult=1, ref_date=None, facility_params=None
     worst_shop_pct = 0
     worst_shop_id = None
     breaching = []
+    shop_out = None  # shared with the top-5 limit below
     if C_SHOP_ID in active.columns and C_OUTSTANDING in active.columns and total_outstanding > 0:
         shop_out = active.groupby(C_SHOP_ID)[C_OUTSTANDING].sum() * mult
         shop_pcts = shop_out / total_outstanding
@@ -205,16 +220,15 @@ def compute_concentration_limits(df, mult=1, ref_date=None, facility_params=None
             worst_idx = shop_pcts.idxmax()
             worst_shop_pct = float(shop_pcts.loc[worst_idx])
             worst_shop_id = str(worst_idx)
-        # Check each shop
-        for shop_id, pct in shop_pcts.items():
-            shop_limit = APPROVED_RECIPIENT_LIMIT if str(shop_id) in approved else threshold_pct
-            if pct > shop_limit:
-                breaching.append({
-                    'shop_id': _safe(shop_id),
-                    'current': _safe(float(pct)),
-                    'threshold': _safe(shop_limit),
-                    'amount': _safe(float(shop_out.loc[shop_id])),
-                })
+        # Check every shop at once; build rows only for the breaching ones
+        shop_limits = _shop_limits(shop_pcts.index, approved, threshold_pct)
+        for i in np.flatnonzero(shop_pcts.to_numpy() > shop_limits):
+            breaching.append({
+                'shop_id': _safe(shop_pcts.index[i]),
+                'current': _safe(float(shop_pcts.iloc[i])),
+                'threshold': _safe(shop_limits[i]),
+                'amount': _safe(float(shop_out.iloc[i])),
+            })
 
     tier_label = f'{threshold_pct:.0%}'
     if facility_drawn_usd > 0:
@@ -241,8 +255,7 @@ def compute_concentration_limits(df, mult=1, ref_date=None, facility_params=None
     # ── Limit 2: Top 5 Shop Concentration ───────────────────────────────
     top5_pct = 0
     top5_threshold = 0.50  # 50% default
-    if C_SHOP_ID in active.columns and C_OUTSTANDING in active.columns and total_outstanding > 0:
-        shop_out = active.groupby(C_SHOP_ID)[C_OUTSTANDING].sum() * mult
+    if shop_out is not None:
         top5 = shop_out.nlargest(5)
         top5_pct = float(top5.sum() / total_outstanding)
 
@@ -787,10 +800,7 @@ def compute_klaim_borrowing_base(df, mult=1, ref_date=None, facility_params=None
     if 'Group' in active.columns and eligible > 0:
         active['_out'] = outstanding
         payer_out = active.groupby('Group')['_out'].sum()
-        for payer, amount in payer_out.items():
-            if amount / eligible > payer_threshold:
-                excess = amount - eligible * payer_threshold
-                conc_adj += excess
+        conc_adj, _ = _excess_over(payer_out, eligible, payer_threshold)
 
     eligible_after_conc = max(eligible - conc_adj, 0)
 
@@ -982,14 +992,9 @@ def compute_klaim_concentration_limits(df, mult=1, ref_date=None, facility_param
             worst_payer = str(payer_pcts.idxmax())
             worst_payer_pct = float(payer_pcts.max())
             payer_compliant = bool(worst_payer_pct <= payer_threshold)
-        for payer, pct in payer_pcts.items():
-            if pct > payer_threshold:
-                excess = payer_out.loc[payer] - total_ar * payer_threshold
-                conc_adjustment += excess
-                payer_breaches.append({
-                    'payer': str(payer),
-                    'pct': _safe(float(pct)),
-                })
+        conc_adjustment, over = _excess_over(payer_out, total_ar, payer_threshold)
+        payer_breaches = [{'payer': str(payer), 'pct': _safe(float(pct))}
+                          for payer, pct in payer_pcts[over].items()]
 
     # Single payer: A if tape has explicit Payer column, B when using Group as proxy
     # (Klaim's current Apr 2026 tape lacks Payer — see Company Mind debtor_validation.json).
@@ -1511,3 +1516,7 @@ def annotate_covenant_eod(result, history):
     eod_count = sum(1 for c in result['covenants'] if c.get('eod_triggered'))
     result['eod_count'] = eod_count
     return result
+
+
+# Latency / input-row / output-size telemetry for every compute_* above
+instrument_module(globals())
@@ -12,12 +12,27 @@ Key functions:
     extract_insights    -- Rules-based insight extraction at ingest time
 """
 
-from core.research.query_engine import ClaudeQueryEngine
-from core.research.extractors import extract_insights
-from core.research.dual_engine import DualResearchEngine
+import importlib
+
+# Resolved on first access: the extractors run at ingest time and
+# shouldn't load the query engine with them.
+_EXPORTS = {
+    "ClaudeQueryEngine": ".query_engine",
+    "extract_insights": ".extractors",
+    "DualResearchEngine": ".dual_engine",
+}
 
 __all__ = [
     "ClaudeQueryEngine",
     "extract_insights",
     "DualResearchEngine",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
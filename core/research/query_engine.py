@@ -53,6 +53,9 @@ class ClaudeQueryEngine:
         self._client = None
         self._client_checked = False
 
+        # core.context_budget report for the last prompt built
+        self.last_context_report: dict = {}
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -152,6 +155,7 @@ class ClaudeQueryEngine:
             "engine": "claude",
             "chunks_searched": len(raw_chunks),
             "mind_context_used": mind_used,
+            "context_budget": self.last_context_report,
         }
 
     # ------------------------------------------------------------------
@@ -197,6 +201,9 @@ class ClaudeQueryEngine:
             - Keep the answer focused and concise (300-500 words typical).
         """))
 
+        mind_context, analytics_context, kept = self._fit_context(
+            question, chunks, mind_context, analytics_context, instructions=parts[0])
+
         # Mind context (institutional knowledge)
         if mind_context:
             parts.append("=== INSTITUTIONAL KNOWLEDGE ===")
@@ -209,14 +216,15 @@ class ClaudeQueryEngine:
             parts.append(analytics_context)
             parts.append("")
 
-        # Retrieved chunks
+        # Retrieved chunks — numbered by retrieval rank so [Source N] still
+        # matches the citations list when the budget drops some of them
         if chunks:
             parts.append("=== RETRIEVED DOCUMENTS ===")
-            for i, chunk in enumerate(chunks, 1):
+            for i, snippet in kept:
+                chunk = chunks[i - 1]
                 filename = chunk.get("filename", "unknown")
                 doc_type = chunk.get("document_type", "unknown")
                 heading = chunk.get("section_heading") or ""
-                snippet = chunk.get("snippet", "")
                 score = chunk.get("score", 0)
 
                 header = f"[Source {i}] {filename} ({doc_type})"
@@ -253,6 +261,51 @@ class ClaudeQueryEngine:
 
         return full_prompt
 
+    def _fit_context(
+        self,
+        question: str,
+        chunks: list[dict],
+        mind_context: str,
+        analytics_context: Optional[str],
+        instructions: str = "",
+    ) -> tuple[str, Optional[str], list[tuple[int, str]]]:
+        """Fit mind, analytics and chunk context to LAITH_CONTEXT_BUDGET_RESEARCH.
+
+        Chunks overlapping each other (consecutive windows of one document)
+        or repeating mind entries are deduped. When over budget, mind
+        entries go first, then the chunks least relevant to the question;
+        analytics is only truncated as a last resort. The report is left
+        on ``last_context_report``.
+
+        Returns (mind_context, analytics_context, [(source_number, snippet)]).
+        """
+        from core.context_budget import (
+            ContextBlock, context_budget, estimate_tokens, join_entries, pack, split_entries,
+        )
+
+        blocks = split_entries(mind_context or "", "mind", priority=1)
+        if analytics_context:
+            blocks.append(ContextBlock("analytics", analytics_context, "analytics",
+                                       priority=3, truncatable=True))
+        for i, chunk in enumerate(chunks, 1):
+            blocks.append(ContextBlock(f"source:{i}", chunk.get("snippet", "") or "", "chunk",
+                                       priority=2, truncatable=True))
+
+        budget = context_budget("research")
+        if budget is not None:
+            budget = max(budget - estimate_tokens(instructions) - estimate_tokens(question), 0)
+        result = pack(blocks, budget, query=question)
+        self.last_context_report = result.report()
+        if result.dropped:
+            logger.info(
+                "ClaudeQueryEngine: context %d -> %d tokens, dropped %d blocks",
+                result.input_tokens, result.used_tokens, len(result.dropped),
+            )
+
+        analytics = result.text(source="analytics") or None
+        kept = [(int(b.key.split(":")[1]), b.text) for b in result.by_source("chunk")]
+        return join_entries(result.by_source("mind")), analytics, kept
+
     # ------------------------------------------------------------------
     # Context helpers
     # ------------------------------------------------------------------
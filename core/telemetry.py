@@ -0,0 +1,356 @@
+"""
+core/telemetry.py
+In-process latency and cache telemetry, exported in Prometheus text format.
+
+Until now only core.ai_client logged timings, so there was no way to tell
+which chart endpoint or compute_* function was slow in production. This
+module keeps a small process-wide registry of
+
+  - histograms   request latency by route template, compute function
+                 latency, tape load/parse latency
+  - summaries    count + sum only (compute input rows, output size)
+  - counters     tape cache hits / misses and the like
+  - collectors   callables polled at scrape time for values other modules
+                 already track (ETag 304s, what-if state cache, agent tool
+                 cache, memo context cache)
+
+and renders it for GET /metrics (render_prometheus) and the Operator
+Center performance card (summary). Recording is a dict lookup plus a few
+additions under one lock, cheap enough to leave on everywhere.
+
+instrument_module(globals()) at the bottom of an analysis module wraps
+every top-level compute_* function, so every importer — backend/main.py,
+the agent tools, the memo bridge — gets the timed version; functions
+registered with @metric (core.metric_registry) are timed the same way.
+Set LAITH_TELEMETRY=0 to skip the wrapping entirely.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("LAITH_TELEMETRY", "1").lower() not in ("0", "false", "no")
+
+# Seconds. Chart computes sit in the 5 ms – 2 s range; AI streams run far longer.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0)
+
+# name → (type, help)
+METRICS = {
+    "laith_http_request_duration_seconds": ("histogram", "HTTP request latency by route template."),
+    "laith_compute_duration_seconds": ("histogram", "compute_* function latency."),
+    "laith_compute_input_rows": ("summary", "Rows of the DataFrame passed to compute_* functions."),
+    "laith_compute_output_items": ("summary", "Top-level size of compute_* results (list items / dict keys)."),
+    "laith_tape_load_duration_seconds": ("histogram", "Tape file load + parse latency."),
+    "laith_cache_requests_total": ("counter", "In-process cache lookups by cache and result."),
+    "laith_cache_hit_ratio": ("gauge", "Hit ratio reported by caches that track their own counts."),
+    "laith_cache_entries": ("gauge", "Entries currently held by a cache."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Linear interpolation within the bucket holding rank q (histogram_quantile)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.bounds[i - 1] if i else 0.0
+                if i == len(self.bounds):         # +Inf bucket: best bound we have
+                    return self.bounds[-1]
+                return lo + (self.bounds[i] - lo) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+class Telemetry:
+    """Process-wide metric registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[Tuple[str, Labels], Histogram] = {}
+        self._summary: Dict[Tuple[str, Labels], List[float]] = {}
+        self._counter: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]] = {}
+
+    # ── Recording ────────────────────────────────────────────────────────────
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = Histogram()
+            hist.observe(value)
+
+    def summarize(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            acc = self._summary.setdefault(key, [0, 0.0])
+            acc[0] += 1
+            acc[1] += value
+
+    def inc(self, name: str, by: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counter[key] = self._counter.get(key, 0) + by
+
+    def register_collector(self, name: str,
+                           collect: Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]) -> None:
+        """collect() → iterable of (metric_name, labels, value), polled at scrape time."""
+        self._collectors[name] = collect
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._summary.clear()
+            self._counter.clear()
+
+    # ── Export ───────────────────────────────────────────────────────────────
+
+    def _collected(self) -> List[Tuple[str, Labels, float]]:
+        out = []
+        for name, collect in list(self._collectors.items()):
+            try:
+                for metric, labels, value in collect():
+                    if value is not None:
+                        out.append((metric, _labels(labels), float(value)))
+            except Exception as e:
+                logger.debug("telemetry collector %s failed: %s", name, e)
+        return out
+
+    def render_prometheus(self) -> str:
+        """Text exposition format 0.0.4."""
+        with self._lock:
+            hist = {k: (list(h.counts), h.count, h.sum, h.bounds) for k, h in self._hist.items()}
+            summary = {k: tuple(v) for k, v in self._summary.items()}
+            counter = dict(self._counter)
+        gauges: Dict[Tuple[str, Labels], float] = {}
+        for metric, labels, value in self._collected():
+            if METRICS.get(metric, ("gauge",))[0] == "counter":
+                counter[(metric, labels)] = counter.get((metric, labels), 0) + value
+            else:
+                gauges[(metric, labels)] = value
+
+        by_name: Dict[str, List[str]] = {}
+
+        def fmt(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        for (name, labels), (counts, count, total, bounds) in sorted(hist.items()):
+            lines = by_name.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(bounds + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{fmt(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{fmt(labels)} {total:.6f}")
+            lines.append(f"{name}_count{fmt(labels)} {count}")
+        for (name, labels), (count, total) in sorted(summary.items()):
+            lines = by_name.setdefault(name, [])
+            lines.append(f"{name}_sum{fmt(labels)} {total:g}")
+            lines.append(f"{name}_count{fmt(labels)} {count}")
+        for (name, labels), value in sorted(counter.items()) + sorted(gauges.items()):
+            by_name.setdefault(name, []).append(f"{name}{fmt(labels)} {value:g}")
+
+        out = []
+        for name in sorted(by_name):
+            kind, help_text = METRICS.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(by_name[name])
+        return "\n".join(out) + "\n"
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Operator-facing digest: slowest routes / compute functions, tape loads, caches."""
+        with self._lock:
+            hist = {k: (h.count, h.sum, h.quantile(0.5), h.quantile(0.95)) for k, h in self._hist.items()}
+            counter = dict(self._counter)
+
+        def rows(metric: str, label: str) -> List[Dict[str, Any]]:
+            out = []
+            for (name, labels), (count, total, p50, p95) in hist.items():
+                if name != metric:
+                    continue
+                lab = dict(labels)
+                out.append({label: lab.get(label, ""), **{k: v for k, v in lab.items() if k != label},
+                            "count": count, "mean_ms": round(total / count * 1000, 2),
+                            "p50_ms": round(p50 * 1000, 2), "p95_ms": round(p95 * 1000, 2),
+                            "total_s": round(total, 3)})
+            return sorted(out, key=lambda r: -r["p95_ms"])[:top]
+
+        caches: Dict[str, Dict[str, Any]] = {}
+        for (name, labels), value in counter.items():
+            if name == "laith_cache_requests_total":
+                lab = dict(labels)
+                caches.setdefault(lab.get("cache", ""), {})[lab.get("result", "")] = int(value)
+        for c in caches.values():
+            looked = c.get("hit", 0) + c.get("miss", 0)
+            c["hit_ratio"] = round(c.get("hit", 0) / looked, 4) if looked else 0.0
+        for metric, labels, value in self._collected():
+            lab = dict(labels)
+            if metric == "laith_cache_hit_ratio":
+                caches.setdefault(lab.get("cache", ""), {})["hit_ratio"] = round(value, 4)
+            elif metric == "laith_cache_entries":
+                caches.setdefault(lab.get("cache", ""), {})["entries"] = int(value)
+
+        return {
+            "routes": rows("laith_http_request_duration_seconds", "route"),
+            "compute": rows("laith_compute_duration_seconds", "function"),
+            "tape_loads": rows("laith_tape_load_duration_seconds", "loader"),
+            "caches": dict(sorted(caches.items())),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    return _telemetry
+
+
+# ── Instrumentation helpers ──────────────────────────────────────────────────
+
+def _rows_in(args, kwargs) -> Optional[int]:
+    """Row count of the first DataFrame argument (compute_* take df first)."""
+    for value in (args[0] if args else None, kwargs.get("df")):
+        shape = getattr(value, "shape", None)
+        if shape is not None and len(shape) == 2:
+            return shape[0]
+    return None
+
+
+def _size_of(result) -> Optional[int]:
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    shape = getattr(result, "shape", None)
+    return shape[0] if shape else None
+
+
+def timed_compute(fn: Callable) -> Callable:
+    """Record latency, input rows and output size of a compute function."""
+    if not ENABLED or getattr(fn, "_telemetry_wrapped", False) or inspect.iscoroutinefunction(fn):
+        return fn
+    name, module = fn.__name__, fn.__module__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        _telemetry.observe("laith_compute_duration_seconds", elapsed, function=name, module=module)
+        rows = _rows_in(args, kwargs)
+        if rows is not None:
+            _telemetry.summarize("laith_compute_input_rows", rows, function=name)
+        size = _size_of(result)
+        if size is not None:
+            _telemetry.summarize("laith_compute_output_items", size, function=name)
+        return result
+
+    wrapper._telemetry_wrapped = True
+    return wrapper
+
+
+def timed_load(fn: Callable, loader: Optional[str] = None) -> Callable:
+    """Record tape load/parse latency of a loader function."""
+    if not ENABLED or getattr(fn, "_telemetry_wrapped", False):
+        return fn
+    label = loader or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _telemetry.observe("laith_tape_load_duration_seconds", time.perf_counter() - t0, loader=label)
+
+    wrapper._telemetry_wrapped = True
+    return wrapper
+
+
+def instrument_module(namespace: Dict[str, Any], prefix: str = "compute_") -> int:
+    """Wrap every top-level `prefix*` function defined in the module owning namespace."""
+    module = namespace.get("__name__")
+    wrapped = 0
+    for attr, value in list(namespace.items()):
+        if attr.startswith(prefix) and inspect.isfunction(value) and value.__module__ == module:
+            namespace[attr] = timed_compute(value)
+            wrapped += 1
+    return wrapped
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    _telemetry.inc("laith_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware: request latency histogram labelled by route template.
+
+    The route is read from scope["route"] after the app has run (the router
+    sets it on match), so `/companies/klaim/...` and `/companies/SILQ/...`
+    share one series. Unmatched paths are labelled "<unmatched>" to keep
+    label cardinality bounded.
+    """
+
+    def __init__(self, app, exclude: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            _telemetry.observe("laith_http_request_duration_seconds", time.perf_counter() - t0,
+                               route=template, method=scope.get("method", ""), status=str(status["code"]))
@@ -0,0 +1,340 @@
+"""
+Sorted time index over loan tapes.
+
+Every chart endpoint takes `as_of_date` and used to cut the tape with a
+boolean mask over the whole frame, after re-parsing the date column even
+when the loader had already parsed it. Scrubbing the date slider therefore
+paid O(n) parse + mask + copy per position.
+
+Tapes held in the backend caches are now stored sorted by their origination
+date (Klaim `Deal date`, SILQ `Disbursement_Date`, Aajil `Invoice Date`),
+stable within a date, with unparseable dates (NaT) at the tail. On a sorted
+tape the rows on or before a cut-off are a prefix, so the cut is a binary
+search plus a zero-copy `iloc` slice. The `filter_*_by_date` helpers keep
+their "returns a copy" contract (compute functions add columns in place) but
+copy only the surviving prefix; read-only consumers such as the as-of sweep
+use `as_of_slice` directly. Unsorted frames (tests, ad-hoc scripts) fall back
+to the mask, so results never depend on whether a frame was indexed.
+
+The as-of sweep evaluates a metric at many cut-offs in one pass. Metrics
+that decompose into per-deal contributions (collection rate, PAR, HHI) are
+computed from cumulative sums over the sorted tape read at the searchsorted
+positions of the cut-offs; anything else is evaluated per cut-off on the
+zero-copy prefix. Values match `filter_by_date` + the compute function at
+the same cut-off.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+logger = logging.getLogger(__name__)
+
+KLAIM_DATE_COL = 'Deal date'
+SILQ_DATE_COL = 'Disbursement_Date'
+AAJIL_DATE_COL = 'Invoice Date'
+
+# Position of each row in the tape as loaded, kept on re-sorted tapes so
+# aggregations defined on file order ('first' row per group) still can be
+# evaluated in that order
+ROW_POS_COL = '_tape_row'
+
+SWEEP_METRICS = ('collection_rate', 'par', 'hhi')
+MAX_SWEEP_POINTS = 500
+
+_PAR_THRESHOLDS = (30, 60, 90)
+_HHI_DIMENSIONS = (('Group', 'group'), ('Provider', 'provider'), ('Product', 'product'))
+
+
+# ── Index ────────────────────────────────────────────────────────────────────
+
+def ensure_datetime(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Return df with `col` parsed to datetime, copying only when a parse is needed."""
+    if col not in df.columns or is_datetime64_any_dtype(df[col]):
+        return df
+    df = df.copy()
+    df[col] = pd.to_datetime(df[col], errors='coerce', format='mixed')
+    return df
+
+
+def _valid_count(s: pd.Series) -> Optional[int]:
+    """Number of leading non-NaT values if `s` is a sorted index, else None.
+
+    A sorted index is a datetime column whose valid dates are non-decreasing
+    and whose NaT values (if any) all sit after them.
+    """
+    if not is_datetime64_any_dtype(s):
+        return None
+    na = s.isna().to_numpy()
+    n_valid = len(s) - int(na.sum())
+    if na[:n_valid].any():
+        return None
+    if n_valid and not s.iloc[:n_valid].is_monotonic_increasing:
+        return None
+    return n_valid
+
+
+def is_date_sorted(df: pd.DataFrame, col: str) -> bool:
+    """True if `df` is indexed on `col` (sorted, NaT last)."""
+    return col in df.columns and _valid_count(df[col]) is not None
+
+
+def sort_by_date(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Return the tape parsed and stable-sorted on `col` with NaT rows last.
+
+    Already-sorted frames come back unchanged. A re-sorted tape gets a fresh
+    RangeIndex, so positional and label access agree on the cached tape, and
+    a ROW_POS_COL column holding each row's position in the input frame.
+    """
+    if col not in df.columns:
+        return df
+    df = ensure_datetime(df, col)
+    if _valid_count(df[col]) is not None:
+        return df
+    df = df.assign(**{ROW_POS_COL: np.arange(len(df), dtype=np.int64)})
+    return df.sort_values(col, kind='stable', na_position='last').reset_index(drop=True)
+
+
+def cutoff_positions(dates: pd.Series, cutoffs: Sequence) -> np.ndarray:
+    """Row count on or before each cut-off for a sorted date column."""
+    n_valid = _valid_count(dates)
+    if n_valid is None:
+        raise ValueError(f"Column '{dates.name}' is not a sorted date index")
+    ts = pd.DatetimeIndex(pd.to_datetime(list(cutoffs)))
+    return np.asarray(dates.iloc[:n_valid].searchsorted(ts, side='right'), dtype=np.int64)
+
+
+def as_of_slice(df: pd.DataFrame, col: str, as_of_date) -> Optional[pd.DataFrame]:
+    """Zero-copy prefix of rows with `col` <= as_of_date, or None if not indexed.
+
+    The returned frame is a view of `df` — treat it as read-only.
+    """
+    if col not in df.columns or _valid_count(df[col]) is None:
+        return None
+    k = int(cutoff_positions(df[col], [as_of_date])[0])
+    return df.iloc[:k]
+
+
+def filter_sorted(df: pd.DataFrame, col: str, as_of_date) -> pd.DataFrame:
+    """Copy of the rows with `col` <= as_of_date; a slice when indexed, else a mask."""
+    cut = as_of_slice(df, col, as_of_date)
+    if cut is not None:
+        return cut.copy()
+    return df[df[col] <= pd.to_datetime(as_of_date)].copy()
+
+
+# ── As-of sweep ──────────────────────────────────────────────────────────────
+
+def sweep_cutoffs(dates: pd.Series, points: int, end=None) -> List[pd.Timestamp]:
+    """`points` month-end cut-offs ending at `end` (default: last valid date)."""
+    valid = dates.dropna()
+    if valid.empty or points < 1:
+        return []
+    last = pd.Timestamp(end) if end is not None else valid.max()
+    first = valid.min()
+    ends = pd.date_range(end=last.normalize() + pd.offsets.MonthEnd(0), periods=points, freq='ME')
+    ends = [min(e, last) for e in ends if e >= first.normalize()]
+    return sorted(set(ends))
+
+
+def _rate(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den != 0, num / np.where(den != 0, den, 1) * 100, 0.0)
+
+
+def _prefix(values: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """Σ values[:p] for each p in pos via one cumulative sum."""
+    cum = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+    return cum[pos]
+
+
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.zeros(len(df))
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _sweep_collection_rate(df, pos, cutoffs, mult):
+    pv = _prefix(np.nan_to_num(_col(df, 'Purchase value')), pos)
+    collected = _prefix(np.nan_to_num(_col(df, 'Collected till date')), pos)
+    denied = _prefix(np.nan_to_num(_col(df, 'Denied by insurance')), pos)
+    pending = _prefix(np.nan_to_num(_col(df, 'Pending insurance response')), pos)
+    cr, dr, pr = _rate(collected, pv), _rate(denied, pv), _rate(pending, pv)
+    return [{
+        'total_deals': int(pos[i]),
+        'total_purchase_value': float(pv[i] * mult),
+        'total_collected': float(collected[i] * mult),
+        'collection_rate': float(cr[i]),
+        'denial_rate': float(dr[i]),
+        'pending_rate': float(pr[i]),
+    } for i in range(len(cutoffs))]
+
+
+# Proxy-method triggers more than a century out are treated as never (and
+# would overflow datetime64[ns]).
+_MAX_TRIGGER_DAYS = 36_500
+
+
+def _par_trigger_dates(active: pd.DataFrame, threshold: int, mult) -> pd.Series:
+    """Earliest as-of date at which each active deal counts towards PAR{threshold}.
+
+    Mirrors compute_par: direct DPD (Expected collection days) when present,
+    else the shortfall-ratio x deal-age proxy. NaT means never.
+    """
+    deal = active['Deal date']
+    if 'Expected collection days' in active.columns:
+        exp_days = active['Expected collection days'].fillna(0).astype(float)
+        trigger = deal + pd.to_timedelta(exp_days, unit='D') + pd.Timedelta(days=threshold)
+        # The deal must also be on the tape at the cut-off
+        return trigger.where(trigger > deal, deal)
+    expected = active['Expected till date'].fillna(0) * mult
+    shortfall = (expected - active['Collected till date'] * mult).clip(lower=0)
+    pv = (active['Purchase value'] * mult).replace(0, float('nan'))
+    ratio = (shortfall / pv).fillna(0).to_numpy(dtype=float)
+    # est_dpd = age_days * ratio >= threshold  <=>  age_days >= ceil(threshold / ratio),
+    # nudged a day either way so float rounding agrees with the product test.
+    safe = np.where(ratio > 0, ratio, 1.0)
+    need = np.where(ratio > 0, np.ceil(threshold / safe), np.inf)
+    never = ~np.isfinite(need) | (need > _MAX_TRIGGER_DAYS)
+    need = np.where(never, 0.0, need)
+    need = np.where((need - 1) * ratio >= threshold, need - 1, need)
+    need = np.where(need * ratio < threshold, need + 1, need)
+    trigger = deal + pd.to_timedelta(need, unit='D')
+    return trigger.mask(never)
+
+
+def _sweep_par(df, pos, cutoffs, mult):
+    if 'Expected collection days' not in df.columns and 'Expected till date' not in df.columns:
+        raise ValueError("PAR sweep needs 'Expected collection days' or 'Expected till date'")
+    active_mask = (df['Status'] == 'Executed').to_numpy()
+    active = df[active_mask]
+    outstanding = ((active['Purchase value'] - active['Collected till date']
+                    - active.get('Denied by insurance', pd.Series(0, index=active.index)))
+                   .clip(lower=0) * mult).to_numpy(dtype=float)
+    act_out = np.zeros(len(df))
+    act_out[active_mask] = outstanding
+    den_out = _prefix(act_out, pos)
+    den_cnt = _prefix(active_mask.astype(float), pos)
+    originated = _prefix(np.nan_to_num(_col(df, 'Purchase value')) * mult, pos)
+    deals = pos.astype(float)
+    cut_ns = pd.DatetimeIndex(cutoffs).as_unit('ns').asi8
+
+    # Direct method without Expected till date: shortfall is est_dpd > 0,
+    # which every threshold >= 30 already implies.
+    eligible = outstanding > 0
+    if 'Expected till date' in df.columns:
+        expected = active['Expected till date'].fillna(0) * mult
+        eligible &= ((expected - active['Collected till date'] * mult).clip(lower=0) > 0).to_numpy()
+
+    fields = {}
+    for t in _PAR_THRESHOLDS:
+        trigger = _par_trigger_dates(active, t, mult)
+        ok = eligible & trigger.notna().to_numpy()
+        when = trigger.to_numpy(dtype='datetime64[ns]')[ok].astype(np.int64)
+        order = np.argsort(when, kind='stable')
+        k = np.searchsorted(when[order], cut_ns, side='right')
+        amount = _prefix(outstanding[ok][order], k)
+        count = k.astype(float)
+        fields[f'par{t}'] = (_rate(amount, den_out), 4)
+        fields[f'par{t}_count'] = (_rate(count, den_cnt), 4)
+        fields[f'par{t}_amount'] = (amount, 2)
+        fields[f'lifetime_par{t}'] = (_rate(amount, originated), 4)
+        fields[f'lifetime_par{t}_count'] = (_rate(count, deals), 4)
+
+    method = 'direct' if 'Expected collection days' in df.columns else 'expected'
+    rows = []
+    for i in range(len(cutoffs)):
+        if not (den_cnt[i] > 0 and den_out[i] > 0):
+            rows.append({'available': False})
+            continue
+        rows.append({
+            'available': True,
+            'method': method,
+            **{name: round(float(vals[i]), nd) for name, (vals, nd) in fields.items()},
+            'total_active_outstanding': round(float(den_out[i]), 2),
+            'total_active_count': int(den_cnt[i]),
+            'total_originated': round(float(originated[i]), 2),
+            'total_deal_count': int(pos[i]),
+        })
+    return rows
+
+
+def _grouped_hhi(codes: np.ndarray, values: np.ndarray, pos: np.ndarray,
+                 n_groups: int, totals: np.ndarray) -> np.ndarray:
+    """HHI of `values` grouped by `codes` (-1 = excluded) over each prefix pos[i]."""
+    # Row r first counts at the earliest cut-off whose prefix covers it
+    bucket = np.searchsorted(pos, np.arange(len(codes)), side='right')
+    sums = np.zeros((len(pos) + 1, n_groups))
+    keep = codes >= 0
+    np.add.at(sums, (bucket[keep], codes[keep]), values[keep])
+    sums = np.cumsum(sums, axis=0)[:len(pos)]
+    safe = np.where(totals > 0, totals, 1.0)
+    return np.where(totals > 0, ((sums / safe[:, None]) ** 2).sum(axis=1), 0.0)
+
+
+def _sweep_hhi(df, pos, cutoffs, mult):
+    pv_raw = _col(df, 'Purchase value')
+    pv = np.nan_to_num(pv_raw)
+    # separate_portfolio: loss = denied > 50% of purchase value (NaN compares False)
+    clean = ~(_col(df, 'Denied by insurance') > pv_raw * 0.5)
+    totals = _prefix(pv, pos)
+    clean_totals = _prefix(np.where(clean, pv, 0.0), pos)
+    rows = [{} for _ in cutoffs]
+    for col_name, key in _HHI_DIMENSIONS:
+        if col_name not in df.columns:
+            for r in rows:
+                r[f'{key}_hhi'] = None
+                r[f'{key}_hhi_clean'] = None
+            continue
+        codes, uniques = pd.factorize(df[col_name])
+        full = _grouped_hhi(codes, pv, pos, len(uniques), totals)
+        clean_hhi = _grouped_hhi(np.where(clean, codes, -1), pv, pos, len(uniques), clean_totals)
+        for i, r in enumerate(rows):
+            r[f'{key}_hhi'] = round(float(full[i]), 6)
+            r[f'{key}_hhi_clean'] = (round(float(clean_hhi[i]), 6)
+                                     if clean_totals[i] * mult > 0 else None)
+    return rows
+
+
+_KLAIM_SWEEPS: Dict[str, Callable] = {
+    'collection_rate': _sweep_collection_rate,
+    'par': _sweep_par,
+    'hhi': _sweep_hhi,
+}
+
+
+def as_of_sweep(df: pd.DataFrame, metric: str, cutoffs: Sequence, mult: float = 1,
+                date_col: str = KLAIM_DATE_COL) -> List[Dict]:
+    """Evaluate a Klaim metric at each cut-off in one pass over the sorted tape.
+
+    Returns one dict per cut-off (ascending), each carrying `as_of_date` plus
+    the same fields compute_summary / compute_par / compute_hhi_for_snapshot
+    report for that metric after filter_by_date at the cut-off.
+    """
+    if metric not in _KLAIM_SWEEPS:
+        raise ValueError(f"Unknown sweep metric '{metric}'. Available: {', '.join(SWEEP_METRICS)}")
+    df = sort_by_date(df, date_col)
+    cutoffs = sorted(pd.to_datetime(list(cutoffs)))
+    pos = cutoff_positions(df[date_col], cutoffs)
+    rows = _KLAIM_SWEEPS[metric](df, pos, cutoffs, mult)
+    return [{'as_of_date': c.strftime('%Y-%m-%d'), **r} for c, r in zip(cutoffs, rows)]
+
+
+def sweep_by_slices(df: pd.DataFrame, date_col: str, cutoffs: Sequence,
+                    fn: Callable[[pd.DataFrame, pd.Timestamp], Dict]) -> List[Dict]:
+    """Evaluate `fn(prefix, cutoff)` on the sorted tape's prefix at each cut-off.
+
+    The fallback for metrics without a cumulative form (SILQ and Aajil
+    summaries). Each prefix is a copy because those compute functions
+    normalise columns in place.
+    """
+    df = sort_by_date(df, date_col)
+    cutoffs = sorted(pd.to_datetime(list(cutoffs)))
+    pos = cutoff_positions(df[date_col], cutoffs)
+    return [{'as_of_date': c.strftime('%Y-%m-%d'), **fn(df.iloc[:int(k)].copy(), c)}
+            for c, k in zip(cutoffs, pos)]
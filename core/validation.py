@@ -2,290 +2,341 @@
 core/validation.py
 Single-tape data quality checks — duplicate detection, date sanity,
 negative amounts, null checks, logical consistency.
+
+Expressed as a RuleSet (see core.validation_rules): per-row checks are
+count rules fused into one counting pass; each column is coerced once.
 Pure computation — no FastAPI, no I/O.
 """
 import pandas as pd
 import numpy as np
 
+from core.validation_rules import Rule, RuleSet
+
+
+def _warning(check, detail):
+    return [('warnings', {'check': check, 'detail': detail})]
+
+
+# ── Row count ──
+
+def _row_count(ctx):
+    return [('info', {'check': 'Row Count', 'detail': f'{ctx.n:,} deals in tape'})]
+
+
+# ── 1. Duplicate ID detection ──
+
+def _duplicate_ids(ctx):
+    df = ctx.df
+    id_col = next((c for c in ['ID', 'Id', 'id', 'Reference'] if c in df.columns), None)
+    if not id_col:
+        return [('warnings', {
+            'check': 'No ID Column',
+            'detail': 'No ID column found — cannot check for duplicates',
+        })]
+    dupes = df[df.duplicated(subset=[id_col], keep=False)]
+    if len(dupes) > 0:
+        return [('critical', {
+            'check': 'Duplicate IDs',
+            'detail': f'{len(dupes)} rows with duplicate {id_col} ({dupes[id_col].nunique()} unique IDs)',
+            'sample': list(dupes[id_col].unique()[:5]),
+        })]
+    return [('info', {'check': 'Duplicate IDs', 'detail': f'No duplicate {id_col} values found'})]
+
+
+# ── 2. Date sanity checks ──
+
+def _null_deal_dates(ctx, count):
+    if not count:
+        return []
+    return _warning('Null Deal Dates', f'{count} deals have null or unparseable Deal date')
+
+
+def _future_deal_dates(ctx, count):
+    if not count:
+        return []
+    return [('critical', {
+        'check': 'Future Deal Dates',
+        'detail': f'{count} deals have Deal date in the future',
+    })]
+
+
+def _old_deal_dates(ctx, count):
+    if not count:
+        return []
+    return _warning('Very Old Deal Dates', f'{count} deals have Deal date before 2018')
+
+
+def _deal_date_range(ctx):
+    dates = ctx.dates('Deal date')
+    lo, hi = dates.min(), dates.max()
+    if pd.isna(lo):
+        return []
+    return [('info', {
+        'check': 'Date Range',
+        'detail': f'Deal dates span {lo.strftime("%Y-%m-%d")} to {hi.strftime("%Y-%m-%d")}',
+    })]
+
+
+# ── 3. Negative amount detection ──
+
+AMOUNT_COLS = ['Purchase value', 'Purchase price', 'Collected till date',
+               'Denied by insurance', 'Pending insurance response',
+               'Gross revenue', 'Setup fee', 'Other fee']
+
+
+def _negative_amount_rule(col):
+    def emit(ctx, count):
+        if not count:
+            return []
+        numeric = ctx.num(col)
+        return _warning(
+            f'Negative {col}',
+            f'{count} deals have negative {col} (min: {numeric[numeric < 0].min():,.2f})',
+        )
+    return Rule(f'negative_{col}', emit, mask=lambda ctx: ctx.num(col) < 0, requires=(col,))
+
+
+# ── 4. Null / missing critical fields ──
+
+CRITICAL_COLS = ['Purchase value', 'Purchase price', 'Status',
+                 'Collected till date', 'Denied by insurance']
+
+
+def _critical_field_rules(col):
+    def emit_nulls(ctx, count):
+        if not count:
+            return []
+        return _warning(f'Null {col}', f'{count} deals have null {col}')
+
+    def emit_missing(ctx):
+        if col in ctx.df.columns:
+            return []
+        return [('critical', {
+            'check': f'Missing Column: {col}',
+            'detail': f'Required column {col} not found in tape',
+        })]
+
+    return [
+        Rule(f'null_{col}', emit_nulls, mask=lambda ctx: ctx.isna(col), requires=(col,)),
+        Rule(f'missing_{col}', emit_missing),
+    ]
+
+
+# ── 5. Collected > Purchase value anomalies ──
+
+def _over_collection(ctx, count):
+    if not count:
+        return []
+    return _warning('Over-Collection', f'{count} deals have Collected > 150% of Purchase value')
+
+
+# ── 6. Status vs collection consistency ──
+
+def _completed_zero(ctx, count):
+    if not count:
+        return []
+    return _warning('Completed with Zero Collection',
+                    f'{count} deals marked Completed but have 0 collected')
+
+
+# ── 7. Discount range check ──
 
-def validate_tape(df):
+def _discount_over_100(ctx, count):
+    if not count:
+        return []
+    return _warning('Discount > 100%',
+                    f'{count} deals have Discount > 100% (max: {ctx.num("Discount").max():.2%})')
+
+
+def _negative_discount(ctx, count):
+    if not count:
+        return []
+    return _warning('Negative Discount', f'{count} deals have negative Discount')
+
+
+# ── 8. Status value check ──
+
+def _status_values(ctx):
+    df = ctx.df
+    findings = []
+    unexpected = set(df['Status'].dropna().unique()) - {'Executed', 'Completed'}
+    if unexpected:
+        findings += _warning('Unexpected Status Values',
+                             f'Found unexpected status values: {unexpected}')
+    status_counts = df['Status'].value_counts().to_dict()
+    findings.append(('info', {
+        'check': 'Status Distribution',
+        'detail': f'Status breakdown: {status_counts}',
+    }))
+    return findings
+
+
+# ── 9. Duplicate counterparty + amount + date combos ──
+
+COMBO_COLS = ['Group', 'Purchase value', 'Deal date']
+
+
+def _combo_duplicates(ctx):
+    df = ctx.df
+    combo_dupes = df[df.duplicated(subset=COMBO_COLS, keep=False)]
+    if not len(combo_dupes):
+        return []
+    unique_combos = combo_dupes.groupby(COMBO_COLS).size().reset_index(name='count')
+    return [('warnings', {
+        'check': 'Duplicate Counterparty+Amount+Date',
+        'detail': (
+            f'{len(combo_dupes)} rows share the same Group + Purchase value + Deal date '
+            f'({len(unique_combos)} unique combinations). Possible double-entry.'
+        ),
+        'sample': unique_combos.head(3).to_dict(orient='records'),
+    })]
+
+
+# ── 10. Identical amount concentration ──
+
+def _purchase_values(ctx):
+    return ctx.memo('pv_dropna', lambda: ctx.num('Purchase value').dropna())
+
+
+def _identical_amounts(ctx):
+    pv = _purchase_values(ctx)
+    if not len(pv):
+        return []
+    val_counts = pv.value_counts()
+    top_val = val_counts.index[0]
+    top_count = int(val_counts.iloc[0])
+    top_pct = top_count / len(pv) * 100
+    if top_pct > 5 and top_count > 10:
+        return _warning('Identical Amount Concentration', (
+            f'{top_count} deals ({top_pct:.1f}%) share the same Purchase value of '
+            f'{top_val:,.2f}. May indicate templated or copy-paste entries.'
+        ))
+    return []
+
+
+# ── 11/12. IQR outliers (3×IQR fence) ──
+
+def _iqr_outliers(values):
+    """(outliers, lower, upper) for a 3×IQR fence floored at 0, or None."""
+    q1, q3 = values.quantile(0.25), values.quantile(0.75)
+    iqr = q3 - q1
+    if iqr <= 0:
+        return None
+    upper = q3 + 3 * iqr
+    lower = max(q1 - 3 * iqr, 0)
+    outliers = values[(values > upper) | (values < lower)]
+    if not len(outliers):
+        return None
+    return outliers, lower, upper
+
+
+def _deal_size_outliers(ctx):
+    pv = _purchase_values(ctx)
+    found = _iqr_outliers(pv) if len(pv) >= 20 else None
+    if not found:
+        return []
+    outliers, lower, upper = found
+    return _warning('Deal Size Outliers', (
+        f'{len(outliers)} deals have Purchase value outside 3×IQR bounds '
+        f'[{lower:,.0f} – {upper:,.0f}]. '
+        f'Max outlier: {outliers.max():,.0f}.'
+    ))
+
+
+def _discount_outliers(ctx):
+    disc = ctx.num('Discount').dropna()
+    disc = disc[(disc >= 0) & (disc <= 1)]
+    found = _iqr_outliers(disc) if len(disc) >= 20 else None
+    if not found:
+        return []
+    outliers, lower, upper = found
+    return _warning('Discount Outliers', (
+        f'{len(outliers)} deals have Discount outside 3×IQR bounds '
+        f'[{lower:.1%} – {upper:.1%}]. '
+        f'Max outlier: {outliers.max():.1%}.'
+    ))
+
+
+# ── 13. Balance identity violations ──
+# Klaim accounting identity (empirically verified):
+#   Paid by insurance + Denied by insurance + Pending insurance response ≡ Purchase value
+# `Collected till date` legitimately exceeds `Paid by insurance` because Collected includes
+# VAT reimbursement and fees received on top of the claim principal — it is NOT part of the
+# three-way identity. Only flag when Paid column is available; gracefully skip otherwise.
+
+BALANCE_COLS = ('Paid by insurance', 'Denied by insurance',
+                'Pending insurance response', 'Purchase value')
+
+
+def _balance_identity_mask(ctx):
+    paid, denied, pending, pv = (ctx.num(c).fillna(0) for c in BALANCE_COLS)
+    total_src = paid + denied + pending
+    return ((total_src - pv).abs() > pv.abs() * 0.01) & (pv > 0)
+
+
+def _balance_identity(ctx, count):
+    if not count:
+        return []
+    return _warning('Balance Identity Violations', (
+        f'{count} deals where |Paid + Denied + Pending − Purchase value| '
+        f'> 1% of Purchase value. Possible data inconsistency.'
+    ))
+
+
+# ── 14. Column completeness summary ──
+
+def _column_completeness(ctx):
+    def build():
+        non_null = ctx.df.notna().sum().to_numpy()
+        return {col: round(nn / ctx.n * 100, 1) for col, nn in zip(ctx.df.columns, non_null)}
+    return ctx.memo('column_completeness', build)
+
+
+def _low_completeness(ctx):
+    low = {k: v for k, v in _column_completeness(ctx).items() if v < 90}
+    if not low:
+        return []
+    return _warning('Low Column Completeness',
+                    f'{len(low)} columns have <90% completeness: {low}')
+
+
+KLAIM_RULES = RuleSet('klaim', [
+    Rule('row_count', _row_count),
+    Rule('duplicate_ids', _duplicate_ids),
+    Rule('null_deal_dates', _null_deal_dates,
+         mask=lambda ctx: ctx.dates('Deal date').isna(), requires=('Deal date',)),
+    Rule('future_deal_dates', _future_deal_dates,
+         mask=lambda ctx: ctx.dates('Deal date') > pd.Timestamp.now(), requires=('Deal date',)),
+    Rule('old_deal_dates', _old_deal_dates,
+         mask=lambda ctx: ctx.dates('Deal date') < pd.Timestamp('2018-01-01'), requires=('Deal date',)),
+    Rule('deal_date_range', _deal_date_range, requires=('Deal date',)),
+    *[_negative_amount_rule(col) for col in AMOUNT_COLS],
+    *[rule for col in CRITICAL_COLS for rule in _critical_field_rules(col)],
+    Rule('over_collection', _over_collection,
+         mask=lambda ctx: ctx.num('Collected till date') > ctx.num('Purchase value') * 1.5,
+         requires=('Collected till date', 'Purchase value')),
+    Rule('completed_zero_collection', _completed_zero,
+         mask=lambda ctx: (ctx.df['Status'] == 'Completed') & (ctx.num('Collected till date') == 0),
+         requires=('Status', 'Collected till date')),
+    Rule('discount_over_100', _discount_over_100,
+         mask=lambda ctx: ctx.num('Discount') > 1, requires=('Discount',)),
+    Rule('negative_discount', _negative_discount,
+         mask=lambda ctx: ctx.num('Discount') < 0, requires=('Discount',)),
+    Rule('status_values', _status_values, requires=('Status',)),
+    Rule('combo_duplicates', _combo_duplicates, requires=tuple(COMBO_COLS)),
+    Rule('identical_amounts', _identical_amounts, requires=('Purchase value',)),
+    Rule('deal_size_outliers', _deal_size_outliers, requires=('Purchase value',)),
+    Rule('discount_outliers', _discount_outliers, requires=('Discount',)),
+    Rule('balance_identity', _balance_identity,
+         mask=_balance_identity_mask, requires=BALANCE_COLS),
+    Rule('low_completeness', _low_completeness),
+], extras=lambda ctx: {'column_completeness': _column_completeness(ctx)})
+
+
+def validate_tape(df, use_cache=True):
     """
     Run comprehensive data quality checks on a single loan tape.
-    Returns categorized findings: critical, warning, info.
+    Returns categorized findings: critical, warning, info, plus
+    per-rule timings. Results are cached by tape content.
     """
-    critical = []
-    warnings = []
-    info = []
-
-    total_rows = len(df)
-    info.append({
-        'check': 'Row Count',
-        'detail': f'{total_rows:,} deals in tape',
-    })
-
-    # ── 1. Duplicate ID detection ──
-    id_col = None
-    for candidate in ['ID', 'Id', 'id', 'Reference']:
-        if candidate in df.columns:
-            id_col = candidate
-            break
-
-    if id_col:
-        dupes = df[df.duplicated(subset=[id_col], keep=False)]
-        dupe_count = len(dupes)
-        unique_dupe_ids = dupes[id_col].nunique()
-        if dupe_count > 0:
-            critical.append({
-                'check': 'Duplicate IDs',
-                'detail': f'{dupe_count} rows with duplicate {id_col} ({unique_dupe_ids} unique IDs)',
-                'sample': list(dupes[id_col].unique()[:5]),
-            })
-        else:
-            info.append({
-                'check': 'Duplicate IDs',
-                'detail': f'No duplicate {id_col} values found',
-            })
-    else:
-        warnings.append({
-            'check': 'No ID Column',
-            'detail': 'No ID column found — cannot check for duplicates',
-        })
-
-    # ── 2. Date sanity checks ──
-    if 'Deal date' in df.columns:
-        dates = pd.to_datetime(df['Deal date'], errors='coerce', format='mixed')
-        null_dates = dates.isna().sum()
-        if null_dates > 0:
-            warnings.append({
-                'check': 'Null Deal Dates',
-                'detail': f'{null_dates} deals have null or unparseable Deal date',
-            })
-
-        valid_dates = dates.dropna()
-        if len(valid_dates):
-            future_dates = valid_dates[valid_dates > pd.Timestamp.now()]
-            if len(future_dates):
-                critical.append({
-                    'check': 'Future Deal Dates',
-                    'detail': f'{len(future_dates)} deals have Deal date in the future',
-                })
-
-            old_dates = valid_dates[valid_dates < pd.Timestamp('2018-01-01')]
-            if len(old_dates):
-                warnings.append({
-                    'check': 'Very Old Deal Dates',
-                    'detail': f'{len(old_dates)} deals have Deal date before 2018',
-                })
-
-            info.append({
-                'check': 'Date Range',
-                'detail': f'Deal dates span {valid_dates.min().strftime("%Y-%m-%d")} to {valid_dates.max().strftime("%Y-%m-%d")}',
-            })
-
-    # ── 3. Negative amount detection ──
-    amount_cols = ['Purchase value', 'Purchase price', 'Collected till date',
-                   'Denied by insurance', 'Pending insurance response',
-                   'Gross revenue', 'Setup fee', 'Other fee']
-    for col in amount_cols:
-        if col in df.columns:
-            numeric = pd.to_numeric(df[col], errors='coerce')
-            negatives = numeric[numeric < 0]
-            if len(negatives) > 0:
-                warnings.append({
-                    'check': f'Negative {col}',
-                    'detail': f'{len(negatives)} deals have negative {col} (min: {negatives.min():,.2f})',
-                })
-
-    # ── 4. Null / missing critical fields ──
-    critical_cols = ['Purchase value', 'Purchase price', 'Status',
-                     'Collected till date', 'Denied by insurance']
-    for col in critical_cols:
-        if col in df.columns:
-            nulls = df[col].isna().sum()
-            if nulls > 0:
-                warnings.append({
-                    'check': f'Null {col}',
-                    'detail': f'{nulls} deals have null {col}',
-                })
-        else:
-            critical.append({
-                'check': f'Missing Column: {col}',
-                'detail': f'Required column {col} not found in tape',
-            })
-
-    # ── 5. Collected > Purchase value anomalies ──
-    if 'Collected till date' in df.columns and 'Purchase value' in df.columns:
-        over_collected = df[
-            pd.to_numeric(df['Collected till date'], errors='coerce') >
-            pd.to_numeric(df['Purchase value'], errors='coerce') * 1.5
-        ]
-        if len(over_collected):
-            warnings.append({
-                'check': 'Over-Collection',
-                'detail': f'{len(over_collected)} deals have Collected > 150% of Purchase value',
-            })
-
-    # ── 6. Status vs collection consistency ──
-    if 'Status' in df.columns and 'Collected till date' in df.columns:
-        completed_zero = df[
-            (df['Status'] == 'Completed') &
-            (pd.to_numeric(df['Collected till date'], errors='coerce') == 0)
-        ]
-        if len(completed_zero):
-            warnings.append({
-                'check': 'Completed with Zero Collection',
-                'detail': f'{len(completed_zero)} deals marked Completed but have 0 collected',
-            })
-
-    # ── 7. Discount range check ──
-    if 'Discount' in df.columns:
-        disc = pd.to_numeric(df['Discount'], errors='coerce').dropna()
-        if len(disc):
-            if disc.max() > 1:
-                warnings.append({
-                    'check': 'Discount > 100%',
-                    'detail': f'{len(disc[disc > 1])} deals have Discount > 100% (max: {disc.max():.2%})',
-                })
-            if disc.min() < 0:
-                warnings.append({
-                    'check': 'Negative Discount',
-                    'detail': f'{len(disc[disc < 0])} deals have negative Discount',
-                })
-
-    # ── 8. Status value check ──
-    if 'Status' in df.columns:
-        valid_statuses = {'Executed', 'Completed'}
-        actual = set(df['Status'].dropna().unique())
-        unexpected = actual - valid_statuses
-        if unexpected:
-            warnings.append({
-                'check': 'Unexpected Status Values',
-                'detail': f'Found unexpected status values: {unexpected}',
-            })
-
-        status_counts = df['Status'].value_counts().to_dict()
-        info.append({
-            'check': 'Status Distribution',
-            'detail': f'Status breakdown: {status_counts}',
-        })
-
-    # ── 9. Duplicate counterparty + amount + date combos ──
-    combo_cols = [c for c in ['Group', 'Purchase value', 'Deal date'] if c in df.columns]
-    if len(combo_cols) == 3:
-        combo_dupes = df[df.duplicated(subset=combo_cols, keep=False)]
-        if len(combo_dupes) > 0:
-            unique_combos = combo_dupes.groupby(combo_cols).size().reset_index(name='count')
-            warnings.append({
-                'check': 'Duplicate Counterparty+Amount+Date',
-                'detail': (
-                    f'{len(combo_dupes)} rows share the same Group + Purchase value + Deal date '
-                    f'({len(unique_combos)} unique combinations). Possible double-entry.'
-                ),
-                'sample': unique_combos.head(3).to_dict(orient='records'),
-            })
-
-    # ── 10. Identical amount concentration ──
-    if 'Purchase value' in df.columns:
-        pv = pd.to_numeric(df['Purchase value'], errors='coerce').dropna()
-        if len(pv) > 0:
-            val_counts = pv.value_counts()
-            top_val = val_counts.index[0]
-            top_count = int(val_counts.iloc[0])
-            top_pct = top_count / len(pv) * 100
-            if top_pct > 5 and top_count > 10:
-                warnings.append({
-                    'check': 'Identical Amount Concentration',
-                    'detail': (
-                        f'{top_count} deals ({top_pct:.1f}%) share the same Purchase value of '
-                        f'{top_val:,.2f}. May indicate templated or copy-paste entries.'
-                    ),
-                })
-
-    # ── 11. Deal size outliers (IQR method, 3×IQR fence) ──
-    if 'Purchase value' in df.columns:
-        pv = pd.to_numeric(df['Purchase value'], errors='coerce').dropna()
-        if len(pv) >= 20:
-            q1, q3 = pv.quantile(0.25), pv.quantile(0.75)
-            iqr = q3 - q1
-            if iqr > 0:
-                upper = q3 + 3 * iqr
-                lower = max(q1 - 3 * iqr, 0)
-                outliers = pv[(pv > upper) | (pv < lower)]
-                if len(outliers) > 0:
-                    warnings.append({
-                        'check': 'Deal Size Outliers',
-                        'detail': (
-                            f'{len(outliers)} deals have Purchase value outside 3×IQR bounds '
-                            f'[{lower:,.0f} – {upper:,.0f}]. '
-                            f'Max outlier: {outliers.max():,.0f}.'
-                        ),
-                    })
-
-    # ── 12. Discount outliers (IQR method) ──
-    if 'Discount' in df.columns:
-        disc = pd.to_numeric(df['Discount'], errors='coerce').dropna()
-        disc = disc[(disc >= 0) & (disc <= 1)]
-        if len(disc) >= 20:
-            q1, q3 = disc.quantile(0.25), disc.quantile(0.75)
-            iqr = q3 - q1
-            if iqr > 0:
-                upper = q3 + 3 * iqr
-                lower = max(q1 - 3 * iqr, 0)
-                outliers = disc[(disc > upper) | (disc < lower)]
-                if len(outliers) > 0:
-                    warnings.append({
-                        'check': 'Discount Outliers',
-                        'detail': (
-                            f'{len(outliers)} deals have Discount outside 3×IQR bounds '
-                            f'[{lower:.1%} – {upper:.1%}]. '
-                            f'Max outlier: {outliers.max():.1%}.'
-                        ),
-                    })
-
-    # ── 13. Balance identity violations ──
-    # Klaim accounting identity (empirically verified):
-    #   Paid by insurance + Denied by insurance + Pending insurance response ≡ Purchase value
-    # `Collected till date` legitimately exceeds `Paid by insurance` because Collected includes
-    # VAT reimbursement and fees received on top of the claim principal — it is NOT part of the
-    # three-way identity. Only flag when Paid column is available; gracefully skip otherwise.
-    bal_cols = {
-        'paid':    'Paid by insurance',
-        'denied':  'Denied by insurance',
-        'pending': 'Pending insurance response',
-        'pv':      'Purchase value',
-    }
-    if all(c in df.columns for c in bal_cols.values()):
-        nums = {k: pd.to_numeric(df[v], errors='coerce').fillna(0) for k, v in bal_cols.items()}
-        total_src = nums['paid'] + nums['denied'] + nums['pending']
-        tolerance = nums['pv'].abs() * 0.01
-        violations = df[((total_src - nums['pv']).abs() > tolerance) & (nums['pv'] > 0)]
-        if len(violations) > 0:
-            warnings.append({
-                'check': 'Balance Identity Violations',
-                'detail': (
-                    f'{len(violations)} deals where |Paid + Denied + Pending − Purchase value| '
-                    f'> 1% of Purchase value. Possible data inconsistency.'
-                ),
-            })
-
-    # ── 14. Column completeness summary ──
-    col_completeness = {}
-    for col in df.columns:
-        non_null = df[col].notna().sum()
-        col_completeness[col] = round(non_null / total_rows * 100, 1)
-
-    low_completeness = {k: v for k, v in col_completeness.items() if v < 90}
-    if low_completeness:
-        warnings.append({
-            'check': 'Low Column Completeness',
-            'detail': f'{len(low_completeness)} columns have <90% completeness: {low_completeness}',
-        })
-
-    return {
-        'critical':  critical,
-        'warnings':  warnings,
-        'info':      info,
-        'passed':    len(critical) == 0,
-        'total_rows': total_rows,
-        'column_completeness': col_completeness,
-    }
+    return KLAIM_RULES.run(df, use_cache=use_cache)
@@ -1,7 +1,10 @@
 """
 Aajil SME Trade Credit — Tape Validation
 ==========================================
-Single-tape data quality checks for Aajil loan tapes.
+Single-tape data quality checks for Aajil loan tapes, expressed as a
+RuleSet (see core.validation_rules). Core columns are required: a tape
+missing Transaction ID, Invoice Date, Bill Notional, Realised Amount or
+Realised Status raises KeyError, as before.
 
 Usage:
     from core.validation_aajil import validate_aajil_tape
@@ -11,107 +14,117 @@ Usage:
 import pandas as pd
 import numpy as np
 
+from core.validation_rules import Rule, RuleSet
 
-def validate_aajil_tape(df):
-    """Run Aajil-specific data quality checks.
 
-    Returns dict with keys: critical, warnings, info, passed, total_rows
-    """
-    critical = []
-    warnings = []
-    info = []
-    n = len(df)
+def _count_finding(severity, template):
+    """Count-rule emitter: `template.format(n)` into `severity` when n > 0."""
+    def emit(ctx, count):
+        return [(severity, template.format(count))] if count else []
+    return emit
+
+
+def _written_off_with_receivable(ctx):
+    df = ctx.df
+    wo = (df['Realised Status'] == 'Written Off').to_numpy()
+    if not wo.any():
+        return wo
+    return wo & (df['Receivable Amount'].fillna(0) > 0).to_numpy()
+
+
+# ── Info checks ──────────────────────────────────────────────────
+
+def _status_distribution(ctx):
+    return [('info', f"Status distribution: {ctx.df['Realised Status'].value_counts().to_dict()}")]
+
+
+def _deal_type_distribution(ctx):
+    return [('info', f"Deal Type distribution: {ctx.df['Deal Type'].value_counts().to_dict()}")]
+
+
+def _date_range(ctx):
+    min_date = ctx.df['Invoice Date'].min()
+    max_date = ctx.df['Invoice Date'].max()
+    return [('info', f"Date range: {min_date:%Y-%m-%d} to {max_date:%Y-%m-%d}")]
+
+
+def _industry_coverage(ctx, count):
+    pct = count / ctx.n * 100
+    return [('info', f"Customer Industry: {pct:.1f}% missing ({count}/{ctx.n})")]
+
+
+def _unique_customers(ctx):
+    return [('info', f"Unique customers: {ctx.df['Unique Customer Code'].nunique()}")]
 
+
+def _amount_ranges(ctx):
+    df = ctx.df
+    tenure = df['Deal Tenure'].dropna()
+    return [
+        ('info', f"Bill Notional: SAR {df['Bill Notional'].min():,.0f} to SAR {df['Bill Notional'].max():,.0f}"),
+        ('info', f"Deal Tenure: {tenure.min():.0f} to {tenure.max():.0f} months"),
+    ]
+
+
+AAJIL_RULES = RuleSet('aajil', [
     # ── Critical checks ──────────────────────────────────────────────
     # 1. Duplicate Transaction IDs
-    dupes = df['Transaction ID'].dropna().duplicated()
-    if dupes.any():
-        critical.append(f"{dupes.sum()} duplicate Transaction IDs found")
-
+    Rule('duplicate_transaction_ids',
+         _count_finding('critical', '{} duplicate Transaction IDs found'),
+         mask=lambda ctx: ctx.df['Transaction ID'].duplicated() & ctx.df['Transaction ID'].notna()),
     # 2. Missing Transaction IDs
-    missing_id = df['Transaction ID'].isna().sum()
-    if missing_id > 0:
-        critical.append(f"{missing_id} rows with missing Transaction ID")
-
+    Rule('missing_transaction_id',
+         _count_finding('critical', '{} rows with missing Transaction ID'),
+         mask=lambda ctx: ctx.isna('Transaction ID')),
     # 3. Missing Invoice Date
-    missing_date = df['Invoice Date'].isna().sum()
-    if missing_date > 0:
-        critical.append(f"{missing_date} rows with missing Invoice Date")
-
+    Rule('missing_invoice_date',
+         _count_finding('critical', '{} rows with missing Invoice Date'),
+         mask=lambda ctx: ctx.isna('Invoice Date')),
     # ── Warning checks ───────────────────────────────────────────────
     # 4. Negative Bill Notional
-    neg_bill = (df['Bill Notional'].fillna(0) < 0).sum()
-    if neg_bill > 0:
-        warnings.append(f"{neg_bill} deals with negative Bill Notional")
-
+    Rule('negative_bill_notional',
+         _count_finding('warnings', '{} deals with negative Bill Notional'),
+         mask=lambda ctx: ctx.df['Bill Notional'].fillna(0) < 0),
     # 5. Negative Realised Amount
-    neg_real = (df['Realised Amount'].fillna(0) < 0).sum()
-    if neg_real > 0:
-        warnings.append(f"{neg_real} deals with negative Realised Amount")
-
+    Rule('negative_realised_amount',
+         _count_finding('warnings', '{} deals with negative Realised Amount'),
+         mask=lambda ctx: ctx.df['Realised Amount'].fillna(0) < 0),
     # 6. Sale Overdue > Sale Total
-    if 'Sale Overdue Amount' in df.columns and 'Sale Total' in df.columns:
-        overdue_exceeds = (df['Sale Overdue Amount'].fillna(0) > df['Sale Total'].fillna(0) * 1.01).sum()
-        if overdue_exceeds > 0:
-            warnings.append(f"{overdue_exceeds} deals where Sale Overdue Amount > Sale Total")
-
+    Rule('overdue_over_sale_total',
+         _count_finding('warnings', '{} deals where Sale Overdue Amount > Sale Total'),
+         mask=lambda ctx: ctx.df['Sale Overdue Amount'].fillna(0) > ctx.df['Sale Total'].fillna(0) * 1.01,
+         requires=('Sale Overdue Amount', 'Sale Total')),
     # 7. Paid installments > Total installments
-    if 'Paid No of Installments' in df.columns and 'Total No. of Installments' in df.columns:
-        paid_gt_total = (df['Paid No of Installments'].fillna(0) > df['Total No. of Installments'].fillna(0)).sum()
-        if paid_gt_total > 0:
-            warnings.append(f"{paid_gt_total} deals where Paid installments > Total installments")
-
+    Rule('paid_over_total_installments',
+         _count_finding('warnings', '{} deals where Paid installments > Total installments'),
+         mask=lambda ctx: (ctx.df['Paid No of Installments'].fillna(0)
+                           > ctx.df['Total No. of Installments'].fillna(0)),
+         requires=('Paid No of Installments', 'Total No. of Installments')),
     # 8. Future Invoice Dates
-    today = pd.Timestamp.now().normalize()
-    future = (df['Invoice Date'].dropna() > today).sum()
-    if future > 0:
-        warnings.append(f"{future} deals with Invoice Date in the future")
-
+    Rule('future_invoice_date',
+         _count_finding('warnings', '{} deals with Invoice Date in the future'),
+         mask=lambda ctx: ctx.df['Invoice Date'] > pd.Timestamp.now().normalize()),
     # 9. Deal Tenure <= 0
-    if 'Deal Tenure' in df.columns:
-        bad_tenure = (df['Deal Tenure'].dropna() <= 0).sum()
-        if bad_tenure > 0:
-            warnings.append(f"{bad_tenure} deals with Deal Tenure <= 0")
-
+    Rule('non_positive_tenure',
+         _count_finding('warnings', '{} deals with Deal Tenure <= 0'),
+         mask=lambda ctx: ctx.df['Deal Tenure'] <= 0, requires=('Deal Tenure',)),
     # 10. Written Off with Receivable > 0
-    wo = df[df['Realised Status'] == 'Written Off']
-    if len(wo) > 0:
-        wo_with_recv = (wo['Receivable Amount'].fillna(0) > 0).sum()
-        if wo_with_recv > 0:
-            warnings.append(f"{wo_with_recv} Written Off deals still have Receivable Amount > 0")
-
-    # ── Info checks ──────────────────────────────────────────────────
-    # Status distribution
-    status_dist = df['Realised Status'].value_counts().to_dict()
-    info.append(f"Status distribution: {status_dist}")
-
-    # Deal Type distribution
-    dt_dist = df['Deal Type'].value_counts().to_dict()
-    info.append(f"Deal Type distribution: {dt_dist}")
-
-    # Date range
-    min_date = df['Invoice Date'].min()
-    max_date = df['Invoice Date'].max()
-    info.append(f"Date range: {min_date:%Y-%m-%d} to {max_date:%Y-%m-%d}")
-
-    # Customer Industry coverage
-    if 'Customer Industry' in df.columns:
-        missing_ind = df['Customer Industry'].isna().sum()
-        pct = missing_ind / n * 100
-        info.append(f"Customer Industry: {pct:.1f}% missing ({missing_ind}/{n})")
-
-    # Unique customers
-    info.append(f"Unique customers: {df['Unique Customer Code'].nunique()}")
-
-    # Amount ranges
-    info.append(f"Bill Notional: SAR {df['Bill Notional'].min():,.0f} to SAR {df['Bill Notional'].max():,.0f}")
-    info.append(f"Deal Tenure: {df['Deal Tenure'].dropna().min():.0f} to {df['Deal Tenure'].dropna().max():.0f} months")
-
-    passed = len(critical) == 0
-    return {
-        'critical': critical,
-        'warnings': warnings,
-        'info': info,
-        'passed': passed,
-        'total_rows': n,
-    }
+    Rule('written_off_with_receivable',
+         _count_finding('warnings', '{} Written Off deals still have Receivable Amount > 0'),
+         mask=_written_off_with_receivable),
+    Rule('status_distribution', _status_distribution),
+    Rule('deal_type_distribution', _deal_type_distribution),
+    Rule('date_range', _date_range),
+    Rule('industry_coverage', _industry_coverage,
+         mask=lambda ctx: ctx.isna('Customer Industry'), requires=('Customer Industry',)),
+    Rule('unique_customers', _unique_customers),
+    Rule('amount_ranges', _amount_ranges),
+])
+
+
+def validate_aajil_tape(df, use_cache=True):
+    """Run Aajil-specific data quality checks.
+
+    Returns dict with keys: critical, warnings, info, passed, total_rows, rule_timings
+    """
+    return AAJIL_RULES.run(df, use_cache=use_cache)
@@ -0,0 +1,202 @@
+"""
+core/validation_rules.py
+Declarative rule engine behind the single-tape validators
+(core.validation, core.validation_silq, core.validation_aajil).
+
+A validator is a RuleSet: an ordered list of Rules. Each rule is either
+  - a count rule: `mask(ctx)` returns a per-row boolean expression and
+    `emit(ctx, count)` turns the count into findings, or
+  - an aggregate rule: `emit(ctx)` computes findings directly (duplicates,
+    quantile fences, distributions).
+
+Execution is fused: every count rule's mask is built first, then all masks
+are counted in a single vectorised pass over a stacked boolean matrix.
+Column coercions (`pd.to_numeric`, `pd.to_datetime`, null masks) are
+memoised on the TapeContext, so a column is parsed once no matter how many
+rules read it. Findings are emitted in rule declaration order, which keeps
+each severity bucket in the same order the hand-written validators used.
+
+Results are cached per (rule set, tape content hash, day) — "day" because
+future-date checks compare against today. A tape validated on the
+validation tab and again by the integrity endpoint is checked only once.
+
+Pure computation — no FastAPI, no I/O.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SEVERITIES = ('critical', 'warnings', 'info')
+
+Finding = Tuple[str, Any]  # (severity bucket, item)
+
+_CACHE_SIZE = 32
+_result_cache: 'OrderedDict[tuple, dict]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class TapeContext:
+    """A tape plus memoised column derivations shared by every rule."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self._memo: Dict[Any, Any] = {}
+
+    def has(self, *cols: str) -> bool:
+        return all(c in self.df.columns for c in cols)
+
+    def memo(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Compute `fn()` once per context under `key`."""
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def num(self, col: str) -> pd.Series:
+        """Column coerced to numeric (invalid → NaN)."""
+        return self.memo(('num', col), lambda: pd.to_numeric(self.df[col], errors='coerce'))
+
+    def dates(self, col: str) -> pd.Series:
+        """Column parsed to datetimes (invalid → NaT)."""
+        return self.memo(
+            ('dates', col),
+            lambda: pd.to_datetime(self.df[col], errors='coerce', format='mixed'),
+        )
+
+    def isna(self, col: str) -> pd.Series:
+        return self.memo(('isna', col), lambda: self.df[col].isna())
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One validation check.
+
+    Attributes:
+        name: Stable identifier, reported in `rule_timings`.
+        emit: `emit(ctx, count)` for count rules, `emit(ctx)` otherwise.
+            Returns a list of (severity, item) findings.
+        mask: Optional per-row boolean expression. When set, the rule is a
+            count rule and takes part in the fused counting pass.
+        requires: Columns that must all be present for the rule to run.
+    """
+
+    name: str
+    emit: Callable[..., List[Finding]]
+    mask: Optional[Callable[[TapeContext], Any]] = None
+    requires: Tuple[str, ...] = ()
+
+
+class RuleSet:
+    """An ordered, named collection of rules producing a validation report."""
+
+    def __init__(
+        self,
+        name: str,
+        rules: Sequence[Rule],
+        extras: Optional[Callable[[TapeContext], Dict[str, Any]]] = None,
+    ):
+        self.name = name
+        self.rules = list(rules)
+        self.extras = extras
+
+    def run(self, df: pd.DataFrame, use_cache: bool = True) -> Dict[str, Any]:
+        """Validate a tape.
+
+        Returns:
+            {critical, warnings, info, passed, total_rows, **extras,
+             rule_timings: [{rule, ms}, ...]}
+        """
+        key = None
+        if use_cache:
+            digest = tape_hash(df)
+            if digest is not None:
+                key = (self.name, digest, date.today().isoformat())
+                with _cache_lock:
+                    if key in _result_cache:
+                        _result_cache.move_to_end(key)
+                        return copy.deepcopy(_result_cache[key])
+
+        result = self._evaluate(df)
+
+        if key is not None:
+            with _cache_lock:
+                _result_cache[key] = copy.deepcopy(result)
+                if len(_result_cache) > _CACHE_SIZE:
+                    _result_cache.popitem(last=False)
+        return result
+
+    def _evaluate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        ctx = TapeContext(df)
+        rules = [r for r in self.rules if ctx.has(*r.requires)]
+        timings: Dict[str, float] = {r.name: 0.0 for r in rules}
+
+        # Pass 1 — build every count rule's mask
+        masked = [r for r in rules if r.mask is not None]
+        masks = []
+        for rule in masked:
+            t0 = time.perf_counter()
+            masks.append(_as_bool_array(rule.mask(ctx), ctx.n))
+            timings[rule.name] += time.perf_counter() - t0
+
+        # Pass 2 — count all masks at once
+        t0 = time.perf_counter()
+        counts: Dict[str, int] = {}
+        if masks:
+            totals = np.count_nonzero(np.vstack(masks), axis=1)
+            counts = {r.name: int(c) for r, c in zip(masked, totals)}
+        fused_ms = (time.perf_counter() - t0) * 1000
+
+        # Pass 3 — emit findings in declaration order
+        buckets: Dict[str, List[Any]] = {s: [] for s in SEVERITIES}
+        for rule in rules:
+            t0 = time.perf_counter()
+            findings = rule.emit(ctx, counts[rule.name]) if rule.mask is not None else rule.emit(ctx)
+            timings[rule.name] += time.perf_counter() - t0
+            for severity, item in findings:
+                buckets[severity].append(item)
+
+        result = {
+            'critical': buckets['critical'],
+            'warnings': buckets['warnings'],
+            'info': buckets['info'],
+            'passed': len(buckets['critical']) == 0,
+            'total_rows': ctx.n,
+        }
+        if self.extras:
+            result.update(self.extras(ctx))
+        result['rule_timings'] = [
+            {'rule': name, 'ms': round(sec * 1000, 3)} for name, sec in timings.items()
+        ] + [{'rule': '_fused_count_pass', 'ms': round(fused_ms, 3)}]
+        return result
+
+
+def _as_bool_array(mask: Any, n: int) -> np.ndarray:
+    """Row mask as a plain bool array; nullable-boolean NA counts as False."""
+    if hasattr(mask, 'to_numpy'):
+        return mask.to_numpy(dtype=bool, na_value=False).reshape(n)
+    return np.asarray(mask, dtype=bool).reshape(n)
+
+
+def tape_hash(df: pd.DataFrame) -> Optional[str]:
+    """Content hash of a tape (columns, dtypes, values). None if unhashable."""
+    try:
+        h = hashlib.sha256()
+        h.update(repr(list(df.columns)).encode('utf-8'))
+        h.update(repr([str(t) for t in df.dtypes]).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return h.hexdigest()
+    except (TypeError, ValueError):
+        return None
+
+
+def clear_validation_cache() -> None:
+    with _cache_lock:
+        _result_cache.clear()
@@ -1,129 +1,137 @@
 """
 SILQ-specific data quality validation checks for BNPL, RBF & RCL loan tapes.
+
+Expressed as a RuleSet (see core.validation_rules) so the per-row checks
+share one fused counting pass.
 """
 
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from core.validation_rules import Rule, RuleSet
 
-def validate_silq_tape(df):
-    """Run SILQ-specific data quality checks. Returns {critical, warnings, info, passed, total_rows}."""
-    critical = []
-    warnings = []
-    info = []
-    n = len(df)
-
-    # 1. Duplicate Deal IDs
-    if 'Deal ID' in df.columns:
-        dupes = df['Deal ID'].dropna().duplicated()
-        n_dupes = int(dupes.sum())
-        if n_dupes > 0:
-            critical.append(f'{n_dupes} duplicate Deal IDs found')
-        else:
-            info.append('No duplicate Deal IDs')
-
-    # 2. Negative amounts
-    amount_cols = {
-        'Disbursed_Amount (SAR)': 'disbursed amounts',
-        'Outstanding_Amount (SAR)': 'outstanding amounts',
-        'Overdue_Amount (SAR)': 'overdue amounts',
-        'Amt_Repaid': 'repaid amounts',
-        'Total_Collectable_Amount (SAR)': 'collectable amounts',
-        'Margin Collected': 'margin amounts',
-        'Principal Collected': 'principal amounts',
-    }
-    for col, label in amount_cols.items():
-        if col in df.columns:
-            neg = (df[col] < 0).sum()
-            if neg > 0:
-                warnings.append(f'{int(neg)} negative {label}')
 
-    # 3. Outstanding > Disbursed (warning, not critical — outstanding includes accrued margin)
-    if 'Outstanding_Amount (SAR)' in df.columns and 'Disbursed_Amount (SAR)' in df.columns:
-        bad = (df['Outstanding_Amount (SAR)'] > df['Disbursed_Amount (SAR)'] * 1.5).sum()
-        if bad > 0:
-            warnings.append(f'{int(bad)} loans where outstanding > 150% of disbursed')
+def _count_finding(severity, template):
+    """Count-rule emitter: `template.format(n)` into `severity` when n > 0."""
+    def emit(ctx, count):
+        return [(severity, template.format(count))] if count else []
+    return emit
 
-    # 4. Overdue > Outstanding
-    if 'Overdue_Amount (SAR)' in df.columns and 'Outstanding_Amount (SAR)' in df.columns:
-        bad = (df['Overdue_Amount (SAR)'] > df['Outstanding_Amount (SAR)'] + 0.01).sum()
-        if bad > 0:
-            warnings.append(f'{int(bad)} loans where overdue > outstanding')
 
-    # 5. Amt_Repaid > Total_Collectable (overcollection)
-    if 'Amt_Repaid' in df.columns and 'Total_Collectable_Amount (SAR)' in df.columns:
-        bad = (df['Amt_Repaid'] > df['Total_Collectable_Amount (SAR)'] + 0.01).sum()
-        if bad > 0:
-            warnings.append(f'{int(bad)} loans where repaid > collectable (overcollection)')
-
-    # 6. Missing Shop_ID
-    if 'Shop_ID' in df.columns:
-        missing = df['Shop_ID'].isna().sum()
-        if missing > 0:
-            warnings.append(f'{int(missing)} loans missing Shop_ID')
-        else:
-            info.append(f'{int(df["Shop_ID"].nunique())} unique shops')
+# 1. Duplicate Deal IDs
+def _duplicate_ids(ctx, count):
+    if count:
+        return [('critical', f'{count} duplicate Deal IDs found')]
+    return [('info', 'No duplicate Deal IDs')]
 
-    # 7. Missing Disbursement_Date
-    if 'Disbursement_Date' in df.columns:
-        missing = df['Disbursement_Date'].isna().sum()
-        if missing > 0:
-            critical.append(f'{int(missing)} loans missing Disbursement_Date')
 
-    # 8. Future disbursement dates
-    if 'Disbursement_Date' in df.columns:
-        today = pd.Timestamp.now().normalize()
-        future = (df['Disbursement_Date'] > today).sum()
-        if future > 0:
-            warnings.append(f'{int(future)} loans with future disbursement dates')
+# 2. Negative amounts
+AMOUNT_COLS = {
+    'Disbursed_Amount (SAR)': 'disbursed amounts',
+    'Outstanding_Amount (SAR)': 'outstanding amounts',
+    'Overdue_Amount (SAR)': 'overdue amounts',
+    'Amt_Repaid': 'repaid amounts',
+    'Total_Collectable_Amount (SAR)': 'collectable amounts',
+    'Margin Collected': 'margin amounts',
+    'Principal Collected': 'principal amounts',
+}
+
+
+def _negative_amount_rule(col, label):
+    return Rule(f'negative_{col}', _count_finding('warnings', '{} negative ' + label),
+                mask=lambda ctx: ctx.df[col] < 0, requires=(col,))
+
+
+# 6. Missing Shop_ID
+def _missing_shop_id(ctx, count):
+    if count:
+        return [('warnings', f'{count} loans missing Shop_ID')]
+    return [('info', f'{int(ctx.df["Shop_ID"].nunique())} unique shops')]
+
+
+# 10. Closed loans with outstanding > 0
+def _closed_with_outstanding_mask(ctx):
+    df = ctx.df
+    return (df['Loan_Status'] == 'Closed') & (df['Outstanding_Amount (SAR)'] > 0.01)
+
 
+# 11. Status distribution (info)
+def _status_distribution(ctx):
+    return [('info', f'{status}: {int(count)} loans ({count/ctx.n*100:.1f}%)')
+            for status, count in ctx.df['Loan_Status'].value_counts().items()]
+
+
+# 12. Product distribution (info)
+def _product_distribution(ctx):
+    return [('info', f'{prod}: {int(count)} loans')
+            for prod, count in ctx.df['Product'].value_counts().items()]
+
+
+# 13. Multi-sheet source info
+def _source_sheets(ctx):
+    sheet_dist = ctx.df['_source_sheet'].value_counts()
+    findings = [('info', f'Multi-sheet tape: {len(sheet_dist)} data sheet(s) loaded')]
+    findings += [('info', f'  Sheet "{sheet}": {int(count)} loans')
+                 for sheet, count in sheet_dist.items()]
+    return findings
+
+
+# 14. Cross-sheet Deal ID uniqueness
+def _cross_sheet_ids(ctx):
+    cross = ctx.df.groupby('Deal ID')['_source_sheet'].nunique()
+    cross_dupes = int((cross > 1).sum())
+    if cross_dupes > 0:
+        return [('critical', f'{cross_dupes} Deal IDs appear in multiple sheets')]
+    return [('info', 'No cross-sheet Deal ID overlaps')]
+
+
+SILQ_RULES = RuleSet('silq', [
+    Rule('duplicate_ids', _duplicate_ids,
+         mask=lambda ctx: ctx.df['Deal ID'].duplicated() & ctx.df['Deal ID'].notna(),
+         requires=('Deal ID',)),
+    *[_negative_amount_rule(col, label) for col, label in AMOUNT_COLS.items()],
+    # 3. Outstanding > Disbursed (warning, not critical — outstanding includes accrued margin)
+    Rule('outstanding_over_disbursed',
+         _count_finding('warnings', '{} loans where outstanding > 150% of disbursed'),
+         mask=lambda ctx: ctx.df['Outstanding_Amount (SAR)'] > ctx.df['Disbursed_Amount (SAR)'] * 1.5,
+         requires=('Outstanding_Amount (SAR)', 'Disbursed_Amount (SAR)')),
+    # 4. Overdue > Outstanding
+    Rule('overdue_over_outstanding',
+         _count_finding('warnings', '{} loans where overdue > outstanding'),
+         mask=lambda ctx: ctx.df['Overdue_Amount (SAR)'] > ctx.df['Outstanding_Amount (SAR)'] + 0.01,
+         requires=('Overdue_Amount (SAR)', 'Outstanding_Amount (SAR)')),
+    # 5. Amt_Repaid > Total_Collectable (overcollection)
+    Rule('overcollection',
+         _count_finding('warnings', '{} loans where repaid > collectable (overcollection)'),
+         mask=lambda ctx: ctx.df['Amt_Repaid'] > ctx.df['Total_Collectable_Amount (SAR)'] + 0.01,
+         requires=('Amt_Repaid', 'Total_Collectable_Amount (SAR)')),
+    Rule('missing_shop_id', _missing_shop_id,
+         mask=lambda ctx: ctx.isna('Shop_ID'), requires=('Shop_ID',)),
+    # 7. Missing Disbursement_Date
+    Rule('missing_disbursement_date',
+         _count_finding('critical', '{} loans missing Disbursement_Date'),
+         mask=lambda ctx: ctx.isna('Disbursement_Date'), requires=('Disbursement_Date',)),
+    # 8. Future disbursement dates
+    Rule('future_disbursement_date',
+         _count_finding('warnings', '{} loans with future disbursement dates'),
+         mask=lambda ctx: ctx.df['Disbursement_Date'] > pd.Timestamp.now().normalize(),
+         requires=('Disbursement_Date',)),
     # 9. Tenure issues
-    if 'Tenure' in df.columns:
-        bad_tenure = ((df['Tenure'] <= 0) | df['Tenure'].isna()).sum()
-        if bad_tenure > 0:
-            warnings.append(f'{int(bad_tenure)} loans with zero/negative/missing tenure')
-
-    # 10. Closed loans with outstanding > 0
-    if 'Loan_Status' in df.columns and 'Outstanding_Amount (SAR)' in df.columns:
-        closed = df[df['Loan_Status'] == 'Closed']
-        bad = (closed['Outstanding_Amount (SAR)'] > 0.01).sum()
-        if bad > 0:
-            warnings.append(f'{int(bad)} closed loans with outstanding > 0')
-
-    # 11. Status distribution (info)
-    if 'Loan_Status' in df.columns:
-        dist = df['Loan_Status'].value_counts()
-        for status, count in dist.items():
-            info.append(f'{status}: {int(count)} loans ({count/n*100:.1f}%)')
-
-    # 12. Product distribution (info)
-    if 'Product' in df.columns:
-        dist = df['Product'].value_counts()
-        for prod, count in dist.items():
-            info.append(f'{prod}: {int(count)} loans')
-
-    # 13. Multi-sheet source info
-    if '_source_sheet' in df.columns:
-        sheet_dist = df['_source_sheet'].value_counts()
-        info.append(f'Multi-sheet tape: {len(sheet_dist)} data sheet(s) loaded')
-        for sheet, count in sheet_dist.items():
-            info.append(f'  Sheet "{sheet}": {int(count)} loans')
-
-    # 14. Cross-sheet Deal ID uniqueness
-    if '_source_sheet' in df.columns and 'Deal ID' in df.columns:
-        cross = df.groupby('Deal ID')['_source_sheet'].nunique()
-        cross_dupes = int((cross > 1).sum())
-        if cross_dupes > 0:
-            critical.append(f'{cross_dupes} Deal IDs appear in multiple sheets')
-        else:
-            info.append('No cross-sheet Deal ID overlaps')
-
-    passed = len(critical) == 0
-    return {
-        'critical': critical,
-        'warnings': warnings,
-        'info': info,
-        'passed': passed,
-        'total_rows': n,
-    }
+    Rule('bad_tenure',
+         _count_finding('warnings', '{} loans with zero/negative/missing tenure'),
+         mask=lambda ctx: (ctx.df['Tenure'] <= 0) | ctx.isna('Tenure'), requires=('Tenure',)),
+    Rule('closed_with_outstanding',
+         _count_finding('warnings', '{} closed loans with outstanding > 0'),
+         mask=_closed_with_outstanding_mask,
+         requires=('Loan_Status', 'Outstanding_Amount (SAR)')),
+    Rule('status_distribution', _status_distribution, requires=('Loan_Status',)),
+    Rule('product_distribution', _product_distribution, requires=('Product',)),
+    Rule('source_sheets', _source_sheets, requires=('_source_sheet',)),
+    Rule('cross_sheet_ids', _cross_sheet_ids, requires=('_source_sheet', 'Deal ID')),
+])
+
+
+def validate_silq_tape(df, use_cache=True):
+    """Run SILQ-specific data quality checks. Returns {critical, warnings, info, passed, total_rows, rule_timings}."""
+    return SILQ_RULES.run(df, use_cache=use_cache)
@@ -12,6 +12,7 @@ import {
   getAssetClasses, getAssetClassEntries, promoteMindEntry,
   getFrameworkCodificationCandidates, markFrameworkEntryCodified,
   getRecurringChannels, getEmergentPatterns,
+  getOperatorPerformance, getOperatorProfiles, downloadOperatorProfile,
 } from '../services/api'
 
 // ── Section label (reused pattern from Home.jsx) ─────────────────────────────
@@ -786,6 +787,8 @@ export default function OperatorCenter() {
   const [codification, setCodification] = useState(null)  // D6 queue
   const [channels,  setChannels]  = useState(null)        // recurring channel detection
   const [emergent,  setEmergent]  = useState(null)        // cross-company emergent patterns
+  const [performance, setPerformance] = useState(null)    // request / compute latency telemetry
+  const [profiles, setProfiles] = useState(null)          // ?_profile= request profiles (admin)
   const [activeTab, setActiveTab] = useState('health')
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
@@ -868,6 +871,19 @@ export default function OperatorCenter() {
           setEmergent({ patterns: [], total: 0, error: 'Load failed' })
         })
     }
+    if (activeTab === 'performance' && performance === null) {
+      getOperatorPerformance()
+        .then(setPerformance)
+        .catch(e => {
+          console.error('Performance load failed:', e)
+          setPerformance({ routes: [], compute: [], tape_loads: [], caches: {}, error: 'Load failed' })
+        })
+    }
+    if (activeTab === 'performance' && profiles === null) {
+      getOperatorProfiles()
+        .then(setProfiles)
+        .catch(e => setProfiles({ profiles: [], error: e.response?.status === 403 ? 'Admin only' : 'Load failed' }))
+    }
   }, [activeTab, mindFilter, thesisCompany])
 
   const loadThesis = async (companyInfo) => {
@@ -1073,6 +1089,11 @@ export default function OperatorCenter() {
                 : null
             }
           />
+          <TabButton
+            label="Performance"
+            active={activeTab === 'performance'}
+            onClick={() => setActiveTab('performance')}
+          />
         </div>
 
         {/* Tab content */}
@@ -1733,6 +1754,23 @@ export default function OperatorCenter() {
               />
             )}
 
+            {/* ── Performance Tab ── */}
+            {activeTab === 'performance' && (
+              <PerformanceTab
+                data={performance}
+                profiles={profiles}
+                onRefresh={(reset = false) => {
+                  setPerformance(null)
+                  getOperatorPerformance(reset)
+                    .then(setPerformance)
+                    .catch(() => setPerformance({ routes: [], compute: [], tape_loads: [], caches: {}, error: 'Reload failed' }))
+                  getOperatorProfiles()
+                    .then(setProfiles)
+                    .catch(e => setProfiles({ profiles: [], error: e.response?.status === 403 ? 'Admin only' : 'Reload failed' }))
+                }}
+              />
+            )}
+
           </motion.div>
         </AnimatePresence>
       </div>
@@ -3099,3 +3137,157 @@ function SummaryStat({ label, value, color, accent }) {
     </div>
   )
 }
+
+/* ── Performance Tab ── */
+function LatencyTable({ title, rows, labelKey }) {
+  const cell = { padding: '6px 10px', fontFamily: 'var(--font-mono)', textAlign: 'right' }
+  return (
+    <div style={{ marginBottom: 22 }}>
+      <SectionLabel text={title} accent="var(--gold)" />
+      {rows.length === 0 ? (
+        <div style={{ color: 'var(--text-muted)', fontSize: 12 }}>No samples yet.</div>
+      ) : (
+        <table style={{ width: '100%', borderCollapse: 'collapse', fontSize: 11 }}>
+          <thead>
+            <tr style={{ color: 'var(--text-muted)', textTransform: 'uppercase', letterSpacing: '0.08em', fontSize: 10 }}>
+              <th style={{ ...cell, textAlign: 'left', fontFamily: 'inherit' }}>{labelKey}</th>
+              <th style={cell}>Count</th>
+              <th style={cell}>p50 ms</th>
+              <th style={cell}>p95 ms</th>
+              <th style={cell}>Mean ms</th>
+            </tr>
+          </thead>
+          <tbody>
+            {rows.map((r, i) => (
+              <tr key={i} style={{ borderTop: '1px solid var(--border)' }}>
+                <td style={{ ...cell, textAlign: 'left', color: 'var(--text-primary)' }}>
+                  {r.method ? `${r.method} ` : ''}{r[labelKey]}
+                  {r.status && r.status !== '200' ? <span style={{ color: 'var(--text-muted)' }}> · {r.status}</span> : null}
+                </td>
+                <td style={cell}>{r.count}</td>
+                <td style={cell}>{r.p50_ms}</td>
+                <td style={{ ...cell, color: r.p95_ms > 1000 ? '#F06060' : r.p95_ms > 250 ? 'var(--gold)' : 'var(--text-primary)' }}>
+                  {r.p95_ms}
+                </td>
+                <td style={cell}>{r.mean_ms}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  )
+}
+
+function PerformanceTab({ data, profiles, onRefresh }) {
+  if (data === null) {
+    return <div style={{ color: 'var(--text-muted)', fontSize: 13 }}>Loading performance telemetry…</div>
+  }
+  const caches = Object.entries(data.caches || {})
+  const button = {
+    fontSize: 11, fontFamily: 'var(--font-mono)', fontWeight: 600,
+    textTransform: 'uppercase', letterSpacing: '0.1em',
+    background: 'var(--bg-deep)', color: 'var(--text-muted)',
+    border: '1px solid var(--border)', padding: '6px 12px',
+    borderRadius: 4, cursor: 'pointer',
+  }
+
+  return (
+    <div>
+      <div style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', marginBottom: 18 }}>
+        <div style={{ fontSize: 11, color: 'var(--text-muted)', fontFamily: 'var(--font-mono)' }}>
+          {data.error || (data.enabled === false
+            ? 'Telemetry disabled (LAITH_TELEMETRY=0)'
+            : `Since process start or last reset · ${data.generated_at || ''}`)}
+        </div>
+        <div style={{ display: 'flex', gap: 8 }}>
+          <button onClick={() => onRefresh(false)} style={button}>Refresh</button>
+          <button onClick={() => onRefresh(true)} style={button}>Reset</button>
+        </div>
+      </div>
+
+      <div style={{ marginBottom: 22 }}>
+        <SectionLabel text="Cache hit ratios" accent="#2DD4BF" />
+        {caches.length === 0 ? (
+          <div style={{ color: 'var(--text-muted)', fontSize: 12 }}>No cache activity yet.</div>
+        ) : (
+          <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(160px, 1fr))', gap: 10 }}>
+            {caches.map(([name, c]) => (
+              <SummaryStat
+                key={name}
+                label={`${name}${c.entries != null ? ` · ${c.entries} entries` : ''}`}
+                value={`${Math.round((c.hit_ratio || 0) * 100)}%`}
+                color={(c.hit_ratio || 0) >= 0.8 ? '#2DD4BF' : (c.hit_ratio || 0) >= 0.5 ? 'var(--gold)' : '#F06060'}
+              />
+            ))}
+          </div>
+        )}
+      </div>
+
+      <LatencyTable title="Slowest routes (p95)" rows={data.routes || []} labelKey="route" />
+      <LatencyTable title="Slowest compute functions (p95)" rows={data.compute || []} labelKey="function" />
+      <LatencyTable title="Tape load + parse" rows={data.tape_loads || []} labelKey="loader" />
+      <ProfilesTable data={profiles} />
+    </div>
+  )
+}
+
+function ProfilesTable({ data }) {
+  const cell = { padding: '6px 10px', fontFamily: 'var(--font-mono)', textAlign: 'right' }
+  const rows = data?.profiles || []
+  return (
+    <div style={{ marginBottom: 22 }}>
+      <SectionLabel text="Request profiles" accent="#2DD4BF" />
+      <div style={{ color: 'var(--text-muted)', fontSize: 11, marginBottom: 8 }}>
+        Add <code>?_profile=1</code> (cProfile) or <code>?_profile=sample</code> (flamegraph stacks) to any API
+        request, or send <code>X-Laith-Profile</code>. Admins only; artifacts land in reports/profiles/.
+      </div>
+      {data === null ? (
+        <div style={{ color: 'var(--text-muted)', fontSize: 12 }}>Loading…</div>
+      ) : data.error ? (
+        <div style={{ color: 'var(--text-muted)', fontSize: 12 }}>{data.error}</div>
+      ) : rows.length === 0 ? (
+        <div style={{ color: 'var(--text-muted)', fontSize: 12 }}>No profiles captured yet.</div>
+      ) : (
+        <table style={{ width: '100%', borderCollapse: 'collapse', fontSize: 11 }}>
+          <thead>
+            <tr style={{ color: 'var(--text-muted)', textTransform: 'uppercase', letterSpacing: '0.08em', fontSize: 10 }}>
+              <th style={{ ...cell, textAlign: 'left', fontFamily: 'inherit' }}>Route</th>
+              <th style={{ ...cell, textAlign: 'left', fontFamily: 'inherit' }}>Tape</th>
+              <th style={{ ...cell, textAlign: 'left', fontFamily: 'inherit' }}>Hottest (self time)</th>
+              <th style={cell}>Mode</th>
+              <th style={cell}>ms</th>
+              <th style={cell}>Captured</th>
+              <th style={cell} />
+            </tr>
+          </thead>
+          <tbody>
+            {rows.map(p => (
+              <tr key={p.id} style={{ borderTop: '1px solid var(--border)' }}>
+                <td style={{ ...cell, textAlign: 'left', color: 'var(--text-primary)' }}>
+                  {p.method} {p.path}
+                  {p.status !== 200 ? <span style={{ color: '#F06060' }}> · {p.status}</span> : null}
+                </td>
+                <td style={{ ...cell, textAlign: 'left' }}>{p.tape ? (p.tape.filename || `${p.tape.company}/${p.tape.product}`) : '—'}</td>
+                <td style={{ ...cell, textAlign: 'left' }}>{p.hottest || '—'}</td>
+                <td style={cell}>{p.mode}</td>
+                <td style={{ ...cell, color: p.duration_ms > 1000 ? '#F06060' : p.duration_ms > 250 ? 'var(--gold)' : 'var(--text-primary)' }}>
+                  {p.duration_ms}
+                </td>
+                <td style={cell}>{(p.created_at || '').replace('T', ' ').slice(0, 16)}</td>
+                <td style={cell}>
+                  <button
+                    onClick={() => downloadOperatorProfile(p).catch(e => console.error('Profile download failed:', e))}
+                    style={{ background: 'none', border: 'none', color: 'var(--gold)', cursor: 'pointer', fontSize: 11, fontFamily: 'var(--font-mono)' }}
+                  >
+                    {p.artifact?.endsWith('.folded') ? '.folded' : '.prof'}
+                  </button>
+                </td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  )
+}
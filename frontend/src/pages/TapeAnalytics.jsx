@@ -248,17 +248,17 @@ function SilqTabContent({ tab, activeTab, company, product, snapshot, snapshots,
   }
   // Map tab slugs to components
   const SILQ_TABS = {
-    'delinquency':     <ChartTab tab="delinquency" {...chartProps}><SilqDelinquencyChart {...chartProps} /></ChartTab>,
-    'collections':     <ChartTab tab="collections" {...chartProps}><SilqCollectionsChart {...chartProps} /></ChartTab>,
-    'concentration':   <ChartTab tab="concentration" {...chartProps}><SilqConcentrationChart {...chartProps} /></ChartTab>,
-    'cohort-analysis': <ChartTab tab="cohort" {...chartProps}><SilqCohortTable {...chartProps} /></ChartTab>,
-    'yield-margins':   <ChartTab tab="yield-margins" {...chartProps}><YieldMarginsChart {...chartProps} /></ChartTab>,
-    'tenure':          <ChartTab tab="tenure" {...chartProps}><TenureAnalysisChart {...chartProps} /></ChartTab>,
-    'covenants':          <ChartTab tab="covenants" {...chartProps}><SilqCovenantsChart {...chartProps} /></ChartTab>,
-    'seasonality':        <ChartTab tab="seasonality" {...chartProps}><SilqSeasonalityChart {...chartProps} /></ChartTab>,
-    'loss-waterfall':     <ChartTab tab="loss-waterfall" {...chartProps}><SilqLossWaterfallChart {...chartProps} /></ChartTab>,
-    'underwriting-drift': <ChartTab tab="underwriting-drift" {...chartProps}><SilqUnderwritingDriftChart {...chartProps} /></ChartTab>,
-    'cdr-ccr':            <ChartTab tab="cdr-ccr" {...chartProps}><SilqCdrCcrChart {...chartProps} /></ChartTab>,
+    'delinquency':     <ChartTab slug="delinquency" {...chartProps}><SilqDelinquencyChart {...chartProps} /></ChartTab>,
+    'collections':     <ChartTab slug="collections" {...chartProps}><SilqCollectionsChart {...chartProps} /></ChartTab>,
+    'concentration':   <ChartTab slug="concentration" {...chartProps}><SilqConcentrationChart {...chartProps} /></ChartTab>,
+    'cohort-analysis': <ChartTab slug="cohort-analysis" {...chartProps}><SilqCohortTable {...chartProps} /></ChartTab>,
+    'yield-margins':   <ChartTab slug="yield-margins" {...chartProps}><YieldMarginsChart {...chartProps} /></ChartTab>,
+    'tenure':          <ChartTab slug="tenure" {...chartProps}><TenureAnalysisChart {...chartProps} /></ChartTab>,
+    'covenants':          <ChartTab slug="covenants" {...chartProps}><SilqCovenantsChart {...chartProps} /></ChartTab>,
+    'seasonality':        <ChartTab slug="seasonality" {...chartProps}><SilqSeasonalityChart {...chartProps} /></ChartTab>,
+    'loss-waterfall':     <ChartTab slug="loss-waterfall" {...chartProps}><SilqLossWaterfallChart {...chartProps} /></ChartTab>,
+    'underwriting-drift': <ChartTab slug="underwriting-drift" {...chartProps}><SilqUnderwritingDriftChart {...chartProps} /></ChartTab>,
+    'cdr-ccr':            <ChartTab slug="cdr-ccr" {...chartProps}><SilqCdrCcrChart {...chartProps} /></ChartTab>,
   }
   return SILQ_TABS[tab] || <div style={{ color: 'var(--text-muted)' }}>Tab not found</div>
 }
@@ -277,88 +277,88 @@ function KlaimTabContent({ activeTab, company, product, snapshot, snapshots, cur
         />
       )}
       {activeTab === 'Actual vs Expected' && (
-        <ChartTab tab="actual-vs-expected" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="actual-vs-expected" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <ActualVsExpectedChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Deployment' && (
-        <ChartTab tab="deployment" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="deployment" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <DeploymentChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Collection' && (
-        <ChartTab tab="collection-velocity" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="collection" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <CollectionVelocityChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Denial Trend' && (
-        <ChartTab tab="denial-trend" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="denial-trend" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <DenialFunnelChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
           <DenialTrendChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Ageing' && (
-        <ChartTab tab="ageing" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="ageing" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <AgeingChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Revenue' && (
-        <ChartTab tab="revenue" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="revenue" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <RevenueChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Portfolio' && (
-        <ChartTab tab="concentration" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="portfolio-tab" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <ConcentrationChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Cohort Analysis' && (
-        <ChartTab tab="cohort" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="cohort-analysis" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <CohortTable company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Returns' && (
-        <ChartTab tab="returns" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="returns" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <ReturnsAnalysisChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Collections Timing' && (
-        <ChartTab tab="collections-timing" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="collections-timing" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <CollectionsTimingChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Loss Waterfall' && (
-        <ChartTab tab="loss-waterfall" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="loss-waterfall" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <CohortLossWaterfallChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Recovery Analysis' && (
-        <ChartTab tab="recovery-analysis" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="recovery-analysis" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <RecoveryAnalysisChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Underwriting Drift' && (
-        <ChartTab tab="underwriting-drift" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="underwriting-drift" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <UnderwritingDriftChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Segment Analysis' && (
-        <ChartTab tab="segment-analysis" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="segment-analysis" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <SegmentAnalysisChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Seasonality' && (
-        <ChartTab tab="seasonality" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="seasonality" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <SeasonalityChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'CDR / CCR' && (
-        <ChartTab tab="cdr-ccr" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="cdr-ccr" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <CdrCcrChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
       {activeTab === 'Risk & Migration' && (
-        <ChartTab tab="risk-migration" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
+        <ChartTab slug="risk-migration" company={company} product={product} snapshot={snapshot} currency={currency} isBackdated={isBackdated}>
           <RiskMigrationChart company={company} product={product} snapshot={snapshot} currency={currency} asOfDate={asOfDate} />
         </ChartTab>
       )}
@@ -719,10 +719,14 @@ function LoadingBar() {
 }
 
 /* ── Chart Tab wrapper ── */
-function ChartTab({ tab, company, product, snapshot, currency, children, isBackdated }) {
+// The insight `tab` comes from the config's insight_tabs (core/insight_tabs.py),
+// the same registry AI pregeneration sweeps, so panels hit pregenerated cache.
+function ChartTab({ slug, company, product, snapshot, currency, children, isBackdated }) {
+  const { config } = useCompany()
+  const tab = config?.insight_tabs?.[slug]
   return (
     <div style={{ display: 'flex', flexDirection: 'column', gap: 14 }}>
-      <TabInsight company={company} product={product} snapshot={snapshot} currency={currency} tab={tab} isBackdated={isBackdated} />
+      {tab && <TabInsight company={company} product={product} snapshot={snapshot} currency={currency} tab={tab} isBackdated={isBackdated} />}
       {children}
     </div>
   )
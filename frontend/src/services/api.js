@@ -23,6 +23,46 @@ api.interceptors.response.use(
   }
 )
 
+// Columnar chart payloads (opt-in: VITE_CHART_FORMAT=columnar). Chart GETs ask for
+// ?format=columnar and every {"$columns": {key: [values]}} table in the response is
+// expanded back to rows here, so components always see the row shape.
+const CHART_FORMAT = import.meta.env.VITE_CHART_FORMAT === 'columnar' ? 'columnar' : null
+const COLUMNS_KEY = '$columns'
+
+export const fromColumnar = (value) => {
+  if (Array.isArray(value)) return value.map(fromColumnar)
+  if (value === null || typeof value !== 'object') return value
+  const keys = Object.keys(value)
+  const cols = keys.length === 1 && keys[0] === COLUMNS_KEY ? value[COLUMNS_KEY] : null
+  if (cols && typeof cols === 'object' && !Array.isArray(cols)) {
+    const names = Object.keys(cols)
+    const n = names.length ? cols[names[0]].length : 0
+    const rows = new Array(n)
+    for (let i = 0; i < n; i++) {
+      const row = {}
+      for (const name of names) row[name] = fromColumnar(cols[name][i])
+      rows[i] = row
+    }
+    return rows
+  }
+  const out = {}
+  for (const k of keys) out[k] = fromColumnar(value[k])
+  return out
+}
+
+if (CHART_FORMAT) {
+  api.interceptors.request.use(config => {
+    if ((config.method || 'get') === 'get' && config.url?.includes('/charts/')) {
+      config.params = { ...(config.params || {}), format: CHART_FORMAT }
+    }
+    return config
+  })
+  api.interceptors.response.use(response => {
+    if (response.config.params?.format === 'columnar') response.data = fromColumnar(response.data)
+    return response
+  })
+}
+
 export default api;
 
 // ── Framework ────────────────────────────────────────────────────────────────
@@ -218,6 +258,10 @@ export const getMethodologyLog        = (co, prod, snap, cur, asOf) =>
   api.get(`/companies/${co}/products/${prod}/charts/methodology-log`, { params: { snapshot: snap, ...(asOf ? { as_of_date: asOf } : {}) } }).then(r => r.data);
 export const getHhiTimeseries         = (co, prod, cur) =>
   api.get(`/companies/${co}/products/${prod}/charts/hhi-timeseries`, { params: { currency: cur } }).then(r => r.data);
+export const getAsOfSweep             = (co, prod, snap, cur, metric, { points, dates } = {}) =>
+  api.get(`/companies/${co}/products/${prod}/charts/as-of-sweep`, {
+    params: { snapshot: snap, currency: cur, metric, ...(dates ? { dates: dates.join(',') } : { points }) },
+  }).then(r => r.data);
 export const getCdrCcr                = (co, prod, snap, cur, asOf) =>
   api.get(`/companies/${co}/products/${prod}/charts/cdr-ccr`, { params: p(snap, cur, asOf) }).then(r => r.data);
 export const getSilqCdrCcr            = (co, prod, snap, cur, asOf) =>
@@ -306,6 +350,10 @@ export const getFacilityParams              = (co, prod) =>
   api.get(`/companies/${co}/products/${prod}/portfolio/facility-params`).then(r => r.data);
 export const saveFacilityParams             = (co, prod, params) =>
   api.post(`/companies/${co}/products/${prod}/portfolio/facility-params`, params).then(r => r.data);
+export const getCovenantLedger              = (co, prod, refresh = false) =>
+  api.get(`/companies/${co}/products/${prod}/portfolio/covenant-ledger`, { params: { refresh } }).then(r => r.data);
+export const getFacilityWhatIf              = (co, prod, snap, cur, asOf, { variants, grid } = {}) =>
+  api.post(`/companies/${co}/products/${prod}/portfolio/what-if`, { variants, grid }, { params: p(snap, cur, asOf) }).then(r => r.data);
 
 // ── Portfolio Dashboard Data ────────────────────────────────────────────────
 export const getPortfolioInvoices          = (co, prod, page = 1, perPage = 50, filters = {}) =>
@@ -423,6 +471,19 @@ export const getLegalAmendmentDiff      = (co, prod, oldFile, newFile) =>
 // NB: endpoints live under /api/operator/* to avoid colliding with the SPA
 // route /operator (reverse proxy prefix-matches /operator otherwise).
 export const getOperatorStatus       = () => api.get('/api/operator/status').then(r => r.data);
+export const getOperatorPerformance  = (reset = false) =>
+  api.get('/api/operator/performance', { params: reset ? { reset: true } : {} }).then(r => r.data);
+export const getOperatorProfiles     = (limit = 50) =>
+  api.get('/api/operator/profiles', { params: { limit } }).then(r => r.data);
+export const downloadOperatorProfile = (profile) =>
+  api.get(`/api/operator/profiles/${profile.id}/download`, { responseType: 'blob' }).then(r => {
+    const url = URL.createObjectURL(new Blob([r.data], { type: 'application/octet-stream' }));
+    const a   = document.createElement('a');
+    a.href     = url;
+    a.download = profile.artifact;
+    a.click();
+    setTimeout(() => URL.revokeObjectURL(url), 60_000);
+  });
 export const getOperatorTodos        = () => api.get('/api/operator/todo').then(r => r.data);
 export const createOperatorTodo      = (item) => api.post('/api/operator/todo', item).then(r => r.data);
 export const updateOperatorTodo      = (id, update) => api.patch(`/api/operator/todo/${id}`, update).then(r => r.data);
@@ -0,0 +1,78 @@
+"""Backfill the covenant ledger — one covenant test per tape, computed once.
+
+Runs core.covenant_ledger.update_ledger for every klaim / silq product (or
+one product), loading and testing tapes in parallel worker processes.
+Entries whose tape, facility params and ledger version are unchanged are
+skipped, so re-running is cheap; --force recomputes everything.
+
+Usage:
+    # Every tape-based product, 4 worker processes:
+    python scripts/backfill_covenant_ledger.py --workers 4
+
+    # One product, recompute all entries:
+    python scripts/backfill_covenant_ledger.py --company klaim --product UAE_healthcare --force
+
+    # Machine-readable report:
+    python scripts/backfill_covenant_ledger.py --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _scope(company=None, product=None):
+    from core.config import load_config
+    from core.covenant_ledger import LEDGER_TYPES
+    from core.loader import get_companies, get_products
+
+    if company and product:
+        return [(company, product)]
+    out = []
+    for co in get_companies():
+        co = co['name'] if isinstance(co, dict) else co
+        if company and co != company:
+            continue
+        for prod in get_products(co):
+            prod = prod['name'] if isinstance(prod, dict) else prod
+            if (load_config(co, prod) or {}).get('analysis_type') in LEDGER_TYPES:
+                out.append((co, prod))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--company", default=None)
+    ap.add_argument("--product", default=None)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="worker processes per product (default: CPU count)")
+    ap.add_argument("--force", action="store_true", help="recompute entries that are already current")
+    ap.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = ap.parse_args(argv)
+    if args.product and not args.company:
+        ap.error("--product needs --company")
+
+    from core.covenant_ledger import update_ledger
+
+    reports = []
+    for company, product in _scope(args.company, args.product):
+        t0 = time.perf_counter()
+        report = update_ledger(company, product, workers=args.workers, force=args.force)
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        reports.append(report)
+        if not args.json:
+            print(f"{company}/{product}: {len(report['computed'])} computed, "
+                  f"{len(report['skipped'])} current, {len(report['errors'])} failed "
+                  f"in {report['elapsed_s']}s")
+            for name, err in report["errors"].items():
+                print(f"  FAILED {name}: {err}")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 1 if any(r["errors"] for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
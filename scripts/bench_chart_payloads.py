@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark chart payload size and serialisation time (backend.chart_payloads).
+
+Calls every GET /charts/ endpoint of the app for one product in-process
+(the unwrapped handler, so the payload still holds NumPy / pandas values)
+and serialises the result three ways:
+
+    default   jsonable_encoder + json.dumps — FastAPI's path before ChartRoute
+    orjson    orjson on the row payload      — what ?format is absent now returns
+    columnar  to_columnar + orjson           — ?format=columnar
+
+reporting bytes (raw, gzip, and brotli when installed) and the median
+serialisation time per endpoint. Chart computation itself is not timed.
+
+Usage:
+    python scripts/bench_chart_payloads.py [--company klaim --product UAE_healthcare]
+        [--snapshot NAME] [--repeat 5] [--json]
+"""
+import argparse
+import gzip
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+PRODUCT_PREFIX = "/companies/{company}/products/{product}/charts/"
+
+
+def _chart_routes(app):
+    from fastapi.routing import APIRoute
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path.startswith(PRODUCT_PREFIX) and "GET" in route.methods:
+            yield route.path[len(PRODUCT_PREFIX):], getattr(route.endpoint, "__wrapped__", route.endpoint)
+
+
+def _call(handler, company, product, snapshot):
+    """Invoke a sync handler with company/product/snapshot; None if it needs anything else."""
+    if inspect.iscoroutinefunction(handler):
+        return None
+    kwargs = {}
+    for name, param in inspect.signature(handler).parameters.items():
+        if name == "company":
+            kwargs[name] = company
+        elif name == "product":
+            kwargs[name] = product
+        elif name == "snapshot":
+            kwargs[name] = snapshot
+        elif param.default is inspect.Parameter.empty or type(param.default).__module__.startswith("fastapi"):
+            return None
+    return handler(**kwargs)
+
+
+def _timed(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return out, round(statistics.median(times), 3)
+
+
+def _sizes(body):
+    sizes = {"raw": len(body), "gzip": len(gzip.compress(body, 6))}
+    try:
+        import brotli
+        sizes["br"] = len(brotli.compress(body, quality=5))
+    except ImportError:
+        pass
+    return sizes
+
+
+def bench(company, product, snapshot=None, repeat=5):
+    from fastapi.encoders import jsonable_encoder
+    from backend.chart_payloads import dumps, to_columnar
+    import backend.main as main
+
+    ways = {
+        "default": lambda p: json.dumps(jsonable_encoder(p), ensure_ascii=False,
+                                        separators=(",", ":")).encode(),
+        "orjson": dumps,
+        "columnar": lambda p: dumps(to_columnar(p)),
+    }
+    rows = []
+    for chart, handler in sorted(_chart_routes(main.app)):
+        try:
+            payload = _call(handler, company, product, snapshot)
+        except Exception as e:            # chart not applicable to this analysis type
+            rows.append({"chart": chart, "skipped": type(e).__name__})
+            continue
+        if payload is None:
+            rows.append({"chart": chart, "skipped": "needs extra params"})
+            continue
+        row = {"chart": chart}
+        for way, fn in ways.items():
+            try:
+                body, ms = _timed(lambda: fn(payload), repeat)
+            except (TypeError, ValueError) as e:
+                row[way] = {"error": str(e)[:80]}
+                continue
+            row[way] = {"ms": ms, **_sizes(body)}
+        rows.append(row)
+    return rows
+
+
+def _totals(rows):
+    out = {}
+    for row in rows:
+        for way in ("default", "orjson", "columnar"):
+            stats = row.get(way)
+            if not stats or "error" in stats:
+                continue
+            acc = out.setdefault(way, {})
+            for k, v in stats.items():
+                acc[k] = round(acc.get(k, 0) + v, 3)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--company", default="klaim")
+    ap.add_argument("--product", default="UAE_healthcare")
+    ap.add_argument("--snapshot", default=None)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    rows = bench(args.company, args.product, args.snapshot, args.repeat)
+    totals = _totals(rows)
+    if args.json:
+        print(json.dumps({"company": args.company, "product": args.product,
+                          "charts": rows, "totals": totals}, indent=2))
+        return 0
+
+    print(f"{'chart':32} {'default KB':>10} {'col KB':>8} {'col gz KB':>9} "
+          f"{'default ms':>10} {'orjson ms':>9} {'col ms':>7}")
+    for row in rows:
+        if "skipped" in row:
+            print(f"{row['chart']:32} skipped ({row['skipped']})")
+            continue
+        d, o, c = row["default"], row["orjson"], row["columnar"]
+        if any("error" in x for x in (d, o, c)):
+            print(f"{row['chart']:32} error: {next(x['error'] for x in (d, o, c) if 'error' in x)}")
+            continue
+        print(f"{row['chart']:32} {d['raw'] / 1024:10.1f} {c['raw'] / 1024:8.1f} {c['gzip'] / 1024:9.1f} "
+              f"{d['ms']:10.2f} {o['ms']:9.2f} {c['ms']:7.2f}")
+    if totals.get("default") and totals.get("columnar"):
+        d, o, c = totals["default"], totals["orjson"], totals["columnar"]
+        print(f"\nTotal: {d['raw'] / 1024:.0f} KB → {c['raw'] / 1024:.0f} KB columnar "
+              f"({c['gzip'] / 1024:.0f} KB gzip); serialisation {d['ms']:.1f} ms → "
+              f"{o['ms']:.1f} ms orjson / {c['ms']:.1f} ms columnar")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
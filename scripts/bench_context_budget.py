@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Benchmark input-token reduction from context budgeting (core.context_budget).
+
+Builds memo section prompts and research RAG prompts twice, once the old
+way (no budget, no dedupe) and once through the budgeted path, then reports
+estimated input tokens per prompt plus the packing overhead.
+
+The data room corpus is core/ANALYSIS_FRAMEWORK.md with its headings
+flattened, chunked by the real chunker (400-token windows, 100-token
+overlap), which is roughly what a long facility agreement PDF looks like.
+Retrieval ranks chunks by query-term overlap. Mind context comes from the
+real data/ tree for --company/--product.
+
+Usage:
+    python scripts/bench_context_budget.py [--company klaim --product UAE_healthcare]
+        [--memo-budget 8000] [--research-budget 12000] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RESEARCH_QUESTIONS = [
+    "How should PAR be computed for covenant testing versus learning metrics?",
+    "What is the separation principle and how does it affect collection rate?",
+    "Which denominator should the advance rate and borrowing base use?",
+    "How are stale deals filtered out of cohort loss curves?",
+    "When must confidence grades be disclosed next to headline metrics?",
+]
+
+
+def _corpus():
+    from core.dataroom.chunker import chunk_document
+    text = (ROOT / "core" / "ANALYSIS_FRAMEWORK.md").read_text(encoding="utf-8")
+    text = re.sub(r"(?m)^#+\s*", "", text)
+    return [c["text"] for c in chunk_document(text, max_chunk_tokens=400, overlap_tokens=100)]
+
+
+def _retrieve(corpus, query, top_k):
+    from core.context_budget import query_terms, score_relevance
+    terms = query_terms(query)
+    ranked = sorted(range(len(corpus)), key=lambda i: (-score_relevance(corpus[i], terms), i))
+    return [(i, corpus[i], round(score_relevance(corpus[i], terms), 2)) for i in ranked[:top_k]]
+
+
+def _analytics_text(company, product):
+    """A representative analytics block: the summary line items the bridge emits."""
+    lines = [f"Analytics for {company}/{product}:"]
+    for i, metric in enumerate(["Collection rate", "Denial rate", "PAR30 lifetime", "PAR60 lifetime",
+                                "DSO weighted", "HHI group", "Realised margin", "Expected loss"]):
+        lines.append(f"- {metric}: {80 - i * 7.3:.1f} (population active_outstanding, confidence B)")
+    return "\n".join(lines)
+
+
+class _Unbudgeted:
+    """Baseline: the pre-budget prompt paths (no packing, no dedupe)."""
+
+    def __enter__(self):
+        import core.mind as mind
+        self._mind, self._orig = mind, mind._fit_to_budget
+        mind._fit_to_budget = lambda ctx, budget, query: ctx
+        return self
+
+    def __exit__(self, *exc):
+        self._mind._fit_to_budget = self._orig
+
+
+def _bench_memo(company, product, corpus):
+    from core.context_budget import estimate_tokens
+    from core.memo.generator import (
+        _build_prior_text, _build_section_system_prompt, _build_section_user_prompt, _fit_section_context,
+    )
+    from core.memo.templates import get_template
+    from core.mind import build_mind_context
+
+    template = get_template("credit_memo")
+    body, rows = [], []
+    analytics = _analytics_text(company, product)
+    for section in template["sections"]:
+        if section.get("source") == "auto":
+            continue
+        query = f"{section['title']} {section['guidance']}"
+        hits = _retrieve(corpus, query, 5)
+        research = "\n\n".join(f"[{n}] Source: framework.pdf (relevance: {s:.2f})\n{t}"
+                               for n, (_, t, s) in enumerate(hits, 1))
+        prior = body if section.get("ai_guided") else []
+
+        with _Unbudgeted():
+            mind_old = build_mind_context(company, product, "memo", section_key=section["key"],
+                                          query_text=query).formatted
+        old = (_build_section_system_prompt(company, product, template["name"], mind_old)
+               + _build_section_user_prompt(section, analytics, research, _build_prior_text(prior)))
+
+        t0 = time.perf_counter()
+        mind_new = build_mind_context(company, product, "memo", section_key=section["key"],
+                                      query_text=query).formatted
+        a, r, p, pr, report = _fit_section_context(section, analytics, research, "", prior)
+        new = (_build_section_system_prompt(company, product, template["name"], mind_new)
+               + _build_section_user_prompt(section, a, r, pr, p))
+        elapsed = time.perf_counter() - t0
+
+        rows.append({"prompt": section["key"], "old_tokens": estimate_tokens(old),
+                     "new_tokens": estimate_tokens(new), "dropped": len(report["dropped"]),
+                     "trimmed": len(report["trimmed"]), "pack_ms": round(elapsed * 1000, 1)})
+        # Body sections feed later judgment sections, as in the real pipeline
+        body.append({"key": section["key"], "title": section["title"],
+                     "content": "\n\n".join(t for _, t, _ in hits[:2])})
+    return rows
+
+
+def _bench_research(company, product, corpus):
+    from core.context_budget import estimate_tokens
+    from core.research.query_engine import ClaudeQueryEngine
+
+    engine = ClaudeQueryEngine(dataroom_engine=object())
+    baseline = ClaudeQueryEngine(dataroom_engine=object())
+    baseline._fit_context = lambda q, chunks, mind, analytics, instructions="": (
+        mind, analytics, [(i, c.get("snippet", "")) for i, c in enumerate(chunks, 1)])
+    with _Unbudgeted():
+        mind_old = baseline._get_mind_context(company, product)
+    mind = engine._get_mind_context(company, product)
+    analytics = _analytics_text(company, product)
+    rows = []
+    for q in RESEARCH_QUESTIONS:
+        chunks = [{"filename": f"framework_p{i}.pdf", "document_type": "framework",
+                   "snippet": t, "score": s} for i, t, s in _retrieve(corpus, q, 10)]
+        old = baseline._build_rag_prompt(q, chunks, mind_old, analytics)
+        t0 = time.perf_counter()
+        new = engine._build_rag_prompt(q, chunks, mind, analytics)
+        elapsed = time.perf_counter() - t0
+        report = engine.last_context_report
+        rows.append({"prompt": q[:48], "old_tokens": estimate_tokens(old),
+                     "new_tokens": estimate_tokens(new), "dropped": len(report["dropped"]),
+                     "trimmed": len(report["trimmed"]), "pack_ms": round(elapsed * 1000, 1)})
+    return rows
+
+
+def _summary(rows):
+    old = sum(r["old_tokens"] for r in rows)
+    new = sum(r["new_tokens"] for r in rows)
+    return {"prompts": len(rows), "old_tokens": old, "new_tokens": new,
+            "reduction_pct": round((old - new) / old * 100, 1) if old else 0.0,
+            "pack_ms_avg": round(sum(r["pack_ms"] for r in rows) / max(len(rows), 1), 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--company", default="klaim")
+    ap.add_argument("--product", default="UAE_healthcare")
+    ap.add_argument("--memo-budget", type=int, default=None)
+    ap.add_argument("--research-budget", type=int, default=None)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if args.memo_budget is not None:
+        os.environ["LAITH_CONTEXT_BUDGET_MEMO_SECTION"] = str(args.memo_budget)
+    if args.research_budget is not None:
+        os.environ["LAITH_CONTEXT_BUDGET_RESEARCH"] = str(args.research_budget)
+
+    corpus = _corpus()
+    memo = _bench_memo(args.company, args.product, corpus)
+    research = _bench_research(args.company, args.product, corpus)
+
+    result = {"memo": {"summary": _summary(memo), "prompts": memo},
+              "research": {"summary": _summary(research), "prompts": research}}
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for name, block in result.items():
+        print(f"\n{name} pipeline")
+        print(f"  {'prompt':<50} {'old':>7} {'new':>7} {'drop':>5} {'trim':>5} {'ms':>6}")
+        for r in block["prompts"]:
+            print(f"  {r['prompt']:<50} {r['old_tokens']:>7} {r['new_tokens']:>7} "
+                  f"{r['dropped']:>5} {r['trimmed']:>5} {r['pack_ms']:>6}")
+        s = block["summary"]
+        print(f"  total {s['old_tokens']} -> {s['new_tokens']} tokens "
+              f"({s['reduction_pct']}% less), packing {s['pack_ms_avg']} ms/prompt")
+
+
+if __name__ == "__main__":
+    main()
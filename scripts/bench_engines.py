@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for the analysis engines on synthetic tapes.
+
+For each engine (klaim, silq, aajil) and tape size, generates a synthetic
+tape (scripts/synthetic_tapes.py) and times
+
+    compute     every top-level compute_* in core.analysis / analysis_silq /
+                analysis_aajil — the functions the methodology registry and
+                the /metrics telemetry cover
+    portfolio   the engine's core.portfolio functions (borrowing base,
+                concentration limits, covenants, flow)
+    validation  validate_*_tape with its cache off
+    loader      load_snapshot / load_silq_snapshot / load_aajil_snapshot on
+                the tape written to a temp file (xlsx engines only up to
+                --loader-max-rows: writing a 1M-row workbook takes minutes)
+
+Each call gets a fresh copy of the tape, as the API's tape cache hands
+out, and the median of --repeat runs is reported. Results go to stdout
+(or --out) as JSON. With a baseline (the JSON of an earlier run) each
+median is compared against it and the run exits 1 when any function is
+slower by more than --threshold (relative) AND --min-delta-ms (absolute,
+so 2 ms → 3 ms noise never fails). --save-baseline writes this run as
+the new baseline. Baselines are machine-specific: record one on the box
+that checks against it.
+
+Usage:
+    python scripts/bench_engines.py [--engines klaim silq aajil] [--sizes 10k 100k 1M]
+        [--repeat 3] [--filter REGEX] [--loader-max-rows 100k] [--out results.json]
+        [--baseline reports/benchmarks/engine_baseline.json] [--threshold 0.25]
+        [--min-delta-ms 5] [--save-baseline]
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.synthetic_tapes import AS_OF, ENGINES, generate, parse_rows, tape_frame, write_tape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'reports', 'benchmarks', 'engine_baseline.json')
+DEFAULT_SIZES = ('10k', '100k', '1M')
+
+SUITES = {
+    'klaim': {
+        'compute': 'core.analysis',
+        'portfolio': lambda name: name.startswith('compute_klaim_'),
+        'validation': ('core.validation', 'validate_tape'),
+        'loader': 'load_snapshot',
+        'config': ('klaim', 'UAE_healthcare'),
+    },
+    'silq': {
+        'compute': 'core.analysis_silq',
+        'portfolio': lambda name: name.startswith('compute_') and not name.startswith('compute_klaim_'),
+        'validation': ('core.validation_silq', 'validate_silq_tape'),
+        'loader': 'load_silq_snapshot',
+        'config': ('SILQ', 'KSA'),
+    },
+    'aajil': {
+        'compute': 'core.analysis_aajil',
+        'portfolio': None,
+        'validation': ('core.validation_aajil', 'validate_aajil_tape'),
+        'loader': 'load_aajil_snapshot',
+        'config': ('Aajil', 'KSA'),
+    },
+}
+
+
+class Skip(Exception):
+    """The function needs an argument the harness can't supply."""
+
+
+def _module_functions(module_name, select=None):
+    module = importlib.import_module(module_name)
+    for name, fn in sorted(vars(module).items()):
+        if (name.startswith('compute_') and inspect.isfunction(fn) and fn.__module__ == module_name
+                and (select is None or select(name))):
+            yield name, inspect.unwrap(fn)      # time the function, not the telemetry wrapper
+
+
+def discover(engine):
+    """[(group, name, fn)] benchmarked for `engine`."""
+    suite = SUITES[engine]
+    out = [('compute', name, fn) for name, fn in _module_functions(suite['compute'])]
+    if suite['portfolio']:
+        out += [('portfolio', name, fn) for name, fn in _module_functions('core.portfolio', suite['portfolio'])]
+    module_name, fn_name = suite['validation']
+    out.append(('validation', fn_name, getattr(importlib.import_module(module_name), fn_name)))
+    return out
+
+
+def _context(engine, tape):
+    from core.config import load_config
+    config = load_config(*SUITES[engine]['config']) or {'currency': 'SAR'}
+    return {
+        'tape': tape_frame(engine, tape),
+        'aux': tape[1] if engine == 'aajil' else None,
+        'as_of': AS_OF[engine],
+        'config': config,
+        'currency': config.get('currency', 'SAR'),
+    }
+
+
+def _kwargs(fn, ctx):
+    kwargs = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        if name == 'df':
+            kwargs[name] = ctx['tape'].copy()
+        elif name == 'mult':
+            kwargs[name] = 1
+        elif name in ('as_of_date', 'ref_date', 'snapshot_date'):
+            kwargs[name] = ctx['as_of']
+        elif name == 'config':
+            kwargs[name] = ctx['config']
+        elif name == 'display_currency':
+            kwargs[name] = ctx['currency']
+        elif name == 'aux':
+            kwargs[name] = ctx['aux']
+        elif name == 'use_cache':
+            kwargs[name] = False
+        elif param.default is inspect.Parameter.empty:
+            raise Skip(f'needs {name}')
+    return kwargs
+
+
+def _time(call, repeat):
+    """Median / min wall time in ms; call() returns a zero-arg callable to time."""
+    times = []
+    for _ in range(repeat):
+        fn = call()                  # argument prep (tape copy) stays outside the timer
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {'median_ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3)}
+
+
+def _bench_loader(engine, tape, repeat):
+    from core import loader
+    fn = inspect.unwrap(getattr(loader, SUITES[engine]['loader']))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_tape(engine, tape, tmp)
+        return _time(lambda: (lambda: fn(path)), repeat)
+
+
+def bench_engine(engine, rows, repeat=3, pattern=None, loader_max_rows=100_000, seed=0, log=None):
+    """Result rows for one engine at one tape size."""
+    t0 = time.perf_counter()
+    tape = generate(engine, rows, seed=seed)
+    log and log(f'{engine} {rows:,} rows generated in {time.perf_counter() - t0:.1f}s')
+    ctx = _context(engine, tape)
+    results = []
+
+    def record(group, name, outcome):
+        results.append({'engine': engine, 'rows': rows, 'group': group, 'name': name, **outcome})
+        log and log(f'  {group:10} {name:40} ' + (
+            f"{outcome['median_ms']:10.1f} ms" if 'median_ms' in outcome
+            else outcome.get('skipped') or outcome.get('error')))
+
+    for group, name, fn in discover(engine):
+        if pattern and not re.search(pattern, name):
+            continue
+        try:
+            outcome = _time(lambda: (lambda kw=_kwargs(fn, ctx): fn(**kw)), repeat)
+        except Skip as e:
+            outcome = {'skipped': str(e)}
+        except Exception as e:        # a compute function that can't handle the tape is a finding, not a crash
+            outcome = {'error': f'{type(e).__name__}: {str(e)[:120]}'}
+        record(group, name, outcome)
+
+    loader_name = SUITES[engine]['loader']
+    if not pattern or re.search(pattern, loader_name):
+        if engine != 'klaim' and rows > loader_max_rows:
+            record('loader', loader_name, {'skipped': f'above --loader-max-rows ({loader_max_rows:,})'})
+        else:
+            record('loader', loader_name, _bench_loader(engine, tape, repeat))
+    return results
+
+
+def _key(row):
+    return f"{row['engine']}/{row['rows']}/{row['name']}"
+
+
+def compare(results, baseline, threshold=0.25, min_delta_ms=5.0):
+    """Results slower than baseline by > threshold (relative) and > min_delta_ms (absolute)."""
+    base = {_key(r): r for r in baseline.get('results', []) if 'median_ms' in r}
+    regressions = []
+    for row in results:
+        ref = base.get(_key(row))
+        if ref is None or 'median_ms' not in row:
+            continue
+        now, before = row['median_ms'], ref['median_ms']
+        if now > before * (1 + threshold) and now - before > min_delta_ms:
+            regressions.append({'key': _key(row), 'baseline_ms': before, 'median_ms': now,
+                                'ratio': round(now / before, 3) if before else None})
+    return sorted(regressions, key=lambda r: -(r['ratio'] or 0))
+
+
+def _meta(args, sizes):
+    import numpy as np
+    import pandas as pd
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+        'machine': platform.machine(), 'cpus': os.cpu_count(),
+        'engines': list(args.engines), 'sizes': sizes, 'repeat': args.repeat, 'seed': args.seed,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    ap.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES))
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--filter', default=None, help='only functions whose name matches this regex')
+    ap.add_argument('--loader-max-rows', default='100k')
+    ap.add_argument('--out', default=None, help='write JSON results here instead of stdout')
+    ap.add_argument('--baseline', default=DEFAULT_BASELINE)
+    ap.add_argument('--threshold', type=float, default=float(os.getenv('LAITH_BENCH_THRESHOLD', '0.25')))
+    ap.add_argument('--min-delta-ms', type=float, default=5.0)
+    ap.add_argument('--save-baseline', action='store_true')
+    ap.add_argument('--quiet', action='store_true')
+    args = ap.parse_args(argv)
+    warnings.simplefilter('ignore', FutureWarning)     # pandas deprecation chatter from the engines
+
+    sizes = [parse_rows(s) for s in args.sizes]
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr, flush=True))
+    results = []
+    for rows in sizes:
+        for engine in args.engines:
+            results += bench_engine(engine, rows, repeat=args.repeat, pattern=args.filter,
+                                    loader_max_rows=parse_rows(args.loader_max_rows),
+                                    seed=args.seed, log=log)
+
+    report = {'meta': _meta(args, sizes), 'results': results}
+    status = 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        log and log(f'baseline written: {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = {'path': args.baseline, 'generated_at': baseline.get('meta', {}).get('generated_at'),
+                              'threshold': args.threshold, 'min_delta_ms': args.min_delta_ms}
+        report['regressions'] = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for r in report['regressions']:
+            log and log(f"REGRESSION {r['key']}: {r['baseline_ms']:.1f} → {r['median_ms']:.1f} ms (×{r['ratio']})")
+        status = 1 if report['regressions'] else 0
+    else:
+        log and log(f'no baseline at {args.baseline}; run with --save-baseline to record one')
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Scripted stand-in for the Anthropic Messages API.
+
+Serves POST /v1/messages (streaming SSE and plain JSON) with a fixed script:
+the first `tool_turns` assistant turns each request every tool in `tools`
+as parallel tool_use blocks, then the model answers with text. Every SSE
+event is preceded by `event_delay` seconds of asyncio sleep to mimic token
+latency without burning CPU, so one fake server can feed many concurrent
+agent streams.
+
+Point the SDK at it with ANTHROPIC_BASE_URL=http://127.0.0.1:<port>; any
+API key is accepted. Used by scripts/loadtest_agent_streams.py and the
+agent runtime tests (via httpx.ASGITransport, no socket needed).
+
+Usage:
+    python scripts/fake_model_server.py [--port 8765] [--tools a,b] [--tool-turns 1] [--delay-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER_TEXT = "Scripted analysis complete. PAR30 is driven by the 2025 vintages."
+
+
+def _tool_rounds(messages: Sequence[Dict[str, Any]]) -> int:
+    """Number of tool_result turns already in the conversation."""
+    rounds = 0
+    for m in messages:
+        content = m.get("content")
+        if m.get("role") == "user" and isinstance(content, list) and any(
+            isinstance(b, dict) and b.get("type") == "tool_result" for b in content
+        ):
+            rounds += 1
+    return rounds
+
+
+def _script_blocks(body: Dict[str, Any], tools: Sequence[str], tool_turns: int) -> List[Dict[str, Any]]:
+    """Content blocks for the next assistant turn."""
+    offered = {t["name"] for t in body.get("tools") or []}
+    calls = [t for t in tools if not offered or t in offered]
+    if calls and _tool_rounds(body.get("messages", [])) < tool_turns:
+        return [{
+            "type": "tool_use",
+            "id": f"toolu_{uuid.uuid4().hex[:20]}",
+            "name": name,
+            "input": {"call": i},
+        } for i, name in enumerate(calls)]
+    return [{"type": "text", "text": ANSWER_TEXT}]
+
+
+def _message(body: Dict[str, Any], blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:20]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake-model"),
+        "content": blocks,
+        "stop_reason": "tool_use" if blocks[0]["type"] == "tool_use" else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 100, "output_tokens": 20},
+    }
+
+
+def _sse_events(message: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """The Messages streaming event sequence for a complete message."""
+    start = {**message, "content": [], "stop_reason": None,
+             "usage": {"input_tokens": message["usage"]["input_tokens"], "output_tokens": 1}}
+    yield {"type": "message_start", "message": start}
+    for i, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            yield {"type": "content_block_start", "index": i,
+                   "content_block": {"type": "text", "text": ""}}
+            for word in block["text"].split(" "):
+                yield {"type": "content_block_delta", "index": i,
+                       "delta": {"type": "text_delta", "text": word + " "}}
+        else:
+            yield {"type": "content_block_start", "index": i,
+                   "content_block": {**block, "input": {}}}
+            yield {"type": "content_block_delta", "index": i,
+                   "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}}
+        yield {"type": "content_block_stop", "index": i}
+    yield {"type": "message_delta",
+           "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+           "usage": {"output_tokens": message["usage"]["output_tokens"]}}
+    yield {"type": "message_stop"}
+
+
+def build_app(tools: Sequence[str] = (), tool_turns: int = 1, event_delay: float = 0.0) -> FastAPI:
+    """Create the fake Messages API app.
+
+    Args:
+        tools: API tool names to call (underscored form). Names not offered
+            in the request's `tools` are skipped.
+        tool_turns: Assistant turns that request tools before answering.
+        event_delay: Seconds slept before each SSE event.
+    """
+    app = FastAPI(title="fake-model-server")
+    app.state.requests = 0
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        message = _message(body, _script_blocks(body, tools, tool_turns))
+        if not body.get("stream"):
+            if event_delay:
+                await asyncio.sleep(event_delay)
+            return JSONResponse(message)
+
+        async def _stream():
+            for event in _sse_events(message):
+                if event_delay:
+                    await asyncio.sleep(event_delay)
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+        return StreamingResponse(_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--tools", default="", help="comma-separated tool names to call")
+    ap.add_argument("--tool-turns", type=int, default=1)
+    ap.add_argument("--delay-ms", type=float, default=20.0)
+    args = ap.parse_args()
+
+    import uvicorn
+    tools = [t for t in args.tools.split(",") if t]
+    uvicorn.run(build_app(tools, args.tool_turns, args.delay_ms / 1000),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
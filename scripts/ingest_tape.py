@@ -101,6 +101,7 @@ def main():
     db = SessionLocal() if not args.dry_run else None
     try:
         total_snaps, total_rows = 0, 0
+        ingested = {}
         for company, product, tape_files in scope:
             for tape_file in tape_files:
                 n_snap, n_rows = _ingest_one(
@@ -109,8 +110,11 @@ def main():
                 )
                 total_snaps += n_snap
                 total_rows += n_rows
+                if n_snap:
+                    ingested.setdefault((company, product), []).append(tape_file)
         if not args.dry_run:
             db.commit()
+            _record_covenant_ledger(ingested)
         print(f"\nDone. Snapshots created/updated: {total_snaps}. Rows written: {total_rows}.")
     except Exception:
         if db is not None:
@@ -121,6 +125,19 @@ def main():
             db.close()
 
 
+def _record_covenant_ledger(ingested):
+    """Run the covenant test once for each newly ingested tape (see core/covenant_ledger.py)."""
+    from core.covenant_ledger import update_ledger
+
+    for (company, product), tapes in ingested.items():
+        try:
+            report = update_ledger(company, product, snapshots=tapes)
+            print(f"  Covenant ledger {company}/{product}: {len(report['computed'])} computed"
+                  + (f", {len(report['errors'])} failed" if report['errors'] else ""))
+        except Exception as e:  # ledger is derived state — never fail the ingest
+            print(f"  WARN covenant ledger {company}/{product}: {e}", file=sys.stderr)
+
+
 def _all_scope():
     """Every (company, product, tape_files) across the platform."""
     out = []
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Load-test concurrent AgentRunner streams on a single event loop.
+
+Starts scripts/fake_model_server.py on a local port, points the SDK at it
+via ANTHROPIC_BASE_URL, then drives N concurrent `AgentRunner.stream`
+sessions in one asyncio loop — the same shape as N analyst chats on one
+uvicorn worker. Tool handlers block with time.sleep to mimic pandas work.
+
+Reports wall time, per-stream latency percentiles and the worst event-loop
+lag seen by a 10 ms heartbeat. A loop that is never blocked keeps lag near
+the heartbeat period no matter how many streams run.
+
+Usage:
+    python scripts/loadtest_agent_streams.py [--streams 50] [--tool-ms 200] [--delay-ms 20] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import uvicorn
+
+from scripts.fake_model_server import build_app
+
+TOOLS = ("analytics.get_par_analysis", "analytics.get_cohort_analysis", "analytics.get_concentration")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port,
+                                           log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("fake model server did not start")
+        time.sleep(0.02)
+    return server
+
+
+def _make_config(tool_seconds: float):
+    from core.agents.config import AgentConfig, ToolSpec
+
+    def _handler(call=0):
+        time.sleep(tool_seconds)  # blocking, like a pandas computation
+        return {"call": call, "par30": 0.042}
+
+    tools = [ToolSpec(name, name, {"type": "object", "properties": {"call": {"type": "integer"}}},
+                      _handler) for name in TOOLS]
+    return AgentConfig(name="loadtest", system_prompt="Load test agent.", tools=tools,
+                       model="fake-model", max_turns=5, max_budget_tokens=1_000_000)
+
+
+async def _one_stream(config, i: int):
+    from core.agents.runtime import AgentRunner
+    from core.agents.session import AgentSession
+
+    runner = AgentRunner(config)
+    session = AgentSession.create("loadtest", metadata={"stream": i})
+    t0 = time.perf_counter()
+    first = None
+    kinds = []
+    async for event in runner.stream("What's driving PAR30?", session):
+        if first is None:
+            first = time.perf_counter() - t0
+        kinds.append(event.type)
+    return {"total": time.perf_counter() - t0, "first_event": first or 0.0,
+            "ok": kinds[-1:] == ["done"] and "error" not in kinds}
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, period: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t = loop.time()
+        await asyncio.sleep(period)
+        lags.append(loop.time() - t - period)
+
+
+async def _run(args, config):
+    await _one_stream(config, -1)  # warm-up: client construction, SDK lazy imports
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(_one_stream(config, i) for i in range(args.streams)))
+    wall = time.perf_counter() - t0
+    stop.set()
+    await beat
+    return results, wall, lags
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--streams", type=int, default=50)
+    ap.add_argument("--tool-ms", type=float, default=200.0, help="blocking time per tool call")
+    ap.add_argument("--delay-ms", type=float, default=20.0, help="fake model delay per SSE event")
+    ap.add_argument("--json", action="store_true", help="print a JSON summary")
+    args = ap.parse_args()
+
+    port = _free_port()
+    app = build_app([t.replace(".", "_") for t in TOOLS], tool_turns=1,
+                    event_delay=args.delay_ms / 1000)
+    server = _start_server(app, port)
+    os.environ["ANTHROPIC_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["ANTHROPIC_API_KEY"] = "fake-key"
+
+    import core.agents.session as session_mod
+    with tempfile.TemporaryDirectory() as tmp:
+        session_mod._SESSIONS_DIR = Path(tmp)
+        results, wall, lags = asyncio.run(_run(args, _make_config(args.tool_ms / 1000)))
+    server.should_exit = True
+
+    totals = [r["total"] for r in results]
+    summary = {
+        "streams": args.streams,
+        "ok": sum(r["ok"] for r in results),
+        "wall_s": round(wall, 3),
+        "stream_p50_s": round(statistics.median(totals), 3),
+        "stream_p95_s": round(_pct(totals, 0.95), 3),
+        "first_event_p95_s": round(_pct([r["first_event"] for r in results], 0.95), 3),
+        "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 1),
+        "loop_lag_p95_ms": round(_pct(lags, 0.95) * 1000, 1) if lags else 0.0,
+        "model_requests": app.state.requests,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{summary['ok']}/{args.streams} streams completed in {summary['wall_s']:.2f}s")
+    print(f"  per-stream p50 {summary['stream_p50_s']:.2f}s  p95 {summary['stream_p95_s']:.2f}s"
+          f"  first event p95 {summary['first_event_p95_s']:.2f}s")
+    print(f"  event-loop lag max {summary['loop_lag_max_ms']:.1f} ms  p95 {summary['loop_lag_p95_ms']:.1f} ms")
+    print(f"  model requests served: {summary['model_requests']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Pregenerate every AI panel for a snapshot and fill the AI cache.
+
+Runs the same sweep as POST /companies/{co}/products/{prod}/ai-pregenerate:
+commentary, executive summary and one insight per dashboard tab, generated
+with bounded concurrency on the AI job queue. Targets already cached for the
+current tape are skipped unless --refresh. Defaults match what the dashboard
+requests (reporting currency, agent mode), so its panels hit the cache.
+
+Usage:
+    # Latest snapshot:
+    python scripts/pregenerate_ai.py klaim UAE_healthcare
+
+    # A specific tape, tab insights only, regenerate even if cached:
+    python scripts/pregenerate_ai.py SILQ KSA --snapshot 2026-01-31_KSA.xlsx \\
+        --only tab_insight --refresh
+
+    # Machine-readable report:
+    python scripts/pregenerate_ai.py klaim UAE_healthcare --json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("company")
+    ap.add_argument("product")
+    ap.add_argument("--snapshot", default=None, help="tape filename (default: latest)")
+    ap.add_argument("--currency", default=None, help="default: the product's reporting currency")
+    ap.add_argument("--only", default=None,
+                    help="comma-separated subset of commentary,executive_summary,tab_insight")
+    ap.add_argument("--mode", default=None,
+                    help="default: agent, as the dashboard panels request; 'legacy' for single-call prompts")
+    ap.add_argument("--refresh", action="store_true", help="regenerate targets that are already cached")
+    ap.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = ap.parse_args(argv)
+
+    from backend.main import pregenerate_ai_outputs
+
+    include = [s.strip() for s in args.only.split(",") if s.strip()] if args.only else None
+    report = pregenerate_ai_outputs(args.company, args.product, args.snapshot, args.currency,
+                                    refresh=args.refresh, include=include, mode=args.mode)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['company']}/{report['product']} {report['snapshot']} "
+              f"— {report['counts']} in {report['elapsed_s']}s")
+        for t in report["targets"]:
+            name = t["endpoint"] + (f".{t['tab']}" if t["tab"] else "")
+            print(f"  {t['status']:<10} {name}" + (f"  ({t['error']})" if t.get("error") else ""))
+    return 1 if report["counts"].get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""Synthetic Klaim, SILQ and Aajil loan tapes at arbitrary row counts.
+
+The bundled tapes top out at ~8k rows, which says nothing about how the
+analysis engines scale. These generators produce tapes with the same
+columns, dtypes and sheet layout as the real ones, drawn from
+distributions shaped on them:
+
+  klaim   65-column claims tape: growth-weighted deal dates, Zipf-skewed
+          provider groups, Completed / Executed mix driven by deal age,
+          denial rates, and monotone Expected/Actual in N days curves
+          consistent with Collected till date
+  silq    BNPL / RCL / RBF loans with product-specific tenures and sizes,
+          Closed / Current / Overdue mix driven by repayment deadline,
+          margin split, and the two-data-sheet xlsx layout (RCL_LT without
+          Margin Collected)
+  aajil   EMI / Bullet deals with installment counts, Realised / Accrued /
+          Written Off mix, plus the Current_DPD_New Cohorts, Collections
+          and Payments aux sheets
+
+Each `<engine>_tape()` returns what the matching core.loader function
+returns for a real file (parsed dates, normalised columns), so compute
+functions can be called on it directly. `write_tape()` writes the file
+format the loader reads, for timing load + parse. Everything is seeded:
+the same (rows, seed, as_of) gives the same tape.
+
+xlsx caps a sheet at 1,048,576 rows, so the Aajil Payments sheet is
+truncated to XLSX_MAX_ROWS; no compute function reads it.
+
+Usage:
+    python scripts/synthetic_tapes.py klaim --rows 100k --out /tmp/tapes [--seed 0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+ENGINES = ('klaim', 'silq', 'aajil')
+AS_OF = {'klaim': '2026-04-15', 'silq': '2026-03-31', 'aajil': '2026-04-13'}
+XLSX_MAX_ROWS = 1_000_000
+
+KLAIM_CURVE_DAYS = tuple(range(30, 391, 30))
+
+
+def parse_rows(value):
+    """'10k' → 10000, '1M' → 1000000, '2500' → 2500."""
+    value = str(value).strip().lower().replace('_', '').replace(',', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value[:-1] if scale > 1 else value) * scale)
+
+
+def _zipf_choice(rng, n_items, size, s=1.1):
+    """Indices 0..n_items-1 with Zipf(s) popularity — a few names dominate."""
+    weights = 1.0 / np.arange(1, n_items + 1) ** s
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def _dates(rng, size, start, end, growth=2.0):
+    """Dates in [start, end], denser towards `end` (origination ramps up)."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    span = (end - start).days
+    offsets = np.floor(rng.beta(growth, 1.0, size) * span).astype('int64')
+    return start + pd.to_timedelta(offsets, unit='D')
+
+
+def _ids(prefix, size, width=7):
+    return pd.Series(np.arange(1, size + 1)).map(f'{prefix}{{:0{width}d}}'.format).to_numpy()
+
+
+# ── Klaim ────────────────────────────────────────────────────────────────────
+
+def klaim_tape(rows, seed=0, as_of=AS_OF['klaim']):
+    """Klaim claims tape as core.loader.load_snapshot returns it."""
+    rng = np.random.default_rng(seed)
+    as_of = pd.Timestamp(as_of)
+    deal_date = _dates(rng, rows, as_of - pd.DateOffset(months=56), as_of)
+    age = (as_of - deal_date).days.to_numpy()
+
+    n_groups = int(np.clip(rows // 40, 20, 2000))
+    group_idx = _zipf_choice(rng, n_groups, rows)
+    group = np.char.add('GROUP ', np.char.zfill(group_idx.astype(str), 4))
+    provider = np.char.add(np.char.add(group, ' - P'), rng.integers(1, 4, rows).astype(str))
+
+    purchase_value = np.round(rng.lognormal(np.log(30_000), 1.0, rows), 2)
+    discount = rng.choice([0.04, 0.06, 0.08, 0.10, 0.12], rows, p=[0.1, 0.2, 0.3, 0.25, 0.15])
+    purchase_price = np.round(purchase_value * (1 - discount), 2)
+    expected_days = rng.integers(30, 91, rows)
+    expected_total = np.round(purchase_value * (1 - rng.beta(1.5, 40, rows)), 2)
+    denial_rate = rng.beta(1.2, 12, rows)
+
+    # Completion probability rises once a deal is well past its expected collection days
+    p_complete = 1 / (1 + np.exp(-(age - 1.5 * expected_days) / 30))
+    u = rng.random(rows)
+    status = np.where(u < p_complete, 'Completed', 'Executed')
+    status[(age < 7) & (u > 0.995)] = 'Pending'
+    completed = status == 'Completed'
+
+    # Completed deals collected everything not denied; live deals part-way there
+    progress = np.where(completed, 1.0, np.clip(age / (expected_days * 1.6), 0, 1) ** 1.3)
+    final_collect = purchase_value * (1 - denial_rate)
+    collected = np.round(final_collect * progress, 2)
+    denied = np.round(purchase_value * denial_rate * np.where(completed, 1.0, progress), 2)
+    received = np.minimum(collected + denied, purchase_value)
+    pending = np.round(np.maximum(purchase_value - received, 0), 2)
+    collection_days = np.where(
+        completed,
+        np.minimum(np.maximum(expected_days * rng.lognormal(0, 0.4, rows), 5), np.maximum(age, 5)),
+        age,
+    ).astype('int64')
+    expected_irr = np.round(rng.uniform(0.3, 1.5, rows), 2)
+
+    df = pd.DataFrame({
+        'ID': pd.Series(rng.integers(0, 2 ** 62, rows)).map('{:024x}'.format).to_numpy(),
+        'Reference': _ids('KL/', rows),
+        'Deal date': deal_date,
+        'Status': status,
+        'Product': np.where(rng.random(rows) < 0.99, 'claim', 'invoice'),
+        'Provider': provider,
+        'Group': group,
+        'Purchase value': purchase_value,
+        'Discount': discount,
+        'Purchase price': purchase_price,
+        'New business': purchase_price,
+        'Gross revenue': np.round(purchase_value - purchase_price, 2),
+        'Claim count': np.maximum(rng.poisson(purchase_value / 900), 1),
+        'Reinvestment': 0.0,
+        'Setup fee': 0,
+        'Other fee': 0,
+        'Adjustments': 0.0,
+        'Release amount': purchase_price,
+        'Paid by insurance': collected,
+        'Denied by insurance': denied,
+        'Received insurance response': np.round(received, 2),
+        'Pending insurance response': pending,
+        'Expected collection days': expected_days,
+        'Expected total': expected_total,
+        'Provisions': np.round(purchase_value - expected_total, 2),
+        'Expected till date': np.round(expected_total * np.clip(age / expected_days, 0, 1), 2),
+        'Collection days so far': collection_days,
+        'Collected till date': collected,
+        'Collected till date by owner': collected,
+        'Expected IRR': expected_irr,
+        'Actual IRR': np.round(expected_irr * np.where(completed, rng.uniform(0.3, 1.1, rows), 0), 2),
+        'Actual IRR for owner': np.round(expected_irr * np.where(completed, rng.uniform(0.3, 1.1, rows), 0), 2),
+        'VAT on purchased assets': 0.0,
+        'VAT on fees': 0.0,
+        'Owner': rng.choice(['SPV2', 'SPV3', 'SPV1', 'KKTL', 'SPV4'], rows, p=[0.66, 0.18, 0.06, 0.05, 0.05]),
+        'AccountManager': np.char.add('Account Manager ', rng.integers(1, 9, rows).astype(str)),
+        'SalesManager': np.char.add('Sales Manager ', rng.integers(1, 6, rows).astype(str)),
+    })
+    df.insert(df.columns.get_loc('AccountManager'), 'Released from', df['Owner'])
+    df.insert(df.columns.get_loc('AccountManager'), 'FundStatus', df['Status'])
+
+    # Cumulative curves: expected ramps to Expected total over ~1.3× expected
+    # days; actual ramps to Collected till date by Collection days so far.
+    curves = {}
+    for k in KLAIM_CURVE_DAYS:
+        curves[f'Expected in {k} days'] = np.round(
+            expected_total * np.clip(k / (expected_days * 1.3), 0, 1) ** 1.2, 2)
+    for k in KLAIM_CURVE_DAYS:
+        curves[f'Actual in {k} days'] = np.round(
+            collected * np.clip(k / np.maximum(collection_days, 1), 0, 1) ** 1.5, 2)
+    return pd.concat([df, pd.DataFrame(curves)], axis=1)
+
+
+# ── SILQ ─────────────────────────────────────────────────────────────────────
+
+_SILQ_TENURES = {'BNPL': ([4, 10, 15, 30, 45, 60, 90], [0.05, 0.05, 0.1, 0.45, 0.05, 0.1, 0.2]),
+                 'RCL': ([90], [1.0]),
+                 'RBF': ([30, 90], [0.25, 0.75])}
+_SILQ_SIZES = {'BNPL': (70_000, 1.1), 'RCL': (30_000, 2.0), 'RBF': (2_000_000, 0.8)}
+_SILQ_LIMITS = [100_000, 300_000, 1_000_000, 3_000_000, 4_000_000, 7_000_000, 10_500_000]
+
+
+def silq_tape(rows, seed=0, as_of=AS_OF['silq']):
+    """SILQ multi-product tape as core.loader.load_silq_snapshot returns it: (df, commentary)."""
+    rng = np.random.default_rng(seed)
+    as_of = pd.Timestamp(as_of)
+    product = rng.choice(['BNPL', 'RCL', 'RBF'], rows, p=[0.5, 0.48, 0.02])
+    disb_date = _dates(rng, rows, as_of - pd.DateOffset(months=11), as_of, growth=1.6)
+
+    tenure = np.empty(rows, dtype='int64')
+    disbursed = np.empty(rows)
+    for name, (values, p) in _SILQ_TENURES.items():
+        mask = product == name
+        n = int(mask.sum())
+        tenure[mask] = rng.choice(values, n, p=p)
+        median, sigma = _SILQ_SIZES[name]
+        disbursed[mask] = rng.lognormal(np.log(median), sigma, n)
+    disbursed = np.round(np.clip(disbursed, 25, 10_000_000), 2)
+    margin_rate = np.where(product == 'RCL', 0.0, 0.035 * np.maximum(tenure, 4) / 30)
+    collectable = np.round(disbursed * (1 + margin_rate), 2)
+    deadline = disb_date + pd.to_timedelta(tenure, unit='D')
+    matured = np.asarray(deadline < as_of)
+
+    u = rng.random(rows)
+    status = np.where(matured, np.where(u < 0.93, 'Closed', 'Overdue'),
+                      np.where(u < 0.85, 'Current', np.where(u < 0.95, 'Closed', 'Overdue')))
+    closed = status == 'Closed'
+    repaid = np.round(np.where(closed, collectable,
+                               collectable * rng.uniform(0, 0.7, rows)), 2)
+    outstanding = np.round(np.where(closed, 0.0, collectable - repaid), 2)
+    overdue = np.round(np.where(status == 'Overdue', outstanding * rng.uniform(0.3, 1.0, rows), 0.0), 2)
+    principal = np.round(repaid / (1 + margin_rate), 2)
+
+    age_days = (as_of - disb_date).days.to_numpy()
+    last_coll = disb_date + pd.to_timedelta(
+        np.minimum(np.floor(np.maximum(tenure, 1) * rng.uniform(0.3, 1.1, rows)), age_days), unit='D')
+    last_coll = pd.Series(last_coll).where(repaid > 0)
+
+    n_shops = int(np.clip(rows // 10, 30, 50_000))
+    shop = _zipf_choice(rng, n_shops, rows, s=0.9) + 1
+    shop_limit = np.asarray(rng.choice(_SILQ_LIMITS, n_shops + 1))[shop]
+    comment = pd.Series(np.full(rows, np.nan, dtype=object))
+    legal = (status == 'Overdue') & (rng.random(rows) < 0.1)
+    comment[legal] = pd.Series(shop[legal]).map('Legal Proceedings for Shop ID {} initiated'.format).to_numpy()
+
+    rcl = product == 'RCL'
+    deal_id = np.where(rcl, _ids('10-01-1-', rows, width=6), np.arange(10_000, 10_000 + rows).astype(str))
+    df = pd.DataFrame({
+        'Deal ID': deal_id,
+        'Disbursed_Amount (SAR)': disbursed,
+        'Disbursement_Date': disb_date,
+        'Loan_Status': status,
+        'Outstanding_Amount (SAR)': outstanding,
+        'Overdue_Amount (SAR)': overdue,
+        'Total_Collectable_Amount (SAR)': collectable,
+        'Tenure': tenure,
+        'Shop_ID': shop.astype(str),
+        'Shop_Credit_Limit (SAR)': shop_limit,
+        'Product': product,
+        'Repayment_Deadline': deadline,
+        'Amt_Repaid': repaid,
+        'Last_Collection_Date': pd.to_datetime(last_coll).to_numpy(),
+        'Loan_Age': np.where(closed, np.nan, age_days.astype(float)),
+        'Principal Collected': principal,
+        'Comment': comment.to_numpy(),
+        'Margin Collected': np.where(rcl, 0.0, np.round(repaid - principal, 2)),
+        '_margin_synthetic': rcl,
+        '_source_sheet': np.where(rcl, 'RCL_LT', 'SCF+BNPL+RBF'),
+    })
+    commentary = (f"Synthetic SILQ portfolio as at {as_of:%d %B %Y}: {rows:,} loans, "
+                  f"SAR {disbursed.sum() / 1e6:,.1f} Mn deployed.")
+    return df, commentary
+
+
+# ── Aajil ────────────────────────────────────────────────────────────────────
+
+_AAJIL_INDUSTRIES = [
+    'Contractor', 'Wholesale Trader', 'Manufacturer', 'Building Materials', 'Steel Trading',
+    'Electrical Supplies', 'Food Distribution', 'Plumbing', 'Logistics', 'Packaging',
+    'Chemicals', 'Furniture', 'HVAC', 'Printing', 'Textiles', 'Auto Parts', 'Medical Supplies',
+    'Paints', 'Timber', 'Glass', 'Cement', 'Water Treatment', 'Security Systems', 'Cleaning',
+]
+
+
+def _aajil_dpd_grid(rng, deals, as_of):
+    """Current_DPD_New Cohorts sheet (header=None): dates from column 8 on row 0."""
+    months = pd.period_range(deals['Invoice Date'].min(), as_of, freq='M')
+    deployed = (deals.groupby(deals['Invoice Date'].dt.to_period('M'))['Principal Amount'].sum()
+                .reindex(months, fill_value=0).cumsum().to_numpy())
+    grid = np.full((15, 8 + len(months)), np.nan, dtype=object)
+    labels = {2: 'Amount Deployed', 4: 'DPD30+', 5: 'DPD30+ %', 7: 'DPD60+', 8: 'DPD60+ %',
+              10: 'DPD90+', 11: 'DPD90+ %', 13: 'DPD180+', 14: 'DPD180+ %'}
+    for r, label in labels.items():
+        grid[r, 0] = label
+    base = np.clip(0.04 + rng.normal(0, 0.01, len(months)), 0.005, 0.2)
+    for j, month in enumerate(months):
+        col = 8 + j
+        grid[0, col] = month.to_timestamp(how='end').normalize()
+        grid[2, col] = float(deployed[j])
+        for r, factor in ((4, 1.0), (7, 0.6), (10, 0.4), (13, 0.25)):
+            pct = float(base[j] * factor)
+            grid[r, col] = round(float(deployed[j]) * pct, 2)
+            grid[r + 1, col] = round(pct, 4)
+    return pd.DataFrame(grid)
+
+
+def _aajil_collections_grid(deals):
+    """Collections sheet (header=None): month row + collected / due rows."""
+    month = deals['Expected Completion'].dt.to_period('M')
+    by_month = pd.DataFrame({
+        'collected': deals['Realised Amount'].groupby(month).sum(),
+        'due': deals['Sale Due Amount'].groupby(month).sum(),
+    }).sort_index()
+    grid = [['Month'] + [p.to_timestamp(how='end').normalize() for p in by_month.index],
+            ['Collections'] + by_month['collected'].round(2).tolist(),
+            ['Due'] + by_month['due'].round(2).tolist()]
+    return pd.DataFrame(grid)
+
+
+def _aajil_payments(rng, deals):
+    """Instalment-level Payments sheet for due instalments, capped at XLSX_MAX_ROWS."""
+    due = deals['Due No of Installments'].round().astype('int64').to_numpy()
+    due = np.minimum(due, deals['Total No. of Installments'].to_numpy().astype('int64'))
+    idx = np.repeat(np.arange(len(deals)), due)[:XLSX_MAX_ROWS]
+    inst_no = (np.arange(len(idx)) - np.repeat(np.cumsum(due) - due, due)[:XLSX_MAX_ROWS]) + 1
+    total = deals['Total No. of Installments'].to_numpy()[idx]
+    paid = inst_no <= deals['Paid No of Installments'].to_numpy()[idx]
+    due_date = (deals['Invoice Date'].to_numpy()[idx]
+                + pd.to_timedelta(30 * inst_no, unit='D').to_numpy())
+    amount = np.round(deals['Sale Total'].to_numpy()[idx] / total, 2)
+    late = pd.to_timedelta(rng.integers(-5, 20, len(idx)), unit='D').to_numpy()
+    return pd.DataFrame({
+        'Transaction ID': deals['Transaction ID'].to_numpy()[idx],
+        'Installment No': inst_no,
+        'Due Date': due_date,
+        'Paid Date': np.where(paid, due_date + late, np.datetime64('NaT')),
+        'Amount Due': amount,
+        'Amount Paid': np.where(paid, amount, 0.0),
+    })
+
+
+def aajil_tape(rows, seed=0, as_of=AS_OF['aajil']):
+    """Aajil tape as core.loader.load_aajil_snapshot returns it: (deals, aux)."""
+    rng = np.random.default_rng(seed)
+    as_of = pd.Timestamp(as_of)
+    invoice_date = _dates(rng, rows, '2022-05-01', as_of, growth=2.5)
+    deal_type = rng.choice(['EMI', 'Bullet'], rows, p=[0.6, 0.4])
+    emi = deal_type == 'EMI'
+    tenure = np.where(emi, rng.choice([3, 6, 9, 12], rows, p=[0.2, 0.4, 0.2, 0.2]),
+                      rng.choice([1, 2, 3, 4, 6], rows, p=[0.2, 0.3, 0.3, 0.1, 0.1])).astype('int64')
+    installments = np.where(emi, tenure, 1)
+
+    bill = np.round(rng.lognormal(np.log(250_000), 1.0, rows), 2)
+    monthly_yield = np.round(rng.uniform(0.015, 0.03, rows), 4)
+    margin = np.round(bill * monthly_yield * tenure, 2)
+    admin_fee = np.round(rng.uniform(0.01, 0.02, rows), 4)
+    fee = np.round(bill * admin_fee, 2)
+    sale_notional = bill + margin + fee
+    sale_vat = np.round(0.15 * (margin + fee), 2)
+    sale_total = np.round(sale_notional + sale_vat, 2)
+    expected_end = invoice_date + pd.to_timedelta(30 * tenure, unit='D')
+    months_elapsed = np.clip((as_of - invoice_date).days.to_numpy() // 30, 0, None)
+
+    matured = np.asarray(expected_end < as_of)
+    u = rng.random(rows)
+    status = np.where(matured, np.where(u < 0.93, 'Realised', np.where(u < 0.95, 'Written Off', 'Accrued')),
+                      np.where(u < 0.9, 'Accrued', 'Realised'))
+    realised, accrued, written_off = status == 'Realised', status == 'Accrued', status == 'Written Off'
+
+    due_inst = np.where(emi, np.minimum(months_elapsed, installments), np.where(matured, 1, 0)).astype(float)
+    due_inst[realised | written_off] = installments[realised | written_off]
+    # Most live deals are current; a tail is 1, 2, 3+ instalments behind (fractional = part-paid)
+    behind = np.minimum(rng.choice([0, 0.5, 1, 2, 3, 4], rows, p=[0.8, 0.05, 0.07, 0.04, 0.02, 0.02]), due_inst)
+    overdue_inst = np.where(accrued, behind, np.where(written_off, due_inst * rng.uniform(0.3, 1, rows), 0.0))
+    paid_inst = due_inst - overdue_inst
+
+    per_inst = sale_total / installments
+    sale_due = np.round(per_inst * due_inst, 2)
+    sale_paid = np.round(per_inst * paid_inst, 2)
+    realised_amt = np.where(realised, sale_total, sale_paid)
+    written_off_amt = np.where(written_off, np.round(sale_total - sale_paid, 2), 0.0)
+    wo_date = pd.Series(expected_end + pd.to_timedelta(rng.integers(90, 365, rows), unit='D'))
+    wo_date = wo_date.where(written_off & (wo_date <= as_of).to_numpy(), pd.NaT)
+
+    industry = np.asarray(_AAJIL_INDUSTRIES, dtype=object)[_zipf_choice(rng, len(_AAJIL_INDUSTRIES), rows)]
+    industry[rng.random(rows) < 0.03] = np.nan
+    n_customers = int(np.clip(rows // 4, 20, 250_000))
+
+    deals = pd.DataFrame({
+        'Transaction ID': _ids('AJ-', rows),
+        'Deal Type': deal_type,
+        'Invoice Date': invoice_date,
+        'Unique Customer Code': _zipf_choice(rng, n_customers, rows, s=0.8) + 1,   # numeric on real tapes
+        'Customer Industry': industry,
+        'Bill Notional': bill,
+        'Total Margin': margin,
+        'Origination Fee': fee,
+        'Sale Notional': np.round(sale_notional, 2),
+        'Sale VAT': sale_vat,
+        'Sale Total': sale_total,
+        'Realised Amount': np.round(realised_amt, 2),
+        'Receivable Amount': np.where(accrued, np.round(sale_total - sale_paid, 2), 0.0),
+        'Written Off Amount': written_off_amt,
+        'Written Off VAT Recovered Amount': np.round(written_off_amt * 0.15 / 1.15 * rng.uniform(0, 1, rows), 2),
+        'Write Off Date': wo_date.to_numpy(),
+        'Realised Status': status,
+        'Total No. of Installments': installments,
+        'Due No of Installments': due_inst.astype('int64'),
+        'Paid No of Installments': paid_inst,
+        'Overdue No of Installments': np.round(overdue_inst, 2),
+        'Sale Due Amount': sale_due,
+        'Sale Paid Amount': sale_paid,
+        'Sale Overdue Amount': np.round(sale_due - sale_paid, 2),
+        'Monthly Yield %': monthly_yield,
+        'Total Yield %': np.round((margin + fee) / bill, 4),
+        'Admin Fee %': admin_fee,
+        'Deal Tenure': tenure,
+        'Principal Amount': bill,
+        'Expected Completion': expected_end,
+    })
+    aux = {
+        'dpd_cohorts': _aajil_dpd_grid(rng, deals, as_of),
+        'collections': _aajil_collections_grid(deals),
+        'payments': _aajil_payments(rng, deals),
+    }
+    return deals, aux
+
+
+# ── Files ────────────────────────────────────────────────────────────────────
+
+GENERATORS = {'klaim': klaim_tape, 'silq': silq_tape, 'aajil': aajil_tape}
+
+
+def generate(engine, rows, seed=0, as_of=None):
+    """Loader-shaped tape for `engine`: DataFrame (klaim) or the loader's tuple (silq, aajil)."""
+    return GENERATORS[engine](rows, seed=seed, as_of=as_of or AS_OF[engine])
+
+
+def tape_frame(engine, tape):
+    """The deal-level DataFrame out of generate()'s return value."""
+    return tape if engine == 'klaim' else tape[0]
+
+
+def write_tape(engine, tape, directory, as_of=None):
+    """Write `tape` in the on-disk format core.loader reads; returns the path.
+
+    Klaim → CSV with '23 Aug 2021' deal dates; SILQ → xlsx with RCL_LT,
+    Portfolio Commentary and SCF+BNPL+RBF sheets; Aajil → xlsx with Deals
+    and the three aux sheets.
+    """
+    as_of = pd.Timestamp(as_of or AS_OF[engine])
+    os.makedirs(directory, exist_ok=True)
+    rows = len(tape_frame(engine, tape))
+    path = os.path.join(directory, f'{as_of:%Y-%m-%d}_synthetic_{engine}_{rows}'
+                                   f'.{"csv" if engine == "klaim" else "xlsx"}')
+    if engine == 'klaim':
+        out = tape.copy()
+        out['Deal date'] = out['Deal date'].dt.strftime('%d %b %Y')
+        out.to_csv(path, index=False)
+    elif engine == 'silq':
+        df, commentary = tape
+        rcl = df['_source_sheet'] == 'RCL_LT'
+        data = df.drop(columns=['_source_sheet', '_margin_synthetic'])
+        with pd.ExcelWriter(path) as xw:
+            (data[rcl].drop(columns=['Margin Collected']).rename(columns={'Product': 'Loan_Type'})
+             .to_excel(xw, sheet_name='RCL_LT', index=False))
+            pd.DataFrame({'Portfolio Commentary': [commentary]}).to_excel(
+                xw, sheet_name='Portfolio Commentary', index=False)
+            data[~rcl].to_excel(xw, sheet_name='SCF+BNPL+RBF', index=False)
+    else:
+        deals, aux = tape
+        with pd.ExcelWriter(path) as xw:
+            deals.to_excel(xw, sheet_name='Deals', index=False)
+            aux['dpd_cohorts'].to_excel(xw, sheet_name='Current_DPD_New Cohorts', index=False, header=False)
+            aux['collections'].to_excel(xw, sheet_name='Collections', index=False, header=False)
+            aux['payments'].to_excel(xw, sheet_name='Payments', index=False)
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('engine', choices=ENGINES)
+    ap.add_argument('--rows', default='10k', help='row count, e.g. 10k, 100k, 1M')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--as-of', default=None)
+    ap.add_argument('--out', default='.')
+    args = ap.parse_args(argv)
+
+    tape = generate(args.engine, parse_rows(args.rows), seed=args.seed, as_of=args.as_of)
+    print(write_tape(args.engine, tape, args.out, as_of=args.as_of))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Activity log store tests — newest-first reads, company index, rotation.
+
+Every test redirects `core.activity_log._LOG_PATH` at a tmp directory; the
+index and archive directories are derived from it.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import activity_log as al
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = tmp_path / "activity_log.jsonl"
+    monkeypatch.setattr(al, "_LOG_PATH", path)
+    return path
+
+
+def _write_legacy(path, events):
+    """Write events the way the pre-index logger did (no sidecar files)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+
+
+# Recent enough that age-based rotation never trips on fixture events
+BASE = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=1)
+
+
+def _event(i, company=None, ts=None):
+    ts = ts or BASE + timedelta(minutes=i)
+    return {"timestamp": ts.isoformat(), "action": "tape_loaded",
+            "company": company, "product": None, "detail": str(i), "metadata": {}}
+
+
+class TestNewestFirst:
+    def test_empty_log(self, log_path):
+        assert al.read_activity_log() == []
+
+    def test_latest_n_newest_first(self, log_path, monkeypatch):
+        monkeypatch.setattr(al, "_BLOCK_SIZE", 64)  # force many block boundaries
+        for i in range(200):
+            al.log_activity(al.TAPE_LOADED, detail=str(i))
+        events = al.read_activity_log(limit=5)
+        assert [e["detail"] for e in events] == ["199", "198", "197", "196", "195"]
+
+    def test_skips_corrupt_lines(self, log_path):
+        al.log_activity(al.TAPE_LOADED, detail="a")
+        with open(log_path, "a") as f:
+            f.write("{not json\n\n")
+        al.log_activity(al.TAPE_LOADED, detail="b")
+        assert [e["detail"] for e in al.read_activity_log()] == ["b", "a"]
+
+
+class TestCompanyIndex:
+    def test_company_filter_uses_index(self, log_path):
+        for i in range(30):
+            al.log_activity(al.TAPE_LOADED, company="klaim" if i % 3 == 0 else "SILQ", detail=str(i))
+        events = al.read_activity_log(limit=3, company="klaim")
+        assert [e["detail"] for e in events] == ["27", "24", "21"]
+        assert al._read_company_tail("klaim", 3) == events
+
+    def test_unknown_company_is_empty(self, log_path):
+        al.log_activity(al.TAPE_LOADED, company="klaim")
+        assert al.read_activity_log(company="nobody") == []
+
+    def test_legacy_log_is_indexed_on_first_write(self, log_path):
+        _write_legacy(log_path, [_event(i, "klaim" if i % 2 else "SILQ") for i in range(10)])
+        assert al._read_company_tail("klaim", 5) is None  # no index yet → scan
+        assert [e["detail"] for e in al.read_activity_log(limit=2, company="klaim")] == ["9", "7"]
+
+        al.log_activity(al.TAPE_LOADED, company="klaim", detail="new")
+        assert [e["detail"] for e in al._read_company_tail("klaim", 3)] == ["new", "9", "7"]
+
+    def test_stale_index_falls_back_to_scan(self, log_path):
+        al.log_activity(al.TAPE_LOADED, company="klaim", detail="x")
+        _write_legacy(log_path, [_event(0, "SILQ"), _event(1, "klaim")])
+        assert [e["detail"] for e in al.read_activity_log(company="klaim")] == ["1"]
+
+
+class TestRotation:
+    def test_size_rotation_archives_and_reads_span(self, log_path, monkeypatch):
+        monkeypatch.setattr(al, "_MAX_LOG_BYTES", 2000)
+        for i in range(40):
+            al.log_activity(al.TAPE_LOADED, company="klaim", detail=str(i))
+        archives = al._list_archives()
+        assert archives
+        assert log_path.stat().st_size < 2000 + 500
+        with gzip.open(archives[0], "rt") as f:
+            assert json.loads(f.readline())["detail"] == "0"
+
+        events = al.read_activity_log(limit=40, company="klaim")
+        assert [e["detail"] for e in events] == [str(i) for i in range(39, -1, -1)]
+
+    def test_age_rotation(self, log_path):
+        old = datetime.now(timezone.utc) - timedelta(days=al._MAX_LOG_AGE_DAYS + 1)
+        _write_legacy(log_path, [_event(0, "klaim", ts=old)])
+        al.log_activity(al.TAPE_LOADED, company="klaim", detail="fresh")
+        assert len(al._list_archives()) == 1
+        assert [e["detail"] for e in al.read_activity_log(company="klaim")] == ["fresh", "0"]
+
+    def test_manual_rotate_empty_is_noop(self, log_path):
+        assert al.rotate_activity_log() is None
+
+
+class TestTimeRange:
+    def test_range_bounds_and_company(self, log_path):
+        _write_legacy(log_path, [_event(i, "klaim" if i % 2 else "SILQ") for i in range(10)])
+        events = al.read_activity_range(start=BASE + timedelta(minutes=3),
+                                        end=BASE + timedelta(minutes=7))
+        assert [e["detail"] for e in events] == ["7", "6", "5", "4"]
+
+        events = al.read_activity_range(start=(BASE + timedelta(minutes=3)).isoformat(),
+                                        company="klaim")
+        assert [e["detail"] for e in events] == ["9", "7", "5"]
+
+    def test_range_spans_archives(self, log_path):
+        _write_legacy(log_path, [_event(i) for i in range(5)])
+        al.rotate_activity_log()
+        _write_legacy(log_path, [_event(i) for i in range(5, 10)])
+        events = al.read_activity_range(start=BASE + timedelta(minutes=2), limit=6)
+        assert [e["detail"] for e in events] == ["9", "8", "7", "6", "5", "4"]
+        events = al.read_activity_range(start=BASE + timedelta(minutes=2))
+        assert [e["detail"] for e in events][-1] == "3"
@@ -6,9 +6,11 @@ Tests cover:
 - AgentSession lifecycle (create, save, load, expire, delete)
 - ToolRegistry (register, get, patterns)
 - AgentRunner (mocked Claude API)
+- AgentRunner async paths against scripts/fake_model_server.py
 - StreamEvent SSE formatting
 """
 
+import asyncio
 import json
 import os
 import sys
@@ -135,10 +137,11 @@ class TestAgentSession:
         with patch("core.agents.session._SESSIONS_DIR", tmp_path):
             session = AgentSession.create("analyst")
             session.save()
-            assert (tmp_path / f"{session.session_id}.json").exists()
+            assert (tmp_path / f"{session.session_id}.jsonl").exists()
 
             session.delete()
-            assert not (tmp_path / f"{session.session_id}.json").exists()
+            assert not (tmp_path / f"{session.session_id}.jsonl").exists()
+            assert AgentSession.load(session.session_id) is None
 
     def test_session_list_recent(self, tmp_path):
         with patch("core.agents.session._SESSIONS_DIR", tmp_path):
@@ -169,6 +172,116 @@ class TestAgentSession:
             removed = AgentSession.cleanup_expired()
             assert removed == 1
 
+    def test_save_appends_only_new_messages(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            session = AgentSession.create("analyst")
+            session.add_user_message("q1")
+            session.add_assistant_message([{"type": "tool_use", "id": "t1", "name": "x", "input": {}}])
+            session.save()
+            log = tmp_path / f"{session.session_id}.jsonl"
+            assert len(log.read_text().splitlines()) == 2
+
+            session.save()  # nothing new
+            assert len(log.read_text().splitlines()) == 2
+
+            session.add_tool_result("t1", "r1")
+            session.save()
+            session.add_tool_result("t2", "r2")  # grouped into the persisted message
+            session.add_assistant_message([{"type": "text", "text": "done"}])
+            session.save()
+            assert len(log.read_text().splitlines()) == 5
+
+            loaded = AgentSession.load(session.session_id)
+            assert loaded.messages == session.messages
+            assert [b["tool_use_id"] for b in loaded.messages[2]["content"]] == ["t1", "t2"]
+
+    def test_loaded_session_continues_appending(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            session = AgentSession.create("analyst")
+            session.add_user_message("q1")
+            session.save()
+
+            loaded = AgentSession.load(session.session_id)
+            loaded.add_user_message("q2")
+            loaded.save()
+            assert AgentSession.load(session.session_id).messages == [
+                {"role": "user", "content": "q1"}, {"role": "user", "content": "q2"},
+            ]
+
+    def test_truncated_history_rewrites_log(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            session = AgentSession.create("analyst")
+            for i in range(4):
+                session.add_user_message(f"q{i}")
+            session.save()
+            session.messages = session.messages[-1:]
+            session.save()
+            assert AgentSession.load(session.session_id).messages == [{"role": "user", "content": "q3"}]
+
+    def test_torn_last_line_is_skipped(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            session = AgentSession.create("analyst")
+            session.add_user_message("q1")
+            session.save()
+            with open(tmp_path / f"{session.session_id}.jsonl", "a") as f:
+                f.write('{"i": 1, "m": {"role": "assi')
+            loaded = AgentSession.load(session.session_id)
+            assert len(loaded.messages) == 1
+
+            loaded.add_user_message("q2")
+            loaded.save()
+            assert len(AgentSession.load(session.session_id).messages) == 2
+
+    def test_list_recent_reads_index_only(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            for i in range(3):
+                s = AgentSession.create("analyst", metadata={"i": i})
+                s.add_user_message("q")
+                s.record_usage(10, 5)
+                s.save()
+                time.sleep(0.01)
+            for log in tmp_path.glob("*.jsonl"):
+                log.unlink()  # listing must not need the message logs
+
+            recent = AgentSession.list_recent(limit=2)
+            assert [r["metadata"]["i"] for r in recent] == [2, 1]
+            assert recent[0]["total_tokens"] == 15
+
+    def test_legacy_json_sessions_are_migrated(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            data = {
+                "session_id": "legacy123",
+                "agent_name": "analyst",
+                "messages": [{"role": "user", "content": "old question"}],
+                "metadata": {"company": "klaim"},
+                "created_at": time.time() - 60,
+                "last_active": time.time() - 60,
+                "total_input_tokens": 7,
+                "total_output_tokens": 3,
+                "turn_count": 1,
+            }
+            (tmp_path / "legacy123.json").write_text(json.dumps(data))
+
+            assert AgentSession.list_recent()[0]["session_id"] == "legacy123"
+            assert not (tmp_path / "legacy123.json").exists()
+            loaded = AgentSession.load("legacy123")
+            assert loaded.messages == data["messages"]
+            assert loaded.metadata == {"company": "klaim"} and loaded.total_tokens == 10
+
+    def test_store_counts_and_filters_by_activity(self, tmp_path):
+        from core.agents.session_store import get_store
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            old = AgentSession.create("analyst", metadata={"i": 0})
+            old.save()
+            cutoff = time.time()
+            time.sleep(0.01)
+            new = AgentSession.create("analyst", metadata={"i": 1})
+            new.save()
+
+            store = get_store(tmp_path)
+            assert store.count() == 2
+            assert [s["session_id"] for s in store.active_since(cutoff)] == [new.session_id]
+
 
 # ── ToolRegistry Tests ───────────────────────────────────────────────────
 
@@ -341,6 +454,204 @@ class TestAgentRunner:
         assert "Timed out after 180s" in result
 
 
+# ── Async AgentRunner against the scripted model server ─────────────────
+
+def _fake_async_client(app):
+    """AsyncAnthropic wired to the fake server in-process (no socket)."""
+    import anthropic
+    import httpx
+    return anthropic.AsyncAnthropic(
+        api_key="fake",
+        base_url="http://fake-model",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                      base_url="http://fake-model"),
+    )
+
+
+async def _drive(app, coro_fn):
+    """Run coro_fn() with the runtime's model client pointed at `app`."""
+    client = _fake_async_client(app)
+    with patch("core.ai_client.get_async_client", return_value=client):
+        return await coro_fn()
+
+
+class TestAsyncRunner:
+    TOOLS = ("analytics.get_par_analysis", "analytics.get_cohort_analysis")
+
+    @pytest.fixture(autouse=True)
+    def _sessions_dir(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            yield
+
+    def _config(self, handler):
+        tools = [ToolSpec(name, name, {"type": "object", "properties": {}}, handler)
+                 for name in self.TOOLS]
+        return AgentConfig(name="test", system_prompt="test", tools=tools,
+                           max_turns=5, max_budget_tokens=100_000)
+
+    def _app(self):
+        from scripts.fake_model_server import build_app
+        return build_app([t.replace(".", "_") for t in self.TOOLS], tool_turns=1)
+
+    def test_stream_runs_tools_then_answers(self):
+        from scripts.fake_model_server import ANSWER_TEXT
+        runner = AgentRunner(self._config(lambda call=0: f"result {call}"))
+        session = AgentSession.create("test")
+
+        async def _collect():
+            return [e async for e in runner.stream("Why is PAR up?", session)]
+
+        events = asyncio.run(_drive(self._app(), _collect))
+        kinds = [e.type for e in events]
+        assert kinds.count("tool_call") == 2 and kinds.count("tool_result") == 2
+        assert kinds[-1] == "done"
+        text = "".join(e.data["delta"] for e in events if e.type == "text")
+        assert text.strip() == ANSWER_TEXT
+        results = [b for m in session.messages if m["role"] == "user"
+                   for b in (m["content"] if isinstance(m["content"], list) else [])]
+        assert [b["content"] for b in results] == ["result 0", "result 1"]
+
+    def test_run_non_streaming(self):
+        from scripts.fake_model_server import ANSWER_TEXT
+        runner = AgentRunner(self._config(lambda call=0: "ok"))
+        session = AgentSession.create("test")
+        result = asyncio.run(_drive(self._app(), lambda: runner.run("q", session)))
+        assert result.text == ANSWER_TEXT
+        assert [c["tool"] for c in result.tool_calls_made] == [t.replace(".", "_") for t in self.TOOLS]
+        assert result.turns_used == 2
+
+    def test_blocking_tools_do_not_block_event_loop(self):
+        def slow(call=0):
+            time.sleep(0.3)
+            return "done"
+
+        config = self._config(slow)
+        lags = []
+
+        async def _scenario():
+            loop = asyncio.get_running_loop()
+            stop = asyncio.Event()
+
+            async def beat():
+                while not stop.is_set():
+                    t = loop.time()
+                    await asyncio.sleep(0.01)
+                    lags.append(loop.time() - t - 0.01)
+
+            async def one():
+                session = AgentSession.create("test")
+                return [e.type async for e in AgentRunner(config).stream("q", session)]
+
+            task = asyncio.create_task(beat())
+            runs = await asyncio.gather(*(one() for _ in range(8)))
+            stop.set()
+            await task
+            return runs
+
+        runs = asyncio.run(_drive(self._app(), _scenario))
+        assert all(r[-1] == "done" for r in runs)
+        assert max(lags) < 0.25  # a blocking tool would stall the loop ≥ 0.3s
+
+    def test_async_tool_timeout(self, monkeypatch):
+        monkeypatch.setattr(AgentRunner, "TOOL_TIMEOUT_SECONDS", 0.05)
+
+        def hangs(**_):
+            time.sleep(0.5)
+            return "never"
+
+        runner = AgentRunner(self._config(hangs))
+        result = asyncio.run(runner._execute_tool_async("analytics.get_par_analysis", {}))
+        assert "Timed out after 0.05s" in result
+
+
+class TestParallelToolTurns:
+    TOOLS = ("analytics.get_par_analysis", "analytics.get_cohort_analysis",
+             "analytics.get_concentration")
+
+    @pytest.fixture(autouse=True)
+    def _sessions_dir(self, tmp_path):
+        with patch("core.agents.session._SESSIONS_DIR", tmp_path):
+            yield
+
+    def _config(self, handlers):
+        tools = [ToolSpec(name, name, {"type": "object", "properties": {}}, handlers[name])
+                 for name in self.TOOLS]
+        return AgentConfig(name="test", system_prompt="test", tools=tools,
+                           max_turns=5, max_budget_tokens=100_000)
+
+    def _app(self):
+        from scripts.fake_model_server import build_app
+        return build_app([t.replace(".", "_") for t in self.TOOLS], tool_turns=1)
+
+    @staticmethod
+    def _sleeper(seconds, label):
+        def handler(call=0):
+            time.sleep(seconds)
+            return label
+        return handler
+
+    def test_turn_latency_is_max_not_sum(self):
+        handlers = {name: self._sleeper(0.3, name) for name in self.TOOLS}
+        runner = AgentRunner(self._config(handlers))
+        session = AgentSession.create("test")
+        t0 = time.perf_counter()
+        result = asyncio.run(_drive(self._app(), lambda: runner.run("q", session)))
+        assert time.perf_counter() - t0 < 0.75  # sequential would be ≥ 0.9s
+        assert len(result.tool_calls_made) == 3
+
+    def test_results_keep_block_order(self):
+        handlers = {
+            self.TOOLS[0]: self._sleeper(0.2, "slow"),
+            self.TOOLS[1]: self._sleeper(0.0, "fast"),
+            self.TOOLS[2]: self._sleeper(0.1, "medium"),
+        }
+        runner = AgentRunner(self._config(handlers))
+        session = AgentSession.create("test")
+
+        async def _collect():
+            return [e async for e in runner.stream("q", session)]
+
+        events = asyncio.run(_drive(self._app(), _collect))
+        previews = [e.data["preview"] for e in events if e.type == "tool_result"]
+        assert previews == ["slow", "fast", "medium"]
+        tool_use_ids = [b["id"] for m in session.messages if m["role"] == "assistant"
+                        for b in m["content"] if b["type"] == "tool_use"]
+        result_ids = [b["tool_use_id"] for m in session.messages if m["role"] == "user"
+                      and isinstance(m["content"], list) for b in m["content"]]
+        assert result_ids == tool_use_ids
+
+    def test_per_tool_timeout_inside_a_turn(self, monkeypatch):
+        monkeypatch.setattr(AgentRunner, "TOOL_TIMEOUT_SECONDS", 0.2)
+        handlers = {
+            self.TOOLS[0]: self._sleeper(0.0, "a"),
+            self.TOOLS[1]: self._sleeper(1.0, "never"),
+            self.TOOLS[2]: self._sleeper(0.0, "c"),
+        }
+        runner = AgentRunner(self._config(handlers))
+        calls = [(name, {}) for name in self.TOOLS]
+
+        async def _turn():
+            return [await t for t in runner._schedule_tools(calls)]
+
+        assert asyncio.run(_turn()) == ["a", "Tool error (analytics.get_cohort_analysis): Timed out after 0.2s", "c"]
+
+    def test_identical_calls_share_one_execution(self):
+        count = []
+        handlers = {name: (lambda **_: count.append(1) or "r") for name in self.TOOLS}
+        runner = AgentRunner(self._config(handlers))
+        calls = [(self.TOOLS[0], {"x": 1}), (self.TOOLS[0], {"x": 1}), (self.TOOLS[1], {})]
+
+        async def _turn():
+            return [await t for t in runner._schedule_tools(calls)]
+
+        assert asyncio.run(_turn()) == ["r", "r", "r"]
+        assert len(count) == 2
+
+    def test_underscored_name_gets_prefix_timeout(self):
+        assert AgentRunner._timeout_for_tool("external_web_search") == 180
+
+
 # ── Global tool registration test ────────────────────────────────────────
 
 class TestGlobalToolRegistration:
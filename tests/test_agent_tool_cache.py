@@ -0,0 +1,156 @@
+"""Shared agent tool-result cache — keys, invalidation, eviction, stats."""
+import json
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.agents import tool_cache as tc
+from core.agents.tool_cache import ToolResultCache, cached_tool
+
+
+@pytest.fixture
+def product_dir(tmp_path, monkeypatch):
+    """A data/ tree with one product holding two tapes and a config."""
+    data = tmp_path / "data"
+    product = data / "acme" / "KSA"
+    product.mkdir(parents=True)
+    (product / "2026-01-31_ksa.csv").write_text("id,amount\n1,100\n")
+    (product / "2026-02-28_ksa.csv").write_text("id,amount\n1,100\n2,50\n")
+    (product / "config.json").write_text(json.dumps({"currency": "SAR"}))
+    monkeypatch.setattr("core.loader.DATA_DIR", str(data))
+    monkeypatch.setattr(tc, "tool_cache", ToolResultCache(max_entries=16, ttl_seconds=60))
+    return product
+
+
+def _counting_tool(name="analytics.get_par_analysis", **wrap_kw):
+    calls = []
+
+    def handler(company, product, snapshot=None, currency=None, as_of_date=None):
+        calls.append(snapshot)
+        return f"{name} #{len(calls)}"
+
+    return cached_tool(name, handler, **wrap_kw), calls
+
+
+class TestCachedTool:
+    def test_second_call_hits(self, product_dir):
+        tool, calls = _counting_tool()
+        assert tool(company="acme", product="KSA") == tool(company="acme", product="KSA")
+        assert len(calls) == 1
+        stats = tc.tool_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["per_tool"]["analytics.get_par_analysis"] == {"hits": 1, "misses": 1}
+
+    def test_latest_filename_and_date_share_an_entry(self, product_dir):
+        tool, calls = _counting_tool()
+        tool(company="acme", product="KSA")
+        tool(company="acme", product="KSA", snapshot="2026-02-28_ksa.csv")
+        tool(company="acme", product="KSA", snapshot="2026-02-28", currency=None)
+        assert len(calls) == 1
+        tool(company="acme", product="KSA", snapshot="2026-01-31")
+        assert len(calls) == 2
+
+    def test_args_are_part_of_the_key(self, product_dir):
+        tool, calls = _counting_tool()
+        tool(company="acme", product="KSA")
+        tool(company="acme", product="KSA", as_of_date="2026-01-15")
+        tool(company="acme", product="KSA", currency="USD")
+        assert len(calls) == 3
+
+    def test_tape_content_change_misses(self, product_dir):
+        tool, calls = _counting_tool()
+        tool(company="acme", product="KSA")
+        tape = product_dir / "2026-02-28_ksa.csv"
+        tape.write_text("id,amount\n1,100\n2,75\n")
+        os.utime(tape, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        tool(company="acme", product="KSA")
+        assert len(calls) == 2
+
+    def test_config_change_misses(self, product_dir):
+        tool, calls = _counting_tool()
+        tool(company="acme", product="KSA")
+        (product_dir / "config.json").write_text(json.dumps({"currency": "USD", "x": 1}))
+        tool(company="acme", product="KSA")
+        assert len(calls) == 2
+
+    def test_all_snapshot_tools_key_on_every_tape(self, product_dir):
+        tool, calls = _counting_tool("analytics.get_metric_trend", all_snapshots=True)
+        tool(company="acme", product="KSA")
+        (product_dir / "2026-03-31_ksa.csv").write_text("id\n1\n")
+        tool(company="acme", product="KSA")
+        assert len(calls) == 2
+
+    def test_unresolvable_product_bypasses_cache(self, product_dir):
+        tool, calls = _counting_tool()
+        tool(company="nobody", product="KSA")
+        tool(company="nobody", product="KSA")
+        assert len(calls) == 2
+        assert tc.tool_cache.stats()["entries"] == 0
+
+    def test_exceptions_are_not_cached(self, product_dir):
+        calls = []
+
+        def flaky(company, product):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        tool = cached_tool("analytics.flaky", flaky)
+        with pytest.raises(RuntimeError):
+            tool(company="acme", product="KSA")
+        assert tool(company="acme", product="KSA") == "ok"
+        assert tool(company="acme", product="KSA") == "ok"
+        assert len(calls) == 2
+
+
+class TestEviction:
+    def test_lru_bound(self):
+        cache = ToolResultCache(max_entries=2, ttl_seconds=60)
+        for k in ("a", "b"):
+            cache.put(k, "t", k)
+        cache.get("a", "t")  # a is now most recent
+        cache.put("c", "t", "c")
+        assert cache.get("b", "t") is None
+        assert cache.get("a", "t") == "a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = ToolResultCache(max_entries=4, ttl_seconds=10)
+        cache.put("k", "t", "v")
+        now = time.time()
+        monkeypatch.setattr(tc.time, "time", lambda: now + 11)
+        assert cache.get("k", "t") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_disk_tier_survives_new_process(self, tmp_path):
+        first = ToolResultCache(max_entries=4, ttl_seconds=60, disk_dir=tmp_path)
+        first.put("k", "t", "v")
+        second = ToolResultCache(max_entries=4, ttl_seconds=60, disk_dir=tmp_path)
+        assert second.get("k", "t") == "v"
+        assert second.stats()["disk_hits"] == 1
+
+    def test_disk_tier_pruned_to_max_entries(self, tmp_path):
+        cache = ToolResultCache(max_entries=2, ttl_seconds=60, disk_dir=tmp_path)
+        for k in ("a", "b", "c"):
+            cache.put(k, "t", k)
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+class TestStatsEndpoint:
+    def test_tool_cache_endpoint_and_rate_limits(self, product_dir):
+        from backend.agents import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/agents")
+        client = TestClient(app)
+        tool, _ = _counting_tool()
+        tool(company="acme", product="KSA")
+        tool(company="acme", product="KSA")
+
+        stats = client.get("/agents/tool-cache").json()
+        assert stats["hits"] == 1 and stats["hit_ratio"] == 0.5
+        assert client.get("/agents/rate-limits").json()["tool_cache"]["entries"] == 1
@@ -0,0 +1,124 @@
+"""Indexed AI response cache store — keys, freshness, bulk status, eviction."""
+from __future__ import annotations
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core import ai_cache as ac
+from core.ai_cache import AICacheKey, AICacheStore, usage_from_message
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AICacheStore(root=tmp_path, max_bytes=10_000, max_age_seconds=3600)
+
+
+def _key(endpoint="commentary", snapshot="2026-03-31.csv", tab="", mtime=100, **kw):
+    return AICacheKey(endpoint, "acme", "KSA", snapshot, tab=tab, tape_mtime=mtime, **kw)
+
+
+class TestKeys:
+    def test_key_is_stable_and_ignores_mtime(self):
+        assert _key(mtime=1) == _key(mtime=2)
+        assert _key() != _key(currency="USD")
+        assert _key().startswith("commentary:")
+
+    def test_legacy_filename_matches_old_scheme(self):
+        name = _key(endpoint="tab_insight", tab="cohort").legacy_filename()
+        assert name.startswith("acme_KSA_tab_insight_cohort_2026-03-31_csv_") and name.endswith(".json")
+
+
+class TestStore:
+    def test_put_get_with_usage(self, store):
+        store.put(_key(), {"commentary": "hello"},
+                  {"tier": "structured", "model": "m", "input_tokens": 10, "output_tokens": 5, "cost_usd": 0.01})
+        assert store.get(_key()) == {"commentary": "hello"}
+        row = store.status("acme", "KSA", "2026-03-31.csv")[0]
+        assert (row["tier"], row["model"], row["input_tokens"], row["cost_usd"], row["hits"]) == \
+            ("structured", "m", 10, 0.01, 1)
+
+    def test_replaced_tape_misses_and_put_overwrites(self, store):
+        store.put(_key(mtime=100), {"v": 1})
+        assert store.get(_key(mtime=200)) is None
+        assert store.status("acme", "KSA", "2026-03-31.csv", tape_mtime=200) == []
+        store.put(_key(mtime=200), {"v": 2})
+        assert store.get(_key(mtime=200)) == {"v": 2}
+        assert store.stats()["entries"] == 1
+
+    def test_bulk_status_by_scope(self, store):
+        store.put(_key(), {"v": 1})
+        store.put(_key(endpoint="tab_insight", tab="cohort"), {"v": 2})
+        store.put(_key(snapshot="2026-02-28.csv"), {"v": 3})
+        rows = store.status("acme", "KSA", "2026-03-31.csv")
+        assert sorted((r["endpoint"], r["tab"]) for r in rows) == [("commentary", ""), ("tab_insight", "cohort")]
+        assert "payload" not in rows[0]
+        assert len(store.status("acme", "KSA")) == 3
+
+    def test_age_eviction(self, store, monkeypatch):
+        store.put(_key(), {"v": 1})
+        now = time.time()
+        monkeypatch.setattr(ac.time, "time", lambda: now + 7200)
+        assert store.evict() == 1
+        assert store.get(_key()) is None
+
+    def test_size_eviction_drops_least_recently_hit(self, store):
+        blob = "x" * 4000
+        for tab in ("a", "b", "c"):
+            store.put(_key(endpoint="tab_insight", tab=tab), {"blob": blob})
+        store.get(_key(endpoint="tab_insight", tab="a"))  # a is now most recent
+        assert store.evict() == 1
+        remaining = {r["tab"] for r in store.status("acme", "KSA")}
+        assert remaining == {"a", "c"}
+
+    def test_legacy_json_file_is_imported_on_miss(self, store, tmp_path):
+        key = _key(endpoint="executive_summary")
+        (tmp_path / key.legacy_filename()).write_text(json.dumps({"findings": [1]}))
+        assert store.get(key) == {"findings": [1]}
+        assert not (tmp_path / key.legacy_filename()).exists()
+        assert store.get(key) == {"findings": [1]}
+
+    def test_usage_from_message(self):
+        msg = SimpleNamespace(usage=SimpleNamespace(input_tokens=1_000_000, output_tokens=0))
+        msg._laith_metadata = {"tier": "structured", "model": "claude-sonnet-4-6"}
+        assert usage_from_message(msg) == {"tier": "structured", "model": "claude-sonnet-4-6",
+                                           "input_tokens": 1_000_000, "output_tokens": 0,
+                                           "cost_usd": 3.0}
+
+
+class TestStatusEndpoint:
+    def test_ai_cache_status_reads_index(self, store, monkeypatch):
+        import backend.main as main
+
+        monkeypatch.setattr(main, "get_ai_cache", lambda: store)
+        monkeypatch.setattr(main, "_resolve_snapshot",
+                            lambda co, p, s: {"filename": "2026-03-31.csv", "date": "2026-03-31"})
+        monkeypatch.setattr(main, "_snapshot_mtime", lambda *a, **k: 100)
+        monkeypatch.setattr(main, "_get_analysis_type", lambda co, p: "klaim")
+        monkeypatch.setattr(main, "load_config", lambda co, p: {"currency": "SAR"})
+        main._ai_cache_put(main._ai_cache_key("commentary", "acme", "KSA", "2026-03-31.csv",
+                                              snapshot_date="2026-03-31"),
+                           {"commentary": "c"}, {"model": "m", "cost_usd": 0.02})
+        main._ai_cache_put(main._ai_cache_key("tab_insight", "acme", "KSA", "2026-03-31.csv", tab="cohort",
+                                              snapshot_date="2026-03-31"), {"insight": "i"})
+        # Other currency views don't count towards the default (reporting-currency) status
+        main._ai_cache_put(main._ai_cache_key("executive_summary", "acme", "KSA", "2026-03-31.csv",
+                                              snapshot_date="2026-03-31", currency="USD"), {"findings": []})
+
+        body = TestClient(main.app).get("/companies/acme/products/KSA/ai-cache-status").json()
+        assert body["commentary"]["cached"] is True and body["commentary"]["cost_usd"] == 0.02
+        assert body["executive_summary"] == {"cached": False}
+        assert list(body["tab_insights"]) == ["cohort"]
+        assert body["total_cached"] == 2
+
+        # The dashboard's reporting-currency requests count too, and an explicit currency selects its view
+        main._ai_cache_put(main._ai_cache_key("tab_insight", "acme", "KSA", "2026-03-31.csv", tab="ageing",
+                                              snapshot_date="2026-03-31", currency="SAR"), {"insight": "i"})
+        http = TestClient(main.app)
+        assert sorted(http.get("/companies/acme/products/KSA/ai-cache-status").json()["tab_insights"]) == [
+            "ageing", "cohort"]
+        usd = http.get("/companies/acme/products/KSA/ai-cache-status", params={"currency": "USD"}).json()
+        assert usd["executive_summary"]["cached"] is True and list(usd["tab_insights"]) == ["cohort"]
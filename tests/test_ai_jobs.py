@@ -0,0 +1,173 @@
+"""AI job layer — single-flight coalescing, tier caps, SSE subscription."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.ai_jobs import AIJobQueue, stream_job_events
+
+
+def _gated(result="ok"):
+    """A job fn that blocks until released, counting invocations."""
+    gate = threading.Event()
+    calls = []
+
+    def fn(job):
+        calls.append(job.id)
+        job.publish("progress", {"step": 1})
+        gate.wait(5)
+        return result
+
+    return fn, gate, calls
+
+
+class TestSingleFlight:
+    def test_identical_keys_share_one_run(self):
+        q = AIJobQueue(max_workers=4)
+        fn, gate, calls = _gated({"commentary": "x"})
+        first, created1 = q.submit("k", fn)
+        second, created2 = q.submit("k", fn)
+        assert (created1, created2) == (True, False)
+        assert first is second and first.joined == 1
+
+        results = []
+        waiters = [threading.Thread(target=lambda: results.append(q.run("k", fn))) for _ in range(3)]
+        for t in waiters:
+            t.start()
+        gate.set()
+        for t in waiters:
+            t.join(5)
+        assert first.wait(5) == {"commentary": "x"}
+        assert results == [{"commentary": "x"}] * 3
+        assert len(calls) == 1
+        assert q.stats()["coalesced"] == 4
+
+    def test_finished_job_frees_the_key(self):
+        q = AIJobQueue(max_workers=2)
+        job, _ = q.submit("k", lambda job: 1)
+        assert job.wait(5) == 1
+        again, created = q.submit("k", lambda job: 2)
+        assert created and again.wait(5) == 2
+
+    def test_errors_reach_every_waiter(self):
+        q = AIJobQueue(max_workers=2)
+        gate = threading.Event()
+
+        def boom(job):
+            gate.wait(5)
+            raise ValueError("model unavailable")
+
+        job, _ = q.submit("k", boom)
+        joined, _ = q.submit("k", boom)
+        gate.set()
+        for j in (job, joined):
+            with pytest.raises(ValueError, match="model unavailable"):
+                j.wait(5)
+        assert job.status == "error" and q.stats()["failed"] == 1
+
+
+class TestScheduling:
+    def test_tier_limit_queues_excess_jobs(self):
+        q = AIJobQueue(max_workers=8, tier_limits={"judgment": 1})
+        fn, gate, calls = _gated()
+        a, _ = q.submit("a", fn, tier="judgment")
+        b, _ = q.submit("b", fn, tier="judgment")
+        time.sleep(0.05)
+        assert (a.status, b.status) == ("running", "queued")
+        assert q.stats()["tiers"]["judgment"] == {"running": 1, "queued": 1, "limit": 1}
+        gate.set()
+        assert b.wait(5) == "ok" and len(calls) == 2
+
+    def test_busy_tier_does_not_block_other_tiers(self):
+        q = AIJobQueue(max_workers=8, tier_limits={"judgment": 1, "structured": 4})
+        fn, gate, _ = _gated()
+        q.submit("slow", fn, tier="judgment")
+        q.submit("slow-2", fn, tier="judgment")
+        quick, _ = q.submit("quick", lambda job: "fast", tier="structured")
+        assert quick.wait(2) == "fast"
+        gate.set()
+
+    def test_worker_cap_bounds_total_concurrency(self):
+        q = AIJobQueue(max_workers=2, tier_limits={"structured": 10})
+        fn, gate, calls = _gated()
+        jobs = [q.submit(f"k{i}", fn)[0] for i in range(4)]
+        time.sleep(0.05)
+        assert [j.status for j in jobs].count("running") == 2
+        gate.set()
+        assert all(j.wait(5) == "ok" for j in jobs)
+
+
+class TestSubscription:
+    def test_late_subscriber_gets_replay_then_result(self):
+        q = AIJobQueue(max_workers=2)
+        fn, gate, _ = _gated({"insight": "y"})
+        job, _ = q.submit("k", fn)
+        time.sleep(0.05)
+
+        async def _consume():
+            lines = []
+            async for line in stream_job_events(job):
+                lines.append(line)
+                if line.startswith("event: progress"):
+                    gate.set()
+            return lines
+
+        lines = asyncio.run(_consume())
+        kinds = [l.split("\n")[0] for l in lines]
+        assert kinds == ["event: job", "event: progress", "event: done"]
+        assert '"insight": "y"' in lines[-1]
+
+
+class TestEndpoints:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        import backend.main as main
+
+        monkeypatch.setattr(main, "ai_jobs", AIJobQueue(max_workers=4))
+        monkeypatch.setattr(main, "_resolve_snapshot",
+                            lambda co, p, s: {"filename": "t.csv", "date": "2026-04-15"})
+        monkeypatch.setattr(main, "_ai_cache_key", lambda *a, **k: "/tmp/__ai_jobs_test__.json")
+        monkeypatch.setattr(main, "_ai_cache_get", lambda path: None)
+        return TestClient(main.app), main
+
+    def test_concurrent_tab_insights_generate_once(self, client, monkeypatch):
+        client, main = client
+        gate, calls = threading.Event(), []
+
+        def fake_generate(*a, **k):
+            calls.append(1)
+            gate.wait(5)
+            return {"insight": "shared", "tab": "cohort"}
+
+        monkeypatch.setattr(main, "_generate_tab_insight", fake_generate)
+        url = "/companies/acme/products/KSA/ai-tab-insight?tab=cohort"
+
+        pending = client.get(url + "&wait=false")
+        assert pending.status_code == 202
+        job_id = pending.json()["job_id"]
+        assert pending.json()["stream_url"] == f"/ai-jobs/{job_id}/stream"
+
+        results = []
+        t = threading.Thread(target=lambda: results.append(client.get(url).json()))
+        t.start()
+        time.sleep(0.1)
+        gate.set()
+        t.join(5)
+
+        assert results == [{"insight": "shared", "tab": "cohort"}]
+        assert len(calls) == 1
+        status = client.get(f"/ai-jobs/{job_id}").json()
+        assert status["status"] == "done" and status["joined"] == 1
+        assert status["result"]["insight"] == "shared"
+
+        body = client.get(f"/ai-jobs/{job_id}/stream").text
+        assert "event: done" in body and "shared" in body
+        assert client.get("/ai-jobs").json()["completed"] == 1
+
+    def test_unknown_job_404(self, client):
+        client, _ = client
+        assert client.get("/ai-jobs/nope").status_code == 404
@@ -0,0 +1,134 @@
+"""Snapshot-wide AI pregeneration against the scripted model server."""
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.ai_cache import AICacheStore
+from core.ai_jobs import AIJobQueue
+
+CO, PROD = "klaim", "UAE_healthcare"
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """backend.main with a tmp cache store, a fresh job queue and both model
+    clients (legacy calls and the analyst agent) pointed at
+    scripts/fake_model_server.py in-process."""
+    import anthropic
+    import httpx
+    import backend.main as main
+    import core.ai_client as ai_client
+    from scripts.fake_model_server import build_app
+
+    fake = build_app()
+    client = anthropic.Anthropic(api_key="fake", base_url="http://fake-model", max_retries=0,
+                                 http_client=TestClient(fake, base_url="http://fake-model"))
+    store = AICacheStore(root=tmp_path)
+    monkeypatch.setattr(ai_client, "get_client", lambda: client)
+    # Agent runs use a fresh event loop per job, so a fresh async client each time
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: anthropic.AsyncAnthropic(
+        api_key="fake", base_url="http://fake-model", max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake),
+                                      base_url="http://fake-model")))
+    monkeypatch.setattr("core.agents.session._SESSIONS_DIR", tmp_path / "sessions")
+    monkeypatch.setattr(main, "get_ai_cache", lambda: store)
+    monkeypatch.setattr(main, "ai_jobs", AIJobQueue(max_workers=4))
+    monkeypatch.setattr(main, "log_activity", lambda *a, **k: None)
+    return main, store, fake
+
+
+class TestPregenerate:
+    def test_fills_every_panel_then_skips_cached(self, env):
+        main, store, fake = env
+        report = main.pregenerate_ai_outputs(CO, PROD)
+
+        tabs = main._ai_insight_tabs("klaim")
+        assert report["counts"] == {"generated": len(tabs) + 2}
+        assert fake.state.requests == len(tabs) + 2
+
+        snap = report["snapshot"]
+        rows = store.status(CO, PROD, snap)
+        assert sorted(r["tab"] for r in rows if r["endpoint"] == "tab_insight") == sorted(tabs)
+        assert {r["endpoint"] for r in rows} == {"commentary", "executive_summary", "tab_insight"}
+        # Keyed on the currency the dashboard sends, not an empty one
+        assert {r["currency"] for r in rows} == {"AED"}
+
+        # The cache-status endpoint (what the dashboard polls) sees it all
+        status = TestClient(main.app).get(f"/companies/{CO}/products/{PROD}/ai-cache-status").json()
+        assert status["total_cached"] == len(tabs) + 2
+
+        again = main.pregenerate_ai_outputs(CO, PROD)
+        assert again["counts"] == {"cached": len(tabs) + 2}
+        assert fake.state.requests == len(tabs) + 2
+
+    def test_endpoint_subset_and_refresh(self, env):
+        main, store, fake = env
+        http = TestClient(main.app)
+        url = f"/companies/{CO}/products/{PROD}/ai-pregenerate"
+
+        body = http.post(url, params={"only": "commentary"}).json()
+        assert [t["endpoint"] for t in body["targets"]] == ["commentary"]
+        assert body["counts"] == {"generated": 1}
+
+        body = http.post(url, params={"only": "commentary", "refresh": True}).json()
+        assert body["counts"] == {"generated": 1} and fake.state.requests == 2
+
+        assert http.post(url, params={"only": "memo"}).status_code == 400
+
+    def test_failures_are_reported_per_target(self, env, monkeypatch):
+        main, store, _ = env
+
+        def boom(*a, **k):
+            raise RuntimeError("model unavailable")
+
+        monkeypatch.setattr(main, "_generate_executive_summary", boom)
+        report = main.pregenerate_ai_outputs(CO, PROD, include=["commentary", "executive_summary"])
+        by_endpoint = {t["endpoint"]: t for t in report["targets"]}
+        assert by_endpoint["commentary"]["status"] == "generated"
+        assert by_endpoint["executive_summary"]["status"] == "error"
+        assert "model unavailable" in by_endpoint["executive_summary"]["error"]
+
+    def test_legacy_mode_records_usage(self, env):
+        main, store, _ = env
+        report = main.pregenerate_ai_outputs(CO, PROD, include=["tab_insight"], mode="legacy")
+        rows = store.status(CO, PROD, report["snapshot"])
+        assert rows and all(r["input_tokens"] == 100 for r in rows)
+
+    def test_dashboard_requests_hit_pregenerated_cache(self, env):
+        main, store, fake = env
+        report = main.pregenerate_ai_outputs(CO, PROD)
+        generated = fake.state.requests
+        http = TestClient(main.app)
+        base = f"/companies/{CO}/products/{PROD}"
+
+        # Exactly what CompanyContext / ChartTab / TabInsight.jsx send
+        config = http.get(f"{base}/config").json()
+        params = {"snapshot": report["snapshot"], "currency": config["currency"], "mode": "agent"}
+        for slug in ("collection", "portfolio-tab", "cohort-analysis", "seasonality"):
+            body = http.get(f"{base}/ai-tab-insight",
+                            params={**params, "tab": config["insight_tabs"][slug]}).json()
+            assert body["cached"] is True, slug
+        assert http.get(f"{base}/ai-commentary", params=params).json()["cached"] is True
+        summary = http.get(f"{base}/ai-executive-summary",
+                           params={k: v for k, v in params.items() if k != "mode"}).json()
+        assert summary["cached"] is True
+        assert fake.state.requests == generated
+
+
+class TestInsightTabRegistry:
+    @pytest.mark.parametrize("company,product", [("klaim", "UAE_healthcare"), ("SILQ", "KSA")])
+    def test_every_insight_slug_is_a_sidebar_tab(self, company, product):
+        from core.config import load_config
+        from core.insight_tabs import insight_tab_map
+
+        config = load_config(company, product)
+        if not config:
+            pytest.skip(f"{company}/{product} config not available")
+        slugs = {t["slug"] for t in config.get("tabs", [])}
+        assert set(insight_tab_map(config["analysis_type"])) <= slugs
+
+    def test_panel_less_dashboards_get_no_insights(self):
+        from core.insight_tabs import insight_tabs
+        for at in ("aajil", "ejari_summary", "tamara_summary"):
+            assert insight_tabs(at) == []
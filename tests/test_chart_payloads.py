@@ -0,0 +1,148 @@
+"""Columnar chart payloads, orjson serialisation and response compression (backend.chart_payloads)."""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.chart_payloads import (
+    COLUMNS_KEY, CompressionMiddleware, _accepted_encodings, dumps, from_columnar, to_columnar,
+)
+from core.loader import DATA_DIR
+
+KLAIM_DIR = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare')
+CHARTS = '/companies/klaim/products/UAE_healthcare/charts'
+
+
+class TestColumnar:
+    def test_round_trip(self):
+        payload = {
+            'cohorts': [{'month': '2025-01', 'rate': 0.91, 'detail': [{'a': 1}, {'a': 2}]},
+                        {'month': '2025-02', 'rate': None, 'detail': []}],
+            'mixed': [{'a': 1}, {'b': 2}],          # differing keys stay as rows
+            'scalars': [1, 2, 3],
+            'currency': 'AED',
+        }
+        out = to_columnar(payload)
+        assert out['cohorts'][COLUMNS_KEY]['month'] == ['2025-01', '2025-02']
+        assert out['cohorts'][COLUMNS_KEY]['detail'][0] == {COLUMNS_KEY: {'a': [1, 2]}}
+        assert out['mixed'] == [{'a': 1}, {'b': 2}]
+        assert from_columnar(out) == payload
+
+    def test_key_order_preserved(self):
+        rows = [{'z': 1, 'a': 2}, {'z': 3, 'a': 4}]
+        assert list(from_columnar(to_columnar(rows))[0]) == ['z', 'a']
+        # Same keys, different order → rows (expanding would reorder them)
+        assert to_columnar([{'a': 1, 'b': 2}, {'b': 3, 'a': 4}]) == [{'a': 1, 'b': 2}, {'b': 3, 'a': 4}]
+
+    def test_dumps_numpy_dates_and_nan(self):
+        body = json.loads(dumps({'n': np.int64(3), 'f': np.float64(1.5), 'arr': np.array([1, 2]),
+                                 'nan': float('nan'), 'd': date(2026, 1, 31),
+                                 'ts': pd.Timestamp('2026-01-31'), 1: 'int key'}))
+        assert body['n'] == 3 and body['f'] == 1.5 and body['arr'] == [1, 2]
+        assert body['nan'] is None and body['d'] == '2026-01-31' and body['1'] == 'int key'
+        assert body['ts'].startswith('2026-01-31')
+
+    def test_accepted_encodings(self):
+        assert _accepted_encodings('gzip, deflate, br') == {'gzip', 'deflate', 'br'}
+        assert 'br' not in _accepted_encodings('gzip, br;q=0')
+
+
+def _streaming_app(chunks, content_type='application/json', length=None):
+    async def app(scope, receive, send):
+        headers = [(b'content-type', content_type.encode())]
+        if length is not None:
+            headers.append((b'content-length', str(length).encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        for i, chunk in enumerate(chunks):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': i < len(chunks) - 1})
+    return app
+
+
+def _get(app, accept='gzip'):
+    from starlette.testclient import TestClient
+    return TestClient(CompressionMiddleware(app, minimum_size=100)).get(
+        '/', headers={'Accept-Encoding': accept})
+
+
+class TestCompressionMiddleware:
+    def test_streamed_body_gzipped(self):
+        chunks = [b'{"rows": [' + b'1, ' * 200, b'2, ' * 200, b'3]}']
+        resp = _get(_streaming_app(chunks))
+        assert resp.headers['content-encoding'] == 'gzip'
+        assert 'content-length' not in resp.headers
+        assert resp.content == b''.join(chunks)
+
+    def test_single_chunk_gets_exact_length(self):
+        body = b'x' * 500
+        resp = _get(_streaming_app([body], length=len(body)), accept='identity')
+        assert 'content-encoding' not in resp.headers
+        resp = _get(_streaming_app([body], length=len(body)))
+        assert resp.headers['content-encoding'] == 'gzip'
+        assert int(resp.headers['content-length']) < len(body)
+        assert resp.content == body
+
+    def test_small_known_length_untouched_even_when_chunked(self):
+        resp = _get(_streaming_app([b'{"status":', b' "ok"}'], length=16))
+        assert 'content-encoding' not in resp.headers and resp.json() == {'status': 'ok'}
+
+    def test_event_streams_untouched(self):
+        chunks = [b'data: ' + b'x' * 300 + b'\n\n'] * 2
+        resp = _get(_streaming_app(chunks, content_type='text/event-stream'))
+        assert 'content-encoding' not in resp.headers
+        assert resp.content == b''.join(chunks)
+
+    def test_gzip_codec_flushes_into_one_valid_stream(self):
+        from backend.chart_payloads import _GzipCodec
+        codec = _GzipCodec()
+        first = codec.compress(b'a' * 300, more_body=True)
+        assert first  # sync flush emits each chunk as it arrives
+        stream = first + codec.compress(b'b' * 300, more_body=False)
+        assert gzip.decompress(stream) == b'a' * 300 + b'b' * 300
+
+
+@pytest.fixture(scope='module')
+def client():
+    from fastapi.testclient import TestClient
+    import backend.main as main
+    return TestClient(main.app)
+
+
+@pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+class TestEndpoints:
+    @pytest.mark.parametrize('chart', ['cohort', 'loss-triangle', 'collection-curves'])
+    def test_columnar_matches_rows(self, client, chart):
+        rows = client.get(f'{CHARTS}/{chart}')
+        cols = client.get(f'{CHARTS}/{chart}', params={'format': 'columnar'})
+        assert rows.status_code == cols.status_code == 200
+        assert COLUMNS_KEY not in rows.text
+        assert COLUMNS_KEY in cols.text and len(cols.content) < len(rows.content)
+        assert from_columnar(cols.json()) == rows.json()
+        # Columnar responses get their own ETag
+        assert rows.headers['etag'] != cols.headers['etag']
+
+    def test_gzip(self, client):
+        resp = client.get(f'{CHARTS}/cohort', headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['content-encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['vary']
+        plain = client.get(f'{CHARTS}/cohort', headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in plain.headers
+        assert plain.json() == resp.json()
+
+    def test_brotli_when_installed(self, client):
+        pytest.importorskip('brotli')
+        resp = client.get(f'{CHARTS}/cohort', headers={'Accept-Encoding': 'br'})
+        assert resp.headers['content-encoding'] == 'br'
+        assert resp.json()['cohorts']
+
+    def test_small_and_non_chart_responses_untouched(self, client):
+        resp = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+        assert 'content-encoding' not in resp.headers and resp.json() == {'status': 'ok'}
+
+    def test_errors_still_raise(self, client):
+        assert client.get(f'{CHARTS}/cohort', params={'snapshot': 'nope'}).status_code == 400
@@ -0,0 +1,78 @@
+"""Cold-start budget for `import backend.main`, parsed from `python -X importtime`.
+
+Heavy subsystems (anthropic SDK, reportlab, memo/dataroom/research engines,
+optional PDF / ML packages) must stay off the import path — they load on
+first use. The wall-clock budget is deliberately generous so slow CI
+machines don't flake; tighten it locally with LAITH_IMPORT_BUDGET_MS.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv("LAITH_IMPORT_BUDGET_MS", "4000"))
+
+# Modules that must not be imported by `import backend.main`
+DEFERRED = (
+    "anthropic",
+    "reportlab",
+    "sklearn",
+    "fitz",
+    "pdfplumber",
+    "pymupdf4llm",
+    "docx",
+    "core.reporter",
+    "core.memo.generator",
+    "core.memo.pdf_export",
+    "core.dataroom.engine",
+    "core.research.dual_engine",
+)
+
+
+def _importtime(module: str) -> dict:
+    """{module: cumulative_us} for a fresh interpreter importing module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(cumulative)
+    return out
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return _importtime("backend.main")
+
+
+def test_heavy_subsystems_are_deferred(profile):
+    loaded = sorted(m for m in DEFERRED if m in profile)
+    assert not loaded, f"imported at backend.main import time: {loaded}"
+
+
+def test_import_budget(profile):
+    total_ms = profile["backend.main"] / 1000
+    top = sorted(((us, m) for m, us in profile.items() if m.startswith(("core.", "backend."))), reverse=True)[:8]
+    assert total_ms <= BUDGET_MS, (
+        f"import backend.main took {total_ms:.0f} ms (budget {BUDGET_MS:.0f} ms); "
+        f"largest: {[(m, round(us / 1000)) for us, m in top]}"
+    )
+
+
+def test_deferred_engines_still_resolve():
+    import backend.research_hub as hub
+    from core.memo import MemoGenerator, MemoStorage
+
+    assert isinstance(hub._memo_storage(), MemoStorage)
+    assert hub._memo_storage() is hub._memo_storage()
+    assert MemoGenerator.__module__ == "core.memo.generator"
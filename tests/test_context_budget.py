@@ -0,0 +1,146 @@
+"""Token-aware context budgeting — packing, dedupe, and the prompt builders using it."""
+from __future__ import annotations
+
+import random
+
+from core.context_budget import (
+    ContextBlock, context_budget, estimate_tokens, join_entries, pack, split_entries,
+)
+from core.dataroom.chunker import _split_with_overlap
+
+
+def _doc(n_words=2400, seed=3):
+    rng = random.Random(seed)
+    vocab = "facility advance rate borrowing base eligible receivable covenant breach " \
+            "collection ratio cure period servicer report waterfall reserve account".split()
+    return " ".join(f"{rng.choice(vocab)}{rng.randrange(40)}" for _ in range(n_words))
+
+
+class TestPack:
+    def test_keeps_priority_then_relevance_within_budget(self):
+        blocks = [
+            ContextBlock("a", "general note about writing style " * 10, priority=1),
+            ContextBlock("b", "PAR30 covenant headroom narrowed this quarter " * 10, priority=1),
+            ContextBlock("c", "framework rule " * 10, priority=5),
+        ]
+        budget = blocks[1].tokens + blocks[2].tokens
+        result = pack(blocks, budget, query="covenant headroom")
+        assert [b.key for b in result.blocks] == ["b", "c"]  # original order preserved
+        assert result.dropped == [{"key": "a", "source": "", "tokens": blocks[0].tokens,
+                                   "reason": "over_budget", "relevance": 0.0}]
+        assert result.report()["saved_tokens"] == blocks[0].tokens
+
+    def test_deterministic(self):
+        def _blocks():
+            return [ContextBlock(f"k{i}", f"entry {i} " * (5 + i % 7)) for i in range(40)]
+        first = pack(_blocks(), 200, query="entry")
+        second = pack(_blocks(), 200, query="entry")
+        assert [b.key for b in first.blocks] == [b.key for b in second.blocks]
+        assert first.report() == second.report()
+
+    def test_required_blocks_always_kept(self):
+        big = ContextBlock("analytics", "metric value " * 500, required=True)
+        result = pack([big, ContextBlock("x", "other text")], 50)
+        assert [b.key for b in result.blocks] == ["analytics"]
+
+    def test_duplicate_chunk_dropped_and_overlap_trimmed(self):
+        chunks = _split_with_overlap(_doc(), 800, 100)
+        assert len(chunks) >= 3
+        blocks = [ContextBlock(f"c{i}", t, "dataroom") for i, t in enumerate(chunks)]
+        blocks.append(ContextBlock("again", chunks[0], "dataroom"))
+        result = pack(blocks, None)
+        assert result.dropped == [{"key": "again", "source": "dataroom", "tokens": blocks[-1].tokens,
+                                   "reason": "duplicate", "duplicate_of": "c0"}]
+        trimmed = {t["key"] for t in result.trimmed if t["reason"] == "overlap"}
+        assert trimmed == {f"c{i}" for i in range(1, len(chunks))}
+        # The shared 100-token window is gone from each follow-on chunk
+        overlap_words = chunks[0].split()[-70:]
+        assert not result.blocks[1].text.lstrip("…").startswith(" ".join(overlap_words[:12]))
+
+    def test_truncatable_block_fills_remainder(self):
+        text = "\n".join(f"line {i} with some words in it" for i in range(200))
+        result = pack([ContextBlock("t", text, truncatable=True)], 300)
+        assert result.blocks[0].tokens <= 300
+        assert result.blocks[0].text.endswith("[…truncated to fit context budget]")
+        assert result.trimmed[0]["reason"] == "truncated"
+
+    def test_budget_env_override(self, monkeypatch):
+        assert context_budget("memo_section") == 8000
+        monkeypatch.setenv("LAITH_CONTEXT_BUDGET_MEMO_SECTION", "0")
+        assert context_budget("memo_section") is None
+        monkeypatch.setenv("LAITH_CONTEXT_BUDGET_MEMO_SECTION", "1500")
+        assert context_budget("memo_section") == 1500
+
+
+class TestEntries:
+    LAYER = ("## Fund-Level Knowledge\n\n### Analytical Preferences\n- Always show PAR trend\n"
+             "- Denominator discipline: declare\n  total / active / eligible\n\n"
+             "### Writing Style\n- Bottom lines 3-5 sentences")
+
+    def test_round_trip(self):
+        blocks = split_entries(self.LAYER, "master")
+        assert len(blocks) == 3
+        assert join_entries(blocks) == self.LAYER
+
+    def test_headings_follow_surviving_entries_only(self):
+        blocks = split_entries(self.LAYER, "master")
+        out = join_entries([blocks[2]])
+        assert out == "## Fund-Level Knowledge\n\n### Writing Style\n- Bottom lines 3-5 sentences"
+
+
+class TestMindContext:
+    def test_cross_layer_dedupe_and_budget_report(self, isolated_data_dir):
+        from core.mind import CompanyMind, MasterMind, build_mind_context
+
+        lesson = "Always reconcile the borrowing base certificate against the tape before citing headroom"
+        MasterMind().record_analytical_preference(lesson)
+        cm = CompanyMind("acme", "KSA")
+        cm.record_research_finding(lesson)
+        for i in range(4):
+            cm.record_research_finding(f"Finding {i}: vintage {2020 + i} collections lag by {i} days " * 8)
+
+        full = build_mind_context("acme", "KSA", "memo", budget_tokens=0)
+        assert full.budget_report["dropped"][0]["reason"] == "duplicate"
+        assert full.formatted.count(lesson) == 1
+
+        tight = build_mind_context("acme", "KSA", "memo", budget_tokens=300)
+        report = tight.budget_report
+        assert report["used_tokens"] <= 300 < report["input_tokens"]
+        assert any(d["reason"] == "over_budget" for d in report["dropped"])
+        assert estimate_tokens(tight.formatted) <= 330  # layer separators only
+
+
+class TestCallSites:
+    def test_memo_section_context_drops_least_relevant_prior_sections(self, monkeypatch):
+        from core.memo.generator import _fit_section_context
+
+        monkeypatch.setenv("LAITH_CONTEXT_BUDGET_MEMO_SECTION", "1300")
+        section = {"title": "Credit Quality", "guidance": "PAR and delinquency trends"}
+        prior = [{"key": f"s{i}", "title": f"Section {i}", "content": f"Unrelated topic {i}. " * 60}
+                 for i in range(6)]
+        prior.append({"key": "dq", "title": "Delinquency", "content": "PAR delinquency trends rose. " * 40})
+        research = "\n\n".join(f"[{i}] Source: doc{i}.pdf (relevance: 0.5)\n{_doc(120, seed=i)}"
+                               for i in range(1, 4))
+        analytics, dataroom, pack_text, prior_text, report = _fit_section_context(
+            section, "Collection rate 91%", research, "", prior)
+        assert analytics == "Collection rate 91%"
+        assert "**Delinquency:**" in prior_text
+        assert report["used_tokens"] <= 1300
+        assert {d["source"] for d in report["dropped"]} == {"prior"}
+        assert dataroom.count("] Source: ") == 3
+
+    def test_rag_prompt_keeps_source_numbers_when_chunks_drop(self, monkeypatch):
+        from core.research.query_engine import ClaudeQueryEngine
+
+        monkeypatch.setenv("LAITH_CONTEXT_BUDGET_RESEARCH", "1500")
+        engine = ClaudeQueryEngine(dataroom_engine=object())
+        chunks = [{"filename": f"doc{i}.pdf", "snippet": _doc(300, seed=i), "score": 0.5}
+                  for i in range(1, 6)]
+        chunks[3]["snippet"] = "advance rate covenant " + chunks[3]["snippet"]
+        prompt = engine._build_rag_prompt("What is the advance rate covenant?", chunks, "", None)
+        report = engine.last_context_report
+        assert report["dropped"] and all(d["source"] == "chunk" for d in report["dropped"])
+        assert "[Source 4] doc4.pdf" in prompt  # most relevant chunk survives with its number
+        dropped = {int(d["key"].split(":")[1]) for d in report["dropped"]}
+        for i in set(range(1, 6)) - dropped:
+            assert f"[Source {i}] doc{i}.pdf" in prompt
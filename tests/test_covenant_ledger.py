@@ -0,0 +1,120 @@
+"""Incremental covenant ledger (core.covenant_ledger)."""
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+import core.covenant_ledger as cl
+from core.loader import DATA_DIR, get_snapshots, load_silq_snapshot, load_snapshot
+from core.portfolio import annotate_covenant_eod, compute_covenants, compute_klaim_covenants
+
+KLAIM_DIR = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare')
+KLAIM_TAPES = ['2026-03-03_uae_healthcare.csv', '2026-04-15_uae_healthcare.csv']
+
+
+@pytest.fixture
+def ledger_dir(tmp_path, monkeypatch):
+    """Keep ledgers written by tests out of data/."""
+    monkeypatch.setattr(cl, 'ledger_path', lambda co, prod: str(tmp_path / f'{co}_{prod}.json'))
+    return tmp_path
+
+
+@pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+class TestUpdate:
+    def test_parallel_backfill_matches_direct_compute(self, ledger_dir):
+        report = cl.update_ledger('klaim', 'UAE_healthcare', snapshots=KLAIM_TAPES, workers=2)
+        assert report['computed'] == [os.path.splitext(t)[0] for t in KLAIM_TAPES]
+        assert not report['errors']
+
+        ledger = cl.load_ledger('klaim', 'UAE_healthcare')
+        params = cl.facility_params('klaim', 'UAE_healthcare')
+        tape = KLAIM_TAPES[-1]
+        want = compute_klaim_covenants(load_snapshot(os.path.join(KLAIM_DIR, tape)), 1, tape[:10], params)
+        got = cl.ledger_entry(ledger, os.path.splitext(tape)[0], cl.params_fingerprint(params))
+        for c in want['covenants']:
+            assert got[c['name']]['current'] == pytest.approx(c['current'])
+            assert got[c['name']]['compliant'] == c['compliant']
+        # Compact on disk: one list per covenant against a shared header
+        raw = json.loads((ledger_dir / 'klaim_UAE_healthcare.json').read_text())
+        assert raw['fields'] == cl.FIELDS
+        assert all(isinstance(row, list) for e in raw['snapshots'].values() for row in e['covenants'].values())
+
+    def test_incremental(self, ledger_dir, monkeypatch):
+        tape = KLAIM_TAPES[:1]
+        assert cl.update_ledger('klaim', 'UAE_healthcare', snapshots=tape)['computed']
+        assert cl.update_ledger('klaim', 'UAE_healthcare', snapshots=tape)['skipped'] == ['2026-03-03_uae_healthcare']
+        assert cl.update_ledger('klaim', 'UAE_healthcare', snapshots=tape, force=True)['computed']
+
+        # Changed facility params invalidate the entry
+        base = cl.facility_params
+        monkeypatch.setattr(cl, 'facility_params', lambda *a: {**base(*a), 'par30_limit': 0.5})
+        assert cl.update_ledger('klaim', 'UAE_healthcare', snapshots=tape)['computed']
+
+    def test_silq_and_unsupported(self, ledger_dir):
+        report = cl.update_ledger('SILQ', 'KSA', snapshots=['2026-01-31_KSA.xlsx'])
+        assert report['computed'] == ['2026-01-31_KSA']
+        row = cl.load_ledger('SILQ', 'KSA')['snapshots']['2026-01-31_KSA']
+        df, _ = load_silq_snapshot(os.path.join(DATA_DIR, 'SILQ', 'KSA', '2026-01-31_KSA.xlsx'))
+        want = compute_covenants(df, 1, '2026-01-31', cl.facility_params('SILQ', 'KSA'))
+        assert row['breach_count'] == want['breach_count']
+        assert '*' in cl.update_ledger('Tamara', 'KSA')['errors']
+
+
+def _ledger(*entries):
+    snaps = {}
+    for date, compliant in entries:
+        snaps[f'{date}_tape'] = {
+            'date': date, 'test_date': date, 'ledger_version': cl.LEDGER_VERSION, 'params': 'p',
+            'covenants': {
+                'Paid vs Due Ratio': [0.9 if not compliant else 0.99, compliant, True, False,
+                                      'direct', date, 'two_consecutive_breaches', 0.95],
+                'Top 5': [0.3, True, True, False, 'direct', date, None, 0.5],
+            },
+        }
+    return {'version': cl.LEDGER_VERSION, 'fields': cl.FIELDS, 'snapshots': snaps}
+
+
+class TestReaders:
+    def test_history_feeds_eod(self):
+        ledger = _ledger(('2026-02-28', True), ('2026-03-31', False), ('2026-04-30', False))
+        history = cl.ledger_history(ledger, before='2026-04-30')
+        assert list(history) == ['Paid vs Due Ratio']             # only EoD-ruled covenants
+        assert [r['date'] for r in history['Paid vs Due Ratio']] == ['2026-03-31', '2026-02-28']
+
+        result = {'covenants': [{'name': 'Paid vs Due Ratio', 'compliant': False, 'period': '2026-04-30',
+                                 'method': 'direct', 'eod_rule': 'two_consecutive_breaches'}]}
+        assert annotate_covenant_eod(result, history)['covenants'][0]['eod_triggered'] is True
+
+    def test_series_and_entry(self):
+        ledger = _ledger(('2026-02-28', True), ('2026-03-31', False))
+        trend = cl.covenant_series(ledger)
+        assert [s['date'] for s in trend['snapshots']] == ['2026-02-28', '2026-03-31']
+        assert [p['compliant'] for p in trend['series']['Paid vs Due Ratio']] == [True, False]
+        assert cl.ledger_entry(ledger, '2026-03-31_tape', 'p')['Top 5']['threshold'] == 0.5
+        assert cl.ledger_entry(ledger, '2026-03-31_tape', 'other-params') is None
+
+    def test_ledger_file_is_not_a_snapshot(self, tmp_path, monkeypatch):
+        import core.loader as loader
+        (tmp_path / 'co' / 'prod').mkdir(parents=True)
+        (tmp_path / 'co' / 'prod' / 'covenant_ledger.json').write_text('{}')
+        (tmp_path / 'co' / 'prod' / '2026-01-01_tape.csv').write_text('a\n1\n')
+        monkeypatch.setattr(loader, 'DATA_DIR', str(tmp_path))
+        assert [s['filename'] for s in get_snapshots('co', 'prod')] == ['2026-01-01_tape.csv']
+
+
+@pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+def test_ledger_endpoint(ledger_dir, monkeypatch):
+    from fastapi.testclient import TestClient
+    import backend.main as main
+
+    monkeypatch.setattr(main, 'update_ledger',
+                        lambda co, prod: cl.update_ledger(co, prod, snapshots=KLAIM_TAPES[-1:]))
+    client = TestClient(main.app)
+    url = '/companies/klaim/products/UAE_healthcare/portfolio/covenant-ledger'
+    assert client.get(url).json()['snapshots'] == []
+    body = client.get(url, params={'refresh': True}).json()
+    assert body['computed'] == ['2026-04-15_uae_healthcare']
+    assert 'Paid vs Due Ratio' in body['series']
+    assert client.get('/companies/nope/products/none/portfolio/covenant-ledger').status_code == 404
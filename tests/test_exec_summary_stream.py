@@ -184,7 +184,7 @@ class TestAgentPath:
         write_calls = []
         monkeypatch.setattr(
             "backend.main._ai_cache_put",
-            lambda path, data: write_calls.append((path, data)),
+            lambda path, data, *a: write_calls.append((path, data)),
         )
 
         agent_output = {
@@ -276,7 +276,7 @@ class TestAgentPath:
     def test_unparseable_text_falls_back_to_warning_finding(self, monkeypatch):
         _patch_common(monkeypatch)
         monkeypatch.setattr("backend.main._ai_cache_get", lambda path: None)
-        monkeypatch.setattr("backend.main._ai_cache_put", lambda path, data: None)
+        monkeypatch.setattr("backend.main._ai_cache_put", lambda path, data, *a: None)
 
         _patch_agent(monkeypatch, [
             _FakeStreamEvent("text", {"delta": "this is not JSON"}),
@@ -314,7 +314,7 @@ class TestAgentPath:
         write_calls = []
         monkeypatch.setattr(
             "backend.main._ai_cache_put",
-            lambda path, data: write_calls.append((path, data)),
+            lambda path, data, *a: write_calls.append((path, data)),
         )
 
         agent_output = {
@@ -361,7 +361,7 @@ class TestAgentPath:
     def test_agent_error_event_is_forwarded(self, monkeypatch):
         _patch_common(monkeypatch)
         monkeypatch.setattr("backend.main._ai_cache_get", lambda path: None)
-        monkeypatch.setattr("backend.main._ai_cache_put", lambda path, data: None)
+        monkeypatch.setattr("backend.main._ai_cache_put", lambda path, data, *a: None)
 
         _patch_agent(monkeypatch, [
             _FakeStreamEvent("error", {"message": "budget exceeded"}),
@@ -0,0 +1,244 @@
+"""Facility what-if engine (core.facility_whatif) against core.portfolio."""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from core.facility_whatif import (
+    FacilityStateCache, build_facility_state, evaluate, expand_grid,
+)
+from core.loader import load_silq_snapshot, load_snapshot
+from core.portfolio import (
+    compute_borrowing_base, compute_concentration_limits, compute_covenants,
+    compute_klaim_borrowing_base, compute_klaim_concentration_limits, compute_klaim_covenants,
+)
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+KLAIM_TAPE = os.path.join(DATA, 'klaim', 'UAE_healthcare', '2026-04-15_uae_healthcare.csv')
+SILQ_TAPE = os.path.join(DATA, 'SILQ', 'KSA', '2026-01-31_KSA.xlsx')
+
+KLAIM_BASE = {'facility_limit': 60_000_000, 'facility_drawn': 30_000_000, 'cash_balance': 2_000_000,
+              'net_cash_burn': 400_000}
+KLAIM_VARIANTS = [
+    {},
+    {'advance_rate': 0.75, 'ineligibility_age_days': 60},
+    {'single_payer_limit': 0.05, 'facility_limit': 0},
+    {'single_payer_limit': 0.30, 'cash_balance': 0, 'net_cash_burn': 0},
+    {'wal_threshold_days': 30, 'extended_age_upper_days': 200, 'extended_age_limit': 0.9},
+    {'wal_threshold_days': 120, 'extended_age_upper_days': 100},
+    {'par30_limit': 0.0, 'par60_limit': 1.0, 'paid_vs_due_limit': 0.0, 'top10_limit': 0.01},
+    {'net_cash_burn_3m_avg': 5_000, 'parent_cash_balance': 10, 'parent_net_cash_burn': 1,
+     'cash_ratio_limit': 0.5, 'single_receivable_limit': 1.0, 'single_customer_limit': 1.0},
+]
+
+
+def _assert_row(row, bb, limits, covenants):
+    kpis = bb['kpis']
+    for key in ('borrowing_base', 'eligible_ar', 'available_to_draw', 'ineligible'):
+        assert row[key] == pytest.approx(kpis[key], rel=1e-9, abs=1e-6), key
+    assert row['headroom_pct'] == pytest.approx(bb['facility']['headroom_pct'], rel=1e-9, abs=1e-9)
+    assert row['limits'] == {l['name']: l['compliant'] for l in limits['limits']}
+    assert row['limit_breaches'] == limits['breach_count']
+    for c in covenants['covenants']:
+        got = row['covenants'][c['name']]
+        assert got['current'] == pytest.approx(c['current'], rel=1e-9, abs=1e-12), c['name']
+        counted = c['available'] and not c['partial']
+        assert got['compliant'] == (c['compliant'] if counted else None), c['name']
+    assert row['covenant_breaches'] == covenants['breach_count']
+
+
+@pytest.fixture(scope='module')
+def klaim_tape():
+    return load_snapshot(KLAIM_TAPE)
+
+
+@pytest.fixture(scope='module')
+def silq_tape():
+    return load_silq_snapshot(SILQ_TAPE)[0]
+
+
+@pytest.mark.skipif(not os.path.exists(KLAIM_TAPE), reason='Klaim tape not available')
+class TestKlaim:
+    def test_grid_matches_portfolio_functions(self, klaim_tape):
+        tape = klaim_tape
+        ref = '2026-04-15'
+        state = build_facility_state('klaim', tape, 1, ref)
+        result = evaluate(state, KLAIM_BASE, KLAIM_VARIANTS)
+        assert result['variants'] == len(KLAIM_VARIANTS)
+        for variant, row in zip(KLAIM_VARIANTS, result['grid']):
+            fp = {**KLAIM_BASE, **variant}
+            assert row['params'] == variant
+            _assert_row(row, compute_klaim_borrowing_base(tape, 1, ref, fp),
+                        compute_klaim_concentration_limits(tape, 1, ref, fp),
+                        compute_klaim_covenants(tape, 1, ref, fp))
+
+    def test_currency_multiplier(self, klaim_tape):
+        tape = klaim_tape
+        state = build_facility_state('klaim', tape, 3.6725, '2026-04-15')
+        row = evaluate(state, KLAIM_BASE)['grid'][0]
+        want = compute_klaim_borrowing_base(tape, 3.6725, '2026-04-15', KLAIM_BASE)['kpis']
+        assert row['borrowing_base'] == pytest.approx(want['borrowing_base'], rel=1e-9)
+
+
+@pytest.mark.skipif(not os.path.exists(SILQ_TAPE), reason='SILQ tape not available')
+class TestSilq:
+    def test_grid_matches_portfolio_functions(self, silq_tape):
+        tape = silq_tape
+        ref = '2026-01-31'
+        state = build_facility_state('silq', tape, 1, ref)
+        largest = state.group_ids[int(state.group_out.argmax())]
+        base = {'facility_limit': 150_000_000, 'facility_drawn': 20_000_000, 'cash_balance': 1_000_000}
+        variants = [
+            {},
+            {'facility_drawn': 50_000_000, 'advance_rate': 0.7},     # $13M tier
+            {'facility_drawn': 100_000_000, 'equity_injection': 5e6},  # > $20M tier
+            {'facility_drawn': 0, 'facility_limit': 0},
+            {'facility_drawn': 100_000_000, 'approved_recipients': [largest, 'no-such-shop']},
+            {'usd_rate': 1.0, 'cash_balance': 0},
+        ]
+        result = evaluate(state, base, variants)
+        for variant, row in zip(variants, result['grid']):
+            fp = {**base, **variant}
+            _assert_row(row, compute_borrowing_base(tape, 1, ref, fp),
+                        compute_concentration_limits(tape, 1, ref, fp),
+                        compute_covenants(tape, 1, ref, fp))
+            assert row['concentration_threshold'] == \
+                compute_borrowing_base(tape, 1, ref, fp)['concentration_threshold']
+
+
+class TestVariants:
+    def test_expand_grid(self):
+        grid = expand_grid({'advance_rate': [0.8, 0.9], 'facility_drawn': [1, 2, 3]})
+        assert len(grid) == 6
+        assert grid[0] == {'advance_rate': 0.8, 'facility_drawn': 1}
+        assert expand_grid({}) == [{}]
+        with pytest.raises(ValueError, match='non-empty list'):
+            expand_grid({'advance_rate': 0.8})
+
+    def test_rejects_unknown_and_non_numeric(self):
+        import pandas as pd
+        tape = pd.DataFrame({'Status': ['Executed'], 'Deal date': [pd.Timestamp('2026-01-01')],
+                             'Purchase value': [100.0], 'Collected till date': [10.0],
+                             'Denied by insurance': [0.0], 'Group': ['A']})
+        state = build_facility_state('klaim', tape, 1, '2026-02-01')
+        with pytest.raises(ValueError, match='Unsupported'):
+            evaluate(state, {}, [{'approved_recipients': ['x']}])
+        with pytest.raises(ValueError, match='numeric'):
+            evaluate(state, {}, [{'advance_rate': 'high'}])
+        with pytest.raises(ValueError, match='not available'):
+            build_facility_state('aajil', tape)
+
+
+class TestStateCache:
+    def test_lru_ttl_and_stats(self):
+        cache = FacilityStateCache(max_entries=2, ttl_seconds=60)
+        builds = []
+        build = lambda k: (lambda: builds.append(k) or k)  # noqa: E731
+        assert cache.get_or_build('a', build('a')) == ('a', False)
+        assert cache.get_or_build('a', build('a')) == ('a', True)
+        cache.get_or_build('b', build('b'))
+        cache.get_or_build('c', build('c'))           # evicts 'a'
+        assert cache.get_or_build('a', build('a'))[1] is False
+        assert builds == ['a', 'b', 'c', 'a']
+        assert cache.stats()['entries'] == 2 and cache.stats()['hits'] == 1
+
+        expired = FacilityStateCache(ttl_seconds=-1)
+        expired.get_or_build('a', build('a'))
+        assert expired.get_or_build('a', build('a'))[1] is False
+        # Identity-keyed entries ignore the TTL
+        expired.get_or_build('t', build('t'), expires=False)
+        assert expired.get_or_build('t', build('t'), expires=False)[1] is True
+
+
+def _snap(name, source='tape', id_='x'):
+    from datetime import date, datetime
+    from types import SimpleNamespace
+    return SimpleNamespace(id=id_, name=name, source=source, taken_at=date(2026, 4, 15),
+                           ingested_at=datetime(2026, 4, 16, 9, 0), row_count=10)
+
+
+@pytest.mark.skipif(not os.path.exists(KLAIM_TAPE), reason='Klaim tape not available')
+def test_endpoint_keys_state_on_resolved_snapshot(monkeypatch, klaim_tape, tmp_path):
+    from fastapi.testclient import TestClient
+    import backend.main as main
+
+    current = {'snap': _snap('2026-04-15_uae_healthcare')}
+    loads = []
+
+    def fake_load(company, product, snapshot, as_of_date, currency, db=None, snap=None):
+        loads.append(snap.id)
+        sel = {'id': str(snap.id), 'date': '2026-04-15', 'source': snap.source}
+        return klaim_tape, sel, {'currency': 'AED'}, 'AED', 1, '2026-04-15', {}, 'klaim'
+
+    tape_file = tmp_path / '2026-04-15_uae_healthcare.csv'
+    tape_file.write_text('a\n1\n')
+    monkeypatch.setattr(main, '_resolve_portfolio_snapshot', lambda *a: current['snap'])
+    monkeypatch.setattr(main, '_portfolio_load', fake_load)
+    monkeypatch.setattr(main, '_portfolio_facility_params', lambda *a: {'facility_limit': 60_000_000})
+    monkeypatch.setattr(main, 'get_snapshots', lambda co, prod: [
+        {'filename': tape_file.name, 'filepath': str(tape_file)}])
+    main.get_state_cache().clear()
+    client = TestClient(main.app)
+    url = '/companies/klaim/products/UAE_healthcare/portfolio/what-if'
+
+    assert client.post(url, json={}).json()['state_cached'] is False
+    assert client.post(url, json={}).json()['state_cached'] is True
+
+    # A newer tape ingested: snapshot=None now resolves to it — no stale state
+    current['snap'] = _snap('2026-05-15_uae_healthcare', id_='y')
+    assert client.post(url, json={}).json()['state_cached'] is False
+    assert loads == ['x', 'y']
+
+    # Same-name tape replaced on disk
+    current['snap'] = _snap('2026-04-15_uae_healthcare')
+    assert client.post(url, json={}).json()['state_cached'] is True
+    tape_file.write_text('a\n1\n2\n')
+    assert client.post(url, json={}).json()['state_cached'] is False
+
+    # Tape-backed entries don't expire; live snapshots still use the TTL
+    monkeypatch.setattr(main.get_state_cache(), 'ttl_seconds', -1)
+    assert client.post(url, json={}).json()['state_cached'] is True
+    current['snap'] = _snap('live-2026-04-16', source='live', id_='z')
+    client.post(url, json={})
+    assert client.post(url, json={}).json()['state_cached'] is False
+    main.get_state_cache().clear()
+
+
+@pytest.mark.skipif(not os.path.exists(KLAIM_TAPE), reason='Klaim tape not available')
+def test_endpoint_caches_state_and_rereads_params(monkeypatch, klaim_tape):
+    from fastapi.testclient import TestClient
+    import backend.main as main
+
+    tape = klaim_tape
+    loads = []
+    snap = _snap('2026-04-15_uae_healthcare')
+
+    def fake_load(company, product, snapshot, as_of_date, currency, db=None, snap=None):
+        loads.append(snapshot)
+        sel = {'id': str(snap.id), 'date': '2026-04-15', 'source': snap.source}
+        return tape, sel, {'currency': 'AED'}, 'AED', 1, '2026-04-15', {}, 'klaim'
+
+    params = {'facility_limit': 60_000_000, 'cash_balance': 0}
+    monkeypatch.setattr(main, '_resolve_portfolio_snapshot', lambda *a: snap)
+    monkeypatch.setattr(main, '_portfolio_load', fake_load)
+    monkeypatch.setattr(main, '_portfolio_facility_params', lambda *a: dict(params))
+    main.get_state_cache().clear()
+    client = TestClient(main.app)
+    url = '/companies/klaim/products/UAE_healthcare/portfolio/what-if'
+
+    body = client.post(url, json={'grid': {'advance_rate': [0.8, 0.9]}}).json()
+    assert [r['params'] for r in body['grid']] == [{'advance_rate': 0.8}, {'advance_rate': 0.9}]
+    assert body['state_cached'] is False
+    want = compute_klaim_borrowing_base(tape, 1, '2026-04-15', {**params, 'advance_rate': 0.9})
+    assert body['grid'][1]['borrowing_base'] == pytest.approx(want['kpis']['borrowing_base'])
+
+    params['cash_balance'] = 1_000_000
+    again = client.post(url, json={}).json()
+    assert again['state_cached'] is True and len(loads) == 1
+    assert again['grid'][0]['borrowing_base'] == pytest.approx(
+        compute_klaim_borrowing_base(tape, 1, '2026-04-15', params)['kpis']['borrowing_base'])
+
+    assert client.post(url, json={'variants': [{'advance_rate': 'x'}]}).status_code == 400
+    assert client.post(url, json={'grid': {'advance_rate': []}}).status_code == 400
+    main.get_state_cache().clear()
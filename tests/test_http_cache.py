@@ -0,0 +1,138 @@
+"""ETag / 304 middleware for tape-backed GETs (backend.http_cache)."""
+from __future__ import annotations
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.http_cache as http_cache
+import backend.main as main
+from core.loader import DATA_DIR
+
+KLAIM_DIR = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare')
+BASE = '/companies/klaim/products/UAE_healthcare'
+
+pytestmark = pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Count tape loads behind the chart handlers."""
+    calls = []
+    real = main._load
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(main, '_load', counting)
+    return calls
+
+
+class TestETag:
+    def test_304_skips_the_handler(self, client, loads):
+        first = client.get(f'{BASE}/charts/par', params={'as_of_date': '2025-12-31'})
+        assert first.status_code == 200
+        etag = first.headers['etag']
+        assert etag.startswith('"') and first.headers['cache-control'] == 'private, no-cache'
+        assert len(loads) == 1
+
+        again = client.get(f'{BASE}/charts/par', params={'as_of_date': '2025-12-31'},
+                           headers={'If-None-Match': f'W/"other", {etag}'})
+        assert again.status_code == 304 and again.content == b''
+        assert again.headers['etag'] == etag
+        assert len(loads) == 1
+
+    def test_key_covers_params_and_route(self, client):
+        tags = {
+            client.get(f'{BASE}/charts/par').headers['etag'],
+            client.get(f'{BASE}/charts/par', params={'currency': 'USD'}).headers['etag'],
+            client.get(f'{BASE}/charts/dso').headers['etag'],
+            client.get(f'{BASE}/summary').headers['etag'],
+        }
+        assert len(tags) == 4
+        # Param order does not matter
+        a = client.get(f'{BASE}/charts/par?currency=USD&as_of_date=2025-12-31').headers['etag']
+        b = client.get(f'{BASE}/charts/par?as_of_date=2025-12-31&currency=USD').headers['etag']
+        assert a == b
+
+    def test_pinned_snapshot_and_tape_identity(self, client):
+        tapes = sorted(f for f in os.listdir(KLAIM_DIR) if f.endswith('.csv'))
+        latest = client.get(f'{BASE}/summary').headers['etag']
+        pinned_old = client.get(f'{BASE}/summary', params={'snapshot': tapes[0]}).headers['etag']
+        assert latest != pinned_old
+        # Unknown snapshot: no ETag, the handler reports the error
+        resp = client.get(f'{BASE}/summary', params={'snapshot': 'nope.csv'})
+        assert resp.status_code == 400 and 'etag' not in resp.headers
+
+    def test_sidecar_and_content_changes_invalidate(self, client, monkeypatch, tmp_path):
+        before = client.get(f'{BASE}/charts/par').headers['etag']
+        real_fp = http_cache.file_fingerprint
+        monkeypatch.setattr(http_cache, 'file_fingerprint',
+                            lambda p: (0, 0) if p.endswith('config.json') else real_fp(p))
+        assert client.get(f'{BASE}/charts/par').headers['etag'] != before
+
+        tape = tmp_path / 't.csv'
+        tape.write_text('a\n1\n')
+        h1 = http_cache.tape_content_hash(str(tape))
+        tape.write_text('a\n2\n')
+        os.utime(tape, ns=(1, 1))
+        assert http_cache.tape_content_hash(str(tape)) != h1
+
+    def test_etag_rolls_with_the_effective_as_of_date(self, client, monkeypatch):
+        from datetime import date
+
+        def on(day):
+            class _Day(date):
+                @classmethod
+                def today(cls):
+                    return cls.fromisoformat(day)
+            monkeypatch.setattr(http_cache, 'date', _Day)
+
+        on('2026-04-01')
+        etag = client.get(f'{BASE}/charts/ageing').headers['etag']
+        pinned = client.get(f'{BASE}/charts/ageing', params={'as_of_date': '2026-03-31'}).headers['etag']
+        on('2026-04-02')
+        # Computed against the wall clock: tomorrow's revalidation is a full response
+        resp = client.get(f'{BASE}/charts/ageing', headers={'If-None-Match': etag})
+        assert resp.status_code == 200 and resp.headers['etag'] != etag
+        # An explicit as_of_date pins the result
+        assert client.get(f'{BASE}/charts/ageing', params={'as_of_date': '2026-03-31'},
+                          headers={'If-None-Match': pinned}).status_code == 304
+
+    def test_uncached_routes_pass_through(self, client):
+        assert 'etag' not in client.get(f'{BASE}/config').headers
+        assert 'etag' not in client.get(f'{BASE}/snapshots').headers
+
+    def test_multi_tape_route(self, client):
+        resp = client.get(f'{BASE}/charts/hhi-timeseries')
+        assert resp.status_code == 200 and 'etag' in resp.headers
+        stats = http_cache.cache_stats()
+        assert stats['full'] >= 1
+
+
+def test_public_cache_control_for_pinned_snapshots(monkeypatch):
+    from starlette.requests import Request
+    monkeypatch.setattr(http_cache, '_PUBLIC', True)
+    pinned = Request({'type': 'http', 'query_string': b'snapshot=a.csv', 'headers': []})
+    latest = Request({'type': 'http', 'query_string': b'', 'headers': []})
+    assert http_cache.TapeETagMiddleware.cache_control(pinned).startswith('public, max-age=0, s-maxage=')
+    assert http_cache.TapeETagMiddleware.cache_control(latest) == 'private, no-cache'
+    # Computed as of today: the shared copy expires by midnight
+    monkeypatch.setattr(http_cache, '_seconds_to_midnight', lambda: 60)
+    assert http_cache.TapeETagMiddleware.cache_control(pinned).endswith('s-maxage=60, must-revalidate')
+    as_of = Request({'type': 'http', 'query_string': b'snapshot=a.csv&as_of_date=2026-01-31', 'headers': []})
+    assert f's-maxage={http_cache._SHARED_MAX_AGE},' in http_cache.TapeETagMiddleware.cache_control(as_of)
+
+
+def test_if_none_match_matches():
+    assert http_cache.if_none_match_matches('W/"a", "b"', '"b"')
+    assert http_cache.if_none_match_matches(' * ', '"b"')
+    assert not http_cache.if_none_match_matches('"bc"', '"b"')
+    assert not http_cache.if_none_match_matches(None, '"b"')
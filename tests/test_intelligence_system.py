@@ -469,6 +469,23 @@ class TestKnowledgeCompiler:
         # At minimum, the method should work without errors
         assert isinstance(discrepancies, list)
 
+    def test_compile_updates_entity_index(self, compiler):
+        from core.mind.entity_extractor import ExtractedEntity
+        from core.mind.entity_index import EntityIndex
+
+        for i, value in enumerate((0.87, 0.82)):
+            compiler.compile([ExtractedEntity(
+                entity_type="METRIC", key="collection_rate",
+                value=value, confidence="A", source_doc_id=f"tape{i}.csv",
+            )], f"tape{i}.csv", "test", "prod")
+
+        index = EntityIndex(compiler.mind_dir)
+        assert [r[2] for r in index.values("METRIC", "collection_rate")] == [0.87, 0.82]
+        entities_size = (compiler.mind_dir / "entities.jsonl").stat().st_size
+        assert index._data["source_bytes"] == entities_size
+        # Nothing new appended — sync is a no-op
+        assert index.sync() == 0
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Phase 5: Intelligence Engine Tests
@@ -513,6 +530,53 @@ class TestIntelligenceEngine:
         # Both companies have par_30 entities — should detect
         assert isinstance(patterns, list)
 
+    def test_metric_trend_from_index(self, intel_dir):
+        from core.mind.intelligence import IntelligenceEngine
+
+        for co, value in (("company_a", 3.9), ("company_b", 4.4)):
+            with open(intel_dir / co / "mind" / "entities.jsonl", "a") as f:
+                node = make_node("metric", f"PAR30: {value}%", metadata={
+                    "entity_key": "par_30", "entity_type": "METRIC", "value": value
+                }, node_type="entity")
+                f.write(json.dumps(node.to_mind_entry_dict()) + "\n")
+
+        patterns = IntelligenceEngine(intel_dir).detect_cross_company_patterns()
+        trend = [p for p in patterns if p.pattern_type == "metric_trend"]
+        assert len(trend) == 1
+        assert trend[0].metric_key == "par_30"
+        assert sorted(trend[0].companies_affected) == ["company_a/", "company_b/"]
+        assert (intel_dir / "company_a" / "mind" / "entity_index.json").exists()
+
+    def test_risk_convergence_ignores_old_flags(self, intel_dir):
+        from core.mind.intelligence import IntelligenceEngine
+
+        old = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
+        for co, ts in (("company_a", None), ("company_b", old)):
+            node = make_node("risk_flag", "Provider concentration", metadata={
+                "entity_key": "concentration", "entity_type": "RISK_FLAG",
+            }, node_type="entity")
+            d = node.to_mind_entry_dict()
+            if ts:
+                d["timestamp"] = ts
+            with open(intel_dir / co / "mind" / "entities.jsonl", "a") as f:
+                f.write(json.dumps(d) + "\n")
+
+        engine = IntelligenceEngine(intel_dir)
+        assert not [p for p in engine.detect_cross_company_patterns()
+                    if p.pattern_type == "risk_convergence"]
+        assert [p.metric_key for p in engine.detect_cross_company_patterns(lookback_days=120)
+                if p.pattern_type == "risk_convergence"] == ["concentration"]
+
+    def test_entity_index_rebuilds_when_source_rewritten(self, intel_dir):
+        from core.mind.entity_index import EntityIndex
+
+        mind_dir = intel_dir / "company_a" / "mind"
+        index = EntityIndex(mind_dir)
+        assert index.sync() == 1
+        (mind_dir / "entities.jsonl").write_text("")
+        assert EntityIndex(mind_dir).sync() == 0
+        assert EntityIndex(mind_dir).keys("METRIC") == []
+
     def test_save_and_load_patterns(self, intel_dir):
         from core.mind.intelligence import IntelligenceEngine, Pattern
         engine = IntelligenceEngine(intel_dir)
@@ -743,6 +807,60 @@ class TestMorningBriefing:
         briefing = generate_morning_briefing(data_dir=tmp_path)
         assert briefing.generated_at
 
+    def test_briefing_reused_when_nothing_changed(self, tmp_path):
+        from core.mind.briefing import generate_morning_briefing
+
+        (tmp_path / "test_co" / "test_prod").mkdir(parents=True)
+        first = generate_morning_briefing(data_dir=tmp_path)
+        assert generate_morning_briefing(data_dir=tmp_path) is first
+        assert generate_morning_briefing(data_dir=tmp_path, use_cache=False) is not first
+
+    def test_thesis_change_invalidates_cached_briefing(self, tmp_path):
+        from core.mind.briefing import generate_morning_briefing
+
+        mind_dir = tmp_path / "test_co" / "mind"
+        (tmp_path / "test_co" / "test_prod").mkdir(parents=True)
+        mind_dir.mkdir()
+        first = generate_morning_briefing(data_dir=tmp_path)
+        assert first.thesis_alerts == []
+
+        (mind_dir / "thesis.json").write_text(json.dumps({"pillars": [
+            {"claim": "Collections hold", "status": "broken", "conviction_score": 20},
+        ]}))
+        second = generate_morning_briefing(data_dir=tmp_path)
+        assert second is not first
+        assert {a["pillar"] for a in second.thesis_alerts} == {"Collections hold"}
+        assert any("broken thesis" in r for r in second.recommendations)
+
+    def test_agent_activity_reads_session_index(self, tmp_path, monkeypatch):
+        import time
+        from core.agents.session import AgentSession
+        from core.mind import briefing as briefing_mod
+
+        sessions_dir = tmp_path / "_agent_sessions"
+        sessions_dir.mkdir()
+        monkeypatch.setattr(briefing_mod, "_SESSIONS_DIR", sessions_dir)
+        monkeypatch.setattr("core.agents.session._SESSIONS_DIR", sessions_dir)
+        (sessions_dir / "legacy123.json").write_text(json.dumps({
+            "session_id": "legacy123", "agent_name": "analyst", "messages": [],
+            "metadata": {"company": "klaim", "product": "UAE_healthcare"},
+            "created_at": time.time(), "last_active": time.time(),
+            "total_input_tokens": 7, "total_output_tokens": 3, "turn_count": 1,
+        }))
+
+        first = briefing_mod.generate_morning_briefing(data_dir=tmp_path)
+        assert not (sessions_dir / "legacy123.json").exists()  # migrated
+        assert first.agent_activity["total_sessions"] == 1
+        assert first.agent_activity["sessions"][0]["company"] == "klaim"
+
+        session = AgentSession.create("memo_writer", metadata={"company": "silq"})
+        session.record_usage(20, 5)
+        session.save()
+        second = briefing_mod.generate_morning_briefing(data_dir=tmp_path)
+        assert second is not first
+        assert second.agent_activity["total_sessions"] == 2
+        assert second.agent_activity["total_tokens"] == 35
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Integration: Event Bus + Listeners
@@ -0,0 +1,130 @@
+"""Shared analytics context cache behind AnalyticsBridge.get_section_context."""
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from core.memo import analytics_bridge
+from core.memo.analytics_bridge import AnalyticsBridge, SectionContextCache
+
+CO, PROD = "klaim", "UAE_healthcare"
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Fresh process cache; builders count calls; tape loads are faked."""
+    monkeypatch.setattr(analytics_bridge, "_context_cache", SectionContextCache())
+    counts = {"load": 0}
+
+    def _load(self, company, product, snapshot=None):
+        counts["load"] += 1
+        return pd.DataFrame({"x": [1]}), {"currency": "AED"}, "tape.csv", "2026-04-15", None
+    monkeypatch.setattr(AnalyticsBridge, "_load_data", _load)
+
+    for name in ("_build_portfolio_analytics", "_build_credit_quality",
+                 "_build_concentration", "_build_covenants"):
+        def _counting(self, df, config, mult, ccy, snap_date, _name=name, **kw):
+            counts[_name] = counts.get(_name, 0) + 1
+            time.sleep(0.05)
+            return {"metrics": [{"label": _name, "value": ccy, "assessment": "neutral"}],
+                    "text": f"{_name} in {ccy}", "charts_data": {}, "available": True}
+        monkeypatch.setattr(AnalyticsBridge, name, functools.wraps(getattr(AnalyticsBridge, name))(_counting))
+    return counts
+
+
+class TestSectionContextCache:
+    def test_builder_runs_once_across_sections_and_bridges(self, builds):
+        first = AnalyticsBridge().get_section_context(CO, PROD, "portfolio_analytics")
+        again = AnalyticsBridge().get_section_context(CO, PROD, "portfolio_performance")
+        assert first["cache"]["status"] == "miss" and again["cache"]["status"] == "hit"
+        assert first["cache"]["builder"] == "portfolio_analytics"
+        assert again["text"] == first["text"]
+        assert builds["_build_portfolio_analytics"] == 1 and builds["load"] == 1
+
+        # Callers get their own copies of the mutable parts
+        again["metrics"][0]["value"] = "mutated"
+        third = AnalyticsBridge().get_section_context(CO, PROD, "portfolio_overview")
+        assert third["metrics"][0]["value"] != "mutated"
+
+    def test_currency_and_snapshot_are_part_of_the_key(self, builds):
+        bridge = AnalyticsBridge()
+        aed = bridge.get_section_context(CO, PROD, "credit_quality")
+        usd = bridge.get_section_context(CO, PROD, "credit_quality", currency="USD")
+        assert (aed["cache"]["status"], usd["cache"]["status"]) == ("miss", "miss")
+        older = bridge.get_section_context(CO, PROD, "risk_assessment",
+                                           snapshot="2026-02-20_uae_healthcare.csv")
+        assert older["cache"]["snapshot"] == "2026-02-20_uae_healthcare.csv"
+        assert older["cache"]["status"] == "miss"
+        assert builds["_build_credit_quality"] == 3
+
+    def test_concurrent_callers_join_one_build(self, builds):
+        statuses = []
+        lock = threading.Lock()
+
+        def _call():
+            ctx = AnalyticsBridge().get_section_context(CO, PROD, "concentration_risk")
+            with lock:
+                statuses.append(ctx["cache"]["status"])
+
+        threads = [threading.Thread(target=_call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert builds["_build_concentration"] == 1
+        assert sorted(statuses) == ["joined"] * 3 + ["miss"]
+        assert analytics_bridge.get_context_cache().stats()["hit_rate"] == 0.75
+
+    def test_errors_are_not_cached(self, builds, monkeypatch):
+        calls = {"n": 0}
+
+        def _flaky(self, *a, **kw):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("transient")
+            return {"metrics": [], "text": "ok", "charts_data": {}, "available": True}
+        monkeypatch.setattr(AnalyticsBridge, "_build_stress", _flaky)
+        bridge = AnalyticsBridge()
+        assert bridge.get_section_context(CO, PROD, "stress_scenarios")["available"] is False
+        assert bridge.get_section_context(CO, PROD, "stress_scenarios")["cache"]["status"] == "miss"
+
+
+def _response(payload):
+    resp = MagicMock()
+    resp.content = [MagicMock(text=json.dumps(payload))]
+    resp.usage = MagicMock(input_tokens=100, output_tokens=50)
+    resp._laith_metadata = {"model": "claude-sonnet-4-6", "cache_read_tokens": 0}
+    return resp
+
+
+def test_memo_generation_meta_records_cache_hits(builds, monkeypatch):
+    from core.memo import agent_research
+    from core.memo.generator import MemoGenerator
+
+    monkeypatch.setattr("core.dataroom.DataRoomEngine", lambda: MagicMock(
+        search=MagicMock(return_value=[]), catalog=MagicMock(return_value={"documents": []})))
+    monkeypatch.setattr("core.mind.build_mind_context",
+                        lambda **kw: MagicMock(is_empty=True, formatted="", total_entries=0))
+    monkeypatch.setattr(agent_research, "generate_research_pack",
+                        lambda **kw: dict(agent_research.EMPTY_PACK))
+    monkeypatch.setattr("core.ai_client.complete", lambda **kw: _response(
+        {"content": "body", "metrics": [], "citations": []}))
+
+    first = MemoGenerator().generate_full_memo(CO, PROD, "monitoring_update", polish=False)
+    meta = first["generation_meta"]["analytics_cache"]
+    assert meta["miss"] == 4 and meta["hit"] + meta["joined"] == 0
+    assert meta["sections"]["covenant_compliance"] == "miss:covenants"
+
+    # A regeneration of the same snapshot builds nothing
+    second = MemoGenerator().generate_full_memo(CO, PROD, "monitoring_update", polish=False)
+    meta = second["generation_meta"]["analytics_cache"]
+    assert meta["miss"] == 0 and meta["hit"] == 4
+    by_key = {s["key"]: s for s in second["sections"]}
+    assert by_key["credit_quality"]["generation_meta"]["analytics_cache"]["status"] == "hit"
+    assert sum(v for k, v in builds.items() if k.startswith("_build_")) == 4
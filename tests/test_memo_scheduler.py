@@ -0,0 +1,165 @@
+"""Dependency-graph scheduling of the memo pipeline (core.memo.scheduler)."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.memo.generator import MemoGenerator, section_dependencies
+from core.memo.scheduler import DAGScheduler
+from core.memo.templates import MEMO_TEMPLATES
+
+
+class TestDAGScheduler:
+    def test_runs_nodes_after_their_deps_and_reports_critical_path(self):
+        log = []
+        lock = threading.Lock()
+
+        def node(name, delay):
+            def _run():
+                time.sleep(delay)
+                with lock:
+                    log.append(name)
+                return name
+            return _run
+
+        events = []
+        sched = DAGScheduler(max_workers=3, progress_cb=lambda e, p: events.append((e, p)))
+        sched.add("a", node("a", 0.05), stage="s")
+        sched.add("b", node("b", 0.01), stage="s")
+        sched.add("c", node("c", 0.01), deps=["a", "b"])
+        sched.add("d", node("d", 0.01), deps=["b"])
+        result = sched.run()
+
+        assert log.index("c") > log.index("a") and log.index("d") > log.index("b")
+        assert log.index("d") < log.index("a")  # d didn't wait on the slow a
+        assert result.results == {k: k for k in "abcd"}
+        assert result.critical_path == ["a", "c"]
+        assert result.critical_path_s <= result.wall_s
+        assert {p["node"] for e, p in events if e == "node_done"} == set("abcd")
+        stage_events = [e for e, p in events if e.startswith("stage_")]
+        assert stage_events == ["stage_start", "stage_done"]
+
+    def test_failed_node_recorded_and_dependents_still_run(self):
+        ran = []
+
+        def boom():
+            raise SystemExit("client went away")
+
+        sched = DAGScheduler(max_workers=2)
+        sched.add("x", boom)
+        sched.add("y", lambda: ran.append("y"), deps=["x"])
+        result = sched.run()
+        assert "SystemExit" in result.errors["x"]
+        assert result.timings["x"]["status"] == "error"
+        assert ran == ["y"]
+
+    def test_rejects_cycles_and_unknown_deps(self):
+        sched = DAGScheduler()
+        sched.add("a", lambda: None, deps=["b"])
+        sched.add("b", lambda: None, deps=["a"])
+        with pytest.raises(ValueError, match="cycle"):
+            sched.run()
+        sched = DAGScheduler()
+        sched.add("a", lambda: None, deps=["missing"])
+        with pytest.raises(ValueError, match="unknown"):
+            sched.run()
+
+
+class TestSectionDependencies:
+    def test_default_judgment_chain(self):
+        sections = MEMO_TEMPLATES["credit_memo"]["sections"]
+        deps = section_dependencies(sections)
+        body = [s["key"] for s in sections if not s.get("ai_guided")]
+        assert deps["company_overview"] == []
+        assert deps["exec_summary"] == body
+        assert deps["investment_thesis"] == body + ["exec_summary"]
+
+    def test_declared_deps_filtered_to_present_sections(self):
+        sections = [
+            {"key": "a", "title": "A"},
+            {"key": "b", "title": "B"},
+            {"key": "j", "title": "J", "ai_guided": True, "depends_on": ["b", "gone", "j"]},
+        ]
+        assert section_dependencies(sections) == {"a": [], "b": [], "j": ["b"]}
+
+
+def _response(payload):
+    resp = MagicMock()
+    resp.content = [MagicMock(text=json.dumps(payload))]
+    resp.usage = MagicMock(input_tokens=100, output_tokens=50,
+                           cache_read_input_tokens=0, cache_creation_input_tokens=0)
+    resp._laith_metadata = {"model": "claude-sonnet-4-6", "cache_read_tokens": 0}
+    return resp
+
+
+class TestPipelinedMemo:
+    SLOW = "portfolio_performance"
+
+    @pytest.fixture
+    def gen(self, monkeypatch):
+        bridge = MagicMock()
+        bridge.get_section_context.return_value = {"available": True, "text": "analytics",
+                                                   "metrics": []}
+        dataroom = MagicMock()
+        dataroom.search.return_value = [{"text": "excerpt"}]
+        dataroom.catalog.return_value = {"documents": []}
+        monkeypatch.setattr("core.memo.generator.AnalyticsBridge", lambda: bridge)
+        monkeypatch.setattr("core.dataroom.DataRoomEngine", lambda: dataroom)
+        monkeypatch.setattr("core.mind.build_mind_context",
+                            lambda **kw: MagicMock(is_empty=True, formatted="", total_entries=0))
+        from core.memo import agent_research
+        self.pack_bodies = {}
+
+        def _pack(**kw):
+            self.pack_bodies[kw["section_key"]] = [s["key"] for s in kw["body_so_far"]]
+            return dict(agent_research.EMPTY_PACK)
+        monkeypatch.setattr(agent_research, "generate_research_pack", _pack)
+
+
+        def _complete(*, tier, system, messages, max_tokens, **kwargs):
+            prefix = kwargs.get("log_prefix") or ""
+            parts = prefix.split(".")
+            kind = parts[1] if len(parts) > 2 else "section"
+            key = parts[-1]
+            if kind == "section" and key == self.SLOW:
+                time.sleep(0.3)
+            if kind == "polish":
+                return _response({"content": f"polished {key}"})
+            if kind == "citation_audit":
+                return _response({"issues": []})
+            return _response({"content": "body", "metrics": [],
+                              "citations": [{"source": "doc.pdf", "snippet": "s"}]})
+        monkeypatch.setattr("core.ai_client.complete", _complete)
+        return MemoGenerator()
+
+    def test_audit_starts_before_slowest_draft_finishes(self, gen, monkeypatch):
+        monkeypatch.setattr("core.memo.generator._PARALLEL_CAP", 3)
+        events = []
+        memo = gen.generate_full_memo("TestCo", "KSA", "monitoring_update",
+                                      progress_cb=lambda e, p: events.append((e, p)))
+
+        sched = memo["generation_meta"]["schedule"]
+        timings = sched["timings"]
+        slow_done = timings[f"gen:{self.SLOW}"]["end_s"]
+        early_audits = [k for k, t in timings.items()
+                        if t["stage"] == "citation_audit" and t["start_s"] < slow_done]
+        assert early_audits, "audits should overlap the slow section draft"
+        # Judgment sections still see every body draft before they run
+        body = [s["key"] for s in MEMO_TEMPLATES["monitoring_update"]["sections"]
+                if not s.get("ai_guided")]
+        assert self.pack_bodies["exec_summary"] == body
+        assert self.pack_bodies["action_items"] == body + ["exec_summary"]
+        assert timings["gen:exec_summary"]["start_s"] >= slow_done
+
+        assert memo["polished"] is True
+        assert sched["critical_path"][0] == f"gen:{self.SLOW}"
+        assert sched["critical_path_s"] <= sched["wall_s"] + 0.01
+        names = [e for e, _ in events]
+        for name in ("node_start", "node_done", "citation_audit_start",
+                     "citation_audit_done", "polish_start", "polish_done"):
+            assert name in names
+        assert names.index("polish_done") < names.index("pipeline_done")
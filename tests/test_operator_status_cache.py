@@ -0,0 +1,148 @@
+"""Operator status health cache + ETag regression tests.
+
+Pins the contract that:
+- `/api/operator/status` computes per-company health once and serves it from
+  `_health_cache` on subsequent requests.
+- Event bus events invalidate only the affected company.
+- A matching `If-None-Match` returns 304 with no body; a todo write, activity
+  event or health change produces a new ETag.
+
+Health computation, company discovery and every file the payload reads are
+redirected at stubs / tmp paths so the tests never touch real `data/`.
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import backend.operator as operator
+from core import activity_log
+
+
+@pytest.fixture
+def stub_operator(tmp_path, monkeypatch):
+    calls = []
+
+    def _fake_health(company, product, config):
+        calls.append((company, product))
+        return {"company": company, "product": product, "n": len(calls)}
+
+    monkeypatch.setattr(operator, "get_companies", lambda: ["alpha", "beta", "_master_mind"])
+    monkeypatch.setattr(operator, "get_products", lambda co: ["P1"])
+    monkeypatch.setattr(operator, "load_config", lambda co, prod: {})
+    monkeypatch.setattr(operator, "_compute_company_health", _fake_health)
+    monkeypatch.setattr(operator, "_TODO_PATH", tmp_path / "todo.json")
+    monkeypatch.setattr(operator, "_DEEP_WORK_PATH", tmp_path / "progress.json")
+    monkeypatch.setattr(activity_log, "_LOG_PATH", tmp_path / "activity_log.jsonl")
+
+    cache = operator._HealthCache(ttl_seconds=3600)
+    monkeypatch.setattr(operator, "_health_cache", cache)
+    return calls, cache
+
+
+@pytest.fixture
+def client(stub_operator):
+    app = FastAPI()
+    app.include_router(operator.router)
+    return TestClient(app)
+
+
+def _wait_for_refresh(cache, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not cache._refreshing and not cache._dirty:
+            return
+        time.sleep(0.01)
+    raise AssertionError("background refresh did not finish")
+
+
+class TestHealthCache:
+    def test_health_computed_once_across_requests(self, client, stub_operator):
+        calls, _ = stub_operator
+        r1 = client.get("/api/operator/status")
+        r2 = client.get("/api/operator/status")
+        assert r1.status_code == r2.status_code == 200
+        assert sorted(calls) == [("alpha", "P1"), ("beta", "P1")]
+        assert [c["company"] for c in r2.json()["companies"]] == ["alpha", "beta"]
+
+    def test_invalidate_recomputes_only_that_company(self, client, stub_operator):
+        calls, cache = stub_operator
+        client.get("/api/operator/status")
+        calls.clear()
+        operator._on_company_changed({"company": "beta", "product": "P1"})
+        _wait_for_refresh(cache)
+        assert calls == [("beta", "P1")]
+
+    def test_expired_entries_refresh_in_background(self, client, stub_operator):
+        calls, cache = stub_operator
+        client.get("/api/operator/status")
+        cache.ttl_seconds = 0
+        calls.clear()
+        body = client.get("/api/operator/status").json()
+        # The stale snapshot is served while the refresher runs
+        assert len(body["companies"]) == 2
+        _wait_for_refresh(cache)
+        assert sorted(calls) == [("alpha", "P1"), ("beta", "P1")]
+
+    def test_refresh_param_forces_recompute(self, client, stub_operator):
+        calls, _ = stub_operator
+        client.get("/api/operator/status")
+        calls.clear()
+        client.get("/api/operator/status", params={"refresh": "true"})
+        assert len(calls) == 2
+
+
+class TestStatusEtag:
+    def test_if_none_match_returns_304(self, client):
+        r1 = client.get("/api/operator/status")
+        etag = r1.headers["etag"]
+        assert r1.headers["cache-control"] == "no-cache"
+        r2 = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        assert r2.status_code == 304
+        assert r2.content == b""
+        assert r2.headers["etag"] == etag
+
+    def test_todo_write_changes_etag(self, client):
+        etag = client.get("/api/operator/status").headers["etag"]
+        client.post("/api/operator/todo", json={"text": "chase tape"})
+        r = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_activity_event_changes_etag(self, client):
+        etag = client.get("/api/operator/status").headers["etag"]
+        activity_log.log_activity(activity_log.TAPE_LOADED, company="alpha")
+        r = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.json()["activity_log"][0]["company"] == "alpha"
+
+    def test_health_change_changes_etag(self, client, stub_operator):
+        _, cache = stub_operator
+        etag = client.get("/api/operator/status").headers["etag"]
+        operator._on_company_changed({"company": "alpha"})
+        _wait_for_refresh(cache)
+        r = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+
+    def test_conditional_poll_still_refreshes_expired_health(self, client, stub_operator):
+        calls, cache = stub_operator
+        etag = client.get("/api/operator/status").headers["etag"]
+        cache.ttl_seconds = 0
+        calls.clear()
+        r = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        # The poll that spots the expiry may still be answered from the old
+        # snapshot, but it must kick off the refresh
+        assert r.status_code in (200, 304)
+        _wait_for_refresh(cache)
+        assert sorted(calls) == [("alpha", "P1"), ("beta", "P1")]
+        r = client.get("/api/operator/status", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+
+    def test_if_none_match_compares_whole_entity_tags(self, client):
+        etag = client.get("/api/operator/status").headers["etag"]
+        partial = etag[:-3] + '"'
+        assert client.get("/api/operator/status", headers={"If-None-Match": partial}).status_code == 200
+        assert client.get("/api/operator/status", headers={"If-None-Match": f'"x{etag[1:]}'}).status_code == 200
+        listed = f'"stale", W/{etag}'
+        assert client.get("/api/operator/status", headers={"If-None-Match": listed}).status_code == 304
@@ -0,0 +1,101 @@
+"""Golden outputs for concentration limits / borrowing base on the real SILQ and Klaim tapes.
+
+tests/golden/portfolio_concentration.json was recorded from the per-shop /
+per-payer loop implementation; the vectorized evaluation must reproduce it.
+Regenerate (only when the expected numbers legitimately change) with:
+    LAITH_REGEN_GOLDEN=1 python -m pytest tests/test_portfolio_concentration_golden.py
+"""
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from core.analysis_silq import C_OUTSTANDING, C_SHOP_ID, C_STATUS
+from core.loader import DATA_DIR, load_silq_snapshot, load_snapshot
+from core.portfolio import (
+    compute_borrowing_base, compute_concentration_limits,
+    compute_klaim_borrowing_base, compute_klaim_concentration_limits,
+)
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden', 'portfolio_concentration.json')
+SILQ_TAPE = os.path.join(DATA_DIR, 'SILQ', 'KSA', '2026-01-31_KSA.xlsx')
+KLAIM_TAPE = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare', '2026-04-15_uae_healthcare.csv')
+
+# (restrict to the N largest shops or None, facility_params) — the full tape has no
+# shop above the 10% tier, so the concentrated cases keep only the biggest borrowers.
+SILQ_CASES = {
+    'default': (None, {}),
+    'large_facility': (None, {'facility_drawn': 100_000_000, 'facility_limit': 150_000_000}),
+    'concentrated': (12, {'facility_drawn': 100_000_000}),
+    'concentrated_with_approved': (12, {'facility_drawn': 100_000_000, 'usd_rate': 1.0,
+                                        'approved_recipients': ['__largest__', '__second__', 'unknown-shop']}),
+}
+KLAIM_CASES = {
+    'default': {},
+    'tight_payer': {'single_payer_limit': 0.01, 'facility_limit': 50_000_000},
+    'loose_payer': {'single_payer_limit': 0.5},
+}
+
+
+def _silq_case(df, top_n, params):
+    """Restrict the tape to its largest borrowers and resolve placeholder shop ids."""
+    active = df[df[C_STATUS] != 'Closed']
+    top = (active.groupby(active[C_SHOP_ID].astype(str))[C_OUTSTANDING]
+           .sum().sort_values(ascending=False, kind='stable').index.tolist())
+    if top_n:
+        df = df[df[C_SHOP_ID].astype(str).isin(top[:top_n])]
+    alias = {'__largest__': top[0], '__second__': top[1]}
+    if 'approved_recipients' in params:
+        params = {**params, 'approved_recipients': [alias.get(s, s) for s in params['approved_recipients']]}
+    return df.copy(), params
+
+
+def _outputs():
+    out = {}
+    silq, _ = load_silq_snapshot(SILQ_TAPE)
+    for case, (top_n, params) in SILQ_CASES.items():
+        df, fp = _silq_case(silq, top_n, params)
+        out[f'silq/{case}/borrowing_base'] = compute_borrowing_base(df, 1, '2026-01-31', fp)
+        out[f'silq/{case}/concentration_limits'] = compute_concentration_limits(df.copy(), 1, '2026-01-31', fp)
+    klaim = load_snapshot(KLAIM_TAPE)
+    for case, fp in KLAIM_CASES.items():
+        out[f'klaim/{case}/borrowing_base'] = compute_klaim_borrowing_base(klaim, 1, '2026-04-15', fp)
+        out[f'klaim/{case}/concentration_limits'] = compute_klaim_concentration_limits(klaim, 1, '2026-04-15', fp)
+    return json.loads(json.dumps(out, default=str))
+
+
+def _assert_same(got, want, path='$'):
+    if isinstance(want, dict):
+        assert isinstance(got, dict) and list(got) == list(want), path
+        for k in want:
+            _assert_same(got[k], want[k], f'{path}.{k}')
+    elif isinstance(want, list):
+        assert isinstance(got, list) and len(got) == len(want), path
+        for i, (g, w) in enumerate(zip(got, want)):
+            _assert_same(g, w, f'{path}[{i}]')
+    elif isinstance(want, float) and not isinstance(got, bool):
+        # Array sums may differ from the Python loop in the last few ulps
+        assert got == pytest.approx(want, rel=1e-9, abs=1e-6), path
+    else:
+        assert got == want, path
+
+
+@pytest.mark.skipif(not (os.path.exists(SILQ_TAPE) and os.path.exists(KLAIM_TAPE)),
+                    reason='SILQ / Klaim tapes not available')
+def test_matches_golden_outputs():
+    outputs = _outputs()
+    if os.getenv('LAITH_REGEN_GOLDEN'):
+        os.makedirs(os.path.dirname(GOLDEN), exist_ok=True)
+        with open(GOLDEN, 'w') as f:
+            json.dump(outputs, f, indent=1, sort_keys=False)
+    with open(GOLDEN) as f:
+        golden = json.load(f)
+    assert list(outputs) == list(golden)
+    for key in golden:
+        _assert_same(outputs[key], golden[key], key)
+    # The cases exercise the breaching paths, not just the all-compliant one
+    assert golden['silq/concentrated/borrowing_base']['breaching_shops']
+    assert golden['silq/concentrated_with_approved/concentration_limits']['limits'][0]['breaching_shops']
+    assert golden['klaim/tight_payer/concentration_limits']['limits'][3]['breaches']
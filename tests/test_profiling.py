@@ -0,0 +1,118 @@
+"""Admin-only request profiling and its Operator Center endpoints (backend.profiling)."""
+from __future__ import annotations
+
+import os
+import pstats
+
+import pytest
+
+from backend import profiling
+from core.loader import DATA_DIR
+
+KLAIM_DIR = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare')
+RETURNS = '/companies/klaim/products/UAE_healthcare/charts/returns-analysis'
+needs_klaim = pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+
+
+@pytest.fixture(scope='module')
+def client():
+    from fastapi.testclient import TestClient
+    import backend.main as main
+    return TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', tmp_path)
+    return tmp_path
+
+
+class TestProfiler:
+    def test_cprofile_and_sample_modes(self):
+        def work():
+            return sum(i * i for i in range(2_000_000))
+
+        profile = profiling.RequestProfile('cprofile')
+        assert profile.run(work) == work()
+        assert any(r['function'].startswith('work ') for r in profile.top())
+
+        sampled = profiling.RequestProfile('sample')
+        sampled.run(work)
+        assert sampled.samples and any(s.startswith('work ') for s in sampled.stacks)
+        assert sampled.top()[0]['self_samples'] <= sampled.samples
+
+    def test_wrapper_is_transparent_without_a_profile(self):
+        def endpoint(x: int):
+            return x + 1
+        wrapped = profiling.profiled(endpoint)
+        assert wrapped(1) == 2 and wrapped.__wrapped__ is endpoint
+
+    def test_prune_and_unknown_ids(self, profile_dir):
+        for i in range(3):
+            (profile_dir / f'2026010{i}T000000Z_x_0000000{i}.json').write_text('{}')
+            (profile_dir / f'2026010{i}T000000Z_x_0000000{i}.prof').write_text('')
+        profiling._prune(profile_dir, keep=2)
+        assert sorted(p.name for p in profile_dir.iterdir())[0].startswith('20260101')
+        assert len(list(profile_dir.glob('*.prof'))) == 2
+        for bad in ('../secrets', '20260101T000000Z_x_zzzz'):
+            with pytest.raises(Exception):
+                profiling.load_profile(bad)
+
+
+class TestMiddleware:
+    @needs_klaim
+    def test_cprofile_artifact_with_tape_identity(self, client, profile_dir):
+        r = client.get(RETURNS, params={'_profile': '1'})
+        assert r.status_code == 200
+        profile_id = r.headers['x-laith-profile-id']
+        meta = profiling.load_profile(profile_id)
+        assert meta['mode'] == 'cprofile' and meta['status'] == 200
+        assert meta['route'] == '/companies/{company}/products/{product}/charts/returns-analysis'
+        assert meta['tape']['filename'].endswith('.csv') and meta['tape']['size'] > 0
+        assert meta['params'] == {} and meta['user'] == 'dev@localhost'
+        assert any('compute_returns_analysis' in row['function'] for row in meta['top'])
+        stats = pstats.Stats(str(profile_dir / meta['artifact']))
+        assert any(name == 'compute_returns_analysis' for _, _, name in stats.stats)
+
+    @needs_klaim
+    def test_sample_mode_writes_folded_stacks(self, client, profile_dir):
+        r = client.get(RETURNS, headers={'X-Laith-Profile': 'sample'})
+        meta = profiling.load_profile(r.headers['x-laith-profile-id'])
+        assert meta['artifact'].endswith('.folded')
+        lines = (profile_dir / meta['artifact']).read_text().splitlines()
+        assert len(lines) >= 1 and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    @needs_klaim
+    def test_profiled_request_bypasses_etag(self, client):
+        etag = client.get(RETURNS).headers['etag']
+        assert client.get(RETURNS, headers={'If-None-Match': etag}).status_code == 304
+        r = client.get(RETURNS, params={'_profile': '1'}, headers={'If-None-Match': etag})
+        assert r.status_code == 200 and 'x-laith-profile-id' in r.headers
+
+    def test_unflagged_or_unknown_mode_is_not_profiled(self, client, profile_dir):
+        for params in ({}, {'_profile': 'nope'}):
+            r = client.get('/health', params=params)
+            assert r.status_code == 200 and 'x-laith-profile-id' not in r.headers
+        assert not list(profile_dir.iterdir())
+
+    def test_non_admin_is_refused(self, client, monkeypatch, profile_dir):
+        from backend import cf_auth
+        from core.models import User
+        monkeypatch.setattr(cf_auth, 'get_current_user',
+                            lambda request, db: User(email='analyst@x', role='viewer', is_active=True))
+        r = client.get('/health', params={'_profile': '1'})
+        assert r.status_code == 403
+        assert not list(profile_dir.iterdir())
+
+
+class TestOperatorEndpoints:
+    def test_list_detail_download(self, client):
+        r = client.get('/health', headers={'X-Laith-Profile': 'cprofile'})
+        profile_id = r.headers['x-laith-profile-id']
+        listed = client.get('/api/operator/profiles').json()['profiles']
+        assert [p['id'] for p in listed] == [profile_id]
+        assert 'top' not in listed[0] and listed[0]['route'] == '/health' and listed[0]['tape'] is None
+        assert client.get(f'/api/operator/profiles/{profile_id}').json()['top']
+        download = client.get(f'/api/operator/profiles/{profile_id}/download')
+        assert download.status_code == 200 and download.content
+        assert client.get('/api/operator/profiles/not-an-id').status_code == 404
@@ -0,0 +1,97 @@
+"""Synthetic tape generator and engine benchmark harness (scripts/synthetic_tapes.py, scripts/bench_engines.py)."""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.loader import DATA_DIR, load_aajil_snapshot, load_silq_snapshot, load_snapshot
+from scripts.bench_engines import bench_engine, compare, discover
+from scripts.synthetic_tapes import (
+    KLAIM_CURVE_DAYS, generate, parse_rows, tape_frame, write_tape,
+)
+
+KLAIM_TAPE = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare', '2026-04-15_uae_healthcare.csv')
+SILQ_TAPE = os.path.join(DATA_DIR, 'SILQ', 'KSA', '2026-03-31_KSA.xlsx')
+
+
+class TestGenerator:
+    def test_parse_rows(self):
+        assert parse_rows('10k') == 10_000
+        assert parse_rows('1M') == 1_000_000
+        assert parse_rows('2,500') == 2_500
+
+    @pytest.mark.parametrize('engine', ['klaim', 'silq', 'aajil'])
+    def test_seeded(self, engine):
+        a, b = tape_frame(engine, generate(engine, 500)), tape_frame(engine, generate(engine, 500))
+        pd.testing.assert_frame_equal(a, b)
+        assert not tape_frame(engine, generate(engine, 500, seed=1)).equals(a)
+
+    @pytest.mark.skipif(not os.path.exists(KLAIM_TAPE), reason='Klaim tape not available')
+    def test_klaim_matches_real_schema(self):
+        real = load_snapshot(KLAIM_TAPE)
+        synth = generate('klaim', 500)
+        assert list(synth.columns) == list(real.columns)
+        for col in ('Deal date', 'Purchase value', 'Claim count', 'Status'):
+            assert synth[col].dtype.kind == real[col].dtype.kind, col
+
+    @pytest.mark.skipif(not os.path.exists(SILQ_TAPE), reason='SILQ tape not available')
+    def test_silq_matches_real_schema(self):
+        real, _ = load_silq_snapshot(SILQ_TAPE)
+        synth, commentary = generate('silq', 500)
+        assert set(synth.columns) == set(real.columns)
+        assert set(synth['_source_sheet']) == set(real['_source_sheet'])
+        assert commentary
+
+    def test_status_mixes(self):
+        assert set(generate('klaim', 5000)['Status']) >= {'Completed', 'Executed'}
+        assert set(generate('silq', 5000)[0]['Loan_Status']) == {'Closed', 'Current', 'Overdue'}
+        deals, aux = generate('aajil', 5000)
+        assert set(deals['Realised Status']) == {'Realised', 'Accrued', 'Written Off'}
+        assert set(deals['Deal Type']) == {'EMI', 'Bullet'}
+        assert aux['dpd_cohorts'].iloc[2, 8:].is_monotonic_increasing
+
+    def test_klaim_curves_are_cumulative(self):
+        df = generate('klaim', 2000)
+        actual = df[[f'Actual in {k} days' for k in KLAIM_CURVE_DAYS]].to_numpy()
+        expected = df[[f'Expected in {k} days' for k in KLAIM_CURVE_DAYS]].to_numpy()
+        assert (np.diff(actual, axis=1) >= 0).all() and (np.diff(expected, axis=1) >= 0).all()
+        settled = df['Collection days so far'] <= KLAIM_CURVE_DAYS[-1]
+        assert np.allclose(actual[settled, -1], df.loc[settled, 'Collected till date'], atol=0.01)
+
+    @pytest.mark.parametrize('engine, loader', [
+        ('klaim', load_snapshot), ('silq', load_silq_snapshot), ('aajil', load_aajil_snapshot),
+    ])
+    def test_written_tape_loads_back(self, engine, loader, tmp_path):
+        tape = generate(engine, 300)
+        loaded = loader(write_tape(engine, tape, str(tmp_path)))
+        frame, back = tape_frame(engine, tape), tape_frame(engine, loaded)
+        assert len(back) == len(frame) and set(back.columns) == set(frame.columns)
+        assert back[frame.columns[2]].dtype.kind == frame[frame.columns[2]].dtype.kind
+        if engine == 'aajil':
+            assert set(loaded[1]) == {'dpd_cohorts', 'collections', 'payments'}
+
+
+class TestBenchHarness:
+    @pytest.mark.parametrize('engine', ['klaim', 'silq', 'aajil'])
+    def test_every_function_runs_on_synthetic_tape(self, engine):
+        results = bench_engine(engine, 1500, repeat=1, pattern=r'^(compute_|validate_)')
+        assert len(results) == len(discover(engine))
+        failed = {r['name']: r.get('error') or r.get('skipped') for r in results if 'median_ms' not in r}
+        assert not failed
+
+    def test_loader_row_cap(self):
+        results = bench_engine('silq', 200, repeat=1, pattern='^load_', loader_max_rows=100)
+        assert results == [{'engine': 'silq', 'rows': 200, 'group': 'loader', 'name': 'load_silq_snapshot',
+                            'skipped': 'above --loader-max-rows (100)'}]
+
+    def test_compare_threshold_and_noise_floor(self):
+        def row(name, ms):
+            return {'engine': 'klaim', 'rows': 10_000, 'name': name, 'median_ms': ms}
+        baseline = {'results': [row('slow', 100.0), row('tiny', 2.0), row('ok', 100.0)]}
+        results = [row('slow', 140.0), row('tiny', 4.0), row('ok', 120.0), row('new', 50.0)]
+        regressions = compare(results, baseline, threshold=0.25, min_delta_ms=5)
+        assert [r['key'] for r in regressions] == ['klaim/10000/slow']
+        assert regressions[0]['ratio'] == 1.4
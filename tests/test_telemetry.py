@@ -0,0 +1,123 @@
+"""Latency / cache telemetry and the Prometheus /metrics endpoint (core.telemetry)."""
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+import pytest
+
+from core.telemetry import (
+    Histogram, Telemetry, get_telemetry, instrument_module, timed_compute,
+)
+from core.loader import DATA_DIR
+
+KLAIM_DIR = os.path.join(DATA_DIR, 'klaim', 'UAE_healthcare')
+CHARTS = '/companies/klaim/products/UAE_healthcare/charts'
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_in_export(self):
+        t = Telemetry()
+        for v in (0.001, 0.02, 0.02, 3.0, 500.0):
+            t.observe('laith_compute_duration_seconds', v, function='f')
+        text = t.render_prometheus()
+        assert 'laith_compute_duration_seconds_bucket{function="f",le="0.005"} 1' in text
+        assert 'laith_compute_duration_seconds_bucket{function="f",le="0.025"} 3' in text
+        assert 'laith_compute_duration_seconds_bucket{function="f",le="+Inf"} 5' in text
+        assert 'laith_compute_duration_seconds_count{function="f"} 5' in text
+        assert '# TYPE laith_compute_duration_seconds histogram' in text
+
+    def test_quantile(self):
+        h = Histogram((0.1, 1.0))
+        assert h.quantile(0.5) is None
+        for v in (0.05, 0.05, 0.5, 0.5):
+            h.observe(v)
+        assert h.quantile(0.5) == pytest.approx(0.1)
+        assert 0.1 < h.quantile(0.95) <= 1.0
+
+    def test_label_escaping_and_collectors(self):
+        t = Telemetry()
+        t.inc('laith_cache_requests_total', cache='a"b', result='hit')
+        t.register_collector('x', lambda: [('laith_cache_hit_ratio', {'cache': 'c'}, 0.75)])
+        t.register_collector('broken', lambda: 1 / 0)
+        text = t.render_prometheus()
+        assert 'laith_cache_requests_total{cache="a\\"b",result="hit"} 1' in text
+        assert 'laith_cache_hit_ratio{cache="c"} 0.75' in text
+        assert t.summary()['caches']['c']['hit_ratio'] == 0.75
+
+
+class TestInstrumentation:
+    def test_compute_records_latency_rows_and_output(self):
+        def compute_thing(df, mult=1):
+            return [{'x': 1}, {'x': 2}]
+
+        timed = timed_compute(compute_thing)
+        assert timed_compute(timed) is timed
+        before = get_telemetry().render_prometheus()
+        assert timed(pd.DataFrame({'a': range(7)})) == [{'x': 1}, {'x': 2}]
+        text = get_telemetry().render_prometheus()
+        assert 'function="compute_thing"' in text and 'function="compute_thing"' not in before
+        assert 'laith_compute_input_rows_sum{function="compute_thing"} 7' in text
+        assert 'laith_compute_output_items_sum{function="compute_thing"} 2' in text
+
+    def test_instrument_module_only_wraps_own_compute_functions(self):
+        ns = {'__name__': __name__, 'compute_a': lambda df: {}, 'helper': lambda: None,
+              'compute_imported': pd.concat}
+        ns['compute_a'].__module__ = __name__
+        assert instrument_module(ns) == 1
+        assert ns['compute_a']._telemetry_wrapped and ns['compute_imported'] is pd.concat
+
+    def test_analysis_modules_are_instrumented(self):
+        import core.analysis as analysis
+        import core.analysis_silq as silq
+        import core.loader as loader
+        assert analysis.compute_summary._telemetry_wrapped
+        assert silq.compute_silq_summary._telemetry_wrapped
+        assert loader.load_snapshot._telemetry_wrapped
+        assert analysis.compute_summary.__name__ == 'compute_summary'
+
+
+@pytest.fixture(scope='module')
+def client():
+    from fastapi.testclient import TestClient
+    import backend.main as main
+    return TestClient(main.app)
+
+
+class TestEndpoints:
+    def test_route_template_label(self, client):
+        client.get('/health')
+        client.get('/no-such-path')
+        text = client.get('/metrics').text
+        assert 'laith_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+        assert 'route="<unmatched>"' in text and 'no-such-path' not in text
+        assert 'route="/metrics"' not in text
+        assert 'laith_cache_hit_ratio{cache="http_etag"}' in text
+
+    @pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+    def test_chart_request_records_compute_and_tape_cache(self, client):
+        assert client.get(f'{CHARTS}/cohort').status_code == 200
+        assert client.get(f'{CHARTS}/cohort', headers={'Cache-Control': 'no-cache'}).status_code == 200
+        perf = client.get('/api/operator/performance').json()
+        routes = {r['route'] for r in perf['routes']}
+        assert '/companies/{company}/products/{product}/charts/cohort' in routes
+        assert any(r['function'].startswith('compute_') for r in perf['compute'])
+        assert perf['caches']['tape_klaim']['hit'] >= 1
+
+    def test_metrics_token(self, client, monkeypatch):
+        monkeypatch.setenv('LAITH_METRICS_TOKEN', 's3cret')
+        assert client.get('/metrics').status_code == 401
+        ok = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        assert ok.status_code == 200 and ok.headers['content-type'].startswith('text/plain; version=0.0.4')
+
+    def test_metrics_closed_in_production_without_token(self, client, monkeypatch):
+        from backend import cf_auth
+        monkeypatch.delenv('LAITH_METRICS_TOKEN', raising=False)
+        monkeypatch.setattr(cf_auth, 'CF_TEAM', 'acme')
+        assert client.get('/metrics').status_code == 403
+
+    def test_operator_performance_reset(self, client):
+        client.get('/health')
+        assert client.get('/api/operator/performance', params={'reset': True}).json()['routes']
+        routes = client.get('/api/operator/performance').json()['routes']
+        assert all(r['route'] == '/api/operator/performance' for r in routes)
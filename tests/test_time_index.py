@@ -0,0 +1,176 @@
+"""Sorted time index over tapes and the as-of sweep (core.time_index)."""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.analysis import compute_hhi_for_snapshot, compute_par, compute_summary, filter_by_date
+from core.analysis_silq import compute_silq_concentration, filter_silq_by_date
+from core.loader import load_snapshot
+from core.time_index import (
+    ROW_POS_COL, as_of_slice, as_of_sweep, cutoff_positions, is_date_sorted, sort_by_date, sweep_cutoffs,
+)
+
+KLAIM_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'klaim', 'UAE_healthcare')
+
+
+def _tape(n=400, seed=7, proxy=False):
+    """Unsorted synthetic Klaim tape with a few unparseable deal dates."""
+    rng = np.random.default_rng(seed)
+    pv = rng.uniform(1_000, 50_000, n).round(2)
+    collected = (pv * rng.uniform(0, 1.1, n)).round(2)
+    denied = (pv * rng.choice([0, 0, 0.2, 0.7], n)).round(2)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')
+    deal = pd.Series(dates.strftime('%Y-%m-%d'), dtype=object)
+    deal.iloc[::97] = 'not a date'
+    df = pd.DataFrame({
+        'Deal date': deal,
+        'Status': rng.choice(['Executed', 'Completed'], n, p=[0.4, 0.6]),
+        'Group': rng.choice([f'G{i}' for i in range(12)] + [None], n),
+        'Provider': rng.choice([f'P{i}' for i in range(30)], n),
+        'Product': rng.choice(['claims', 'lpo'], n, p=[0.9, 0.1]),
+        'Purchase value': pv,
+        'Collected till date': collected,
+        'Denied by insurance': denied,
+        'Pending insurance response': (pv * 0.05).round(2),
+        'Expected till date': (pv * rng.uniform(0.3, 1.2, n)).round(2),
+    })
+    if not proxy:
+        df['Expected collection days'] = rng.integers(20, 200, n).astype(float)
+    return df
+
+
+class TestIndex:
+    def test_sort_puts_nat_last_and_keeps_ties_stable(self):
+        df = _tape()
+        indexed = sort_by_date(df, 'Deal date')
+        assert is_date_sorted(indexed, 'Deal date') and not is_date_sorted(df, 'Deal date')
+        assert indexed['Deal date'].isna().sum() == 5
+        assert indexed['Deal date'].iloc[-5:].isna().all()
+        assert sort_by_date(indexed, 'Deal date') is indexed
+        # Stable: rows sharing a date keep their tape order
+        parsed = pd.to_datetime(df['Deal date'], errors='coerce', format='mixed')
+        day = parsed.value_counts().idxmax()
+        assert list(indexed.loc[indexed['Deal date'] == day, 'Provider']) == \
+            list(df.loc[parsed == day, 'Provider'])
+        # File position survives the re-sort
+        assert ROW_POS_COL not in df.columns
+        assert (df['Provider'].to_numpy()[indexed[ROW_POS_COL]] == indexed['Provider'].to_numpy()).all()
+
+    def test_slice_is_zero_copy_prefix(self):
+        indexed = sort_by_date(_tape(), 'Deal date')
+        cut = as_of_slice(indexed, 'Deal date', '2024-02-29')
+        assert len(cut) == int((indexed['Deal date'] <= '2024-02-29').sum())
+        assert np.shares_memory(cut['Purchase value'].to_numpy(), indexed['Purchase value'].to_numpy())
+        assert as_of_slice(_tape(), 'Deal date', '2024-02-29') is None
+        assert list(cutoff_positions(indexed['Deal date'], ['2022-01-01', '2030-01-01'])) == [0, 395]
+
+    @pytest.mark.parametrize('as_of', [None, '2023-06-15', '2024-12-31'])
+    def test_filters_agree_on_indexed_and_raw_tapes(self, as_of):
+        raw = _tape()
+        indexed = sort_by_date(raw, 'Deal date')
+        a = filter_by_date(raw, as_of)
+        b = filter_by_date(indexed, as_of)
+        key = ['Deal date', 'Provider', 'Purchase value']
+        pd.testing.assert_frame_equal(
+            a.sort_values(key).reset_index(drop=True),
+            b.sort_values(key).reset_index(drop=True)[a.columns])
+        # Still a private copy — writing to it leaves the cached tape alone
+        b['Purchase value'] = 0.0
+        assert indexed['Purchase value'].sum() > 0
+        assert raw['Deal date'].dtype == object
+
+    def test_silq_filter_uses_slice(self):
+        df = pd.DataFrame({'Disbursement_Date': pd.to_datetime(['2025-01-05', '2025-03-01', None]),
+                           'Disbursed_Amount': [1.0, 2.0, 3.0]})
+        assert list(filter_silq_by_date(df, '2025-02-01')['Disbursed_Amount']) == [1.0]
+
+    def test_silq_shop_limit_keeps_file_order(self):
+        # Shop S1's first row in the file is neither its earliest nor its latest
+        # disbursement; the limit comes from that row whether or not the tape
+        # was re-sorted by date
+        df = pd.DataFrame({
+            'Disbursement_Date': ['2025-02-01', '2025-03-01', '2025-01-05', '2025-02-01'],
+            'Shop_ID': ['S1', 'S1', 'S1', 'S2'],
+            'Disbursed_Amount (SAR)': [100.0, 100.0, 100.0, 50.0],
+            'Outstanding_Amount (SAR)': [60.0, 20.0, 20.0, 50.0],
+            'Shop_Credit_Limit (SAR)': [400.0, 300.0, 200.0, 100.0],
+        })
+        expected = [{'shop_id': 'S2', 'outstanding': 50.0, 'limit': 100.0, 'util_pct': 50.0},
+                    {'shop_id': 'S1', 'outstanding': 100.0, 'limit': 400.0, 'util_pct': 25.0}]
+        raw = compute_silq_concentration(df)
+        indexed = compute_silq_concentration(sort_by_date(df, 'Disbursement_Date'))
+        assert raw['utilization'] == indexed['utilization'] == expected
+        cut = filter_silq_by_date(sort_by_date(df, 'Disbursement_Date'), '2025-03-31')
+        assert compute_silq_concentration(cut)['utilization'] == expected
+
+
+def _expected(df, cutoff, mult):
+    sub = filter_by_date(df, cutoff)
+    summary = compute_summary(sub, None, 'USD', None, None)
+    return summary, compute_par(sub, mult, as_of_date=cutoff), compute_hhi_for_snapshot(sub, mult)
+
+
+def _assert_close(got, want, keys):
+    """Equal up to summation order, which can flip the last rounded digit."""
+    for k in keys:
+        if want[k] is None:
+            assert got[k] is None, k
+            continue
+        money = k.endswith(('_amount', 'outstanding', 'originated'))
+        assert got[k] == pytest.approx(want[k], rel=1e-9, abs=0.011 if money else 1.1e-4), k
+
+
+class TestAsOfSweep:
+    @pytest.mark.parametrize('proxy', [False, True])
+    def test_matches_filter_then_compute(self, proxy):
+        df = _tape(proxy=proxy)
+        cutoffs = sweep_cutoffs(pd.to_datetime(df['Deal date'], errors='coerce', format='mixed'), 30) + [pd.Timestamp('2022-06-30')]
+        sweeps = {m: as_of_sweep(df, m, cutoffs, mult=3.67) for m in ('collection_rate', 'par', 'hhi')}
+        for i, c in enumerate(sorted(cutoffs)):
+            summary, par, hhi = _expected(df, c, 3.67)
+            assert sweeps['par'][i]['available'] == par['available']
+            _assert_close(sweeps['collection_rate'][i], summary,
+                          ['total_deals', 'collection_rate', 'denial_rate', 'pending_rate'])
+            if par['available']:
+                _assert_close(sweeps['par'][i], par, [k for k in sweeps['par'][i]
+                                                      if k not in ('available', 'method', 'as_of_date')])
+            _assert_close(sweeps['hhi'][i], hhi, list(hhi))
+
+    @pytest.mark.skipif(not os.path.isdir(KLAIM_DIR), reason='Klaim tapes not available')
+    def test_real_tape(self):
+        tape = sorted(f for f in os.listdir(KLAIM_DIR) if f.endswith('.csv'))[-1]
+        df = sort_by_date(load_snapshot(os.path.join(KLAIM_DIR, tape)), 'Deal date')
+        cutoffs = sweep_cutoffs(df['Deal date'], 6)
+        par = as_of_sweep(df, 'par', cutoffs)
+        for row, c in zip(par, cutoffs):
+            want = compute_par(filter_by_date(df, c), 1, as_of_date=c)
+            _assert_close(row, want, ['par30', 'par90', 'lifetime_par60', 'total_active_outstanding'])
+
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError, match='Unknown sweep metric'):
+            as_of_sweep(_tape(), 'dso', ['2024-01-31'])
+
+
+def test_sweep_endpoint_matches_chart():
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    if not os.path.isdir(KLAIM_DIR):
+        pytest.skip('Klaim tapes not available')
+    client = TestClient(app)
+    base = '/companies/klaim/products/UAE_healthcare'
+    resp = client.get(f'{base}/charts/as-of-sweep',
+                      params={'metric': 'par', 'dates': '2025-12-31,2025-06-30'})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['method'] == 'cumulative'
+    assert [p['as_of_date'] for p in body['points']] == ['2025-06-30', '2025-12-31']
+    chart = client.get(f'{base}/charts/par', params={'as_of_date': '2025-06-30'}).json()
+    assert body['points'][0]['par30'] == pytest.approx(chart['par30'])
+
+    assert client.get(f'{base}/charts/as-of-sweep', params={'metric': 'dso'}).status_code == 400
+    assert client.get(f'{base}/charts/as-of-sweep', params={'dates': 'soon'}).status_code == 400
@@ -0,0 +1,110 @@
+"""Tape validation rule engine — fused counting, ordering, caching, timings."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import validation_rules as vr
+from core.validation import validate_tape
+from core.validation_rules import Rule, RuleSet
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    vr.clear_validation_cache()
+    yield
+    vr.clear_validation_cache()
+
+
+def _count_rule(name, severity, mask, requires=()):
+    return Rule(name, lambda ctx, n: [(severity, f'{name}:{n}')] if n else [],
+                mask=mask, requires=requires)
+
+
+def _klaim_frame(n=40):
+    return pd.DataFrame({
+        'ID': range(n),
+        'Deal date': pd.date_range('2024-01-01', periods=n, freq='D'),
+        'Purchase value': np.linspace(1000, 5000, n),
+        'Purchase price': np.linspace(900, 4500, n),
+        'Status': ['Executed', 'Completed'] * (n // 2),
+        'Collected till date': np.linspace(500, 2500, n),
+        'Denied by insurance': 0.0,
+        'Discount': 0.1,
+    })
+
+
+class TestRuleSet:
+    def test_fused_counts_and_declaration_order(self):
+        df = pd.DataFrame({'a': [-1, 2, -3, 4], 'b': [1, None, None, 4]})
+        rules = RuleSet('t', [
+            _count_rule('neg_a', 'warnings', lambda ctx: ctx.df['a'] < 0, ('a',)),
+            _count_rule('null_b', 'critical', lambda ctx: ctx.isna('b'), ('b',)),
+            _count_rule('null_c', 'critical', lambda ctx: ctx.isna('c'), ('c',)),
+            Rule('rows', lambda ctx: [('info', ctx.n)]),
+            _count_rule('big_a', 'warnings', lambda ctx: ctx.df['a'] > 3, ('a',)),
+        ])
+        result = rules.run(df, use_cache=False)
+        assert result['warnings'] == ['neg_a:2', 'big_a:1']
+        assert result['critical'] == ['null_b:2']
+        assert result['info'] == [4]
+        assert result['passed'] is False
+        names = [t['rule'] for t in result['rule_timings']]
+        assert names == ['neg_a', 'null_b', 'rows', 'big_a', '_fused_count_pass']
+
+    def test_nullable_boolean_na_counts_as_false(self):
+        df = pd.DataFrame({'a': pd.array([-1, None, 3], dtype='Int64')})
+        rules = RuleSet('t', [_count_rule('neg', 'warnings', lambda ctx: ctx.df['a'] < 0)])
+        assert rules.run(df, use_cache=False)['warnings'] == ['neg:1']
+
+    def test_columns_coerced_once(self, monkeypatch):
+        calls = []
+        orig = pd.to_numeric
+        monkeypatch.setattr(pd, 'to_numeric', lambda *a, **kw: calls.append(1) or orig(*a, **kw))
+        rules = RuleSet('t', [
+            _count_rule('x', 'info', lambda ctx: ctx.num('a') > 0),
+            _count_rule('y', 'info', lambda ctx: ctx.num('a') < 0),
+        ])
+        rules.run(pd.DataFrame({'a': ['1', '-2', 'x']}), use_cache=False)
+        assert len(calls) == 1
+
+
+class TestCache:
+    def test_cache_hit_returns_independent_copy(self):
+        df = _klaim_frame()
+        first = validate_tape(df)
+        first['snapshot'] = 'mutated by caller'
+        first['warnings'].append('x')
+        second = validate_tape(df.copy())
+        assert 'snapshot' not in second
+        assert 'x' not in second['warnings']
+        assert len(vr._result_cache) == 1
+
+    def test_changed_tape_misses(self):
+        df = _klaim_frame()
+        validate_tape(df)
+        changed = df.copy()
+        changed.loc[0, 'Purchase value'] = -1
+        result = validate_tape(changed)
+        assert any(w['check'] == 'Negative Purchase value' for w in result['warnings'])
+        assert len(vr._result_cache) == 2
+
+    def test_uncached_matches_cached(self):
+        df = _klaim_frame()
+        cached = validate_tape(df)
+        fresh = validate_tape(df, use_cache=False)
+        cached.pop('rule_timings'), fresh.pop('rule_timings')
+        assert cached == fresh
+
+
+class TestKlaimRules:
+    def test_report_shape(self):
+        result = validate_tape(_klaim_frame())
+        assert list(result)[:6] == ['critical', 'warnings', 'info', 'passed',
+                                    'total_rows', 'column_completeness']
+        assert result['passed'] is True
+        assert all(t['ms'] >= 0 for t in result['rule_timings'])
+
+    def test_missing_required_column_is_critical(self):
+        df = _klaim_frame().drop(columns=['Status'])
+        result = validate_tape(df)
+        assert [c['check'] for c in result['critical']] == ['Missing Column: Status']